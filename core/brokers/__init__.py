@@ -8,10 +8,14 @@ from .alpaca_connector import (
     BrokerConnectionError,
     BrokerOrderError,
 )
+from .alpaca_async_connector import AsyncAlpacaBrokerConnector
+from .state_cache import BrokerStateCache
 
 __all__ = [
     "AlpacaBrokerConnector",
+    "AsyncAlpacaBrokerConnector",
     "BrokerOrderSide",
     "BrokerConnectionError",
     "BrokerOrderError",
+    "BrokerStateCache",
 ]
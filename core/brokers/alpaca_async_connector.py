@@ -0,0 +1,652 @@
+"""
+Async pooled Alpaca broker connector.
+
+PROBLEM:
+    AlpacaBrokerConnector drives the synchronous alpaca-py client: one
+    blocking request at a time, a fresh round trip per call and
+    time.sleep() backoff. Protective legs and mass cancels went out one
+    after another.
+
+DESIGN:
+    - httpx.AsyncClient with a persistent keep-alive connection pool, owned
+      by one private event loop running on a daemon thread.
+    - Every operation exists as a coroutine (*_async) and as a blocking
+      wrapper with the SAME signature as AlpacaBrokerConnector, so
+      OrderExecutionEngine can use either connector unchanged.
+    - Blocking wrappers are thread-safe: calls from several threads run
+      concurrently on the loop (supports_concurrent_requests = True).
+    - Retry/backoff is non-blocking (asyncio.sleep): 429 / 5xx / transport
+      errors, Retry-After honoured, absolute timeout like PATCH 11.
+    - Every attempt spends a token of the attached core.net Throttler on its
+      ALPACA_ROUTES route (orders / status / account), like the sync
+      connector's _throttled (PATCH 33).
+    - Request bodies are built with the alpaca-py request models and
+      responses parsed into alpaca-py models, so callers see the same
+      objects as with the sync connector.
+
+Enabled in the runtime with MQD_ASYNC_BROKER=1.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from alpaca.trading.enums import OrderClass, OrderSide, TimeInForce
+from alpaca.trading.models import ClosePositionResponse, Clock, Order, TradeAccount
+from alpaca.trading.models import Position as AlpacaPosition
+from alpaca.trading.requests import (
+    LimitOrderRequest,
+    MarketOrderRequest,
+    StopLossRequest,
+    StopOrderRequest,
+    TakeProfitRequest,
+)
+
+from core.brokers.alpaca_connector import (
+    BracketOrderIds,
+    BrokerConnectionError,
+    BrokerOrderError,
+    BrokerOrderSide,
+    ROUTE_ACCOUNT,
+    ROUTE_ORDERS,
+    ROUTE_STATUS,
+    _bracket_leg_id,
+    close_position_info,
+    map_alpaca_status,
+    order_fill_info,
+    position_from_alpaca,
+)
+from core.logging import LogContext, LogStream, get_logger
+from core.state import OrderStatus, Position
+
+
+# ============================================================================
+# ASYNC ALPACA BROKER CONNECTOR
+# ============================================================================
+
+class AsyncAlpacaBrokerConnector:
+    """
+    Alpaca REST connector over a pooled async HTTP client.
+
+    Usage:
+        broker = AsyncAlpacaBrokerConnector(api_key, api_secret, paper=True)
+        broker.submit_market_order("SPY", Decimal("10"), BrokerOrderSide.BUY, "ORD_1")
+        results = broker.cancel_orders(["b1", "b2", "b3"])   # concurrent
+        broker.close()
+
+    THREAD SAFETY:
+    - Blocking methods may be called from any thread except the loop thread.
+    """
+
+    MAX_RETRIES = 3
+    RETRY_DELAY_SECONDS = 1.0
+    RETRY_BACKOFF_MULTIPLIER = 2.0
+    RETRY_TIMEOUT_SECONDS = 30.0
+
+    PAPER_BASE_URL = "https://paper-api.alpaca.markets"
+    LIVE_BASE_URL = "https://api.alpaca.markets"
+
+    _RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+    supports_bracket_orders = True
+    supports_concurrent_requests = True
+    supports_bulk_close = True
+
+    # PATCH 33: optional core.net Throttler (set per instance; see __init__).
+    throttler = None
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        paper: bool = True,
+        base_url: Optional[str] = None,
+        max_connections: int = 20,
+        request_timeout_s: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs,
+    ):
+        """Initialize connector and verify the account.
+
+        *transport* is an httpx transport override (tests / local stand-in
+        server); extra kwargs (data_feed, ...) are accepted like the sync
+        connector.
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.paper = paper
+        self.base_url = (base_url or (self.PAPER_BASE_URL if paper else self.LIVE_BASE_URL)).rstrip("/")
+        self.logger = get_logger(LogStream.TRADING)
+
+        # PATCH 33: core.net Throttler shared with the rest of the process
+        # (Container.set_broker_connector attaches it).
+        self.throttler = kwargs.get("throttler")
+
+        self._clock_cache: Optional[Dict[str, Any]] = None
+        self._clock_cache_ts: float = 0.0
+        self._clock_cache_ttl: float = float(os.getenv("MARKET_CLOCK_CACHE_S", "15") or "15")
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="alpaca-async-broker", daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        )
+
+        async def _make_client() -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "APCA-API-KEY-ID": api_key,
+                    "APCA-API-SECRET-KEY": api_secret,
+                    "Content-Type": "application/json",
+                },
+                limits=limits,
+                timeout=request_timeout_s,
+                transport=transport,
+            )
+
+        self._client: httpx.AsyncClient = self._run(_make_client())
+
+        self.logger.info("AsyncAlpacaBrokerConnector initialized", extra={
+            "paper_trading": self.paper,
+            "base_url": self.base_url,
+            "max_connections": max_connections,
+        })
+
+        self._verify_account()
+
+    # ------------------------------------------------------------------
+    # Loop plumbing
+    # ------------------------------------------------------------------
+
+    def _run(self, coro: Coroutine) -> Any:
+        """Run *coro* on the connector loop and block for its result."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("blocking AsyncAlpacaBrokerConnector call from its own event loop")
+        if self._closed:
+            coro.close()
+            raise BrokerConnectionError("AsyncAlpacaBrokerConnector is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the connection pool and stop the loop thread."""
+        if self._closed:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=5)
+        except Exception:
+            pass
+        self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _ensure_orders_allowed(self) -> None:
+        """Refuse order placement in explicit smoke mode (same guard as sync connector)."""
+        if os.getenv("MQD_SMOKE_NO_ORDERS", "").strip().lower() in ("1", "true", "yes"):
+            raise BrokerOrderError(
+                "SMOKE MODE: order placement is disabled (MQD_SMOKE_NO_ORDERS=1)."
+            )
+
+    def _verify_account(self) -> None:
+        try:
+            account = self._run(self._request("GET", "/v2/account", route=ROUTE_ACCOUNT))
+            self.logger.info("Account verified", extra={
+                "account_number": (account["account_number"][:4] + "****") if account.get("account_number") else None,
+                "buying_power": str(account.get("buying_power")),
+            })
+        except Exception as e:
+            raise BrokerConnectionError(f"Account verification failed: {e}") from e
+
+    # ------------------------------------------------------------------
+    # HTTP with non-blocking retry
+    # ------------------------------------------------------------------
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        route: Optional[str] = None,
+    ) -> Any:
+        """Send one request; retry 429/5xx/transport errors with async backoff.
+
+        route: ALPACA_ROUTES id; every attempt (retries included) spends one
+        throttler token at that route's priority.
+        """
+        delay = float(self.RETRY_DELAY_SECONDS)
+        deadline = time.monotonic() + float(self.RETRY_TIMEOUT_SECONDS)
+        attempts = int(self.MAX_RETRIES)
+
+        for attempt in range(1, attempts + 1):
+            throttler = self.throttler
+            if throttler is not None and route is not None:
+                await throttler.acquire_async(route)
+            self._bump("requests")
+            self._enter()
+            try:
+                response = await self._client.request(method, path, params=params, json=json)
+            except httpx.TransportError as e:
+                self._bump("errors")
+                if attempt >= attempts or time.monotonic() + delay > deadline:
+                    raise
+                self.logger.warning("Transient network error; retrying", extra={
+                    "path": path, "attempt": attempt, "delay_s": delay, "error": str(e),
+                })
+            else:
+                if response.status_code < 400:
+                    if response.status_code == 204 or not response.content:
+                        return None
+                    return response.json()
+                if response.status_code not in self._RETRYABLE_STATUS or attempt >= attempts:
+                    self._bump("errors")
+                    raise AlpacaHTTPError(response.status_code, _error_message(response))
+                retry_after = response.headers.get("Retry-After")
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                if time.monotonic() + delay > deadline:
+                    self._bump("errors")
+                    raise AlpacaHTTPError(response.status_code, _error_message(response))
+                self.logger.warning("Retryable HTTP status; retrying", extra={
+                    "path": path, "status": response.status_code, "attempt": attempt, "delay_s": delay,
+                })
+            finally:
+                self._exit()
+
+            self._bump("retries")
+            await asyncio.sleep(delay)
+            delay *= float(self.RETRY_BACKOFF_MULTIPLIER)
+
+        raise BrokerConnectionError(f"{method} {path}: retries exhausted")  # pragma: no cover
+
+    def _bump(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _enter(self) -> None:
+        with self._stats_lock:
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+
+    def _exit(self) -> None:
+        with self._stats_lock:
+            self._stats["in_flight"] -= 1
+
+    # ------------------------------------------------------------------
+    # Orders (async)
+    # ------------------------------------------------------------------
+
+    async def _submit(self, request, internal_order_id: str, kind: str) -> Order:
+        self._ensure_orders_allowed()
+        self.logger.info(f"Submitting {kind} order", extra={
+            "internal_order_id": internal_order_id,
+            "symbol": request.symbol,
+            "quantity": str(request.qty),
+            "side": request.side.value,
+        })
+        data = await self._request("POST", "/v2/orders", json=request.to_request_fields(), route=ROUTE_ORDERS)
+        order = Order(**data)
+        self.logger.info(f"{kind.capitalize()} order submitted", extra={
+            "internal_order_id": internal_order_id,
+            "broker_order_id": str(order.id),
+            "status": getattr(order.status, "value", str(order.status)),
+        })
+        return order
+
+    async def submit_market_order_async(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, internal_order_id: str
+    ) -> str:
+        try:
+            order = await self._submit(
+                MarketOrderRequest(
+                    symbol=symbol,
+                    qty=float(quantity),
+                    side=_side(side),
+                    time_in_force=TimeInForce.DAY,
+                    client_order_id=internal_order_id,
+                ),
+                internal_order_id,
+                "market",
+            )
+            return str(order.id)
+        except Exception as e:
+            self.logger.error("Order submission failed", extra={"error": str(e)})
+            raise BrokerOrderError(f"Failed to submit order: {e}") from e
+
+    async def submit_limit_order_async(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, limit_price: Decimal,
+        internal_order_id: str,
+    ) -> str:
+        try:
+            if limit_price is None or limit_price <= 0:
+                raise ValueError(f"limit_price must be positive, got {limit_price}")
+            order = await self._submit(
+                LimitOrderRequest(
+                    symbol=symbol,
+                    qty=float(quantity),
+                    side=_side(side),
+                    time_in_force=TimeInForce.DAY,
+                    limit_price=float(limit_price),
+                    client_order_id=internal_order_id,
+                ),
+                internal_order_id,
+                "limit",
+            )
+            return str(order.id)
+        except Exception as e:
+            self.logger.error("Limit order submission failed", extra={"error": str(e)})
+            raise BrokerOrderError(f"Failed to submit limit order: {e}") from e
+
+    async def submit_stop_order_async(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, stop_price: Decimal,
+        internal_order_id: str,
+    ) -> str:
+        try:
+            if stop_price is None or stop_price <= 0:
+                raise ValueError(f"stop_price must be positive, got {stop_price}")
+            order = await self._submit(
+                StopOrderRequest(
+                    symbol=symbol,
+                    qty=float(quantity),
+                    side=_side(side),
+                    time_in_force=TimeInForce.DAY,
+                    stop_price=float(stop_price),
+                    client_order_id=internal_order_id,
+                ),
+                internal_order_id,
+                "stop",
+            )
+            return str(order.id)
+        except Exception as e:
+            self.logger.error("Stop order submission failed", extra={"error": str(e)})
+            raise BrokerOrderError(f"Failed to submit stop order: {e}") from e
+
+    async def submit_bracket_order_async(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, internal_order_id: str,
+        stop_loss: Decimal, take_profit: Decimal, limit_price: Optional[Decimal] = None,
+    ) -> BracketOrderIds:
+        try:
+            if stop_loss is None or stop_loss <= 0:
+                raise ValueError(f"stop_loss must be positive, got {stop_loss}")
+            if take_profit is None or take_profit <= 0:
+                raise ValueError(f"take_profit must be positive, got {take_profit}")
+            common = dict(
+                symbol=symbol,
+                qty=float(quantity),
+                side=_side(side),
+                time_in_force=TimeInForce.DAY,
+                client_order_id=internal_order_id,
+                order_class=OrderClass.BRACKET,
+                take_profit=TakeProfitRequest(limit_price=float(take_profit)),
+                stop_loss=StopLossRequest(stop_price=float(stop_loss)),
+            )
+            if limit_price is not None:
+                request = LimitOrderRequest(limit_price=float(limit_price), **common)
+            else:
+                request = MarketOrderRequest(**common)
+
+            order = await self._submit(request, internal_order_id, "bracket")
+            legs = order.legs
+            if not legs:
+                nested = await self._request(
+                    "GET", f"/v2/orders/{order.id}", params={"nested": "true"}, route=ROUTE_STATUS
+                )
+                legs = Order(**nested).legs or []
+            return BracketOrderIds(
+                entry=str(order.id),
+                stop_loss=_bracket_leg_id(legs, "stop"),
+                take_profit=_bracket_leg_id(legs, "limit"),
+            )
+        except Exception as e:
+            self.logger.error("Bracket order submission failed", extra={"error": str(e)})
+            raise BrokerOrderError(f"Failed to submit bracket order: {e}") from e
+
+    async def get_order_status_async(self, broker_order_id: str) -> Tuple[OrderStatus, Optional[Dict]]:
+        try:
+            order = Order(**await self._request("GET", f"/v2/orders/{broker_order_id}", route=ROUTE_STATUS))
+            return map_alpaca_status(getattr(order.status, "value", str(order.status))), order_fill_info(order)
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to get order status: {e}") from e
+
+    async def cancel_order_async(self, broker_order_id: str) -> bool:
+        try:
+            await self._request("DELETE", f"/v2/orders/{broker_order_id}", route=ROUTE_ORDERS)
+            self.logger.info("Order cancelled", extra={"broker_order_id": broker_order_id})
+            return True
+        except AlpacaHTTPError as e:
+            if e.status_code == 422 or "not cancelable" in str(e).lower():
+                return False
+            raise BrokerOrderError(f"Failed to cancel: {e}") from e
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to cancel: {e}") from e
+
+    async def cancel_orders_async(self, broker_order_ids: Sequence[str]) -> Dict[str, bool]:
+        """Cancel many orders concurrently; per-order result (errors -> False)."""
+        ids = [str(b) for b in broker_order_ids]
+        results = await asyncio.gather(*(self.cancel_order_async(b) for b in ids), return_exceptions=True)
+        out: Dict[str, bool] = {}
+        for broker_order_id, result in zip(ids, results):
+            if isinstance(result, BaseException):
+                self.logger.error("Cancel failed", extra={"broker_order_id": broker_order_id, "error": str(result)})
+                out[broker_order_id] = False
+            else:
+                out[broker_order_id] = bool(result)
+        return out
+
+    async def cancel_all_orders_async(self) -> int:
+        try:
+            data = await self._request("DELETE", "/v2/orders", route=ROUTE_ORDERS)
+            self.logger.warning("All open orders cancelled", extra={"count": len(data or [])})
+            return len(data or [])
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to cancel all orders: {e}") from e
+
+    async def close_all_positions_async(self, cancel_orders: bool = True) -> List[Dict]:
+        try:
+            self._ensure_orders_allowed()
+            params = {"cancel_orders": "true"} if cancel_orders else None
+            data = await self._request("DELETE", "/v2/positions", params=params, route=ROUTE_ORDERS)
+            infos = [close_position_info(ClosePositionResponse(**item)) for item in (data or [])]
+            self.logger.warning("Close-all submitted", extra={
+                "positions": len(infos),
+                "failed": sum(1 for i in infos if i["error"]),
+            })
+            return infos
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to close all positions: {e}") from e
+
+    async def get_orders_async(
+        self, status: str = "open", limit: Optional[int] = None, after: Optional[datetime] = None,
+    ) -> List[Order]:
+        try:
+            params: Dict[str, Any] = {"status": (status or "open").lower()}
+            if params["status"] not in ("open", "closed", "all"):
+                params["status"] = "open"
+            if limit is not None:
+                params["limit"] = int(limit)
+            if after is not None:
+                params["after"] = after.isoformat()
+            data = await self._request("GET", "/v2/orders", params=params, route=ROUTE_STATUS)
+            return [Order(**o) for o in (data or [])]
+        except Exception as e:
+            raise BrokerConnectionError(f"Failed to get orders: {e}") from e
+
+    # ------------------------------------------------------------------
+    # Account / positions / clock (async)
+    # ------------------------------------------------------------------
+
+    async def get_positions_async(self) -> List[Position]:
+        try:
+            data = await self._request("GET", "/v2/positions", route=ROUTE_ACCOUNT)
+            return [position_from_alpaca(AlpacaPosition(**p)) for p in (data or [])]
+        except Exception as e:
+            raise BrokerConnectionError(f"Failed to get positions: {e}") from e
+
+    async def get_account_info_async(self) -> Dict:
+        try:
+            account = TradeAccount(**await self._request("GET", "/v2/account", route=ROUTE_ACCOUNT))
+            return {
+                "buying_power": Decimal(str(account.buying_power)),
+                "cash": Decimal(str(account.cash)),
+                "portfolio_value": Decimal(str(account.portfolio_value)),
+                "pattern_day_trader": getattr(account, "pattern_day_trader", None),
+            }
+        except Exception as e:
+            raise BrokerConnectionError(f"Failed to get account info: {e}") from e
+
+    async def get_clock_async(self) -> Dict:
+        now_mono = time.monotonic()
+        now_utc = datetime.now(timezone.utc)
+        cache = self._clock_cache
+        if cache is not None and self._clock_cache_ttl > 0:
+            fresh = 0.0 <= now_mono - self._clock_cache_ts < self._clock_cache_ttl
+            crossed = any(cache.get(k) and now_utc >= cache[k] for k in ("next_open", "next_close"))
+            if fresh and not crossed:
+                return cache
+        try:
+            clock = Clock(**await self._request("GET", "/v2/clock", route=ROUTE_ACCOUNT))
+            result = {
+                "is_open": bool(clock.is_open),
+                "timestamp": clock.timestamp.astimezone(timezone.utc) if clock.timestamp else None,
+                "next_open": clock.next_open.astimezone(timezone.utc) if clock.next_open else None,
+                "next_close": clock.next_close.astimezone(timezone.utc) if clock.next_close else None,
+            }
+            self._clock_cache = result
+            self._clock_cache_ts = now_mono
+            return result
+        except Exception as e:
+            raise BrokerConnectionError(f"Failed to get market clock: {e}") from e
+
+    # ------------------------------------------------------------------
+    # Blocking surface (same as AlpacaBrokerConnector)
+    # ------------------------------------------------------------------
+
+    def submit_market_order(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, internal_order_id: str
+    ) -> str:
+        """Submit market order. Returns broker_order_id."""
+        with LogContext(internal_order_id):
+            return self._run(self.submit_market_order_async(symbol, quantity, side, internal_order_id))
+
+    def submit_limit_order(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, limit_price: Decimal,
+        internal_order_id: str,
+    ) -> str:
+        """Submit limit order. Returns broker_order_id."""
+        with LogContext(internal_order_id):
+            return self._run(
+                self.submit_limit_order_async(symbol, quantity, side, limit_price, internal_order_id)
+            )
+
+    def submit_stop_order(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, stop_price: Decimal,
+        internal_order_id: str,
+    ) -> str:
+        """Submit stop (market) order. Returns broker_order_id."""
+        with LogContext(internal_order_id):
+            return self._run(
+                self.submit_stop_order_async(symbol, quantity, side, stop_price, internal_order_id)
+            )
+
+    def submit_bracket_order(
+        self, symbol: str, quantity: Decimal, side: BrokerOrderSide, internal_order_id: str,
+        stop_loss: Decimal, take_profit: Decimal, limit_price: Optional[Decimal] = None,
+    ) -> BracketOrderIds:
+        """Submit entry + SL + TP as one bracket. Returns BracketOrderIds."""
+        with LogContext(internal_order_id):
+            return self._run(self.submit_bracket_order_async(
+                symbol, quantity, side, internal_order_id, stop_loss, take_profit, limit_price
+            ))
+
+    def get_order_status(self, broker_order_id: str) -> Tuple[OrderStatus, Optional[Dict]]:
+        """Get order status. Returns (OrderStatus, fill_info)."""
+        return self._run(self.get_order_status_async(broker_order_id))
+
+    def cancel_order(self, broker_order_id: str) -> bool:
+        """Cancel order. Returns True if cancelled."""
+        return self._run(self.cancel_order_async(broker_order_id))
+
+    def cancel_orders(self, broker_order_ids: Sequence[str]) -> Dict[str, bool]:
+        """Cancel many orders concurrently. Returns {broker_order_id: cancelled}."""
+        return self._run(self.cancel_orders_async(broker_order_ids))
+
+    def cancel_all_orders(self) -> int:
+        """Cancel every open order in one request. Returns orders attempted."""
+        return self._run(self.cancel_all_orders_async())
+
+    def close_all_positions(self, cancel_orders: bool = True) -> List[Dict]:
+        """Liquidate every position in one request (see AlpacaBrokerConnector)."""
+        return self._run(self.close_all_positions_async(cancel_orders))
+
+    def get_orders(
+        self, status: str = "open", limit: Optional[int] = None, after: Optional[datetime] = None,
+    ) -> List:
+        """Get orders filtered by status (open/closed/all), optional limit/after."""
+        return self._run(self.get_orders_async(status, limit, after))
+
+    def get_positions(self) -> List[Position]:
+        """Get all positions from broker."""
+        return self._run(self.get_positions_async())
+
+    def get_account_info(self) -> Dict:
+        """Get account information."""
+        return self._run(self.get_account_info_async())
+
+    def get_clock(self) -> Dict:
+        """Market clock (cached like AlpacaBrokerConnector.get_clock)."""
+        return self._run(self.get_clock_async())
+
+    def _map_status(self, alpaca_status: str) -> OrderStatus:
+        return map_alpaca_status(alpaca_status)
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _side(side: BrokerOrderSide) -> OrderSide:
+    return OrderSide.BUY if side == BrokerOrderSide.BUY else OrderSide.SELL
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        body = response.json()
+        if isinstance(body, dict) and body.get("message"):
+            return str(body["message"])
+    except Exception:
+        pass
+    return response.text[:200]
+
+
+class AlpacaHTTPError(Exception):
+    """Non-retryable (or retries exhausted) HTTP error from the Alpaca REST API."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
@@ -10,13 +10,17 @@ CRITICAL PROPERTIES:
 6. Paper/live mode safety checks
 
 PATCH 3: Added get_orders() method for reconciliation support.
+PATCH 29: Added submit_bracket_order() (native entry + SL + TP in one request).
+PATCH 31: Added cancel_all_orders() / close_all_positions() for emergency flatten.
+PATCH 33: REST calls spend the shared "alpaca_trading" budget through an
+          attached core.net Throttler (ROUTE_* ids from ALPACA_ROUTES).
 
 Based on Alpaca Trading API v2.
 """
 
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Tuple, Callable, Any
+from typing import Optional, List, Dict, Tuple, Callable, Any, NamedTuple
 from decimal import Decimal
 from datetime import datetime, timezone, UTC
 import os
@@ -24,13 +28,26 @@ import time
 from enum import Enum
 
 from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest, StopOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import (
+    GetOrderByIdRequest,
+    LimitOrderRequest,
+    MarketOrderRequest,
+    StopLossRequest,
+    StopOrderRequest,
+    TakeProfitRequest,
+)
+from alpaca.trading.enums import OrderClass, OrderSide, TimeInForce
 from alpaca.common.exceptions import APIError
 
 from core.logging import get_logger, LogStream, LogContext
 from core.state import OrderStatus, Position
 
+# Throttler route ids (core.net.ALPACA_ROUTES): all share "alpaca_trading",
+# served ORDER > STATUS.
+ROUTE_ORDERS = "alpaca_orders"
+ROUTE_STATUS = "alpaca_status"
+ROUTE_ACCOUNT = "alpaca_account"
+
 
 # ============================================================================
 # BROKER ORDER SIDE
@@ -42,6 +59,13 @@ class BrokerOrderSide(Enum):
     SELL = "SELL"
 
 
+class BracketOrderIds(NamedTuple):
+    """Broker ids of a native bracket: the entry and its two exit legs."""
+    entry: str
+    stop_loss: Optional[str]
+    take_profit: Optional[str]
+
+
 # ============================================================================
 # ALPACA BROKER CONNECTOR
 # ============================================================================
@@ -70,23 +94,44 @@ class AlpacaBrokerConnector:
     # NOTE: CLASS attribute so tests/mocks don't break if constructed oddly.
     _RETRYABLE_NETWORK_ERRORS = (ConnectionError, TimeoutError, OSError)
 
+    # PATCH 29: OrderExecutionEngine only takes the native bracket path when
+    # the broker declares it (explicit flag, so mocks never opt in by accident).
+    supports_bracket_orders = True
+
+    # PATCH 31: EmergencyFlattener uses the bulk cancel-all / close-all endpoints.
+    supports_bulk_close = True
+
+    # PATCH 33: optional core.net Throttler (set per instance; see __init__).
+    throttler = None
+
     def __init__(self, api_key: str, api_secret: str, paper: bool = True, **kwargs):
         """Initialize Alpaca connector.
 
-        Extra kwargs (base_url, data_feed, etc.) are accepted for forward
-        compatibility but currently unused by the Alpaca v2 SDK wrapper.
+        Extra kwargs (data_feed, etc.) are accepted for forward
+        compatibility. ``base_url`` is only honoured when it points away from
+        *.alpaca.markets (PATCH 35: local stand-in server); otherwise the SDK
+        picks the paper/live endpoint from ``paper``.
         """
         self.api_key = api_key
         self.api_secret = api_secret
         self.paper = paper
         self.logger = get_logger(LogStream.TRADING)
 
+        base_url = (kwargs.get("base_url") or "").strip().rstrip("/")
+        url_override = base_url if base_url and "alpaca.markets" not in base_url else None
+
         self.client = TradingClient(
             api_key=api_key,
             secret_key=api_secret,
-            paper=paper
+            paper=paper,
+            url_override=url_override,
         )
 
+        # PATCH 33: core.net Throttler shared with the rest of the process
+        # (Container.set_broker_connector attaches it). Submits/cancels spend
+        # at ORDER priority, polls/account at STATUS, per ALPACA_ROUTES.
+        self.throttler = kwargs.get("throttler")
+
         # PATCH 5: Removed broker-side _order_id_map.
         # OrderExecutionEngine owns the internal<->broker mapping.
 
@@ -148,7 +193,7 @@ class AlpacaBrokerConnector:
                     "side": side.value
                 })
 
-                order = self._retry_api_call(lambda: self.client.submit_order(request))
+                order = self._retry_api_call(lambda: self.client.submit_order(request), route=ROUTE_ORDERS)
                 broker_order_id = order.id
 
                 self.logger.info("Order submitted", extra={
@@ -193,7 +238,7 @@ class AlpacaBrokerConnector:
                     "limit_price": str(limit_price)
                 })
 
-                order = self._retry_api_call(lambda: self.client.submit_order(request))
+                order = self._retry_api_call(lambda: self.client.submit_order(request), route=ROUTE_ORDERS)
                 broker_order_id = order.id
 
                 self.logger.info("Limit order submitted", extra={
@@ -238,7 +283,7 @@ class AlpacaBrokerConnector:
                     "stop_price": str(stop_price)
                 })
 
-                order = self._retry_api_call(lambda: self.client.submit_order(request))
+                order = self._retry_api_call(lambda: self.client.submit_order(request), route=ROUTE_ORDERS)
                 broker_order_id = order.id
 
                 self.logger.info("Stop order submitted", extra={
@@ -252,22 +297,116 @@ class AlpacaBrokerConnector:
                 self.logger.error("Stop order submission failed", extra={"error": str(e)}, exc_info=True)
                 raise BrokerOrderError(f"Failed to submit stop order: {e}") from e
 
+    def submit_bracket_order(
+        self,
+        symbol: str,
+        quantity: Decimal,
+        side: BrokerOrderSide,
+        internal_order_id: str,
+        stop_loss: Decimal,
+        take_profit: Decimal,
+        limit_price: Optional[Decimal] = None,
+    ) -> BracketOrderIds:
+        """
+        PATCH 29: Submit entry + stop-loss + take-profit as ONE bracket order.
+
+        The broker holds both exit legs until the entry fills and cancels the
+        survivor when either leg fills (native OCO). Entry is a market order,
+        or a limit order when limit_price is given.
+
+        Returns BracketOrderIds (leg ids are None only if the broker response
+        could not be resolved into a stop leg and a limit leg).
+        """
+        with LogContext(internal_order_id):
+            try:
+                self._ensure_orders_allowed()
+                if stop_loss is None or stop_loss <= 0:
+                    raise ValueError(f"stop_loss must be positive, got {stop_loss}")
+                if take_profit is None or take_profit <= 0:
+                    raise ValueError(f"take_profit must be positive, got {take_profit}")
+
+                common = dict(
+                    symbol=symbol,
+                    qty=float(quantity),
+                    side=OrderSide.BUY if side == BrokerOrderSide.BUY else OrderSide.SELL,
+                    time_in_force=TimeInForce.DAY,
+                    client_order_id=internal_order_id,
+                    order_class=OrderClass.BRACKET,
+                    take_profit=TakeProfitRequest(limit_price=float(take_profit)),
+                    stop_loss=StopLossRequest(stop_price=float(stop_loss)),
+                )
+                if limit_price is not None:
+                    request = LimitOrderRequest(limit_price=float(limit_price), **common)
+                else:
+                    request = MarketOrderRequest(**common)
+
+                self.logger.info("Submitting bracket order", extra={
+                    "symbol": symbol,
+                    "quantity": str(quantity),
+                    "side": side.value,
+                    "limit_price": str(limit_price) if limit_price is not None else None,
+                    "stop_loss": str(stop_loss),
+                    "take_profit": str(take_profit),
+                })
+
+                order = self._retry_api_call(lambda: self.client.submit_order(request), route=ROUTE_ORDERS)
+                ids = self._bracket_order_ids(order)
+
+                self.logger.info("Bracket order submitted", extra={
+                    "broker_order_id": ids.entry,
+                    "sl_broker_order_id": ids.stop_loss,
+                    "tp_broker_order_id": ids.take_profit,
+                    "status": getattr(order.status, "value", str(order.status))
+                })
+
+                return ids
+
+            except Exception as e:
+                self.logger.error("Bracket order submission failed", extra={"error": str(e)}, exc_info=True)
+                raise BrokerOrderError(f"Failed to submit bracket order: {e}") from e
+
+    def get_bracket_order_by_client_id(self, internal_order_id: str) -> Optional[BracketOrderIds]:
+        """
+        PATCH 29: The bracket the broker holds under client_order_id, or None
+        if it never accepted one.
+
+        A failed submit response does not mean the bracket was refused (the
+        POST may have landed before a timeout); the engine asks here before
+        it falls back to a plain entry under the same id.
+        """
+        try:
+            order = self._retry_api_call(
+                lambda: self.client.get_order_by_client_id(internal_order_id), route=ROUTE_STATUS
+            )
+        except APIError as e:
+            if getattr(e, "status_code", None) == 404:
+                return None
+            raise BrokerOrderError(f"Failed to look up order {internal_order_id}: {e}") from e
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to look up order {internal_order_id}: {e}") from e
+        return self._bracket_order_ids(order)
+
+    def _bracket_order_ids(self, order: Any) -> BracketOrderIds:
+        legs = getattr(order, "legs", None)
+        if not legs:
+            # Response without nested legs: one extra read resolves them.
+            nested = self._retry_api_call(
+                lambda: self.client.get_order_by_id(order.id, GetOrderByIdRequest(nested=True)),
+                route=ROUTE_STATUS,
+            )
+            legs = getattr(nested, "legs", None) or []
+        return BracketOrderIds(
+            entry=str(order.id),
+            stop_loss=_bracket_leg_id(legs, "stop"),
+            take_profit=_bracket_leg_id(legs, "limit"),
+        )
+
     def get_order_status(self, broker_order_id: str) -> Tuple[OrderStatus, Optional[Dict]]:
         """Get order status. Returns (OrderStatus, fill_info)."""
         try:
-            order = self._retry_api_call(lambda: self.client.get_order_by_id(broker_order_id))
+            order = self._retry_api_call(lambda: self.client.get_order_by_id(broker_order_id), route=ROUTE_STATUS)
             status = self._map_status(getattr(order.status, "value", str(order.status)))
-
-            fill_info = None
-            filled_qty = getattr(order, "filled_qty", None)
-            if filled_qty is not None and float(filled_qty) > 0:
-                fill_info = {
-                    "filled_qty": Decimal(str(order.filled_qty)),
-                    "filled_avg_price": Decimal(str(order.filled_avg_price)) if getattr(order, "filled_avg_price", None) else None,
-                    "filled_at": order.filled_at.isoformat() if getattr(order, "filled_at", None) else None,
-                }
-
-            return status, fill_info
+            return status, order_fill_info(order)
 
         except Exception as e:
             raise BrokerOrderError(f"Failed to get order status: {e}") from e
@@ -275,7 +414,7 @@ class AlpacaBrokerConnector:
     def cancel_order(self, broker_order_id: str) -> bool:
         """Cancel order. Returns True if cancelled."""
         try:
-            self.client.cancel_order_by_id(broker_order_id)
+            self._throttled(ROUTE_ORDERS, lambda: self.client.cancel_order_by_id(broker_order_id))
             self.logger.info("Order cancelled", extra={"broker_order_id": broker_order_id})
             return True
         except APIError as e:
@@ -283,27 +422,42 @@ class AlpacaBrokerConnector:
                 return False
             raise BrokerOrderError(f"Failed to cancel: {e}") from e
 
+    def cancel_all_orders(self) -> int:
+        """PATCH 31: Cancel every open order in one request. Returns orders attempted."""
+        try:
+            responses = self._retry_api_call(lambda: self.client.cancel_orders(), route=ROUTE_ORDERS)
+            count = len(responses or [])
+            self.logger.warning("All open orders cancelled", extra={"count": count})
+            return count
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to cancel all orders: {e}") from e
+
+    def close_all_positions(self, cancel_orders: bool = True) -> List[Dict]:
+        """
+        PATCH 31: Liquidate every position in one request (optionally cancelling
+        open orders first, broker-side). Returns one close_position_info()
+        dict per position.
+        """
+        try:
+            self._ensure_orders_allowed()
+            responses = self._retry_api_call(
+                lambda: self.client.close_all_positions(cancel_orders=cancel_orders), route=ROUTE_ORDERS
+            )
+            infos = [close_position_info(r) for r in responses or []]
+            self.logger.warning("Close-all submitted", extra={
+                "positions": len(infos),
+                "failed": sum(1 for i in infos if i["error"]),
+            })
+            return infos
+        except Exception as e:
+            raise BrokerOrderError(f"Failed to close all positions: {e}") from e
+
     def get_positions(self) -> List[Position]:
         """Get all positions from broker."""
         try:
-            alpaca_positions = self._retry_api_call(lambda: self.client.get_all_positions())
-
-            positions: List[Position] = []
-            for pos in alpaca_positions:
-                position = Position(
-                    symbol=pos.symbol,
-                    quantity=Decimal(str(pos.qty)),
-                    entry_price=Decimal(str(pos.avg_entry_price)),
-                    entry_time=datetime.now(UTC),
-                    strategy="UNKNOWN",
-                    order_id="UNKNOWN",
-                    current_price=Decimal(str(pos.current_price)) if getattr(pos, "current_price", None) else None,
-                    unrealized_pnl=Decimal(str(pos.unrealized_pl)) if getattr(pos, "unrealized_pl", None) else None,
-                    broker_position_id=getattr(pos, "asset_id", None),
-                )
-                positions.append(position)
+            alpaca_positions = self._retry_api_call(lambda: self.client.get_all_positions(), route=ROUTE_ACCOUNT)
 
-            return positions
+            return [position_from_alpaca(pos) for pos in alpaca_positions]
 
         except Exception as e:
             raise BrokerConnectionError(f"Failed to get positions: {e}") from e
@@ -311,7 +465,7 @@ class AlpacaBrokerConnector:
     def get_account_info(self) -> Dict:
         """Get account information."""
         try:
-            account = self._retry_api_call(lambda: self.client.get_account())
+            account = self._retry_api_call(lambda: self.client.get_account(), route=ROUTE_ACCOUNT)
             return {
                 "buying_power": Decimal(str(account.buying_power)),
                 "cash": Decimal(str(account.cash)),
@@ -321,8 +475,17 @@ class AlpacaBrokerConnector:
         except Exception as e:
             raise BrokerConnectionError(f"Failed to get account info: {e}") from e
 
-    def get_orders(self, status: str = "open", limit: Optional[int] = None) -> List:
-        """Get orders from broker filtered by status (open/closed/all). Optionally limit results."""
+    def get_orders(
+        self,
+        status: str = "open",
+        limit: Optional[int] = None,
+        after: Optional[datetime] = None,
+    ) -> List:
+        """
+        Get orders from broker filtered by status (open/closed/all).
+
+        Optionally limit results and only return orders submitted after *after*.
+        """
         try:
             from alpaca.trading.requests import GetOrdersRequest
             from alpaca.trading.enums import QueryOrderStatus
@@ -334,20 +497,23 @@ class AlpacaBrokerConnector:
             }
             alpaca_status = status_map.get((status or "open").lower(), QueryOrderStatus.OPEN)
 
-            # Alpaca supports limit on the request; keep it optional.
+            # Alpaca supports limit/after on the request; keep them optional.
+            params: Dict[str, Any] = {"status": alpaca_status}
             if limit is not None:
-                request = GetOrdersRequest(status=alpaca_status, limit=int(limit))
-            else:
-                request = GetOrdersRequest(status=alpaca_status)
+                params["limit"] = int(limit)
+            if after is not None:
+                params["after"] = after
+            request = GetOrdersRequest(**params)
 
-            orders = self._retry_api_call(lambda: self.client.get_orders(request))
+            orders = self._retry_api_call(lambda: self.client.get_orders(request), route=ROUTE_STATUS)
 
             # Some SDK versions return iterables; normalize to a plain list for stability.
             orders_list = list(orders)
 
             self.logger.debug(
                 "Fetched orders",
-                extra={"count": len(orders_list), "status_filter": status, "limit": limit},
+                extra={"count": len(orders_list), "status_filter": status, "limit": limit,
+                       "after": after.isoformat() if after is not None else None},
             )
             return orders_list
 
@@ -405,7 +571,7 @@ class AlpacaBrokerConnector:
                 return cache
 
         try:
-            clock = self._retry_api_call(lambda: self.client.get_clock())
+            clock = self._retry_api_call(lambda: self.client.get_clock(), route=ROUTE_ACCOUNT)
             result = {
                 "is_open": bool(getattr(clock, "is_open", False)),
                 "timestamp": clock.timestamp.astimezone(timezone.utc) if getattr(clock, "timestamp", None) else None,
@@ -420,9 +586,23 @@ class AlpacaBrokerConnector:
         except Exception as e:
             raise BrokerConnectionError(f"Failed to get market clock: {e}") from e
 
-    def _retry_api_call(self, func: Callable[[], Any], max_retries: Optional[int] = None):
+    def _throttled(self, route: Optional[str], func: Callable[[], Any]) -> Any:
+        """PATCH 33: spend one token of the shared Alpaca budget (when a throttler is attached), then call."""
+        if self.throttler is None or route is None:
+            return func()
+        return self.throttler.execute_sync(route, func)
+
+    def _retry_api_call(
+        self,
+        func: Callable[[], Any],
+        max_retries: Optional[int] = None,
+        route: Optional[str] = None,
+    ):
         """Retry with exponential backoff.
 
+        route: ALPACA_ROUTES id; every attempt (retries included) is one
+        request against the throttler budget, at that route's priority.
+
         Retries on:
           - HTTP 429 (rate limit) and 5xx (server errors) via APIError
           - ConnectionError / TimeoutError / OSError (transient network errors)
@@ -451,7 +631,7 @@ class AlpacaBrokerConnector:
                     raise TimeoutError(f"Retry timeout exceeded after {elapsed:.2f}s")
 
             try:
-                return func()
+                return self._throttled(route, func)
 
             except APIError as e:
                 status_code = getattr(e, "status_code", None)
@@ -480,17 +660,76 @@ class AlpacaBrokerConnector:
 
     def _map_status(self, alpaca_status: str) -> OrderStatus:
         """Map Alpaca status to OrderStatus."""
-        mapping = {
-            "new": OrderStatus.SUBMITTED,
-            "accepted": OrderStatus.SUBMITTED,
-            "partially_filled": OrderStatus.PARTIALLY_FILLED,
-            "filled": OrderStatus.FILLED,
-            "canceled": OrderStatus.CANCELLED,
-            "expired": OrderStatus.EXPIRED,
-            "rejected": OrderStatus.REJECTED,
-        }
-        return mapping.get(str(alpaca_status).lower(), OrderStatus.SUBMITTED)
-
+        return map_alpaca_status(alpaca_status)
+
+
+_ALPACA_STATUS_MAP = {
+    "new": OrderStatus.SUBMITTED,
+    "accepted": OrderStatus.SUBMITTED,
+    "held": OrderStatus.SUBMITTED,  # bracket legs waiting on their entry
+    "partially_filled": OrderStatus.PARTIALLY_FILLED,
+    "filled": OrderStatus.FILLED,
+    "canceled": OrderStatus.CANCELLED,
+    "expired": OrderStatus.EXPIRED,
+    "rejected": OrderStatus.REJECTED,
+}
+
+
+def map_alpaca_status(alpaca_status: str) -> OrderStatus:
+    """Map an Alpaca order status (REST or trade_updates stream) to OrderStatus."""
+    return _ALPACA_STATUS_MAP.get(str(alpaca_status).lower(), OrderStatus.SUBMITTED)
+
+
+def position_from_alpaca(pos: Any) -> Position:
+    """Convert an Alpaca position object into our Position."""
+    return Position(
+        symbol=pos.symbol,
+        quantity=Decimal(str(pos.qty)),
+        entry_price=Decimal(str(pos.avg_entry_price)),
+        entry_time=datetime.now(UTC),
+        strategy="UNKNOWN",
+        order_id="UNKNOWN",
+        current_price=Decimal(str(pos.current_price)) if getattr(pos, "current_price", None) else None,
+        unrealized_pnl=Decimal(str(pos.unrealized_pl)) if getattr(pos, "unrealized_pl", None) else None,
+        broker_position_id=getattr(pos, "asset_id", None),
+    )
+
+
+def close_position_info(resp: Any) -> Dict:
+    """Flatten an Alpaca ClosePositionResponse into symbol / liquidation order / error."""
+    body = getattr(resp, "body", None)
+    order_id = getattr(resp, "order_id", None) or getattr(body, "id", None)
+    failed = order_id is None or not hasattr(body, "qty")
+    side = getattr(body, "side", None)
+    return {
+        "symbol": getattr(resp, "symbol", None),
+        "broker_order_id": str(order_id) if order_id is not None else None,
+        "qty": Decimal(str(body.qty)) if not failed and body.qty is not None else None,
+        "side": str(getattr(side, "value", side)).upper() if side is not None else None,
+        "error": getattr(body, "message", None) or ("close failed" if failed else None),
+    }
+
+
+def order_fill_info(order: Any) -> Optional[Dict]:
+    """Cumulative fill info of an Alpaca order object (None if nothing filled)."""
+    filled_qty = getattr(order, "filled_qty", None)
+    if filled_qty is None or float(filled_qty) <= 0:
+        return None
+    filled_at = getattr(order, "filled_at", None)
+    return {
+        "filled_qty": Decimal(str(filled_qty)),
+        "filled_avg_price": Decimal(str(order.filled_avg_price)) if getattr(order, "filled_avg_price", None) else None,
+        "filled_at": filled_at.isoformat() if hasattr(filled_at, "isoformat") else filled_at,
+    }
+
+
+def _bracket_leg_id(legs: Any, order_type: str) -> Optional[str]:
+    """Broker id of the bracket leg with the given order type ("stop"/"limit")."""
+    for leg in legs or []:
+        leg_type = getattr(leg, "order_type", None) or getattr(leg, "type", None)
+        if str(getattr(leg_type, "value", leg_type)).lower() == order_type:
+            return str(leg.id)
+    return None
 
 # ============================================================================
 # EXCEPTIONS
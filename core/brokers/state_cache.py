@@ -0,0 +1,248 @@
+"""
+Per-cycle broker state cache with event-driven invalidation.
+
+PROBLEM:
+    Every cycle the runtime pulls the account, and guards/risk/reconciliation
+    independently pull positions and open orders. Most of those REST calls
+    return the same data within one cycle.
+
+DESIGN:
+    - BrokerStateCache sits in front of a broker connector and caches three
+      sections: account, positions, open orders.
+    - Each section is fetched at most once per cycle (begin_cycle() starts a
+      new cycle). Optional max_age_s bounds staleness for readers that run
+      outside the cycle (e.g. the background reconciliation worker).
+    - Invalidation is precise:
+        * trade updates (UserStreamTracker) -> open orders; fills also
+          invalidate positions and account
+        * account updates -> account
+        * our own submissions/cancels -> open orders, positions, account
+    - Fetch failures are never cached; the exception propagates to the
+      caller exactly as the direct broker call would have.
+
+Thread-safe: websocket handlers, the runtime loop and the reconciliation
+worker may all touch the cache.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.logging import LogStream, get_logger
+
+logger = get_logger(LogStream.SYSTEM)
+
+
+SECTION_ACCOUNT = "account"
+SECTION_POSITIONS = "positions"
+SECTION_OPEN_ORDERS = "open_orders"
+_SECTIONS = (SECTION_ACCOUNT, SECTION_POSITIONS, SECTION_OPEN_ORDERS)
+
+# Alpaca trade_updates events that change positions / buying power.
+_FILL_EVENTS = frozenset({"fill", "partial_fill"})
+
+
+class _Entry:
+    __slots__ = ("value", "cycle", "fetched_at")
+
+    def __init__(self, value: Any, cycle: int, fetched_at: float) -> None:
+        self.value = value
+        self.cycle = cycle
+        self.fetched_at = fetched_at
+
+
+class BrokerStateCache:
+    """
+    Caches account, positions and open orders for one runtime cycle.
+
+    Usage:
+        cache = BrokerStateCache(broker)
+
+        while running:
+            cache.begin_cycle()
+            acct = cache.get_account_info()        # 1 REST call
+            ...
+            pos = cache.get_position("SPY")        # served from cache
+            ...
+            broker_order_id = engine.submit_market_order(...)
+            cache.on_order_activity()              # our own order changed state
+
+        # Wired to the user stream:
+        tracker.on_trade_update(cache.on_trade_update)
+        tracker.on_account_update(cache.on_account_update)
+    """
+
+    def __init__(
+        self,
+        broker: Any,
+        *,
+        max_age_s: Optional[float] = None,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            broker: Broker connector (AlpacaBrokerConnector or compatible)
+            max_age_s: Optional hard staleness bound for cached sections
+            monotonic: Injectable monotonic clock (tests)
+        """
+        self._broker = broker
+        self._max_age_s = max_age_s
+        self._monotonic = monotonic
+
+        self._lock = threading.RLock()
+        self._cycle = 0
+        self._entries: Dict[str, _Entry] = {}
+        # Per-symbol memo for connectors that only expose get_position(symbol)
+        self._position_by_symbol: Dict[str, _Entry] = {}
+
+        self._hits = {s: 0 for s in _SECTIONS}
+        self._misses = {s: 0 for s in _SECTIONS}
+        self._invalidations = {s: 0 for s in _SECTIONS}
+        # Bumped on every invalidation so a fetch that raced with an
+        # update is not published as fresh.
+        self._generation = {s: 0 for s in _SECTIONS}
+
+    @property
+    def broker(self) -> Any:
+        return self._broker
+
+    # ========================================================================
+    # CYCLE CONTROL / INVALIDATION
+    # ========================================================================
+
+    def begin_cycle(self) -> int:
+        """Start a new cycle; every section is refetched on next access."""
+        with self._lock:
+            self._cycle += 1
+            return self._cycle
+
+    def invalidate(self, *sections: str) -> None:
+        """Drop the given sections (all sections if none given)."""
+        targets = sections or _SECTIONS
+        with self._lock:
+            for s in targets:
+                self._generation[s] = self._generation.get(s, 0) + 1
+                if self._entries.pop(s, None) is not None:
+                    self._invalidations[s] = self._invalidations.get(s, 0) + 1
+                if s == SECTION_POSITIONS:
+                    self._position_by_symbol.clear()
+
+    def on_order_activity(self) -> None:
+        """Our own submit/cancel/fill: orders, positions and buying power changed."""
+        self.invalidate(SECTION_OPEN_ORDERS, SECTION_POSITIONS, SECTION_ACCOUNT)
+
+    def on_trade_update(self, update: Optional[dict]) -> None:
+        """UserStreamTracker trade_updates handler."""
+        event = str((update or {}).get("event", "")).lower()
+        if event in _FILL_EVENTS:
+            self.invalidate(SECTION_OPEN_ORDERS, SECTION_POSITIONS, SECTION_ACCOUNT)
+        else:
+            self.invalidate(SECTION_OPEN_ORDERS)
+
+    def on_account_update(self, update: Optional[dict] = None) -> None:
+        """UserStreamTracker account_updates handler."""
+        self.invalidate(SECTION_ACCOUNT)
+
+    # ========================================================================
+    # READ-THROUGH ACCESSORS (same shapes as the broker connector)
+    # ========================================================================
+
+    def get_account_info(self) -> Dict:
+        return self._get(SECTION_ACCOUNT, self._broker.get_account_info)
+
+    def get_positions(self) -> List:
+        return self._get(SECTION_POSITIONS, lambda: list(self._broker.get_positions() or []))
+
+    def get_open_orders(self) -> List:
+        return self._get(SECTION_OPEN_ORDERS, self._fetch_open_orders)
+
+    def list_open_orders(self) -> List:
+        """Alias used by the single-trade guard."""
+        return self.get_open_orders()
+
+    def get_orders(self, status: str = "open", limit: Optional[int] = None, after: Any = None) -> List:
+        """Broker-compatible get_orders(); only the plain open-orders view is cached."""
+        if (status or "open").lower() == "open" and limit is None and after is None:
+            return self.get_open_orders()
+        if after is not None:
+            return self._broker.get_orders(status=status, limit=limit, after=after)
+        return self._broker.get_orders(status=status, limit=limit)
+
+    def get_position(self, symbol: str) -> Any:
+        """
+        Position for *symbol* (None if flat).
+
+        Uses the connector's own get_position(symbol) when it has one
+        (memoized per symbol for the cycle), otherwise filters the cached
+        positions list.
+        """
+        sym = str(symbol).upper()
+        if hasattr(self._broker, "get_position"):
+            with self._lock:
+                entry = self._position_by_symbol.get(sym)
+                if entry is not None and self._is_fresh(entry):
+                    self._hits[SECTION_POSITIONS] += 1
+                    return entry.value
+                cycle = self._cycle
+                generation = self._generation[SECTION_POSITIONS]
+            value = self._broker.get_position(symbol)
+            with self._lock:
+                self._misses[SECTION_POSITIONS] += 1
+                if cycle == self._cycle and generation == self._generation[SECTION_POSITIONS]:
+                    self._position_by_symbol[sym] = _Entry(value, cycle, self._monotonic())
+            return value
+
+        for p in self.get_positions():
+            psym = p.get("symbol") if isinstance(p, dict) else getattr(p, "symbol", None)
+            if str(psym).upper() == sym:
+                return p
+        return None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "cycle": self._cycle,
+                "hits": dict(self._hits),
+                "misses": dict(self._misses),
+                "invalidations": dict(self._invalidations),
+            }
+
+    # ========================================================================
+    # INTERNALS
+    # ========================================================================
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        if entry.cycle != self._cycle:
+            return False
+        if self._max_age_s is not None and (self._monotonic() - entry.fetched_at) > self._max_age_s:
+            return False
+        return True
+
+    def _get(self, section: str, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(section)
+            if entry is not None and self._is_fresh(entry):
+                self._hits[section] += 1
+                return entry.value
+            cycle = self._cycle
+            generation = self._generation[section]
+
+        # Fetch outside the lock: a slow REST call must not stall
+        # websocket invalidations.
+        value = fetch()
+
+        with self._lock:
+            self._misses[section] += 1
+            # Only publish if no new cycle/invalidation happened meanwhile.
+            if cycle == self._cycle and generation == self._generation[section]:
+                self._entries[section] = _Entry(value, cycle, self._monotonic())
+        return value
+
+    def _fetch_open_orders(self) -> List:
+        if hasattr(self._broker, "get_orders"):
+            return list(self._broker.get_orders(status="open") or [])
+        if hasattr(self._broker, "list_open_orders"):
+            return list(self._broker.list_open_orders() or [])
+        return []
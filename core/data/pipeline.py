@@ -33,7 +33,6 @@ import threading
 import time
 
 import pandas as pd
-import requests
 
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
@@ -47,6 +46,7 @@ except Exception:  # pragma: no cover
 
 from core.logging import get_logger, LogStream
 from core.net.throttler import Throttler, ExponentialBackoff
+from core.net.http_client import get_http_client
 
 
 # ============================================================================
@@ -145,7 +145,10 @@ class MarketDataPipeline:
         self.twelvedata_api_key = (twelvedata_api_key or "").strip() or None
 
         # Alpaca client (primary)
-        self.alpaca_client = StockHistoricalDataClient(api_key, api_secret)
+        # PATCH 35: MQD_ALPACA_DATA_URL points market data at a local stand-in
+        self.alpaca_client = StockHistoricalDataClient(
+            api_key, api_secret, url_override=os.getenv("MQD_ALPACA_DATA_URL", "").strip() or None
+        )
 
         # Behavior configuration
         self.max_staleness = max_staleness
@@ -401,7 +404,8 @@ class MarketDataPipeline:
         url = "https://api.twelvedata.com/time_series"
 
         def _call():
-            return requests.get(url, params=params, timeout=15)
+            # Pooled keep-alive client; this loop owns retry/backoff (retries=0).
+            return get_http_client().get(url, params=params, timeout=15, retries=0)
 
         last_err: Optional[Exception] = None
         resp = None
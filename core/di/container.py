@@ -14,10 +14,12 @@ from typing import Optional
 from decimal import Decimal
 from datetime import time
 import logging
+import os
 from pathlib import Path
 
 # State
-from core.state.order_machine import OrderStateMachine
+from core.state.order_machine import OrderStateMachine, OrderStateChangedEvent
+from core.state.order_archive import OrderArchive
 from core.state.position_store import PositionStore
 from core.state.transaction_log import TransactionLog
 from core.state.reconciler import BrokerReconciler, StartupReconciler
@@ -25,7 +27,9 @@ from core.state.order_tracker import OrderTracker, InFlightOrder, FillEvent, Ord
 
 # Events
 from core.events.bus import OrderEventBus
+from core.events.async_bus import AsyncOrderEventBus
 from core.events.handlers import EventHandlerRegistry
+from core.events.types import OrderFilledEvent, OrderPartiallyFilledEvent
 
 # Data
 from core.data.validator import DataValidator
@@ -40,8 +44,12 @@ from core.risk.manager import RiskManager, RiskLimits
 from core.risk.protections import create_default_protections, ProtectionManager
 
 # Execution (NEW)
+from core.execution.emergency import EmergencyFlattener
 from core.execution.engine import OrderExecutionEngine
 
+# Broker
+from core.brokers.state_cache import BrokerStateCache
+
 # Strategies
 from strategies.registry import StrategyRegistry
 from strategies.lifecycle import StrategyLifecycleManager
@@ -52,7 +60,7 @@ from core.config.loader import ConfigLoader
 
 # NEW: Time, Network, Market, Real-time
 from core.time import get_clock, Clock
-from core.net import create_combined_throttler, Throttler
+from core.net import alpaca_shared_budgets, create_combined_throttler, Throttler
 from core.market import SymbolPropertiesCache, SecurityCache
 from core.realtime import UserStreamTracker
 
@@ -77,12 +85,14 @@ class Container:
         
         # State
         self._order_machine: Optional[OrderStateMachine] = None
+        self._order_archive: Optional[OrderArchive] = None
         self._position_store: Optional[PositionStore] = None
         self._transaction_log: Optional[TransactionLog] = None
         self._order_tracker: Optional[OrderTracker] = None  # NEW
         
         # Events
         self._event_bus: Optional[OrderEventBus] = None
+        self._async_event_bus: Optional[AsyncOrderEventBus] = None
         self._event_handlers: Optional[EventHandlerRegistry] = None
         
         # Data
@@ -105,11 +115,13 @@ class Container:
         self._broker_connector = None
         self._reconciler: Optional[BrokerReconciler] = None
         self._execution_engine: Optional[OrderExecutionEngine] = None  # NEW
+        self._emergency_flattener: Optional[EmergencyFlattener] = None
         
         # NEW: Market and Real-time (initialized when broker is set)
         self._symbol_props_cache: Optional[SymbolPropertiesCache] = None
         self._security_cache: Optional[SecurityCache] = None
         self._user_stream: Optional[UserStreamTracker] = None
+        self._broker_state_cache: Optional[BrokerStateCache] = None
 
     def initialize(self, config_path: str) -> None:
         """
@@ -141,7 +153,11 @@ class Container:
         logger.info(f"Clock initialized: {type(self._clock).__name__}")
         
         # 3. NEW: Initialize throttler (rate limiting)
-        self._throttler = create_combined_throttler()
+        # PATCH 33: Alpaca buckets also draw from the host-wide budget shared
+        # with the scanner / universe builder (MQD_SHARED_RATE_BUDGET=1).
+        self._throttler = create_combined_throttler(
+            shared=alpaca_shared_budgets(self._config.broker.api_key, client="trading")
+        )
         logger.info("Throttler initialized with combined rate limits")
         
         # 4. Initialize state components (now with clock)
@@ -149,11 +165,20 @@ class Container:
             log_path=self._config.transaction_log_path,
             clock=self._clock  # CRITICAL: Pass clock for backtest-safe timestamps
         )
-        self._event_bus = OrderEventBus()
+        # Keyed parallel dispatch (per-order ordering preserved); 1 = single FIFO consumer
+        self._event_bus = OrderEventBus(
+            partitions=int(os.getenv("MQD_EVENT_BUS_PARTITIONS", "1") or "1"),
+        )
         
+        # Terminal orders move to a SQLite cold store next to the position DB
+        self._order_archive = None
+        if os.getenv("MQD_ORDER_ARCHIVE", "1").strip().lower() in ("1", "true", "yes"):
+            self._order_archive = OrderArchive(Path(self._config.position_db_path).parent / "orders_archive.db")
         self._order_machine = OrderStateMachine(
             event_bus=self._event_bus,
-            transaction_log=self._transaction_log
+            transaction_log=self._transaction_log,
+            archive=self._order_archive,
+            archive_grace_s=float(os.getenv("MQD_ORDER_ARCHIVE_GRACE_S", "300") or "300"),
         )
         self._position_store = PositionStore(
             db_path=self._config.position_db_path,
@@ -170,6 +195,8 @@ class Container:
             position_store=self._position_store,
             transaction_log=self._transaction_log
         )
+        # Handlers are invoked directly (e.g. EmergencyFlattener -> kill switch record)
+        self._event_handlers.register_default_handlers()
         
         # 6. Initialize data components
         self._data_validator = DataValidator(
@@ -285,6 +312,21 @@ class Container:
             raise RuntimeError("Container not initialized")
         return self._event_bus
     
+    def get_async_event_bus(self) -> AsyncOrderEventBus:
+        """
+        Loop-native bus for stream-driven components (created on first use).
+        
+        Opt-in extension point: the runtime itself neither creates nor
+        subscribes to it, so until a component calls this the websocket
+        fill publish in _handle_trade_update is skipped. Subscribe before
+        start_async(); it is started alongside the user stream so
+        websocket-driven events are dispatched on the event loop. Use
+        EventBusBridge to hand selected types to the threaded bus.
+        """
+        if self._async_event_bus is None:
+            self._async_event_bus = AsyncOrderEventBus()
+        return self._async_event_bus
+    
     def get_data_validator(self) -> DataValidator:
         if self._data_validator is None:
             raise RuntimeError("Container not initialized")
@@ -341,6 +383,20 @@ class Container:
     # NEW: Order Execution Engine accessor
     def get_order_execution_engine(self) -> Optional[OrderExecutionEngine]:
         return self._execution_engine
+
+    def get_emergency_flattener(self) -> Optional[EmergencyFlattener]:
+        return self._emergency_flattener
+
+    def activate_kill_switch(self, reason: str, trigger_source: str = "manual"):
+        """
+        Kill switch: cancel every working order and liquidate every account
+        position now. Returns the FlattenReport, or None when no broker is
+        wired (nothing to flatten) or a flatten is already running.
+        """
+        if self._emergency_flattener is None:
+            logger.critical("KILL SWITCH requested but no broker is wired: %s (source=%s)", reason, trigger_source)
+            return None
+        return self._emergency_flattener.flatten_all(reason, trigger_source=trigger_source)
     
     # NEW: Symbol Properties accessor
     def get_symbol_properties_cache(self) -> Optional[SymbolPropertiesCache]:
@@ -354,6 +410,10 @@ class Container:
     def get_user_stream(self) -> Optional[UserStreamTracker]:
         return self._user_stream
 
+    # Broker state cache accessor (account / positions / open orders)
+    def get_broker_state_cache(self) -> Optional[BrokerStateCache]:
+        return self._broker_state_cache
+
     # ========================================================================
     # BROKER & MARKET INITIALIZATION
     # ========================================================================
@@ -370,6 +430,14 @@ class Container:
         """
         self._broker_connector = connector
 
+        # PATCH 33: the connector's REST calls spend the same "alpaca_trading"
+        # budget as everything else in the process (ORDER before STATUS).
+        if getattr(connector, "throttler", False) is None:
+            connector.throttler = self._throttler
+
+        # Per-cycle broker state cache, invalidated by user stream updates
+        self._broker_state_cache = BrokerStateCache(connector)
+
         # Create reconciler
         if self._position_store and self._order_machine:
             self._reconciler = BrokerReconciler(
@@ -403,6 +471,22 @@ class Container:
             )
             logger.info("Order execution engine initialized with symbol properties + order tracker + transaction log")
 
+            # Order waits complete on state-machine transitions made by any
+            # component (reconciler, stream-driven tracker) instead of polling.
+            if self._event_bus is not None and not getattr(self._event_bus, "_running", False):
+                self._event_bus.subscribe(
+                    OrderStateChangedEvent, self._execution_engine.completions.on_state_changed
+                )
+
+            # Kill switch / daily-loss breach: concurrent cancel + flatten-all
+            self._emergency_flattener = EmergencyFlattener(
+                broker=connector,
+                engine=self._execution_engine,
+                throttler=self._throttler,
+                notify=self._event_handlers.handle_event if self._event_handlers else None,
+                timeout_s=float(os.getenv("MQD_FLATTEN_TIMEOUT_S", "30") or "30"),
+            )
+
         # NEW: Initialize user stream tracker
         if self._config:
             self._user_stream = UserStreamTracker(
@@ -423,6 +507,13 @@ class Container:
         
         Feeds fills to OrderTracker for lifecycle tracking.
         """
+        if self._broker_state_cache is not None:
+            self._broker_state_cache.on_trade_update(update)
+
+        # Wake any wait_for_order() blocked on this order.
+        if self._execution_engine is not None:
+            self._execution_engine.completions.on_trade_update(update)
+
         event = update.get('event')
         order_data = update.get('order', {})
         client_order_id = order_data.get('client_order_id')
@@ -440,6 +531,10 @@ class Container:
             )
             self._order_tracker.process_fill(client_order_id, fill)
             logger.info(f"Processed fill for order {client_order_id}")
+
+            # Loop-native consumers see the fill without a thread hop.
+            if self._async_event_bus is not None and self._async_event_bus.is_running:
+                await self._async_event_bus.publish(self._fill_event_from_update(event, order_data, client_order_id))
         
         # Process other status updates
         else:
@@ -449,8 +544,28 @@ class Container:
                 'filled_qty': order_data.get('filled_qty')
             })
     
+    def _fill_event_from_update(self, event: str, order_data: dict, client_order_id: str):
+        """Build OrderFilledEvent / OrderPartiallyFilledEvent from a trade update."""
+        filled = Decimal(str(order_data.get('filled_qty') or 0))
+        price = Decimal(str(order_data.get('filled_avg_price') or 0))
+        common = dict(
+            order_id=client_order_id,
+            broker_order_id=str(order_data.get('id') or ""),
+            symbol=str(order_data.get('symbol') or ""),
+            filled_quantity=filled,
+            fill_price=price,
+            commission=Decimal('0'),
+            timestamp=self._clock.now(),
+        )
+        if event == 'partial_fill':
+            total = Decimal(str(order_data.get('qty') or filled))
+            return OrderPartiallyFilledEvent(remaining_quantity=max(total - filled, Decimal('0')), **common)
+        return OrderFilledEvent(**common)
+
     async def _handle_account_update(self, update: dict):
         """Handle account update from WebSocket"""
+        if self._broker_state_cache is not None:
+            self._broker_state_cache.on_account_update(update)
         logger.info(
             "Account update: cash=%s, buying_power=%s",
             update.get('cash'),
@@ -469,10 +584,15 @@ class Container:
         logger.info("Container started")
     
     async def start_async(self) -> None:
-        """Start async components (user stream)"""
+        """Start async components (async event bus, user stream)"""
+        if self._async_event_bus is not None and not self._async_event_bus.is_running:
+            await self._async_event_bus.start()
         if self._user_stream:
             await self._user_stream.start()
             logger.info("User stream started")
+            # Fills are now pushed; wait_for_order may space out its polls.
+            if self._execution_engine is not None:
+                self._execution_engine.completions.attach_source("user_stream")
     
     def stop(self) -> None:
         """Stop all stoppable components"""
@@ -481,17 +601,34 @@ class Container:
                 self._event_bus.stop(timeout=5.0)
             except Exception as e:
                 logger.error(f"Error stopping event bus: {e}")
+
+        # After the bus: no more transitions can load archived orders.
+        if self._order_archive is not None:
+            self._order_archive.close()
+
+        if self._execution_engine is not None:
+            try:
+                self._execution_engine.close()
+            except Exception as e:
+                logger.error(f"Error closing execution engine: {e}")
         
         logger.info("Container stopped")
     
     async def stop_async(self) -> None:
         """Stop async components (user stream)"""
         if self._user_stream:
+            if self._execution_engine is not None:
+                self._execution_engine.completions.detach_source("user_stream")
             try:
                 await self._user_stream.stop()
                 logger.info("User stream stopped")
             except Exception as e:
                 logger.error(f"Error stopping user stream: {e}")
+        if self._async_event_bus is not None and self._async_event_bus.is_running:
+            try:
+                await self._async_event_bus.stop(timeout=5.0)
+            except Exception as e:
+                logger.error(f"Error stopping async event bus: {e}")
 
     def init_from_file(self, path):
         """
@@ -64,7 +64,8 @@ class DiscordEventBridge:
     def start(self):
         """Start listening to events."""
         # Subscribe to order state changes
-        self.event_bus.subscribe(OrderStateChangedEvent, self._handle_state_change)
+        # Notifications are slow network calls: keep them off the fill path.
+        self.event_bus.subscribe(OrderStateChangedEvent, self._handle_state_change, low_priority=True)
         
         self.logger.info("Discord event bridge started")
     
@@ -77,9 +77,11 @@ class DiscordIntegrationManager:
     def _subscribe_to_events(self):
         """Subscribe to event bus."""
         # Order state changes
+        # Notifications are slow network calls: keep them off the fill path.
         self.event_bus.subscribe(
             OrderStateChangedEvent,
-            self._handle_order_state_change
+            self._handle_order_state_change,
+            low_priority=True,
         )
     
     def _handle_order_state_change(self, event: OrderStateChangedEvent):
@@ -27,9 +27,8 @@ import time
 import threading
 from collections import deque
 
-import requests
-
 from core.logging import get_logger, LogStream
+from core.net.http_client import get_http_client  # pooled keep-alive (PATCH 34)
 from core.time.clock import local_time_str, utc_now
 
 
@@ -417,10 +416,12 @@ class DiscordNotifier:
         """Send webhook with retry."""
         for attempt in range(retries):
             try:
-                response = requests.post(
+                # This loop owns retry/backoff (retries=0).
+                response = get_http_client().post(
                     webhook_url,
                     json=payload,
-                    timeout=10
+                    timeout=10,
+                    retries=0,
                 )
                 
                 if response.status_code == 204:
@@ -1,7 +1,8 @@
 """
 Event bus for order lifecycle events.
 
-Provides thread-safe event distribution with FIFO processing.
+Provides thread-safe event distribution with FIFO processing, plus an
+asyncio-native variant for stream-driven components.
 """
 
 from .bus import (
@@ -9,9 +10,15 @@ from .bus import (
     Event,
     OrderStateChangedEvent,
 )
+from .async_bus import (
+    AsyncOrderEventBus,
+    EventBusBridge,
+)
 
 __all__ = [
     "OrderEventBus",
     "Event",
     "OrderStateChangedEvent",
+    "AsyncOrderEventBus",
+    "EventBusBridge",
 ]
@@ -0,0 +1,404 @@
+"""
+Asyncio-native event bus for stream-driven components.
+
+PROBLEM:
+    UserStreamTracker, Throttler.execute and the container's websocket
+    handlers run on an asyncio loop, but OrderEventBus dispatches on its own
+    threads. Every event crossing over pays a queue hand-off and a thread
+    context switch before any handler runs.
+
+DESIGN:
+    - AsyncOrderEventBus mirrors OrderEventBus: subscribe(type, handler,
+      low_priority=...), emit(event), start()/stop() with graceful drain,
+      handler isolation, get_stats() with the same counters and
+      instrumentation (core.events.instrumentation).
+    - Consumers are asyncio tasks on the owning loop (default lane + optional
+      low-priority lane). Handlers may be plain callables or coroutine
+      functions; plain callables run on the loop, so keep them short.
+    - emit() is non-blocking and may be called from any thread: off-loop
+      callers are routed through loop.call_soon_threadsafe().
+    - publish(event) dispatches default-lane handlers inline on the calling
+      task (no queue hop at all) for latency-critical paths such as a
+      websocket fill.
+    - EventBusBridge forwards selected event types between an async bus and
+      a threaded OrderEventBus for mixed deployments, without echo loops.
+      An event the target bus drops (full queue, bus stopped) is not left
+      behind in the bridge's echo bookkeeping.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Type
+
+from core.events.instrumentation import BusInstrumentation
+from core.logging import LogStream, get_logger
+
+LANE_DEFAULT = "default"
+LANE_LOW_PRIORITY = "low"
+
+
+class _Queued:
+    __slots__ = ("event", "enqueued_at")
+
+    def __init__(self, event: Any, enqueued_at: Optional[float]) -> None:
+        self.event = event
+        self.enqueued_at = enqueued_at
+
+
+def _handler_name(handler: Callable) -> str:
+    return getattr(handler, "__qualname__", None) or getattr(handler, "__name__", repr(handler))
+
+
+class AsyncOrderEventBus:
+    """
+    Event bus whose consumers run as tasks on an asyncio loop.
+
+    USAGE:
+        bus = AsyncOrderEventBus()
+        bus.subscribe(OrderFilledEvent, on_fill)              # sync or async
+        bus.subscribe(OrderFilledEvent, notify, low_priority=True)
+        await bus.start()
+
+        bus.emit(event)            # queued, from any thread
+        await bus.publish(event)   # inline on this task
+
+        await bus.stop()
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        *,
+        instrument: bool = True,
+        slow_handler_ms: float = 250.0,
+    ) -> None:
+        """
+        Args:
+            max_queue_size: Maximum events per lane queue
+            instrument: Collect latency/depth/drop telemetry
+            slow_handler_ms: Handler runtime that counts as slow
+        """
+        self.logger = get_logger(LogStream.SYSTEM)
+        self._max_queue_size = max_queue_size
+
+        self._handlers: Dict[Type, List[Callable]] = {}
+        self._low_handlers: Dict[Type, List[Callable]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._low_queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+        self._instr: Optional[BusInstrumentation] = (
+            BusInstrumentation(slow_handler_ms=slow_handler_ms) if instrument else None
+        )
+
+        self._events_processed = 0
+        self._events_failed = 0
+        self._events_dropped = 0
+        self._low_priority_processed = 0
+        self._published_inline = 0
+
+    # ========================================================================
+    # SUBSCRIPTION / EMIT
+    # ========================================================================
+
+    def subscribe(self, event_type: Type, handler: Callable, *, low_priority: bool = False) -> None:
+        """
+        Register handler (callable or coroutine function) for event type.
+
+        Raises:
+            RuntimeError: If bus is already running
+        """
+        if self._running:
+            raise RuntimeError("Cannot subscribe while bus is running")
+        registry = self._low_handlers if low_priority else self._handlers
+        registry.setdefault(event_type, []).append(handler)
+
+    def emit(self, event: Any, *, on_drop: Optional[Callable[[Any], None]] = None) -> bool:
+        """
+        Queue event for dispatch. Non-blocking; callable from any thread.
+
+        Args:
+            event: Event to emit
+            on_drop: Called with the event if the default lane drops it.
+                Off-loop emits are queued later on the loop, so a drop
+                there is only reported through this callback.
+
+        Returns:
+            False if the event was dropped on the spot; True if it was
+            queued (on the loop) or handed to the loop (off the loop)
+
+        Raises:
+            RuntimeError: If bus is not running
+        """
+        if not self._running or self._loop is None:
+            raise RuntimeError("Event bus is not running. Call start() first.")
+        if threading.get_ident() == self._loop_thread:
+            return self._enqueue_all(event, on_drop)
+        self._loop.call_soon_threadsafe(self._enqueue_all, event, on_drop)
+        return True
+
+    async def publish(self, event: Any) -> None:
+        """
+        Dispatch default-lane handlers inline on the calling task.
+
+        Low-priority handlers are still queued so they never delay the caller.
+        """
+        if not self._running:
+            raise RuntimeError("Event bus is not running. Call start() first.")
+        self._published_inline += 1
+        await self._dispatch(event, self._handlers)
+        self._events_processed += 1
+        if self._low_handlers.get(type(event)):
+            self._enqueue(self._low_queue, event, LANE_LOW_PRIORITY)
+
+    def _enqueue_all(self, event: Any, on_drop: Optional[Callable[[Any], None]] = None) -> bool:
+        accepted = False
+        if self._running:
+            accepted = self._enqueue(self._queue, event, LANE_DEFAULT)
+            if self._low_handlers.get(type(event)):
+                self._enqueue(self._low_queue, event, LANE_LOW_PRIORITY)
+        if not accepted and on_drop is not None:
+            on_drop(event)
+        return accepted
+
+    def _enqueue(self, q: Optional[asyncio.Queue], event: Any, lane: str) -> bool:
+        if q is None:
+            return False
+        instr = self._instr
+        try:
+            q.put_nowait(_Queued(event, instr.now() if instr is not None else None))
+            if instr is not None:
+                instr.on_enqueue(lane, q.qsize())
+            return True
+        except asyncio.QueueFull:
+            self._events_dropped += 1
+            if instr is not None:
+                instr.on_drop(type(event).__name__)
+            self.logger.warning(
+                "Async event queue full, dropping event (dropped=%d)",
+                self._events_dropped,
+                extra={"event_type": type(event).__name__, "lane": lane},
+            )
+            return False
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    async def start(self) -> None:
+        """Start consumer tasks on the running loop."""
+        if self._running:
+            raise RuntimeError("Event bus already running")
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._low_queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._consume(self._queue, self._handlers, LANE_DEFAULT)),
+        ]
+        if self._low_handlers:
+            self._tasks.append(
+                asyncio.create_task(self._consume(self._low_queue, self._low_handlers, LANE_LOW_PRIORITY))
+            )
+        self.logger.info("AsyncOrderEventBus started", extra={
+            "registered_event_types": len(self._handlers),
+            "low_priority_event_types": len(self._low_handlers),
+        })
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop accepting events, drain both lanes (bounded), cancel consumers."""
+        if not self._running:
+            raise RuntimeError("Event bus not running")
+        self._running = False
+
+        queues = [q for q in (self._queue, self._low_queue) if q is not None]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in queues)), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "Async event bus did not drain cleanly",
+                extra={"timeout": timeout, "remaining": sum(q.qsize() for q in queues)},
+            )
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._instr is not None:
+            self._instr.maybe_log(force=True)
+        self.logger.info("AsyncOrderEventBus stopped", extra={
+            "events_processed": self._events_processed,
+            "events_failed": self._events_failed,
+        })
+
+    async def _consume(self, q: asyncio.Queue, handlers: Dict[Type, List[Callable]], lane: str) -> None:
+        while True:
+            item = await q.get()
+            try:
+                if self._instr is not None:
+                    self._instr.on_dequeue(type(item.event).__name__, item.enqueued_at)
+                await self._dispatch(item.event, handlers)
+                if lane == LANE_LOW_PRIORITY:
+                    self._low_priority_processed += 1
+                else:
+                    self._events_processed += 1
+            except Exception:
+                self._events_failed += 1
+                self.logger.error("Unexpected error in async event loop", exc_info=True)
+            finally:
+                q.task_done()
+
+    async def _dispatch(self, event: Any, handlers_by_type: Dict[Type, List[Callable]]) -> None:
+        """Run every handler for the event; failures are isolated and counted."""
+        type_name = type(event).__name__
+        for handler in handlers_by_type.get(type(event), []):
+            started = time.perf_counter()
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self._events_failed += 1
+                self.logger.error(
+                    f"Handler failed for {type_name}",
+                    extra={"event_type": type_name, "handler": _handler_name(handler), "error": str(e)},
+                    exc_info=True,
+                )
+            finally:
+                if self._instr is not None:
+                    self._instr.record_handler_latency(
+                        _handler_name(handler), type_name, (time.perf_counter() - started) * 1000.0
+                    )
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def get_stats(self) -> Dict:
+        return {
+            "events_processed": self._events_processed,
+            "events_failed": self._events_failed,
+            "events_dropped": self._events_dropped,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "registered_event_types": len(self._handlers),
+            "low_priority_processed": self._low_priority_processed,
+            "low_priority_queue_size": self._low_queue.qsize() if self._low_queue is not None else 0,
+            "published_inline": self._published_inline,
+            "instrumentation": self._instr.snapshot() if self._instr is not None else None,
+        }
+
+    async def __aenter__(self) -> "AsyncOrderEventBus":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+
+# ============================================================================
+# BRIDGE (mixed deployments)
+# ============================================================================
+
+class EventBusBridge:
+    """
+    Forwards event types between an AsyncOrderEventBus and a threaded
+    OrderEventBus.
+
+    Call forward_* before either bus starts (both require subscription
+    before start). An event forwarded one way is never echoed back when the
+    same type is bridged in both directions.
+
+    USAGE:
+        bridge = EventBusBridge(async_bus, threaded_bus)
+        bridge.forward_to_threaded(OrderFilledEvent)        # loop -> threads
+        bridge.forward_to_async(OrderStateChangedEvent)     # threads -> loop
+    """
+
+    def __init__(self, async_bus: AsyncOrderEventBus, threaded_bus: Any) -> None:
+        self._async_bus = async_bus
+        self._threaded_bus = threaded_bus
+        self._to_threaded_types: Set[Type] = set()
+        self._to_async_types: Set[Type] = set()
+        # id(event) -> event for events currently crossing the bridge
+        self._in_transit: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._forwarded_to_threaded = 0
+        self._forwarded_to_async = 0
+
+    def forward_to_threaded(self, *event_types: Type) -> None:
+        for t in event_types:
+            if t not in self._to_threaded_types:
+                self._to_threaded_types.add(t)
+                self._async_bus.subscribe(t, self._to_threaded)
+
+    def forward_to_async(self, *event_types: Type) -> None:
+        for t in event_types:
+            if t not in self._to_async_types:
+                self._to_async_types.add(t)
+                self._threaded_bus.subscribe(t, self._to_async)
+
+    def _arrived_from_bridge(self, event: Any) -> bool:
+        with self._lock:
+            return self._in_transit.pop(id(event), None) is not None
+
+    def _unmark(self, event: Any) -> None:
+        with self._lock:
+            self._in_transit.pop(id(event), None)
+
+    def _mark(self, event: Any, reverse_types: Set[Type]) -> bool:
+        # Only track when the reverse direction would echo it back.
+        if type(event) not in reverse_types:
+            return False
+        with self._lock:
+            self._in_transit[id(event)] = event
+        return True
+
+    def _to_threaded(self, event: Any) -> None:
+        if self._arrived_from_bridge(event):
+            return
+        marked = self._mark(event, self._to_async_types)
+        accepted = False
+        try:
+            # Buses without a return value count as accepted.
+            accepted = self._threaded_bus.emit(event) is not False
+        finally:
+            # A dropped event never reaches _to_async to clear its mark.
+            if marked and not accepted:
+                self._unmark(event)
+        if accepted:
+            self._forwarded_to_threaded += 1
+
+    def _to_async(self, event: Any) -> None:
+        if self._arrived_from_bridge(event):
+            return
+        marked = self._mark(event, self._to_threaded_types)
+        accepted = False
+        try:
+            accepted = self._async_bus.emit(event, on_drop=self._unmark if marked else None)
+        finally:
+            if marked and not accepted:
+                self._unmark(event)
+        if accepted:
+            self._forwarded_to_async += 1
+
+    def get_stats(self) -> Dict:
+        return {
+            "forwarded_to_threaded": self._forwarded_to_threaded,
+            "forwarded_to_async": self._forwarded_to_async,
+            "in_transit": len(self._in_transit),
+        }
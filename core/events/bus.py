@@ -7,7 +7,9 @@ CRITICAL PROPERTIES:
 3. FIFO event processing
 4. Handler failures are isolated (logged but don't crash bus)
 5. Graceful shutdown with queue drain
-6. Runs in dedicated thread
+6. Runs in dedicated thread(s): optional keyed partitions preserve
+   per-order ordering while independent orders run in parallel, and
+   slow non-critical handlers can opt into a low-priority lane
 
 Based on observer pattern with thread-safety guarantees.
 """
@@ -15,6 +17,8 @@ Based on observer pattern with thread-safety guarantees.
 import threading
 import queue
 import os
+import time
+import zlib
 import atexit
 import weakref
 from typing import Dict, List, Callable, Any, Type, Optional
@@ -24,6 +28,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from core.logging import get_logger, LogStream
+from core.events.instrumentation import BusInstrumentation
 
 # ============================================================================
 # GLOBAL REGISTRY (helps tests / interpreter shutdown)
@@ -90,6 +95,34 @@ class OrderStateChangedEvent(Event):
         }
 
 
+# ============================================================================
+# PARTITIONING
+# ============================================================================
+
+LANE_DEFAULT = "default"
+LANE_LOW_PRIORITY = "low"
+
+
+class _Queued:
+    """Queue entry carrying the emit timestamp (queue-wait telemetry)."""
+    __slots__ = ("event", "enqueued_at")
+
+    def __init__(self, event: Event, enqueued_at: float) -> None:
+        self.event = event
+        self.enqueued_at = enqueued_at
+
+
+def default_partition_key(event: Event) -> Optional[str]:
+    """
+    Partition key for an event: order_id, else symbol, else None.
+
+    Events with the same key always land on the same worker, so per-order
+    (or per-symbol) ordering is preserved. Keyless events go to partition 0.
+    """
+    key = getattr(event, "order_id", None) or getattr(event, "symbol", None)
+    return str(key) if key else None
+
+
 # ============================================================================
 # EVENT BUS
 # ============================================================================
@@ -105,14 +138,32 @@ class OrderEventBus:
     - Each event type has registered handlers
     - Handler failures logged but don't crash bus
     
+    PARTITIONED DISPATCH (partitions > 1):
+    - Events are hashed by order_id (or symbol) onto a fixed pool of
+      worker threads, one queue per worker
+    - Ordering holds per key; independent orders are handled in parallel
+    
+    INSTRUMENTATION (instrument=True):
+    - Per-event-type queue wait and per-handler latency histograms,
+      queue depth high-water marks and per-type drop counts
+    - A monitor thread captures the stack of handlers running longer than
+      slow_handler_ms and periodically logs telemetry to the performance
+      stream; everything is also in get_stats()["instrumentation"]
+    
+    LOW-PRIORITY LANE:
+    - Handlers subscribed with low_priority=True (Discord notifications,
+      analytics writes, ...) run on their own FIFO thread, so a slow
+      non-critical handler never delays fill processing
+    
     THREAD SAFETY:
     - emit() is thread-safe (uses queue.Queue)
     - subscribe() must be called before start()
-    - Handlers execute in event bus thread (NOT caller thread)
+    - Handlers execute in event bus threads (NOT caller thread)
     
     USAGE:
         bus = OrderEventBus()
         bus.subscribe(OrderStateChangedEvent, handle_order_state_change)
+        bus.subscribe(OrderStateChangedEvent, notify_discord, low_priority=True)
         bus.start()
         
         # From any thread:
@@ -122,28 +173,57 @@ class OrderEventBus:
         bus.stop()
     """
     
-    def __init__(self, max_queue_size: int = 10000, *, daemon: bool | None = None):
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        *,
+        daemon: bool | None = None,
+        partitions: int = 1,
+        partition_key: Optional[Callable[[Event], Optional[str]]] = None,
+        instrument: bool = True,
+        slow_handler_ms: float = 250.0,
+        telemetry_interval_s: float = 60.0,
+    ):
         """
         Initialize event bus.
         
         Args:
-            max_queue_size: Maximum events in queue (prevents memory leak)
+            max_queue_size: Maximum events per queue (prevents memory leak)
+            partitions: Number of keyed worker threads (1 = single FIFO consumer)
+            partition_key: Maps an event to its ordering key
+                (default: order_id, else symbol)
+            instrument: Collect latency/depth/drop telemetry
+            slow_handler_ms: Handler runtime that triggers stack capture
+            telemetry_interval_s: Seconds between performance-log snapshots
         """
         self.logger = get_logger(LogStream.SYSTEM)
         
-        # Event queue (thread-safe)
-        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        # Event queues (thread-safe): one per partition + low-priority lane
+        self._partitions = max(1, int(partitions or 1))
+        self._partition_key = partition_key or default_partition_key
+        self._queues: List[queue.Queue] = [
+            queue.Queue(maxsize=max_queue_size) for _ in range(self._partitions)
+        ]
+        self._queue: queue.Queue = self._queues[0]
+        self._low_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
         
         # Event handlers: event_type -> list of handlers
         self._handlers: Dict[Type[Event], List[Callable]] = {}
+        self._low_handlers: Dict[Type[Event], List[Callable]] = {}
         
         # Control
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._threads: List[threading.Thread] = []
+        self._monitor_thread: Optional[threading.Thread] = None
         self._running = False
         
+        # Telemetry
+        self._instr: Optional[BusInstrumentation] = (
+            BusInstrumentation(slow_handler_ms=slow_handler_ms, log_interval_s=telemetry_interval_s)
+            if instrument else None
+        )
         
-
         # Thread daemon mode:
         # - In production we default to non-daemon for graceful shutdown.
         # - Under pytest, stray non-daemon threads can hang the test runner.
@@ -156,22 +236,34 @@ class OrderEventBus:
             _BUS_REGISTRY.add(self)  # type: ignore[arg-type]
         except Exception:
             pass
-# Statistics
+
+        # Statistics (updated from several worker threads)
+        self._stats_lock = threading.Lock()
         self._events_processed = 0
         self._events_failed = 0
         self._events_dropped = 0  # PATCH 8: track dropped events
+        self._low_priority_processed = 0
         
         self.logger.info("OrderEventBus initialized", extra={
-            "max_queue_size": max_queue_size
+            "max_queue_size": max_queue_size,
+            "partitions": self._partitions,
         })
     
-    def subscribe(self, event_type: Type[Event], handler: Callable[[Event], None]):
+    def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], None],
+        *,
+        low_priority: bool = False,
+    ):
         """
         Register handler for event type.
         
         Args:
             event_type: Event class to subscribe to
             handler: Callable that accepts event
+            low_priority: Run on the low-priority lane (slow, non-critical
+                handlers such as notifications)
             
         Raises:
             RuntimeError: If bus is already running
@@ -185,17 +277,25 @@ class OrderEventBus:
         if self._running:
             raise RuntimeError("Cannot subscribe while bus is running")
         
-        if event_type not in self._handlers:
-            self._handlers[event_type] = []
-        
-        self._handlers[event_type].append(handler)
+        registry = self._low_handlers if low_priority else self._handlers
+        registry.setdefault(event_type, []).append(handler)
         
         self.logger.debug(f"Handler registered for {event_type.__name__}", extra={
             "event_type": event_type.__name__,
-            "handler_count": len(self._handlers[event_type])
+            "handler_count": len(registry[event_type]),
+            "lane": LANE_LOW_PRIORITY if low_priority else LANE_DEFAULT,
         })
     
-    def emit(self, event: Event):
+    def partition_for(self, event: Event) -> int:
+        """Index of the partition that handles *event*."""
+        if self._partitions == 1:
+            return 0
+        key = self._partition_key(event)
+        if not key:
+            return 0
+        return zlib.crc32(key.encode("utf-8")) % self._partitions
+    
+    def emit(self, event: Event) -> bool:
         """
         Emit event to bus.
 
@@ -205,27 +305,49 @@ class OrderEventBus:
 
         Args:
             event: Event to emit
+
+        Returns:
+            True if the default-lane handlers will see the event, False if
+            it was dropped
         """
         if not self._running:
             raise RuntimeError("Event bus is not running. Call start() first.")
 
+        partition = self.partition_for(event)
+        lane = LANE_DEFAULT if self._partitions == 1 else f"p{partition}"
+        accepted = self._enqueue(self._queues[partition], event, lane)
+        if self._low_handlers.get(type(event)):
+            self._enqueue(self._low_queue, event, LANE_LOW_PRIORITY)
+        return accepted
+    
+    def _enqueue(self, q: queue.Queue, event: Event, lane: str) -> bool:
+        instr = self._instr
         try:
-            self._queue.put_nowait(event)
+            q.put_nowait(_Queued(event, instr.now()) if instr is not None else event)
+            if instr is not None:
+                instr.on_enqueue(lane, q.qsize())
+            return True
         except queue.Full:
-            self._events_dropped += 1
+            with self._stats_lock:
+                self._events_dropped += 1
+                dropped = self._events_dropped
+            if instr is not None:
+                instr.on_drop(type(event).__name__)
             self.logger.warning(
                 "Event queue full, dropping event (dropped=%d)",
-                self._events_dropped,
+                dropped,
                 extra={
                     "event_type": type(event).__name__,
-                    "queue_size": self._queue.qsize(),
-                    "events_dropped": self._events_dropped,
+                    "lane": lane,
+                    "queue_size": q.qsize(),
+                    "events_dropped": dropped,
                 },
             )
+            return False
     
     def start(self):
         """
-        Start event bus processing thread.
+        Start event bus processing threads.
         
         Raises:
             RuntimeError: If already running
@@ -236,22 +358,45 @@ class OrderEventBus:
         self._stop_event.clear()
         self._running = True
         
-        # Start consumer thread
-        self._thread = threading.Thread(
-            target=self._process_events,
-            name="OrderEventBus",
-            daemon=self._daemon  # auto-daemon under pytest to avoid hangs
-        )
-        self._thread.start()
+        # Start consumer threads: one per partition (+ low-priority lane)
+        self._threads = []
+        for i, q in enumerate(self._queues):
+            name = "OrderEventBus" if self._partitions == 1 else f"OrderEventBus-p{i}"
+            self._threads.append(threading.Thread(
+                target=self._process_events,
+                args=(q, self._handlers),
+                name=name,
+                daemon=self._daemon  # auto-daemon under pytest to avoid hangs
+            ))
+        if self._low_handlers:
+            self._threads.append(threading.Thread(
+                target=self._process_events,
+                args=(self._low_queue, self._low_handlers, LANE_LOW_PRIORITY),
+                name="OrderEventBus-low",
+                daemon=self._daemon,
+            ))
+        for t in self._threads:
+            t.start()
+        self._thread = self._threads[0]
+        
+        if self._instr is not None:
+            self._monitor_thread = threading.Thread(
+                target=self._monitor_loop,
+                name="EventBusMonitor",
+                daemon=True,  # telemetry only; never blocks shutdown
+            )
+            self._monitor_thread.start()
         
         self.logger.info("OrderEventBus started", extra={
             "thread_id": self._thread.ident,
-            "registered_event_types": len(self._handlers)
+            "threads": len(self._threads),
+            "registered_event_types": len(self._handlers),
+            "low_priority_event_types": len(self._low_handlers),
         })
     
     def stop(self, timeout: float = 5.0):
         """
-        Stop event bus and drain queue.
+        Stop event bus and drain queues.
         
         Args:
             timeout: Max seconds to wait for queue drain
@@ -263,7 +408,7 @@ class OrderEventBus:
             raise RuntimeError("Event bus not running")
         
         self.logger.info("Stopping OrderEventBus...", extra={
-            "queue_size": self._queue.qsize(),
+            "queue_size": self._queue_size(),
             "events_processed": self._events_processed,
             "events_failed": self._events_failed
         })
@@ -271,44 +416,58 @@ class OrderEventBus:
         # Signal stop
         self._stop_event.set()
         
-        # Wait for thread to finish
-        if self._thread:
-            self._thread.join(timeout=timeout)
+        # Wait for threads to finish (shared deadline)
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
             
-            if self._thread.is_alive():
+            if t.is_alive():
                 self.logger.warning(
                     "Event bus thread did not stop cleanly",
-                    extra={"timeout": timeout}
+                    extra={"timeout": timeout, "thread": t.name}
                 )
         
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            self._monitor_thread = None
+        if self._instr is not None:
+            self._instr.maybe_log(force=True)
+        
         self._running = False
         
         self.logger.info("OrderEventBus stopped", extra={
             "events_processed": self._events_processed,
             "events_failed": self._events_failed,
-            "queue_remaining": self._queue.qsize()
+            "queue_remaining": self._queue_size()
         })
     
-    def _process_events(self):
+    def _process_events(
+        self,
+        q: Optional[queue.Queue] = None,
+        handlers: Optional[Dict[Type[Event], List[Callable]]] = None,
+        lane: str = LANE_DEFAULT,
+    ):
         """
-        Event processing loop (runs in dedicated thread).
+        Event processing loop (runs in dedicated thread, one per lane).
         
         Processes events FIFO until stop signal received.
         """
-        self.logger.info("Event processing thread started")
+        q = self._queue if q is None else q
+        handlers = self._handlers if handlers is None else handlers
+        self.logger.info("Event processing thread started", extra={"lane": lane})
         
         while not self._stop_event.is_set():
             try:
                 # Get event with timeout (allows checking stop_event)
-                event = self._queue.get(block=True, timeout=0.1)
+                event = self._unwrap(q.get(block=True, timeout=0.1))
                 
                 # Process event
-                self._dispatch_event(event)
+                self._dispatch_event(event, handlers)
                 
                 # Mark task done
-                self._queue.task_done()
+                q.task_done()
                 
-                self._events_processed += 1
+                self._count_processed(lane)
                 
             except queue.Empty:
                 # No events, continue loop
@@ -320,26 +479,60 @@ class OrderEventBus:
                     extra={"error": str(e)},
                     exc_info=True
                 )
-                self._events_failed += 1
+                with self._stats_lock:
+                    self._events_failed += 1
         
         # Drain remaining events
         self.logger.info("Draining remaining events...", extra={
-            "remaining": self._queue.qsize()
+            "remaining": q.qsize(),
+            "lane": lane,
         })
         
         drained = 0
         while True:
             try:
-                event = self._queue.get(block=False)
-                self._dispatch_event(event)
-                self._queue.task_done()
+                event = self._unwrap(q.get(block=False))
+                self._dispatch_event(event, handlers)
+                q.task_done()
+                self._count_processed(lane)
                 drained += 1
             except queue.Empty:
                 break
         
         self.logger.info(f"Event processing thread stopped (drained {drained} events)")
     
-    def _dispatch_event(self, event: Event):
+    def _unwrap(self, item: Any) -> Event:
+        if isinstance(item, _Queued):
+            if self._instr is not None:
+                self._instr.on_dequeue(type(item.event).__name__, item.enqueued_at)
+            return item.event
+        return item
+    
+    def _monitor_loop(self) -> None:
+        """Slow-handler stack capture + periodic telemetry log."""
+        instr = self._instr
+        if instr is None:
+            return
+        interval = min(0.5, max(0.01, instr.slow_handler_ms / 2000.0))
+        while not self._stop_event.wait(interval):
+            try:
+                instr.check_slow_handlers()
+                instr.maybe_log()
+            except Exception:
+                self.logger.debug("Event bus monitor error", exc_info=True)
+    
+    def _count_processed(self, lane: str) -> None:
+        with self._stats_lock:
+            if lane == LANE_LOW_PRIORITY:
+                self._low_priority_processed += 1
+            else:
+                self._events_processed += 1
+    
+    def _dispatch_event(
+        self,
+        event: Event,
+        handlers_by_type: Optional[Dict[Type[Event], List[Callable]]] = None,
+    ):
         """
         Dispatch event to registered handlers.
         
@@ -349,7 +542,8 @@ class OrderEventBus:
             event: Event to dispatch
         """
         event_type = type(event)
-        handlers = self._handlers.get(event_type, [])
+        registry = self._handlers if handlers_by_type is None else handlers_by_type
+        handlers = registry.get(event_type, [])
         
         if not handlers:
             self.logger.debug(f"No handlers for {event_type.__name__}", extra={
@@ -358,7 +552,11 @@ class OrderEventBus:
             return
         
         # Call each handler
+        instr = self._instr
+        type_name = event_type.__name__
         for handler in handlers:
+            handler_name = getattr(handler, "__qualname__", None) or getattr(handler, "__name__", repr(handler))
+            started = instr.handler_started(handler_name, type_name) if instr is not None else 0.0
             try:
                 handler(event)
                 
@@ -368,12 +566,19 @@ class OrderEventBus:
                     f"Handler failed for {event_type.__name__}",
                     extra={
                         "event_type": event_type.__name__,
-                        "handler": handler.__name__,
+                        "handler": getattr(handler, "__name__", repr(handler)),
                         "error": str(e)
                     },
                     exc_info=True
                 )
-                self._events_failed += 1
+                with self._stats_lock:
+                    self._events_failed += 1
+            finally:
+                if instr is not None:
+                    instr.handler_finished(handler_name, type_name, started)
+    
+    def _queue_size(self) -> int:
+        return sum(q.qsize() for q in self._queues)
     
     def __del__(self):
         """Best-effort cleanup if user forgot to call stop()."""
@@ -394,9 +599,14 @@ class OrderEventBus:
             "events_processed": self._events_processed,
             "events_failed": self._events_failed,
             "events_dropped": self._events_dropped,
-            "queue_size": self._queue.qsize(),
+            "queue_size": self._queue_size(),
             "running": self._running,
             "registered_event_types": len(self._handlers),
+            "partitions": self._partitions,
+            "partition_queue_sizes": [q.qsize() for q in self._queues],
+            "low_priority_processed": self._low_priority_processed,
+            "low_priority_queue_size": self._low_queue.qsize(),
+            "instrumentation": self._instr.snapshot() if self._instr is not None else None,
         }
     
     def __enter__(self):
@@ -348,7 +348,8 @@ class EventHandlerRegistry:
         logger.critical(
             f"[KILL_SWITCH] Activated: {event.reason} "
             f"(positions closed: {event.all_positions_closed}, "
-            f"orders cancelled: {event.all_orders_cancelled})"
+            f"orders cancelled: {event.all_orders_cancelled}, "
+            f"time to flat: {getattr(event, 'time_to_flat_s', None)})"
         )
         
         self.transaction_log.append({
@@ -357,5 +358,6 @@ class EventHandlerRegistry:
             'reason': event.reason,
             'trigger_source': event.trigger_source,
             'all_positions_closed': event.all_positions_closed,
-            'all_orders_cancelled': event.all_orders_cancelled
+            'all_orders_cancelled': event.all_orders_cancelled,
+            'time_to_flat_s': getattr(event, 'time_to_flat_s', None)
         })
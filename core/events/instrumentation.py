@@ -0,0 +1,269 @@
+"""
+Event bus instrumentation: queue wait, handler latency, depth and drops.
+
+PROBLEM:
+    OrderEventBus only counted processed/failed/dropped events, so a
+    fill-to-position latency spike could not be attributed to either
+    backpressure (events waiting in the queue) or a misbehaving handler.
+
+DESIGN:
+    - LatencyHistogram: fixed log-spaced millisecond buckets (cheap to
+      update, bounded memory) with count/mean/max and bucket-estimated
+      percentiles.
+    - BusInstrumentation records, per event type, the time between emit()
+      and dispatch (queue wait) and, per handler, execution latency.
+      Queue depth high-water marks and drops are tracked per lane.
+    - Slow-handler detector: handlers currently executing are registered by
+      thread. check_slow_handlers() (driven by the bus monitor thread)
+      captures the live stack of any handler that has been running longer
+      than slow_handler_ms, so the report shows WHERE it is stuck, not just
+      that it was slow.
+    - snapshot() returns a plain dict (exposed through bus.get_stats());
+      maybe_log() periodically writes it to the performance log stream.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from core.logging import LogStream, get_logger
+
+
+# Upper bounds (ms); the last bucket is open-ended.
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; caller locks)."""
+
+    __slots__ = ("bounds", "counts", "count", "total_ms", "max_ms")
+
+    def __init__(self, bounds_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.bounds = tuple(float(b) for b in bounds_ms)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        idx = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value_ms <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-quantile (max for the open bucket)."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                (f"le_{b:g}" if i < len(self.bounds) else "gt_max"): c
+                for i, (b, c) in enumerate(zip(self.bounds + (float("inf"),), self.counts))
+                if c
+            },
+        }
+
+
+class _InFlight:
+    __slots__ = ("handler", "event_type", "started", "captured")
+
+    def __init__(self, handler: str, event_type: str, started: float) -> None:
+        self.handler = handler
+        self.event_type = event_type
+        self.started = started
+        self.captured = False
+
+
+class BusInstrumentation:
+    """
+    Collects event bus latency / depth / drop telemetry.
+
+    All methods are thread-safe; the hot-path ones take one short lock.
+    """
+
+    def __init__(
+        self,
+        *,
+        slow_handler_ms: float = 250.0,
+        log_interval_s: float = 60.0,
+        max_slow_reports: int = 50,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Args:
+            slow_handler_ms: Handler runtime that counts as slow
+            log_interval_s: Min seconds between performance-log snapshots
+            max_slow_reports: Slow-handler reports kept (newest win)
+            clock: Injectable high-resolution clock (tests)
+        """
+        self.logger = get_logger(LogStream.PERFORMANCE)
+        self.slow_handler_ms = float(slow_handler_ms)
+        self.log_interval_s = float(log_interval_s)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._queue_wait: Dict[str, LatencyHistogram] = {}
+        self._handler_latency: Dict[str, LatencyHistogram] = {}
+        self._high_water: Dict[str, int] = {}
+        self._drops: Dict[str, int] = {}
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._slow: Deque[Dict] = deque(maxlen=max_slow_reports)
+        self._slow_count = 0
+        self._last_log = clock()
+
+    def now(self) -> float:
+        return self._clock()
+
+    # ========================================================================
+    # HOT PATH
+    # ========================================================================
+
+    def on_enqueue(self, lane: str, depth: int) -> None:
+        with self._lock:
+            if depth > self._high_water.get(lane, 0):
+                self._high_water[lane] = depth
+
+    def on_drop(self, event_type: str) -> None:
+        with self._lock:
+            self._drops[event_type] = self._drops.get(event_type, 0) + 1
+
+    def on_dequeue(self, event_type: str, enqueued_at: Optional[float]) -> None:
+        if enqueued_at is None:
+            return
+        wait_ms = (self._clock() - enqueued_at) * 1000.0
+        with self._lock:
+            hist = self._queue_wait.get(event_type)
+            if hist is None:
+                hist = self._queue_wait[event_type] = LatencyHistogram()
+            hist.record(wait_ms)
+
+    def handler_started(self, handler: str, event_type: str) -> float:
+        started = self._clock()
+        with self._lock:
+            self._in_flight[threading.get_ident()] = _InFlight(handler, event_type, started)
+        return started
+
+    def handler_finished(self, handler: str, event_type: str, started: float) -> None:
+        elapsed_ms = (self._clock() - started) * 1000.0
+        with self._lock:
+            entry = self._in_flight.pop(threading.get_ident(), None)
+            self._record_handler_locked(handler, event_type, elapsed_ms, entry)
+
+    def record_handler_latency(self, handler: str, event_type: str, elapsed_ms: float) -> None:
+        """Record a handler run measured by the caller (no in-flight tracking)."""
+        with self._lock:
+            self._record_handler_locked(handler, event_type, elapsed_ms, None)
+
+    def _record_handler_locked(
+        self, handler: str, event_type: str, elapsed_ms: float, entry: Optional[_InFlight]
+    ) -> None:
+        hist = self._handler_latency.get(handler)
+        if hist is None:
+            hist = self._handler_latency[handler] = LatencyHistogram()
+        hist.record(elapsed_ms)
+        if elapsed_ms >= self.slow_handler_ms:
+            self._slow_count += 1
+            if entry is None or not entry.captured:
+                # Finished before the monitor could sample it: no stack.
+                self._slow.append({
+                    "handler": handler,
+                    "event_type": event_type,
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "stack": None,
+                })
+
+    # ========================================================================
+    # SLOW HANDLER DETECTION
+    # ========================================================================
+
+    def check_slow_handlers(self) -> List[Dict]:
+        """
+        Capture the live stack of every handler running past the threshold.
+
+        Each in-flight invocation is captured at most once.
+        """
+        now = self._clock()
+        with self._lock:
+            candidates = [
+                (tid, e) for tid, e in self._in_flight.items()
+                if not e.captured and (now - e.started) * 1000.0 >= self.slow_handler_ms
+            ]
+            for _, e in candidates:
+                e.captured = True
+        if not candidates:
+            return []
+
+        frames = sys._current_frames()
+        reports = []
+        for tid, e in candidates:
+            frame = frames.get(tid)
+            report = {
+                "handler": e.handler,
+                "event_type": e.event_type,
+                "elapsed_ms": round((now - e.started) * 1000.0, 3),
+                "thread_id": tid,
+                "stack": "".join(traceback.format_stack(frame)) if frame is not None else None,
+            }
+            reports.append(report)
+            self.logger.warning(
+                "Slow event handler detected",
+                extra=dict(report),
+            )
+        with self._lock:
+            self._slow.extend(reports)
+        return reports
+
+    # ========================================================================
+    # REPORTING
+    # ========================================================================
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "queue_wait_ms": {k: h.to_dict() for k, h in self._queue_wait.items()},
+                "handler_latency_ms": {k: h.to_dict() for k, h in self._handler_latency.items()},
+                "queue_high_water": dict(self._high_water),
+                "dropped_by_type": dict(self._drops),
+                "slow_handler_count": self._slow_count,
+                "slow_handlers": list(self._slow),
+                "handlers_in_flight": len(self._in_flight),
+            }
+
+    def maybe_log(self, force: bool = False) -> bool:
+        """Write a snapshot to the performance stream if the interval elapsed."""
+        now = self._clock()
+        if not force and (now - self._last_log) < self.log_interval_s:
+            return False
+        self._last_log = now
+        snap = self.snapshot()
+        snap.pop("slow_handlers", None)  # stacks are logged when captured
+        self.logger.info("Event bus telemetry", extra={"event_bus": snap})
+        return True
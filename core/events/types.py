@@ -173,6 +173,7 @@ class KillSwitchActivatedEvent:
     all_positions_closed: bool
     all_orders_cancelled: bool
     timestamp: datetime = field(default_factory=now_utc)
+    time_to_flat_s: Optional[float] = None  # PATCH 31: trigger -> last liquidation fill
 
 
 # ============================================================================
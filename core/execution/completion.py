@@ -0,0 +1,222 @@
+"""
+Event-driven order completion.
+
+PROBLEM:
+    OrderExecutionEngine.wait_for_order polled broker.get_order_status every
+    poll_interval for up to 60s: one REST call per second per working order,
+    and up to a full second of latency after the fill.
+
+DESIGN:
+    - OrderCompletionTracker holds one waiter per order being waited on.
+    - Status news from any source resolves the waiter immediately:
+        * on_trade_update(update)  - UserStreamTracker trade_updates
+        * on_state_changed(event)  - OrderStateMachine transitions via the bus
+        * notify(...)              - anything else (batched status refresher)
+    - A waiter carries the latest CompletionHint (status + cumulative fill
+      info); wait_for_order applies it through the normal status-change path,
+      so positions/journal/OCO handling are identical to the polling path.
+    - Polling remains as a fallback, so orders still complete when no stream
+      is connected. It only backs off exponentially while a push source is
+      attached (attach_source); otherwise nothing else would deliver the
+      news and polls keep their fixed interval.
+
+Thread-safe: stream handlers (event loop), bus threads and the runtime
+thread all touch the tracker.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from core.brokers.alpaca_connector import map_alpaca_status
+from core.logging import LogStream, get_logger
+from core.state import OrderStatus
+
+logger = get_logger(LogStream.ORDERS)
+
+
+@dataclass(frozen=True)
+class CompletionHint:
+    """Latest known broker status for a waited-on order."""
+    status: OrderStatus
+    fill_info: Optional[Dict[str, Any]] = None
+    broker_order_id: Optional[str] = None
+    source: str = "unknown"
+
+
+class _Waiter:
+    __slots__ = ("internal_order_id", "broker_order_id", "_event", "_hint", "_lock")
+
+    def __init__(self, internal_order_id: str, broker_order_id: Optional[str]) -> None:
+        self.internal_order_id = internal_order_id
+        self.broker_order_id = broker_order_id
+        self._event = threading.Event()
+        self._hint: Optional[CompletionHint] = None
+        self._lock = threading.Lock()
+
+    def offer(self, hint: CompletionHint) -> None:
+        with self._lock:
+            self._hint = hint
+            self._event.set()
+
+    def wait(self, timeout: Optional[float]) -> Optional[CompletionHint]:
+        """Block up to *timeout* for news; returns (and consumes) the latest hint."""
+        if not self._event.wait(timeout):
+            return None
+        with self._lock:
+            hint, self._hint = self._hint, None
+            self._event.clear()
+            return hint
+
+
+class OrderCompletionTracker:
+    """
+    Resolves order waits from push notifications instead of polling.
+
+    Usage:
+        tracker = OrderCompletionTracker()
+        user_stream.on_trade_update(tracker.on_trade_update)
+        event_bus.subscribe(OrderStateChangedEvent, tracker.on_state_changed)
+
+        waiter = tracker.register(internal_id, broker_id)
+        hint = waiter.wait(timeout=2.0)   # returns the moment news arrives
+        tracker.unregister(internal_id)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, _Waiter] = {}
+        self._by_broker_id: Dict[str, str] = {}
+        self._by_client_id: Dict[str, str] = {}
+        self._notifications = 0
+        self._resolved = 0
+        self._push_sources: set = set()
+
+    def register(
+        self,
+        internal_order_id: str,
+        broker_order_id: Optional[str] = None,
+        client_order_id: Optional[str] = None,
+    ) -> _Waiter:
+        with self._lock:
+            waiter = _Waiter(internal_order_id, broker_order_id)
+            self._waiters[internal_order_id] = waiter
+            if broker_order_id:
+                self._by_broker_id[str(broker_order_id)] = internal_order_id
+            if client_order_id:
+                self._by_client_id[str(client_order_id)] = internal_order_id
+            return waiter
+
+    def unregister(self, internal_order_id: str) -> None:
+        with self._lock:
+            waiter = self._waiters.pop(internal_order_id, None)
+            if waiter is not None and waiter.broker_order_id:
+                self._by_broker_id.pop(str(waiter.broker_order_id), None)
+            for cid, iid in list(self._by_client_id.items()):
+                if iid == internal_order_id:
+                    del self._by_client_id[cid]
+
+    def notify(
+        self,
+        *,
+        status: OrderStatus,
+        internal_order_id: Optional[str] = None,
+        broker_order_id: Optional[str] = None,
+        client_order_id: Optional[str] = None,
+        fill_info: Optional[Dict[str, Any]] = None,
+        source: str = "unknown",
+    ) -> bool:
+        """Deliver status news; returns True if a waiter was woken."""
+        with self._lock:
+            self._notifications += 1
+            iid = internal_order_id
+            if iid is None and broker_order_id:
+                iid = self._by_broker_id.get(str(broker_order_id))
+            if iid is None and client_order_id:
+                iid = self._by_client_id.get(str(client_order_id)) or (
+                    client_order_id if client_order_id in self._waiters else None
+                )
+            waiter = self._waiters.get(iid) if iid is not None else None
+            if waiter is None:
+                return False
+            self._resolved += 1
+        waiter.offer(CompletionHint(
+            status=status,
+            fill_info=fill_info,
+            broker_order_id=broker_order_id or waiter.broker_order_id,
+            source=source,
+        ))
+        return True
+
+    # ========================================================================
+    # SOURCES
+    # ========================================================================
+
+    def attach_source(self, name: str) -> None:
+        """Mark a live push source (e.g. the user stream once connected)."""
+        with self._lock:
+            self._push_sources.add(name)
+
+    def detach_source(self, name: str) -> None:
+        with self._lock:
+            self._push_sources.discard(name)
+
+    def has_push_source(self) -> bool:
+        with self._lock:
+            return bool(self._push_sources)
+
+    def on_trade_update(self, update: Optional[dict]) -> bool:
+        """UserStreamTracker trade_updates handler (Alpaca payload)."""
+        order = (update or {}).get("order") or {}
+        status_raw = order.get("status") or (update or {}).get("event")
+        if not status_raw:
+            return False
+        fill_info = None
+        filled_qty = order.get("filled_qty")
+        try:
+            if filled_qty is not None and Decimal(str(filled_qty)) > 0:
+                avg = order.get("filled_avg_price")
+                fill_info = {
+                    "filled_qty": Decimal(str(filled_qty)),
+                    "filled_avg_price": Decimal(str(avg)) if avg else None,
+                    "filled_at": order.get("filled_at"),
+                }
+        except Exception:
+            fill_info = None
+        return self.notify(
+            status=map_alpaca_status(status_raw),
+            broker_order_id=order.get("id"),
+            client_order_id=order.get("client_order_id"),
+            fill_info=fill_info,
+            source="user_stream",
+        )
+
+    def on_state_changed(self, event: Any) -> bool:
+        """Event bus handler for OrderStateChangedEvent."""
+        to_state = getattr(event, "to_state", None)
+        if not isinstance(to_state, OrderStatus):
+            return False
+        fill_info = None
+        if getattr(event, "filled_qty", None):
+            fill_info = {
+                "filled_qty": event.filled_qty,
+                "filled_avg_price": getattr(event, "fill_price", None),
+            }
+        return self.notify(
+            status=to_state,
+            internal_order_id=getattr(event, "order_id", None),
+            broker_order_id=getattr(event, "broker_order_id", None),
+            fill_info=fill_info,
+            source="state_machine",
+        )
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "waiting": len(self._waiters),
+                "notifications": self._notifications,
+                "resolved": self._resolved,
+            }
@@ -0,0 +1,326 @@
+"""
+Emergency mass-cancel and flatten-all.
+
+PROBLEM:
+    A kill switch or daily-loss breach had to cancel every working order and
+    flatten every position with serial OrderExecutionEngine.cancel_order /
+    submit calls, each with its own retries. Time-to-flat grew linearly with
+    the number of orders and positions.
+
+DESIGN:
+    - Bulk path (broker.supports_bulk_close): ONE close_all_positions(
+      cancel_orders=True) request; the broker cancels open orders and places
+      the liquidations. The liquidation orders are adopted into the engine
+      (register_external_order) so their fills update positions/journal.
+    - Fallback path: cancels fired concurrently, then one market order per
+      broker position fired concurrently (serial when the broker is not
+      safe to call from several threads).
+    - Every REST call goes through the throttler budget (execute_sync).
+    - Completion is confirmed through engine.wait_for_order(), which resolves
+      from the user stream / event bus and only polls as a fallback.
+    - FlattenReport carries time-to-flat (monotonic seconds from trigger to
+      the last confirmed liquidation fill); it is logged and published as a
+      KillSwitchActivatedEvent.
+
+Only one flatten runs at a time; a concurrent trigger returns None.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.brokers.alpaca_connector import BrokerOrderSide
+from core.events.types import KillSwitchActivatedEvent
+from core.logging import LogStream, get_logger
+from core.state import OrderStatus
+
+EMERGENCY_STRATEGY = "emergency_flatten"
+
+
+@dataclass
+class FlattenReport:
+    """Outcome of one emergency flatten."""
+    reason: str
+    trigger_source: str
+    used_bulk: bool = False
+    orders_to_cancel: int = 0
+    cancels_confirmed: int = 0
+    positions_to_close: int = 0
+    liquidations_submitted: int = 0
+    liquidations_filled: int = 0
+    time_to_cancel_s: Optional[float] = None
+    time_to_flat_s: Optional[float] = None
+    flat: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class EmergencyFlattener:
+    """
+    Cancels all working orders and liquidates all positions, concurrently.
+
+    Usage:
+        flattener = EmergencyFlattener(broker, exec_engine, throttler=throttler,
+                                       notify=event_handlers.handle_event)
+        report = flattener.flatten_all("daily loss limit", trigger_source="risk")
+        report.time_to_flat_s
+    """
+
+    def __init__(
+        self,
+        broker: Any,
+        engine: Any,
+        *,
+        throttler: Any = None,
+        limit_id: str = "alpaca_orders",
+        notify: Optional[Callable[[KillSwitchActivatedEvent], None]] = None,
+        max_workers: int = 16,
+        timeout_s: float = 30.0,
+        poll_interval_s: float = 0.5,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            broker: Connector (bulk endpoints used when supports_bulk_close)
+            engine: OrderExecutionEngine (cancel/submit/wait/working orders)
+            throttler: Optional core.net Throttler; every REST call uses it
+            limit_id: Throttler bucket for emergency calls
+            notify: Receives the KillSwitchActivatedEvent (e.g. handler registry)
+            max_workers: Upper bound on concurrent in-flight calls
+            timeout_s: Budget for confirmations (cancel + fills)
+            poll_interval_s: Fallback polling start interval while confirming
+            monotonic: Injectable clock (tests)
+        """
+        self.logger = get_logger(LogStream.ORDERS)
+        self.broker = broker
+        self.engine = engine
+        self.throttler = throttler
+        self.limit_id = limit_id
+        self.notify = notify
+        self.max_workers = max(1, int(max_workers))
+        self.timeout_s = float(timeout_s)
+        self.poll_interval_s = float(poll_interval_s)
+        self._monotonic = monotonic
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._last_report: Optional[FlattenReport] = None
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def flatten_all(self, reason: str, trigger_source: str = "manual") -> Optional[FlattenReport]:
+        """Cancel everything, liquidate everything, confirm, report time-to-flat."""
+        if not self._lock.acquire(blocking=False):
+            self.logger.warning("Emergency flatten already in progress; ignoring trigger",
+                                extra={"reason": reason, "trigger_source": trigger_source})
+            return None
+        try:
+            t0 = self._monotonic()
+            report = FlattenReport(reason=reason, trigger_source=trigger_source)
+            self.logger.critical("EMERGENCY FLATTEN: %s (source=%s)", reason, trigger_source)
+
+            working = list(self.engine.get_working_orders())
+            report.orders_to_cancel = len(working)
+
+            liquidations: Optional[List[Tuple[str, str]]] = None
+            if getattr(self.broker, "supports_bulk_close", False) is True:
+                liquidations = self._bulk_close(report, reason)
+            if liquidations is None:
+                liquidations = self._cancel_then_liquidate(report, working, reason, t0)
+                cancel_waits: List[Tuple[str, str]] = []
+            else:
+                cancel_waits = [(w.internal_order_id, w.broker_order_id) for w in working if w.broker_order_id]
+
+            self._confirm(report, cancel_waits, liquidations, t0)
+            self._finish(report)
+            return report
+        finally:
+            self._lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        last = self._last_report
+        return {
+            "runs": self._runs,
+            "last_time_to_flat_s": last.time_to_flat_s if last else None,
+            "last_flat": last.flat if last else None,
+        }
+
+    # ========================================================================
+    # PATHS
+    # ========================================================================
+
+    def _bulk_close(self, report: FlattenReport, reason: str) -> Optional[List[Tuple[str, str]]]:
+        """One close-all request; adopt the liquidation orders. None -> use fallback."""
+        try:
+            infos = self._call(lambda: self.broker.close_all_positions(cancel_orders=True))
+        except Exception:
+            self.logger.error("Bulk close-all failed; falling back to per-order flatten", exc_info=True)
+            return None
+
+        report.used_bulk = True
+        report.positions_to_close = len(infos)
+        liquidations: List[Tuple[str, str]] = []
+        for info in infos:
+            if info.get("error") or not info.get("broker_order_id"):
+                report.errors.append(f"{info.get('symbol')}: {info.get('error')}")
+                continue
+            internal_id = self._flat_id(info["symbol"])
+            try:
+                self.engine.register_external_order(
+                    internal_order_id=internal_id,
+                    broker_order_id=info["broker_order_id"],
+                    symbol=info["symbol"],
+                    quantity=info["qty"],
+                    side=BrokerOrderSide.BUY if info.get("side") == "BUY" else BrokerOrderSide.SELL,
+                    strategy=EMERGENCY_STRATEGY,
+                    reason={"source": "close_all_positions", "reason": reason},
+                )
+            except Exception as e:
+                report.errors.append(f"{info['symbol']}: adopt failed: {e}")
+            liquidations.append((internal_id, info["broker_order_id"]))
+        report.liquidations_submitted = len(liquidations)
+        return liquidations
+
+    def _cancel_then_liquidate(
+        self, report: FlattenReport, working: Sequence[Any], reason: str, t0: float,
+    ) -> List[Tuple[str, str]]:
+        """Concurrent cancels, then concurrent market liquidations."""
+        cancel_reason = f"emergency_flatten:{reason}"
+        results = self._map(
+            lambda w: self._call(lambda: self.engine.cancel_order(
+                internal_order_id=w.internal_order_id,
+                broker_order_id=w.broker_order_id,
+                reason=cancel_reason,
+            )),
+            [w for w in working if w.broker_order_id],
+            mutating=True,
+        )
+        report.cancels_confirmed = sum(1 for r in results if r is True)
+        report.time_to_cancel_s = self._monotonic() - t0
+
+        positions = self._positions(report)
+        report.positions_to_close = len(positions)
+
+        def _liquidate(pos) -> Optional[Tuple[str, str]]:
+            qty = Decimal(str(pos.quantity))
+            internal_id = self._flat_id(pos.symbol)
+            broker_id = self._call(lambda: self.engine.submit_market_order(
+                internal_order_id=internal_id,
+                symbol=pos.symbol,
+                quantity=abs(qty),
+                side=BrokerOrderSide.SELL if qty > 0 else BrokerOrderSide.BUY,
+                strategy=EMERGENCY_STRATEGY,
+            ))
+            return internal_id, broker_id
+
+        liquidations: List[Tuple[str, str]] = []
+        for pos, result in zip(positions, self._map(_liquidate, positions, mutating=True)):
+            if isinstance(result, BaseException) or result is None:
+                report.errors.append(f"{pos.symbol}: liquidation failed: {result}")
+            else:
+                liquidations.append(result)
+        report.liquidations_submitted = len(liquidations)
+        return liquidations
+
+    def _confirm(
+        self,
+        report: FlattenReport,
+        cancel_waits: List[Tuple[str, str]],
+        liquidations: List[Tuple[str, str]],
+        t0: float,
+    ) -> None:
+        """Wait (stream-driven, polling fallback) for cancels and fills, concurrently."""
+        remaining = max(0.0, self.timeout_s - (self._monotonic() - t0))
+
+        def _wait(pair: Tuple[str, str]) -> OrderStatus:
+            return self.engine.wait_for_order(
+                pair[0], pair[1], timeout_seconds=remaining, poll_interval=self.poll_interval_s,
+            )
+
+        states = self._map(_wait, list(cancel_waits) + list(liquidations), mutating=False)
+        cancel_states, fill_states = states[:len(cancel_waits)], states[len(cancel_waits):]
+        if cancel_waits:
+            report.cancels_confirmed = sum(
+                1 for s in cancel_states if s in (OrderStatus.CANCELLED, OrderStatus.FILLED, OrderStatus.EXPIRED)
+            )
+            report.time_to_cancel_s = self._monotonic() - t0
+        report.liquidations_filled = sum(1 for s in fill_states if s == OrderStatus.FILLED)
+
+        report.flat = (
+            not report.errors
+            and report.liquidations_filled == report.positions_to_close
+            and report.cancels_confirmed >= report.orders_to_cancel
+        )
+        if report.flat:
+            report.time_to_flat_s = self._monotonic() - t0
+
+    def _finish(self, report: FlattenReport) -> None:
+        self._runs += 1
+        self._last_report = report
+        log = self.logger.critical if not report.flat else self.logger.warning
+        log("EMERGENCY FLATTEN %s: time_to_flat=%s", "COMPLETE" if report.flat else "INCOMPLETE",
+            f"{report.time_to_flat_s:.3f}s" if report.time_to_flat_s is not None else "n/a",
+            extra=report.to_dict())
+        if self.notify is not None:
+            try:
+                self.notify(KillSwitchActivatedEvent(
+                    reason=report.reason,
+                    trigger_source=report.trigger_source,
+                    all_positions_closed=report.liquidations_filled == report.positions_to_close and not report.errors,
+                    all_orders_cancelled=report.cancels_confirmed >= report.orders_to_cancel,
+                    time_to_flat_s=report.time_to_flat_s,
+                ))
+            except Exception:
+                self.logger.warning("Kill switch notification failed", exc_info=True)
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def _positions(self, report: FlattenReport) -> List[Any]:
+        """Broker positions are authoritative; local store if the broker call fails."""
+        try:
+            positions = self._call(self.broker.get_positions)
+        except Exception as e:
+            report.errors.append(f"get_positions: {e}")
+            positions = self.engine.position_store.get_all()
+        return [p for p in positions if Decimal(str(p.quantity)) != 0]
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        # A connector holding the same throttler already spends per request.
+        if self.throttler is None or getattr(self.broker, "throttler", None) is self.throttler:
+            return fn()
+        return self.throttler.execute_sync(self.limit_id, fn)
+
+    def _map(self, fn: Callable[[Any], Any], items: Sequence[Any], *, mutating: bool) -> List[Any]:
+        """Run fn over items concurrently; exceptions are returned in place."""
+        items = list(items)
+        if not items:
+            return []
+        workers = min(self.max_workers, len(items))
+        if mutating and getattr(self.broker, "supports_concurrent_requests", False) is not True:
+            workers = 1
+        if workers == 1:
+            return [_capture(fn, item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flatten") as pool:
+            return list(pool.map(lambda item: _capture(fn, item), items))
+
+    @staticmethod
+    def _flat_id(symbol: str) -> str:
+        return f"FLAT-{symbol}-{uuid.uuid4().hex[:8]}"
+
+
+def _capture(fn: Callable[[Any], Any], item: Any) -> Any:
+    try:
+        return fn(item)
+    except Exception as e:
+        return e
@@ -3,7 +3,8 @@ Order execution engine - bridges state machine and broker.
 
 CRITICAL PROPERTIES:
 1. Synchronous order submission
-2. Status polling with timeout
+2. Order completion: push-driven (user stream / event bus) with
+   exponentially spaced status polling as fallback
 3. State machine integration
 4. Position store updates on fill
 5. Order ID mapping (internal <-> broker)
@@ -15,22 +16,36 @@ PATCH 1 (2026-02-14):
 - Deterministic protective internal IDs: "{entry_id}::SL" and "{entry_id}::TP".
 - Ensure limit/stop submissions also populate _internal_to_broker_id and are idempotent.
 
+PATCH 29:
+- Native bracket path: when the broker supports it, a BUY entry with both
+  stop_loss and take_profit goes out as ONE bracket request (no unprotected
+  window between entry fill and protective submits). Legs reuse the
+  "{entry_id}::SL" / "{entry_id}::TP" ids. Synthetic path is the fallback.
+
+PATCH 30:
+- With a broker that declares supports_concurrent_requests (pooled async
+  connector), synthetic SL/TP legs are submitted and cancelled concurrently.
+
 Based on LEAN's OrderTicket pattern.
 """
 
 from __future__ import annotations
 
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 
 from core.brokers.alpaca_connector import (
     AlpacaBrokerConnector,
+    BracketOrderIds,
     BrokerOrderError,
     BrokerOrderSide,
 )
+from core.execution.completion import CompletionHint, OrderCompletionTracker
 from core.journal.trade_journal import TradeIds, TradeJournal, build_trade_event
 from core.logging import LogContext, LogStream, get_logger
 from core.market.symbol_properties import SymbolPropertiesCache
@@ -39,7 +54,9 @@ from core.state import (
     OrderStatus,
     Position,
     PositionStore,
+    TransactionLog,
 )
+from core.state.log_checkpoint import OrderLogReducer
 from core.state.order_tracker import (
     FillEvent,
     InFlightOrder,
@@ -51,6 +68,15 @@ from core.state.order_tracker import (
 # ============================================================================
 
 
+class WorkingOrder(NamedTuple):
+    """A submitted, not-yet-terminal order as seen by the engine."""
+    internal_order_id: str
+    broker_order_id: str
+    state: OrderStatus
+    submitted_at: Optional[datetime]
+
+
+
 class OrderExecutionEngine:
     """
     Order execution engine.
@@ -79,6 +105,7 @@ class OrderExecutionEngine:
         symbol_properties: Optional[SymbolPropertiesCache] = None,
         order_tracker: Optional[OrderTracker] = None,
         transaction_log=None,  # optional TransactionLog for crash-restart seeding
+        completions: Optional[OrderCompletionTracker] = None,
     ):
         self.broker = broker
         self.state_machine = state_machine
@@ -104,6 +131,22 @@ class OrderExecutionEngine:
         # PATCH 3: Track cumulative filled quantity for partial fills
         self._cumulative_filled_qty: Dict[str, Decimal] = {}
 
+        # Last status this engine applied to each submitted, non-terminal order
+        # (batched status refresh works from this set).
+        self._working_states: Dict[str, OrderStatus] = {}
+
+        # Push-driven order completion (fed by user stream / event bus)
+        self.completions = completions or OrderCompletionTracker()
+
+        # PATCH 30: worker pool for concurrent leg submits / cancels. Built
+        # here (workers start on first submit) and shut down by close().
+        self._leg_pool: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="engine-legs"
+        )
+
+        # PATCH 29: native bracket submission (broker must also declare support)
+        self._native_brackets = os.getenv("MQD_NATIVE_BRACKETS", "1").strip().lower() in ("1", "true", "yes")
+
         # Seed duplicate-order guard from persistent transaction log after restart.
         if transaction_log is not None:
             self._seed_submitted_ids_from_log(transaction_log)
@@ -118,12 +161,12 @@ class OrderExecutionEngine:
         """Replay ORDER_SUBMIT events from the transaction log to rebuild
         the in-memory duplicate-order guard after a restart."""
         try:
-            for event in transaction_log.iter_events():
-                et = event.get("event_type") or event.get("event")
-                if str(et).upper() == "ORDER_SUBMIT":
-                    oid = event.get("internal_order_id")
-                    if oid:
-                        self._submitted_order_ids.add(oid)
+            # PATCH 37: segmented logs resume from the latest checkpoint.
+            if isinstance(transaction_log, TransactionLog):
+                state, events = transaction_log.replay_from_checkpoint()
+            else:
+                state, events = None, transaction_log.iter_events()
+            self._submitted_order_ids |= OrderLogReducer.from_snapshot(state).apply_all(events).submitted_ids
             if self._submitted_order_ids:
                 self.logger.info(
                     "Seeded %d submitted order IDs from transaction log",
@@ -193,6 +236,14 @@ class OrderExecutionEngine:
         if not sib_internal:
             return
 
+        if meta.get("native_bracket"):
+            # PATCH 29: broker-side OCO already cancels the sibling.
+            self.logger.info(
+                "OCO: native bracket leg filled; broker cancels sibling",
+                extra={"filled_internal": internal_order_id, "sibling_internal": sib_internal},
+            )
+            return
+
         sib_broker = self._internal_to_broker_id.get(sib_internal)
         if not sib_broker:
             # best effort: might not be submitted yet or mapping lost
@@ -221,6 +272,7 @@ class OrderExecutionEngine:
         strategy: str,
         stop_loss: Optional[Decimal],
         take_profit: Optional[Decimal],
+        leg_id_base: Optional[str] = None,
     ) -> None:
         """
         PATCH 1: Submit synthetic protective orders for an entry.
@@ -232,6 +284,9 @@ class OrderExecutionEngine:
         Orders are linked as OCO. Deterministic internal IDs prevent duplicates.
 
         NOTE: We validate basic directional sanity. If invalid, we log and skip that leg.
+
+        leg_id_base replaces the entry id in the leg ids (re-protection after
+        the original legs were cancelled; those ids are already used).
         """
         if filled_qty is None or filled_qty <= 0:
             return
@@ -242,127 +297,134 @@ class OrderExecutionEngine:
         if self._is_protective_internal_id(entry_internal_order_id):
             return
 
-        sl_internal = self._sl_id(entry_internal_order_id)
-        tp_internal = self._tp_id(entry_internal_order_id)
+        sl_internal = self._sl_id(leg_id_base or entry_internal_order_id)
+        tp_internal = self._tp_id(leg_id_base or entry_internal_order_id)
 
         created_any = False
         created_sl = False
         created_tp = False
 
-        # STOP LOSS leg
-        if stop_loss is not None:
-            try:
-                # Long: stop_loss should be below fill price (otherwise instant trigger / nonsense)
-                if stop_loss >= entry_fill_price:
-                    self.logger.error(
-                        "Invalid stop_loss for long entry; skipping SL leg",
-                        extra={
-                            "symbol": symbol,
-                            "entry_internal_order_id": entry_internal_order_id,
-                            "stop_loss": str(stop_loss),
-                            "fill_price": str(entry_fill_price),
-                        },
-                    )
-                else:
-                    # idempotent submit_stop_order will return existing mapping if already submitted
-                    sl_broker_id = self.submit_stop_order(
-                        internal_order_id=sl_internal,
-                        symbol=symbol,
-                        quantity=filled_qty,
-                        side=BrokerOrderSide.SELL,
-                        stop_price=stop_loss,
-                        strategy=f"{strategy}::protective",
-                    )
-                    created_any = True
-                    created_sl = True
-
-                    with self._metadata_lock:
-                        m = self._order_metadata.get(sl_internal) or {}
-                        m.update(
-                            {
-                                "parent_internal_order_id": entry_internal_order_id,
-                                "protective_kind": "STOP_LOSS",
+        def _submit_sl() -> None:
+            nonlocal created_any, created_sl
+            # STOP LOSS leg
+            if stop_loss is not None:
+                try:
+                    # Long: stop_loss should be below fill price (otherwise instant trigger / nonsense)
+                    if stop_loss >= entry_fill_price:
+                        self.logger.error(
+                            "Invalid stop_loss for long entry; skipping SL leg",
+                            extra={
                                 "symbol": symbol,
-                                "strategy": f"{strategy}::protective",
-                            }
+                                "entry_internal_order_id": entry_internal_order_id,
+                                "stop_loss": str(stop_loss),
+                                "fill_price": str(entry_fill_price),
+                            },
                         )
-                        self._order_metadata[sl_internal] = m
-
-                    self.logger.info(
-                        "Protective SL submitted",
-                        extra={
-                            "symbol": symbol,
-                            "entry_internal_order_id": entry_internal_order_id,
-                            "sl_internal_order_id": sl_internal,
-                            "sl_broker_order_id": sl_broker_id,
-                            "stop_loss": str(stop_loss),
-                            "qty": str(filled_qty),
-                        },
-                    )
-            except Exception:
-                self.logger.error(
-                    "Failed to submit protective SL",
-                    extra={"symbol": symbol, "entry_internal_order_id": entry_internal_order_id},
-                    exc_info=True,
-                )
+                    else:
+                        # idempotent submit_stop_order will return existing mapping if already submitted
+                        sl_broker_id = self.submit_stop_order(
+                            internal_order_id=sl_internal,
+                            symbol=symbol,
+                            quantity=filled_qty,
+                            side=BrokerOrderSide.SELL,
+                            stop_price=stop_loss,
+                            strategy=f"{strategy}::protective",
+                        )
+                        created_any = True
+                        created_sl = True
+
+                        with self._metadata_lock:
+                            m = self._order_metadata.get(sl_internal) or {}
+                            m.update(
+                                {
+                                    "parent_internal_order_id": entry_internal_order_id,
+                                    "protective_kind": "STOP_LOSS",
+                                    "symbol": symbol,
+                                    "strategy": f"{strategy}::protective",
+                                }
+                            )
+                            self._order_metadata[sl_internal] = m
 
-        # TAKE PROFIT leg
-        if take_profit is not None:
-            try:
-                # Long: take_profit should be above fill price
-                if take_profit <= entry_fill_price:
+                        self.logger.info(
+                            "Protective SL submitted",
+                            extra={
+                                "symbol": symbol,
+                                "entry_internal_order_id": entry_internal_order_id,
+                                "sl_internal_order_id": sl_internal,
+                                "sl_broker_order_id": sl_broker_id,
+                                "stop_loss": str(stop_loss),
+                                "qty": str(filled_qty),
+                            },
+                        )
+                except Exception:
                     self.logger.error(
-                        "Invalid take_profit for long entry; skipping TP leg",
-                        extra={
-                            "symbol": symbol,
-                            "entry_internal_order_id": entry_internal_order_id,
-                            "take_profit": str(take_profit),
-                            "fill_price": str(entry_fill_price),
-                        },
+                        "Failed to submit protective SL",
+                        extra={"symbol": symbol, "entry_internal_order_id": entry_internal_order_id},
+                        exc_info=True,
                     )
-                else:
-                    tp_broker_id = self.submit_limit_order(
-                        internal_order_id=tp_internal,
-                        symbol=symbol,
-                        quantity=filled_qty,
-                        side=BrokerOrderSide.SELL,
-                        limit_price=take_profit,
-                        strategy=f"{strategy}::protective",
-                        stop_loss=None,
-                        take_profit=None,
-                    )
-                    created_any = True
-                    created_tp = True
 
-                    with self._metadata_lock:
-                        m = self._order_metadata.get(tp_internal) or {}
-                        m.update(
-                            {
-                                "parent_internal_order_id": entry_internal_order_id,
-                                "protective_kind": "TAKE_PROFIT",
+        def _submit_tp() -> None:
+            nonlocal created_any, created_tp
+            # TAKE PROFIT leg
+            if take_profit is not None:
+                try:
+                    # Long: take_profit should be above fill price
+                    if take_profit <= entry_fill_price:
+                        self.logger.error(
+                            "Invalid take_profit for long entry; skipping TP leg",
+                            extra={
                                 "symbol": symbol,
-                                "strategy": f"{strategy}::protective",
-                            }
+                                "entry_internal_order_id": entry_internal_order_id,
+                                "take_profit": str(take_profit),
+                                "fill_price": str(entry_fill_price),
+                            },
                         )
-                        self._order_metadata[tp_internal] = m
-
-                    self.logger.info(
-                        "Protective TP submitted",
-                        extra={
-                            "symbol": symbol,
-                            "entry_internal_order_id": entry_internal_order_id,
-                            "tp_internal_order_id": tp_internal,
-                            "tp_broker_order_id": tp_broker_id,
-                            "take_profit": str(take_profit),
-                            "qty": str(filled_qty),
-                        },
+                    else:
+                        tp_broker_id = self.submit_limit_order(
+                            internal_order_id=tp_internal,
+                            symbol=symbol,
+                            quantity=filled_qty,
+                            side=BrokerOrderSide.SELL,
+                            limit_price=take_profit,
+                            strategy=f"{strategy}::protective",
+                            stop_loss=None,
+                            take_profit=None,
+                        )
+                        created_any = True
+                        created_tp = True
+
+                        with self._metadata_lock:
+                            m = self._order_metadata.get(tp_internal) or {}
+                            m.update(
+                                {
+                                    "parent_internal_order_id": entry_internal_order_id,
+                                    "protective_kind": "TAKE_PROFIT",
+                                    "symbol": symbol,
+                                    "strategy": f"{strategy}::protective",
+                                }
+                            )
+                            self._order_metadata[tp_internal] = m
+
+                        self.logger.info(
+                            "Protective TP submitted",
+                            extra={
+                                "symbol": symbol,
+                                "entry_internal_order_id": entry_internal_order_id,
+                                "tp_internal_order_id": tp_internal,
+                                "tp_broker_order_id": tp_broker_id,
+                                "take_profit": str(take_profit),
+                                "qty": str(filled_qty),
+                            },
+                        )
+                except Exception:
+                    self.logger.error(
+                        "Failed to submit protective TP",
+                        extra={"symbol": symbol, "entry_internal_order_id": entry_internal_order_id},
+                        exc_info=True,
                     )
-            except Exception:
-                self.logger.error(
-                    "Failed to submit protective TP",
-                    extra={"symbol": symbol, "entry_internal_order_id": entry_internal_order_id},
-                    exc_info=True,
-                )
+
+        # PATCH 30: both legs in flight at once when the broker allows it
+        self._run_concurrently([_submit_sl, _submit_tp])
 
         # Link OCO only if we have both legs actually submitted
         if created_sl and created_tp:
@@ -390,6 +452,7 @@ class OrderExecutionEngine:
         sl_internal = self._sl_id(entry_internal_order_id)
         tp_internal = self._tp_id(entry_internal_order_id)
 
+        cancels = []
         for child_internal in (sl_internal, tp_internal):
             child_broker = self._internal_to_broker_id.get(child_internal)
             if not child_broker:
@@ -404,11 +467,406 @@ class OrderExecutionEngine:
                     "reason": reason,
                 },
             )
-            self.cancel_order(
-                internal_order_id=child_internal,
-                broker_order_id=child_broker,
+            cancels.append(
+                lambda child_internal=child_internal, child_broker=child_broker: self.cancel_order(
+                    internal_order_id=child_internal,
+                    broker_order_id=child_broker,
+                    reason=reason,
+                )
+            )
+        self._run_concurrently(cancels)
+
+    def _run_concurrently(self, calls: List[Callable[[], Any]]) -> List[Any]:
+        """
+        PATCH 30: Run independent broker-bound calls in parallel when the
+        broker is safe to call from several threads (pooled async connector);
+        otherwise run them in order. Results come back in call order; the
+        first exception is re-raised after all calls finished.
+        """
+        pool = self._leg_pool
+        if (
+            pool is None
+            or len(calls) < 2
+            or getattr(self.broker, "supports_concurrent_requests", False) is not True
+        ):
+            return [call() for call in calls]
+        futures = [pool.submit(call) for call in calls]
+        wait(futures)
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        """
+        PATCH 30: Shut down the leg worker pool, waiting for in-flight leg
+        calls. Later _run_concurrently() calls run sequentially.
+        """
+        pool, self._leg_pool = self._leg_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # ---------------------------------------------------------------------
+    # PATCH 39: POSITION DURABILITY BARRIER
+    # ---------------------------------------------------------------------
+
+    def _flush_positions(self) -> None:
+        """Commit buffered PositionStore writes (no-op for write-through stores)."""
+        flush = getattr(self.position_store, "flush", None)
+        if callable(flush):
+            flush()
+
+    # ---------------------------------------------------------------------
+    # PATCH 29: NATIVE BRACKET (entry + SL + TP in one broker request)
+    # ---------------------------------------------------------------------
+
+    def _native_bracket_eligible(
+        self,
+        side: BrokerOrderSide,
+        stop_loss: Optional[Decimal],
+        take_profit: Optional[Decimal],
+        limit_price: Optional[Decimal] = None,
+    ) -> bool:
+        """Native bracket only for long entries with both legs and sane prices."""
+        if not self._native_brackets:
+            return False
+        if getattr(self.broker, "supports_bracket_orders", False) is not True:
+            return False
+        if side != BrokerOrderSide.BUY or stop_loss is None or take_profit is None:
+            return False
+        if stop_loss >= take_profit:
+            return False
+        if limit_price is not None and not (stop_loss < limit_price < take_profit):
+            return False
+        return True
+
+    def _submit_native_bracket(
+        self,
+        internal_order_id: str,
+        symbol: str,
+        quantity: Decimal,
+        side: BrokerOrderSide,
+        strategy: str,
+        stop_loss: Decimal,
+        take_profit: Decimal,
+        limit_price: Optional[Decimal] = None,
+    ) -> Optional[str]:
+        """
+        Submit entry + protective legs as one native bracket.
+
+        Returns the entry broker_order_id, or None if the broker refused the
+        bracket (caller then submits a plain entry and the synthetic
+        protective path takes over on fill). A failed submit is first looked
+        up by client_order_id: if the bracket was accepted it is tracked as
+        usual; if the lookup itself fails the submit error is raised rather
+        than resubmitting under the same id.
+        """
+        try:
+            ids = self.broker.submit_bracket_order(
+                symbol=symbol,
+                quantity=quantity,
+                side=side,
+                internal_order_id=internal_order_id,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                limit_price=limit_price,
+            )
+        except Exception as e:
+            lookup = getattr(self.broker, "get_bracket_order_by_client_id", None)
+            ids = None
+            if callable(lookup):
+                try:
+                    ids = lookup(internal_order_id)
+                except Exception as lookup_exc:
+                    self.logger.error(
+                        "Native bracket outcome unknown; not resubmitting",
+                        extra={"internal_order_id": internal_order_id, "symbol": symbol,
+                               "error": str(e), "lookup_error": str(lookup_exc)},
+                    )
+                    raise e
+            if not isinstance(ids, BracketOrderIds):
+                self.logger.warning(
+                    "Native bracket submission failed; falling back to synthetic protection",
+                    extra={"internal_order_id": internal_order_id, "symbol": symbol, "error": str(e)},
+                )
+                return None
+            self.logger.warning(
+                "Native bracket submit errored but the broker accepted it",
+                extra={"internal_order_id": internal_order_id, "broker_order_id": ids.entry, "error": str(e)},
+            )
+
+        sl_internal = self._sl_id(internal_order_id)
+        tp_internal = self._tp_id(internal_order_id)
+        protective_strategy = f"{strategy}::protective"
+        now = datetime.now(timezone.utc)
+
+        with self._metadata_lock:
+            self._order_metadata[internal_order_id] = {
+                "symbol": symbol,
+                "quantity": quantity,
+                "side": side,
+                "strategy": strategy,
+                "stop_loss": stop_loss,
+                "take_profit": take_profit,
+                "limit_price": limit_price,
+                "submitted_at": now,
+                "native_bracket": True,
+                "protective_sl_internal_id": sl_internal if ids.stop_loss else None,
+                "protective_tp_internal_id": tp_internal if ids.take_profit else None,
+            }
+            for leg_internal, kind, leg_broker in (
+                (sl_internal, "STOP_LOSS", ids.stop_loss),
+                (tp_internal, "TAKE_PROFIT", ids.take_profit),
+            ):
+                if not leg_broker:
+                    continue
+                self._order_metadata[leg_internal] = {
+                    "symbol": symbol,
+                    "quantity": quantity,
+                    "side": BrokerOrderSide.SELL,
+                    "strategy": protective_strategy,
+                    "stop_loss": None,
+                    "take_profit": None,
+                    "submitted_at": now,
+                    "parent_internal_order_id": internal_order_id,
+                    "protective_kind": kind,
+                    "native_bracket": True,
+                }
+
+        entry_type = OrderType.LIMIT if limit_price is not None else OrderType.MARKET
+        self._record_submission(
+            internal_order_id, ids.entry, symbol, quantity, side, entry_type, strategy,
+            price=limit_price,
+            reason={"source": "engine", "native_bracket": True},
+        )
+
+        # Legs share the entry's trade_id so the journal reads as one trade.
+        trade_id = self._trade_ids(internal_order_id).trade_id
+        for leg_internal, leg_broker, leg_type, leg_price in (
+            (sl_internal, ids.stop_loss, OrderType.STOP, stop_loss),
+            (tp_internal, ids.take_profit, OrderType.LIMIT, take_profit),
+        ):
+            if not leg_broker:
+                self.logger.error(
+                    "Native bracket leg id unresolved; leg is not tracked locally",
+                    extra={"internal_order_id": internal_order_id, "leg_internal_order_id": leg_internal},
+                )
+                continue
+            self._trade_ids_by_internal.setdefault(leg_internal, trade_id)
+            if self.state_machine.get_order(leg_internal) is None:
+                self.state_machine.create_order(
+                    order_id=leg_internal,
+                    symbol=symbol,
+                    quantity=quantity,
+                    side=BrokerOrderSide.SELL.value,
+                    order_type=leg_type.value,
+                    strategy=protective_strategy,
+                    entry_price=leg_price,
+                )
+            self._record_submission(
+                leg_internal, leg_broker, symbol, quantity, BrokerOrderSide.SELL, leg_type,
+                protective_strategy,
+                price=leg_price,
+                reason={"source": "native_bracket", "parent_internal_order_id": internal_order_id},
+            )
+
+        if ids.stop_loss and ids.take_profit:
+            self._link_oco(sl_internal, tp_internal)
+
+        self.logger.info(
+            "Native bracket submitted",
+            extra={
+                "internal_order_id": internal_order_id,
+                "broker_order_id": ids.entry,
+                "sl_broker_order_id": ids.stop_loss,
+                "tp_broker_order_id": ids.take_profit,
+            },
+        )
+        return ids.entry
+
+    def native_bracket_legs(self, internal_order_id: str) -> Optional[BracketOrderIds]:
+        """
+        Broker ids of a native bracket entry and its live exit legs, or None
+        if the entry did not go out as a native bracket (the caller must then
+        protect the fill itself).
+        """
+        with self._metadata_lock:
+            meta = self._order_metadata.get(internal_order_id) or {}
+            if not meta.get("native_bracket") or self._is_protective_internal_id(internal_order_id):
+                return None
+            sl_internal = meta.get("protective_sl_internal_id")
+            tp_internal = meta.get("protective_tp_internal_id")
+        return BracketOrderIds(
+            entry=self._internal_to_broker_id.get(internal_order_id),
+            stop_loss=self._internal_to_broker_id.get(sl_internal) if sl_internal else None,
+            take_profit=self._internal_to_broker_id.get(tp_internal) if tp_internal else None,
+        )
+
+    def _settle_unfilled_remainder(self, internal_order_id: str) -> None:
+        """
+        An order ended (cancelled / expired) before filling completely.
+
+        A native bracket entry that ended part-filled leaves broker legs sized
+        to the full order: cancel them and protect the filled quantity with
+        synthetic legs instead. If a leg cannot be cancelled (it may already
+        have triggered) nothing is resubmitted.
+        """
+        filled = self._cumulative_filled_qty.pop(internal_order_id, None)
+        with self._metadata_lock:
+            meta = self._order_metadata.get(internal_order_id) or {}
+            if not meta.get("native_bracket") or self._is_protective_internal_id(internal_order_id):
+                return
+            legs = [leg for leg in (meta.get("protective_sl_internal_id"), meta.get("protective_tp_internal_id")) if leg]
+        quantity = meta.get("quantity")
+        if not filled or filled <= 0 or quantity is None or filled >= Decimal(str(quantity)):
+            return
+
+        cancelled_all = True
+        for leg in legs:
+            leg_broker = self._internal_to_broker_id.get(leg)
+            if not leg_broker or not self.cancel_order(leg, leg_broker, reason="native_bracket_partial_entry"):
+                cancelled_all = False
+        if not cancelled_all:
+            self.logger.error(
+                "Native bracket legs oversized after partial entry and not all could be cancelled",
+                extra={"internal_order_id": internal_order_id, "filled_qty": str(filled)},
+            )
+            return
+
+        with self._metadata_lock:
+            meta["native_bracket"] = False
+        order = self.state_machine.get_order(internal_order_id)
+        fill_price = getattr(order, "filled_price", None) or meta.get("limit_price")
+        self.logger.warning(
+            "Native bracket entry part-filled; re-protecting the filled quantity",
+            extra={"internal_order_id": internal_order_id, "filled_qty": str(filled)},
+        )
+        self._ensure_protective_orders_for_entry(
+            entry_internal_order_id=internal_order_id,
+            symbol=meta.get("symbol"),
+            filled_qty=filled,
+            entry_fill_price=fill_price,
+            strategy=str(meta.get("strategy")),
+            stop_loss=meta.get("stop_loss"),
+            take_profit=meta.get("take_profit"),
+            leg_id_base=f"{internal_order_id}-R",
+        )
+
+    def _record_submission(
+        self,
+        internal_order_id: str,
+        broker_order_id: str,
+        symbol: str,
+        quantity: Decimal,
+        side: BrokerOrderSide,
+        order_type: OrderType,
+        strategy: str,
+        price: Optional[Decimal],
+        reason: Dict[str, Any],
+    ) -> None:
+        """Id mapping, journal, tx log, tracker and PENDING -> SUBMITTED for one accepted order."""
+        self._submitted_order_ids.add(internal_order_id)
+        self._internal_to_broker_id[internal_order_id] = broker_order_id
+
+        ids = self._trade_ids(internal_order_id)
+        self._j_emit(
+            build_trade_event(
+                event_type="ORDER_SUBMIT",
+                ids=ids,
+                internal_order_id=internal_order_id,
+                broker_order_id=broker_order_id,
+                symbol=symbol,
+                side=side.value,
+                qty=str(quantity),
+                order_type=order_type.value,
+                strategy=strategy,
                 reason=reason,
             )
+        )
+
+        if self.transaction_log is not None:
+            try:
+                self.transaction_log.append(
+                    {
+                        "event_type": "ORDER_SUBMIT",
+                        "run_id": ids.run_id,
+                        "trade_id": ids.trade_id,
+                        "internal_order_id": internal_order_id,
+                        "broker_order_id": broker_order_id,
+                        "symbol": symbol,
+                        "side": side.value,
+                        "qty": str(quantity),
+                        "order_type": order_type.value,
+                        "price": str(price) if price is not None else None,
+                        "strategy": strategy,
+                        "parent_internal_order_id": reason.get("parent_internal_order_id"),
+                    }
+                )
+                self.transaction_log.append(
+                    {
+                        "event_type": "BROKER_ORDER_ACK",
+                        "run_id": ids.run_id,
+                        "trade_id": ids.trade_id,
+                        "internal_order_id": internal_order_id,
+                        "broker_order_id": broker_order_id,
+                        "symbol": symbol,
+                        "ack": True,
+                    }
+                )
+            except Exception:
+                pass
+
+        if self.order_tracker:
+            self.order_tracker.start_tracking(
+                InFlightOrder(
+                    client_order_id=internal_order_id,
+                    exchange_order_id=broker_order_id,
+                    symbol=symbol,
+                    quantity=quantity,
+                    side=TrackerOrderSide.BUY if side == BrokerOrderSide.BUY else TrackerOrderSide.SELL,
+                    order_type=order_type,
+                    price=price if order_type == OrderType.LIMIT else None,
+                    stop_price=price if order_type == OrderType.STOP else None,
+                    strategy_id=strategy,
+                    submitted_at=datetime.now(timezone.utc),
+                )
+            )
+
+        self.state_machine.transition(
+            order_id=internal_order_id,
+            from_state=OrderStatus.PENDING,
+            to_state=OrderStatus.SUBMITTED,
+            broker_order_id=broker_order_id,
+        )
+        self._note_working_state(internal_order_id, OrderStatus.SUBMITTED)
+
+    def register_external_order(
+        self,
+        internal_order_id: str,
+        broker_order_id: str,
+        symbol: str,
+        quantity: Decimal,
+        side: BrokerOrderSide,
+        strategy: str,
+        reason: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        PATCH 31: Adopt a MARKET order the broker created on our behalf
+        (e.g. close-all liquidations) so its fills flow through the normal
+        status-change path (positions, journal, working set).
+        """
+        with self._metadata_lock:
+            self._order_metadata[internal_order_id] = {
+                "symbol": symbol,
+                "quantity": quantity,
+                "side": side,
+                "strategy": strategy,
+                "stop_loss": None,
+                "take_profit": None,
+                "submitted_at": datetime.now(timezone.utc),
+            }
+        self._record_submission(
+            internal_order_id, broker_order_id, symbol, quantity, side, OrderType.MARKET, strategy,
+            price=None,
+            reason=reason or {"source": "broker"},
+        )
 
     # ---------------------------------------------------------------------
     # ORDER SUBMISSION
@@ -443,6 +901,9 @@ class OrderExecutionEngine:
                 raise DuplicateOrderError(error_msg)
 
             try:
+                # PATCH 39: buffered position writes must be durable before the broker acts
+                self._flush_positions()
+
                 # PATCH 10: Round BEFORE validation and metadata storage
                 if self.symbol_properties:
                     props = self.symbol_properties.get(symbol)
@@ -467,6 +928,14 @@ class OrderExecutionEngine:
                         if not is_valid:
                             raise OrderValidationError(f"Order validation failed: {reason}")
 
+                # PATCH 29: entry + SL + TP as one native bracket when supported
+                if self._native_bracket_eligible(side, stop_loss, take_profit):
+                    bracket_broker_id = self._submit_native_bracket(
+                        internal_order_id, symbol, quantity, side, strategy, stop_loss, take_profit,
+                    )
+                    if bracket_broker_id is not None:
+                        return bracket_broker_id
+
                 # Store metadata
                 with self._metadata_lock:
                     self._order_metadata[internal_order_id] = {
@@ -560,6 +1029,7 @@ class OrderExecutionEngine:
                     to_state=OrderStatus.SUBMITTED,
                     broker_order_id=broker_order_id,
                 )
+                self._note_working_state(internal_order_id, OrderStatus.SUBMITTED)
 
                 return broker_order_id
 
@@ -653,6 +1123,9 @@ class OrderExecutionEngine:
                 if limit_price is None or limit_price <= 0:
                     raise OrderValidationError(f"limit_price must be positive, got {limit_price}")
 
+                # PATCH 39: buffered position writes must be durable before the broker acts
+                self._flush_positions()
+
                 # PATCH 10: Round BEFORE validation
                 if self.symbol_properties:
                     props = self.symbol_properties.get(symbol)
@@ -677,6 +1150,15 @@ class OrderExecutionEngine:
                         if not is_valid:
                             raise OrderValidationError(f"Order validation failed: {reason}")
 
+                # PATCH 29: entry + SL + TP as one native bracket when supported
+                if self._native_bracket_eligible(side, stop_loss, take_profit, limit_price):
+                    bracket_broker_id = self._submit_native_bracket(
+                        internal_order_id, symbol, quantity, side, strategy, stop_loss, take_profit,
+                        limit_price=limit_price,
+                    )
+                    if bracket_broker_id is not None:
+                        return bracket_broker_id
+
                 with self._metadata_lock:
                     self._order_metadata[internal_order_id] = {
                         "symbol": symbol,
@@ -769,6 +1251,7 @@ class OrderExecutionEngine:
                     to_state=OrderStatus.SUBMITTED,
                     broker_order_id=broker_order_id,
                 )
+                self._note_working_state(internal_order_id, OrderStatus.SUBMITTED)
                 return broker_order_id
 
             except OrderValidationError:
@@ -854,6 +1337,9 @@ class OrderExecutionEngine:
                 if stop_price is None or stop_price <= 0:
                     raise OrderValidationError(f"stop_price must be positive, got {stop_price}")
 
+                # PATCH 39: buffered position writes must be durable before the broker acts
+                self._flush_positions()
+
                 # PATCH 10: Round BEFORE validation
                 if self.symbol_properties:
                     props = self.symbol_properties.get(symbol)
@@ -957,6 +1443,7 @@ class OrderExecutionEngine:
                     to_state=OrderStatus.SUBMITTED,
                     broker_order_id=broker_order_id,
                 )
+                self._note_working_state(internal_order_id, OrderStatus.SUBMITTED)
                 return broker_order_id
 
             except OrderValidationError:
@@ -1035,9 +1522,11 @@ class OrderExecutionEngine:
                         )
                 except Exception:
                     pass
+                self._note_working_state(internal_order_id, OrderStatus.CANCELLED)
 
                 if self.order_tracker:
                     self.order_tracker.stop_tracking(internal_order_id, reason="cancelled")
+                self._settle_unfilled_remainder(internal_order_id)
 
                 return True
 
@@ -1087,6 +1576,39 @@ class OrderExecutionEngine:
         except Exception:
             return True
 
+    def _note_working_state(self, internal_order_id: str, state: OrderStatus) -> None:
+        with self._metadata_lock:
+            if self.state_machine.is_terminal(state):
+                self._working_states.pop(internal_order_id, None)
+            else:
+                self._working_states[internal_order_id] = state
+
+    def get_working_orders(self) -> List[WorkingOrder]:
+        """
+        Submitted orders that have not reached a terminal state.
+
+        The state machine's stored state wins when it tracks the order
+        (e.g. transitions applied by the reconciler).
+        """
+        with self._metadata_lock:
+            snapshot = [
+                (iid, self._internal_to_broker_id.get(iid), state,
+                 (self._order_metadata.get(iid) or {}).get("submitted_at"))
+                for iid, state in self._working_states.items()
+            ]
+        working: List[WorkingOrder] = []
+        for iid, broker_order_id, state, submitted_at in snapshot:
+            try:
+                order = self.state_machine.get_order(iid)
+            except Exception:
+                order = None
+            machine_state = getattr(order, "state", None)
+            if isinstance(machine_state, OrderStatus):
+                state = machine_state
+            if broker_order_id and not self.state_machine.is_terminal(state):
+                working.append(WorkingOrder(iid, str(broker_order_id), state, submitted_at))
+        return working
+
     def poll_order_status(
         self,
         internal_order_id: str,
@@ -1098,7 +1620,9 @@ class OrderExecutionEngine:
             try:
                 broker_status, fill_info = self.broker.get_order_status(broker_order_id)
 
-                if broker_status != current_state:
+                if broker_status != current_state or self._is_fill_progress(
+                    internal_order_id, current_state, broker_status, fill_info
+                ):
                     self._handle_status_change(
                         internal_order_id=internal_order_id,
                         broker_order_id=broker_order_id,
@@ -1121,36 +1645,147 @@ class OrderExecutionEngine:
         broker_order_id: str,
         timeout_seconds: int = 60,
         poll_interval: float = 1.0,
+        max_poll_interval: float = 8.0,
     ) -> OrderStatus:
-        """Wait for order to reach terminal state."""
+        """
+        Wait for order to reach terminal state.
+
+        Completes as soon as the user stream or event bus reports the order's
+        new status (see core.execution.completion). Broker polling is the
+        fallback: one poll up front, then every poll_interval. Only while a
+        push source is attached (completions.has_push_source()) are polls
+        spaced poll_interval, 2x, 4x, ... capped at max_poll_interval.
+        """
         with LogContext(internal_order_id):
             start = time.time()
             current_state = OrderStatus.SUBMITTED
+            waiter = self.completions.register(internal_order_id, broker_order_id)
+            delay = max(float(poll_interval), 0.0)
+            next_poll_at = start  # first poll immediately
+            polls = 0
+            # Without a push source, polling is the only way to see the fill.
+            backoff = self.completions.has_push_source()
 
-            while time.time() - start < timeout_seconds:
-                current_state = self.poll_order_status(
-                    internal_order_id=internal_order_id,
-                    broker_order_id=broker_order_id,
-                    current_state=current_state,
-                )
-                if self.state_machine.is_terminal(current_state):
-                    self.logger.info(
-                        "Order reached terminal state: %s",
-                        current_state.value,
-                        extra={
-                            "internal_order_id": internal_order_id,
-                            "final_state": current_state.value,
-                            "elapsed_seconds": time.time() - start,
-                        },
-                    )
-                    return current_state
-                time.sleep(poll_interval)
+            try:
+                while time.time() - start < timeout_seconds:
+                    now = time.time()
+                    if now >= next_poll_at:
+                        current_state = self.poll_order_status(
+                            internal_order_id=internal_order_id,
+                            broker_order_id=broker_order_id,
+                            current_state=current_state,
+                        )
+                        polls += 1
+                        next_poll_at = now + delay
+                        if backoff:
+                            delay = min(max(delay * 2, poll_interval), max_poll_interval)
+                    else:
+                        remaining = timeout_seconds - (now - start)
+                        hint = waiter.wait(min(next_poll_at - now, remaining))
+                        if hint is not None:
+                            current_state = self._apply_completion_hint(
+                                internal_order_id, broker_order_id, current_state, hint
+                            )
+
+                    if self.state_machine.is_terminal(current_state):
+                        self.logger.info(
+                            "Order reached terminal state: %s",
+                            current_state.value,
+                            extra={
+                                "internal_order_id": internal_order_id,
+                                "final_state": current_state.value,
+                                "elapsed_seconds": time.time() - start,
+                                "status_polls": polls,
+                            },
+                        )
+                        return current_state
+            finally:
+                self.completions.unregister(internal_order_id)
 
             self.logger.warning(
                 "Order polling timeout",
-                extra={"internal_order_id": internal_order_id, "timeout_seconds": timeout_seconds, "last_state": current_state.value},
+                extra={
+                    "internal_order_id": internal_order_id,
+                    "timeout_seconds": timeout_seconds,
+                    "last_state": current_state.value,
+                    "status_polls": polls,
+                },
+            )
+            return current_state
+
+    def _apply_completion_hint(
+        self,
+        internal_order_id: str,
+        broker_order_id: str,
+        current_state: OrderStatus,
+        hint: CompletionHint,
+    ) -> OrderStatus:
+        """
+        Apply pushed status news through the normal status-change path.
+
+        If another path already applied the transition (state machine is
+        ahead of us), adopt its state. A fill without price data falls back
+        to a single broker poll.
+        """
+        try:
+            order = self.state_machine.get_order(internal_order_id)
+            machine_state = getattr(order, "state", None)
+            if isinstance(machine_state, OrderStatus) and machine_state != current_state:
+                return machine_state
+        except Exception:
+            pass
+
+        progress = self._is_fill_progress(internal_order_id, current_state, hint.status, hint.fill_info)
+        if hint.status == current_state and not progress:
+            return current_state
+
+        if not progress:
+            ok, _ = self.state_machine.validate_transition(current_state, hint.status, broker_order_id)
+            if ok is not True:
+                return current_state
+
+        fill_info = hint.fill_info
+        is_fill = hint.status in (OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
+        if is_fill and not (fill_info and fill_info.get("filled_qty") and fill_info.get("filled_avg_price")):
+            return self.poll_order_status(
+                internal_order_id=internal_order_id,
+                broker_order_id=broker_order_id,
+                current_state=current_state,
+            )
+
+        try:
+            self._handle_status_change(
+                internal_order_id=internal_order_id,
+                broker_order_id=broker_order_id,
+                from_state=current_state,
+                to_state=hint.status,
+                fill_info=fill_info,
+            )
+        except Exception as e:
+            self.logger.error(
+                "Failed to apply pushed order status",
+                extra={"internal_order_id": internal_order_id, "status": hint.status.value,
+                       "source": hint.source, "error": str(e)},
+                exc_info=True,
             )
             return current_state
+        return hint.status
+
+    def _is_fill_progress(
+        self,
+        internal_order_id: str,
+        current_state: OrderStatus,
+        new_state: OrderStatus,
+        fill_info: Optional[Dict[str, Any]],
+    ) -> bool:
+        """PARTIALLY_FILLED -> PARTIALLY_FILLED with more filled than already booked."""
+        if not (current_state == new_state == OrderStatus.PARTIALLY_FILLED and fill_info):
+            return False
+        try:
+            filled = Decimal(str(fill_info.get("filled_qty") or 0))
+        except (ArithmeticError, ValueError):
+            return False
+        return filled > self._cumulative_filled_qty.get(internal_order_id, Decimal("0"))
 
     # ---------------------------------------------------------------------
     # STATUS CHANGE HANDLER
@@ -1177,14 +1812,17 @@ class OrderExecutionEngine:
             filled_qty = fill_info.get("filled_qty")
             fill_price = fill_info.get("filled_avg_price")
 
-        self.state_machine.transition(
-            order_id=internal_order_id,
-            from_state=from_state,
-            to_state=to_state,
-            broker_order_id=broker_order_id,
-            filled_qty=filled_qty,
-            fill_price=fill_price,
-        )
+        # A further partial fill is not a state transition; only book the increment.
+        if from_state != to_state:
+            self.state_machine.transition(
+                order_id=internal_order_id,
+                from_state=from_state,
+                to_state=to_state,
+                broker_order_id=broker_order_id,
+                filled_qty=filled_qty,
+                fill_price=fill_price,
+            )
+        self._note_working_state(internal_order_id, to_state)
 
         # PATCH 3: Handle both PARTIALLY_FILLED and FILLED states
         is_fill_event = to_state in (OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
@@ -1262,7 +1900,8 @@ class OrderExecutionEngine:
                         meta = self._order_metadata.get(internal_order_id) or {}
                     if meta and (not self._is_protective_internal_id(internal_order_id)):
                         side = meta.get("side")
-                        if side == BrokerOrderSide.BUY:
+                        # PATCH 29: native bracket legs are already live at the broker
+                        if side == BrokerOrderSide.BUY and not meta.get("native_bracket"):
                             # Use cumulative filled_qty for protective order sizing
                             self._ensure_protective_orders_for_entry(
                                 entry_internal_order_id=internal_order_id,
@@ -1277,6 +1916,10 @@ class OrderExecutionEngine:
                     # Clean up cumulative tracker on final fill
                     self._cumulative_filled_qty.pop(internal_order_id, None)
 
+        # PATCH 29: a native bracket entry that ends part-filled has oversized legs
+        if to_state in (OrderStatus.CANCELLED, OrderStatus.EXPIRED):
+            self._settle_unfilled_remainder(internal_order_id)
+
     # ---------------------------------------------------------------------
     # POSITION UPDATES
     # ---------------------------------------------------------------------
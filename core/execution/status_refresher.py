@@ -0,0 +1,260 @@
+"""
+Batched order-status refresh.
+
+PROBLEM:
+    Each working order was refreshed with its own get_order_status() call.
+    With an entry plus stop/take-profit legs per position, 20 working
+    orders cost 20 REST requests per interval against a 200 req/min budget.
+
+DESIGN:
+    - One broker.get_orders(status="all", after=<oldest working order>) per
+      interval returns every order that could have changed.
+    - The result is diffed against the working orders: the engine's
+      submitted, non-terminal orders plus any the OrderStateMachine holds
+      (its stored state wins), matched by broker order id, then client
+      order id.
+    - Each changed order is applied in the same pass:
+        * if wait_for_order() is blocked on it, the OrderCompletionTracker
+          hands it the new status (the waiter applies it on its own thread,
+          so the transition is never applied twice);
+        * otherwise it goes straight through engine._handle_status_change,
+          so positions/journal/OCO handling match the single-order path.
+    - Orders missing from the response (beyond the page limit) are retried
+      next interval; nothing is inferred from absence.
+
+Fail-open: a failed batch call is logged and counted; the next interval
+retries. Reconciliation remains the authority for broker/local drift.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from core.brokers.alpaca_connector import map_alpaca_status, order_fill_info
+from core.execution.engine import WorkingOrder
+from core.logging import LogStream, get_logger
+from core.state import OrderStatus
+
+
+@dataclass
+class RefreshReport:
+    """Outcome of one batched refresh."""
+    working: int = 0
+    fetched: int = 0
+    transitions: List[Dict[str, Any]] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    requests: int = 0
+    error: Optional[str] = None
+
+
+class BatchedOrderStatusRefresher:
+    """
+    Refreshes all working orders with a single broker call per interval.
+
+    Usage:
+        refresher = BatchedOrderStatusRefresher(broker, exec_engine, interval_s=5)
+        # once per runtime cycle:
+        refresher.maybe_refresh()
+    """
+
+    def __init__(
+        self,
+        broker: Any,
+        engine: Any,
+        *,
+        state_machine: Any = None,
+        interval_s: float = 5.0,
+        lookback_slack_s: float = 60.0,
+        page_limit: int = 500,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            broker: Connector with get_orders(status=, limit=, after=)
+            engine: OrderExecutionEngine (status-change path + completions)
+            state_machine: Defaults to engine.state_machine
+            interval_s: Minimum seconds between batch calls (maybe_refresh)
+            lookback_slack_s: Subtracted from the oldest working order's
+                timestamp to absorb local/broker clock skew
+            page_limit: Max orders requested per call
+            monotonic: Injectable clock (tests)
+        """
+        self.logger = get_logger(LogStream.ORDERS)
+        self.broker = broker
+        self.engine = engine
+        self.state_machine = state_machine if state_machine is not None else getattr(engine, "state_machine", None)
+        self.interval_s = float(interval_s)
+        self.lookback_slack_s = float(lookback_slack_s)
+        self.page_limit = int(page_limit)
+        self._monotonic = monotonic
+        self._last_refresh: Optional[float] = None
+
+        self._refreshes = 0
+        self._requests = 0
+        self._transitions = 0
+        self._errors = 0
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def maybe_refresh(self) -> Optional[RefreshReport]:
+        """Refresh if interval_s has elapsed since the last refresh."""
+        now = self._monotonic()
+        if self._last_refresh is not None and (now - self._last_refresh) < self.interval_s:
+            return None
+        self._last_refresh = now
+        return self.refresh()
+
+    def refresh(self) -> RefreshReport:
+        """Fetch all recent orders in one call and apply every status change."""
+        report = RefreshReport()
+        working = self._working_orders()
+        report.working = len(working)
+        if not working:
+            return report
+
+        self._refreshes += 1
+        after = self._after(working)
+        try:
+            report.requests = 1
+            self._requests += 1
+            broker_orders = self._fetch(after)
+        except Exception as e:
+            self._errors += 1
+            report.error = str(e)
+            self.logger.warning(
+                "Batched order status refresh failed",
+                extra={"working_orders": len(working), "error": str(e)},
+            )
+            return report
+
+        report.fetched = len(broker_orders)
+        by_broker_id: Dict[str, Any] = {}
+        by_client_id: Dict[str, Any] = {}
+        for bo in broker_orders:
+            bid = _field(bo, "id")
+            cid = _field(bo, "client_order_id")
+            if bid:
+                by_broker_id[str(bid)] = bo
+            if cid:
+                by_client_id[str(cid)] = bo
+
+        for order in working:
+            bo = by_broker_id.get(order.broker_order_id) or by_client_id.get(order.internal_order_id)
+            if bo is None:
+                report.missing.append(order.internal_order_id)
+                continue
+
+            raw_status = _field(bo, "status")
+            new_status = map_alpaca_status(getattr(raw_status, "value", raw_status))
+            if new_status == order.state:
+                continue
+
+            broker_order_id = str(_field(bo, "id") or order.broker_order_id)
+            if self._apply(order, broker_order_id, new_status, order_fill_info(bo)):
+                report.transitions.append({
+                    "internal_order_id": order.internal_order_id,
+                    "broker_order_id": broker_order_id,
+                    "from_state": order.state.value,
+                    "to_state": new_status.value,
+                })
+
+        self._transitions += len(report.transitions)
+        if report.transitions or report.missing:
+            self.logger.info(
+                "Batched order status refresh",
+                extra={
+                    "working_orders": report.working,
+                    "fetched": report.fetched,
+                    "transitions": len(report.transitions),
+                    "missing": report.missing,
+                },
+            )
+        return report
+
+    def get_stats(self) -> dict:
+        return {
+            "refreshes": self._refreshes,
+            "requests": self._requests,
+            "transitions": self._transitions,
+            "errors": self._errors,
+        }
+
+    # ========================================================================
+    # INTERNALS
+    # ========================================================================
+
+    def _working_orders(self) -> List[WorkingOrder]:
+        working: Dict[str, WorkingOrder] = {}
+        if hasattr(self.engine, "get_working_orders"):
+            for w in self.engine.get_working_orders():
+                working[w.internal_order_id] = w
+        if self.state_machine is not None and hasattr(self.state_machine, "get_pending_orders"):
+            for o in self.state_machine.get_pending_orders():
+                # PENDING orders have not reached the broker yet.
+                if o.state == OrderStatus.PENDING or not o.broker_order_id:
+                    continue
+                working[o.order_id] = WorkingOrder(
+                    o.order_id, str(o.broker_order_id), o.state, o.submitted_at or o.created_at,
+                )
+        return list(working.values())
+
+    def _after(self, working: List[WorkingOrder]) -> datetime:
+        now = datetime.now(timezone.utc)
+        oldest = min((o.submitted_at or now) for o in working)
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        return oldest - timedelta(seconds=self.lookback_slack_s)
+
+    def _fetch(self, after: datetime) -> List[Any]:
+        try:
+            orders = self.broker.get_orders(status="all", limit=self.page_limit, after=after)
+        except TypeError:
+            # Connector without after= support: still one call per interval.
+            orders = self.broker.get_orders(status="all", limit=self.page_limit)
+        return list(orders or [])
+
+    def _apply(self, order: WorkingOrder, broker_order_id: str, new_status: OrderStatus, fill_info: Optional[Dict]) -> bool:
+        completions = getattr(self.engine, "completions", None)
+        if completions is not None and completions.notify(
+            status=new_status,
+            internal_order_id=order.internal_order_id,
+            broker_order_id=broker_order_id,
+            fill_info=fill_info,
+            source="batched_refresh",
+        ):
+            return True
+
+        ok, reason = self.state_machine.validate_transition(order.state, new_status, broker_order_id)
+        if not ok:
+            self.logger.debug(
+                "Skipping refreshed status",
+                extra={"internal_order_id": order.internal_order_id, "to_state": new_status.value, "reason": reason},
+            )
+            return False
+        try:
+            self.engine._handle_status_change(
+                internal_order_id=order.internal_order_id,
+                broker_order_id=broker_order_id,
+                from_state=order.state,
+                to_state=new_status,
+                fill_info=fill_info,
+            )
+            return True
+        except Exception as e:
+            self.logger.error(
+                "Failed to apply refreshed order status",
+                extra={"internal_order_id": order.internal_order_id, "to_state": new_status.value, "error": str(e)},
+                exc_info=True,
+            )
+            return False
+
+
+def _field(obj: Any, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
@@ -22,7 +22,7 @@ SAFETY:
 Based on LEAN's PortfolioValidator and Freqtrade's balance checks.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple, Set
@@ -31,6 +31,12 @@ from enum import Enum
 from core.logging import get_logger, LogStream
 
 
+def _avg_price(pos) -> Optional[Decimal]:
+    """Average price of a local position (avg_price, or entry_price on core.state.Position)."""
+    avg = getattr(pos, "avg_price", None)
+    return avg if avg is not None else getattr(pos, "entry_price", None)
+
+
 # ============================================================================
 # DRIFT DEFINITIONS
 # ============================================================================
@@ -290,13 +296,12 @@ class DriftDetector:
         """Get local positions from position store."""
         positions = {}
         
-        for symbol in self.position_store.get_symbols():
-            pos = self.position_store.get_position(symbol)
+        for symbol, pos in self._iter_local_positions():
             if pos and pos.quantity != 0:
                 positions[symbol] = PositionState(
                     symbol=symbol,
                     quantity=pos.quantity,
-                    avg_price=pos.avg_price,
+                    avg_price=_avg_price(pos),
                     side="LONG" if pos.quantity > 0 else "SHORT",
                     timestamp=datetime.now(timezone.utc),
                     source="LOCAL"
@@ -304,6 +309,40 @@ class DriftDetector:
         
         return positions
     
+    def _iter_local_positions(self):
+        """(symbol, position) pairs from either store API (get_symbols/get_position or get_all)."""
+        store = self.position_store
+        if hasattr(store, "get_symbols") and hasattr(store, "get_position"):
+            for symbol in store.get_symbols():
+                yield symbol, store.get_position(symbol)
+        else:
+            # core.state.PositionStore
+            for pos in store.get_all():
+                yield pos.symbol, pos
+
+    def _sync_local(self, symbol: str, quantity: Optional[Decimal] = None,
+                    avg_price: Optional[Decimal] = None) -> bool:
+        """Write broker quantity / avg price into the local position."""
+        store = self.position_store
+        if quantity is not None and hasattr(store, "sync_position"):
+            store.sync_position(symbol=symbol, quantity=quantity, avg_price=avg_price)
+            return True
+        if quantity is None and hasattr(store, "update_avg_price"):
+            store.update_avg_price(symbol=symbol, new_avg_price=avg_price)
+            return True
+        # core.state.PositionStore: merge into the existing row (keeps
+        # strategy, entry_time, stops and metadata).
+        pos = store.get(symbol)
+        if pos is None:
+            return False
+        changes = {}
+        if quantity is not None:
+            changes["quantity"] = quantity
+        if avg_price is not None:
+            changes["entry_price"] = avg_price
+        store.upsert(replace(pos, **changes))
+        return True
+
     def _get_broker_positions(self) -> Dict[str, PositionState]:
         """Get broker positions from broker API."""
         positions = {}
@@ -312,11 +351,16 @@ class DriftDetector:
             broker_positions = self.broker.get_positions()
             
             for pos in broker_positions:
+                # Alpaca position (qty / avg_entry_price / side) or the
+                # connector's core.state.Position (quantity / entry_price).
+                qty = Decimal(str(getattr(pos, "qty", None) or getattr(pos, "quantity", 0)))
+                avg = getattr(pos, "avg_entry_price", None) or _avg_price(pos)
+                side = getattr(pos, "side", None) or ("LONG" if qty > 0 else "SHORT")
                 positions[pos.symbol] = PositionState(
                     symbol=pos.symbol,
-                    quantity=Decimal(str(pos.qty)),
-                    avg_price=Decimal(str(pos.avg_entry_price)),
-                    side=pos.side,
+                    quantity=qty,
+                    avg_price=Decimal(str(avg)),
+                    side=getattr(side, "value", side),
                     timestamp=datetime.now(timezone.utc),
                     source="BROKER"
                 )
@@ -467,13 +511,11 @@ class DriftDetector:
         try:
             if drift.drift_type == DriftType.QUANTITY_MISMATCH:
                 # Update local position to match broker
-                if drift.broker_state:
-                    self.position_store.sync_position(
-                        symbol=drift.symbol,
-                        quantity=drift.broker_state.quantity,
-                        avg_price=drift.broker_state.avg_price
-                    )
-                    
+                if drift.broker_state and self._sync_local(
+                    drift.symbol,
+                    quantity=drift.broker_state.quantity,
+                    avg_price=drift.broker_state.avg_price,
+                ):
                     self._auto_reconciled_count += 1
                     
                     self.logger.info(
@@ -488,12 +530,9 @@ class DriftDetector:
             
             elif drift.drift_type == DriftType.PRICE_MISMATCH:
                 # Update local price to match broker
-                if drift.broker_state:
-                    self.position_store.update_avg_price(
-                        symbol=drift.symbol,
-                        new_avg_price=drift.broker_state.avg_price
-                    )
-                    
+                if drift.broker_state and self._sync_local(
+                    drift.symbol, avg_price=drift.broker_state.avg_price
+                ):
                     self._auto_reconciled_count += 1
                     
                     self.logger.info(
@@ -3,17 +3,29 @@
 from .throttler import (
     Throttler,
     RateLimit,
+    Priority,
+    ALPACA_ROUTES,
     ExponentialBackoff,
     create_alpaca_throttler,
     create_polygon_throttler,
     create_combined_throttler
 )
+from .shared_budget import SharedRateBudget, alpaca_shared_budgets
+from .http_client import HttpClient, HttpClientError, HttpPolicy, get_http_client
 
 __all__ = [
     'Throttler',
     'RateLimit',
+    'Priority',
+    'ALPACA_ROUTES',
     'ExponentialBackoff',
     'create_alpaca_throttler',
     'create_polygon_throttler',
-    'create_combined_throttler'
+    'create_combined_throttler',
+    'SharedRateBudget',
+    'alpaca_shared_budgets',
+    'HttpClient',
+    'HttpClientError',
+    'HttpPolicy',
+    'get_http_client',
 ]
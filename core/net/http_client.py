@@ -0,0 +1,269 @@
+"""
+Shared pooled HTTP client for REST integrations.
+
+PATCH 34: scanners, UniverseBuilder and the TwelveData path of
+MarketDataPipeline called requests.get/post directly, paying a new TCP +
+TLS handshake per call. On a scan tick with 30+ requests the handshakes
+dominated.
+
+INVARIANT:
+    One process-wide client (get_http_client()) keeps per-host keep-alive
+    pools, negotiates HTTP/2 when the ``h2`` package is installed, accepts
+    gzip, and applies one timeout / retry / backoff policy. Per-host
+    latency and error metrics are exposed via get_stats().
+
+DESIGN:
+    - httpx.Client (thread-safe, pooled per origin).
+    - Retries: idempotent methods on transport errors and 429/502/503/504,
+      honouring Retry-After; other methods only on connect errors (the
+      request never left). Backoff uses ExponentialBackoff.
+    - Responses are httpx.Response, which keeps the requests surface the
+      callers use (status_code, text, json(), headers).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .throttler import ExponentialBackoff
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientError(RuntimeError):
+    """Transport failure after retries (connection, timeout, protocol)."""
+
+
+@dataclass
+class HttpPolicy:
+    """Uniform timeout / retry policy."""
+    timeout_s: float = 15.0
+    connect_timeout_s: float = 5.0
+    max_retries: int = 2
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    max_retry_after_s: float = 30.0
+    backoff: ExponentialBackoff = field(
+        default_factory=lambda: ExponentialBackoff(base=0.5, max_delay=8.0)
+    )
+
+
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_LATENCY_SAMPLES = 256
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0          # transport failures
+        self.http_errors = 0     # responses with status >= 400
+        self.last_status: Optional[int] = None
+        self.latencies_ms: deque = deque(maxlen=_LATENCY_SAMPLES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+
+        def pct(p: float) -> Optional[float]:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 2) if lat else None
+
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'http_errors': self.http_errors,
+            'last_status': self.last_status,
+            'latency_ms_avg': round(sum(lat) / len(lat), 2) if lat else None,
+            'latency_ms_p50': pct(0.50),
+            'latency_ms_p95': pct(0.95),
+            'latency_ms_max': round(lat[-1], 2) if lat else None,
+        }
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with uniform retry policy and per-host metrics.
+
+    Usage:
+        http = get_http_client()
+        r = http.get(url, headers=h, params=p, timeout=20)
+        if r.status_code != 200: ...
+        http.get_stats()["data.alpaca.markets"]["latency_ms_p95"]
+    """
+
+    def __init__(
+        self,
+        policy: Optional[HttpPolicy] = None,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        """
+        Args:
+            policy: Timeout / retry policy (default HttpPolicy())
+            max_connections: Pool cap across hosts
+            max_keepalive: Idle keep-alive connections kept open
+            http2: Force HTTP/2 on/off (default: MQD_HTTP2 and h2 installed)
+            transport: httpx transport override (tests / local stand-in server)
+        """
+        self.policy = policy or HttpPolicy()
+        if http2 is None:
+            http2 = os.getenv("MQD_HTTP2", "1").strip().lower() in ("1", "true", "yes")
+        self.http2 = bool(http2) and _h2_available()
+        self._client = httpx.Client(
+            http2=self.http2,
+            timeout=httpx.Timeout(self.policy.timeout_s, connect=self.policy.connect_timeout_s),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive),
+            headers={"Accept-Encoding": "gzip, deflate"},
+            transport=transport,
+        )
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, _HostStats] = defaultdict(_HostStats)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> httpx.Response:
+        """
+        Send a request under the policy.
+
+        Returns the final response (callers still check status_code);
+        raises HttpClientError when the transport fails on every attempt.
+        """
+        method = method.upper()
+        host = urlsplit(url).netloc or "unknown"
+        max_retries = self.policy.max_retries if retries is None else max(0, int(retries))
+        idempotent = method in _IDEMPOTENT
+        req_timeout = (
+            httpx.Timeout(timeout, connect=min(timeout, self.policy.connect_timeout_s))
+            if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                resp = self._client.request(
+                    method, url, params=params, headers=headers, json=json, data=data,
+                    timeout=req_timeout,
+                )
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                self._note(host, start, None, error=True, retry=retryable and attempt < max_retries)
+                if not retryable or attempt >= max_retries:
+                    raise HttpClientError(
+                        f"HTTP {method} {host} failed ({type(e).__name__}, connection/timeout): {e}"
+                    ) from e
+                delay = self.policy.backoff.next_delay(attempt)
+            else:
+                retry = (
+                    idempotent
+                    and resp.status_code in self.policy.retry_statuses
+                    and attempt < max_retries
+                )
+                self._note(host, start, resp.status_code, error=False, retry=retry)
+                if not retry:
+                    return resp
+                delay = self._retry_after(resp) or self.policy.backoff.next_delay(attempt)
+                resp.close()
+
+            logger.warning("HTTP %s %s retry %d in %.2fs", method, host, attempt + 1, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _retry_after(self, resp: httpx.Response) -> Optional[float]:
+        raw = resp.headers.get("Retry-After")
+        try:
+            return min(self.policy.max_retry_after_s, max(0.0, float(raw))) if raw else None
+        except ValueError:
+            return None
+
+    def _note(self, host: str, start: float, status: Optional[int], *, error: bool, retry: bool) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._stats_lock:
+            st = self._stats[host]
+            st.requests += 1
+            st.latencies_ms.append(elapsed_ms)
+            if retry:
+                st.retries += 1
+            if error:
+                st.errors += 1
+            else:
+                st.last_status = status
+                if status is not None and status >= 400:
+                    st.http_errors += 1
+
+    # ------------------------------------------------------------------
+    # Metrics / lifecycle
+    # ------------------------------------------------------------------
+
+    def get_stats(self, host: Optional[str] = None) -> Dict[str, Any]:
+        """Per-host metrics, or one host's metrics."""
+        with self._stats_lock:
+            if host is not None:
+                return self._stats[host].to_dict() if host in self._stats else {}
+            return {h: st.to_dict() for h, st in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+_shared: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide pooled client (created on first use)."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = HttpClient()
+    return _shared
+
+
+def close_http_client() -> None:
+    """Close the process-wide client (next get_http_client() makes a new one)."""
+    global _shared
+    with _shared_lock:
+        client, _shared = _shared, None
+    if client is not None:
+        client.close()
@@ -0,0 +1,315 @@
+"""
+Cross-process rate-limit budget shared by every process on the host.
+
+PATCH 33: the standalone scanner, UniverseBuilder and the trading runtime
+all call Alpaca with the same keys, and each had its own in-process limiter,
+so together they tripped 429s.
+
+INVARIANT:
+    All processes using the same API key draw from ONE budget per Alpaca
+    API (trading / data), never more than max_requests per time_window in
+    total. Foreground clients (the trading runtime) may spend every token;
+    background clients (scanner, universe builder) cannot spend the last
+    ``reserved`` tokens and split what is left fair-share among the
+    background clients active in the window.
+
+DESIGN:
+    - State lives in a small memory-mapped file: a header plus a ring of
+      ``max_requests`` slots (spend time, client id, background flag). The
+      ring is ordered oldest-first from ``head``; a slot's token is free
+      again once its spend time leaves the window.
+    - Mutations hold an exclusive file lock (fcntl / msvcrt) plus a thread
+      lock (file locks do not exclude threads sharing one descriptor).
+    - Times are time.monotonic(), which is system-wide on Linux, Windows
+      and macOS, so all processes agree. Monotonic time restarts at boot
+      while the file (under %TEMP% / /tmp) may survive, so the header keeps
+      the boot epoch (wall clock minus monotonic) and the ring is reset when
+      it moves; a slot stamped after "now" counts as expired either way.
+    - Waiting is polling with a sleep until the next token is due; there is
+      no cross-process condition variable.
+
+Enable with MQD_SHARED_RATE_BUDGET=1 (all processes on the host).
+"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .throttler import RateLimit
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MQDRATE2"
+_HEADER = struct.Struct("<8sIIdd")  # magic, capacity, head, window, boot epoch
+_SLOT = struct.Struct("<dIB3x")     # spend time, client id, background
+
+# Longest single sleep while polling for a token.
+_MAX_POLL_S = 0.25
+
+# Boot epochs further apart than this mean the monotonic clock restarted
+# (reboot); smaller drift is wall-clock adjustment.
+_BOOT_SKEW_S = 30.0
+
+
+class SharedRateBudget:
+    """
+    One rate limit shared across processes through a memory-mapped file.
+
+    Usage:
+        budget = SharedRateBudget("alpaca_data", RateLimit(200, 60.0, reserved=50),
+                                  client="scanner", background=True)
+        budget.acquire()
+        requests.get(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: RateLimit,
+        *,
+        client: str = "trading",
+        background: bool = False,
+        directory: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name: Budget file name (callers sharing a budget use the same name)
+            limit: Window and capacity; ``reserved`` tokens are foreground-only
+            client: Client label; combined with the pid for fair-share
+            background: True for scanners / batch jobs
+            directory: Where the budget file lives
+                (default MQD_RATE_BUDGET_DIR or <tmp>/mqd_rate_budget)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.name = name
+        self.limit = limit
+        self.capacity = max(1, int(limit.max_requests))
+        self.reserved = min(max(0, int(limit.reserved)), self.capacity - 1)
+        self.background = bool(background)
+        self.client = client
+        self.client_id = zlib.crc32(f"{client}:{os.getpid()}".encode()) & 0xFFFFFFFF
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        base = directory or os.getenv("MQD_RATE_BUDGET_DIR") or os.path.join(
+            tempfile.gettempdir(), "mqd_rate_budget"
+        )
+        Path(base).mkdir(parents=True, exist_ok=True)
+        self.path = os.path.join(base, f"{name}.budget")
+        self._size = _HEADER.size + self.capacity * _SLOT.size
+
+        self._fh = open(self.path, "a+b")
+        with self._locked():
+            self._fh.seek(0, os.SEEK_END)
+            if self._fh.tell() < self._size:
+                self._fh.truncate(self._size)
+            self._fh.flush()
+            self._mm = mmap.mmap(self._fh.fileno(), self._size)
+            magic, capacity, _, window, boot = _HEADER.unpack_from(self._mm, 0)
+            self._boot = time.time() - self._clock()
+            if (magic != _MAGIC or capacity != self.capacity or window != float(limit.time_window)
+                    or abs(boot - self._boot) > _BOOT_SKEW_S):
+                # New file, reconfigured limit or a reboot since the last
+                # spend: start from an empty window.
+                _HEADER.pack_into(self._mm, 0, _MAGIC, self.capacity, 0, float(limit.time_window),
+                                  self._boot)
+                for i in range(self.capacity):
+                    _SLOT.pack_into(self._mm, _HEADER.size + i * _SLOT.size, float("-inf"), 0, 0)
+            else:
+                self._boot = boot
+
+        # Statistics (this process only)
+        self.total_requests = 0
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        fd = self._fh.fileno()
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:  # pragma: no cover - Windows
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    # ------------------------------------------------------------------
+    # Ring access (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _slot(self, head: int, i: int):
+        return _SLOT.unpack_from(self._mm, _HEADER.size + ((head + i) % self.capacity) * _SLOT.size)
+
+    def _scan(self, now: float):
+        """Return (head, free tokens, in-window slots oldest-first)."""
+        head = _HEADER.unpack_from(self._mm, 0)[2]
+        window = self.limit.time_window
+        free = 0
+        while free < self.capacity and self._expired(self._slot(head, free)[0], now, window):
+            free += 1
+        used = [self._slot(head, i) for i in range(free, self.capacity)]
+        return head, free, used
+
+    @staticmethod
+    def _expired(spent: float, now: float, window: float) -> bool:
+        # A spend "in the future" comes from an earlier clock (reboot):
+        # never wait on it.
+        return spent + window <= now or spent > now
+
+    def try_acquire(self) -> Optional[float]:
+        """
+        Spend one token if allowed.
+
+        Returns None on success, otherwise seconds until a token this
+        client may spend is due.
+        """
+        with self._locked():
+            now = self._clock()
+            head, free, used = self._scan(now)
+            window = self.limit.time_window
+
+            if self.background:
+                if free <= self.reserved:
+                    # Wait until enough slots expire to leave the reserve intact.
+                    return max(0.0, used[self.reserved - free][0] + window - now)
+                active = {cid for _, cid, bg in used if bg} | {self.client_id}
+                share = max(1, (self.capacity - self.reserved) // len(active))
+                mine = [t for t, cid, bg in used if bg and cid == self.client_id]
+                if len(mine) >= share:
+                    return max(0.0, mine[0] + window - now)
+            elif free == 0:
+                return max(0.0, used[0][0] + window - now)
+
+            _SLOT.pack_into(self._mm, _HEADER.size + head * _SLOT.size,
+                            now, self.client_id, 1 if self.background else 0)
+            _HEADER.pack_into(self._mm, 0, _MAGIC, self.capacity, (head + 1) % self.capacity,
+                              float(window), self._boot)
+            self.total_requests += 1
+            return None
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Block until a token is spent.
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            TimeoutError: if ``timeout`` elapses first
+        """
+        start = time.monotonic()
+        while True:
+            delay = self.try_acquire()
+            waited = time.monotonic() - start
+            if delay is None:
+                if waited > 0.001:
+                    self.total_waits += 1
+                    self.total_wait_time += waited
+                return waited
+            if timeout is not None and waited + delay > timeout:
+                raise TimeoutError(f"Shared rate budget {self.name} exhausted")
+            time.sleep(min(max(delay, 0.001), _MAX_POLL_S))
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """Event-loop friendly acquire()."""
+        start = time.monotonic()
+        while True:
+            delay = self.try_acquire()
+            waited = time.monotonic() - start
+            if delay is None:
+                return waited
+            if timeout is not None and waited + delay > timeout:
+                raise TimeoutError(f"Shared rate budget {self.name} exhausted")
+            await asyncio.sleep(min(max(delay, 0.001), _MAX_POLL_S))
+
+    def usage(self) -> Dict:
+        """Live view of the shared window."""
+        with self._locked():
+            now = self._clock()
+            _, free, used = self._scan(now)
+        background = sum(1 for _, _, bg in used if bg)
+        return {
+            'name': self.name,
+            'capacity': self.capacity,
+            'reserved': self.reserved,
+            'in_window': len(used),
+            'free': free,
+            'foreground_in_window': len(used) - background,
+            'background_in_window': background,
+            'mine_in_window': sum(1 for _, cid, _ in used if cid == self.client_id),
+            'total_requests': self.total_requests,
+            'total_waits': self.total_waits,
+            'total_wait_time': self.total_wait_time,
+        }
+
+    def close(self) -> None:
+        try:
+            self._mm.close()
+        finally:
+            self._fh.close()
+
+
+def shared_budget_enabled() -> bool:
+    return os.getenv("MQD_SHARED_RATE_BUDGET", "0").strip().lower() in ("1", "true", "yes")
+
+
+def alpaca_shared_budgets(
+    api_key: Optional[str] = None,
+    *,
+    client: str = "trading",
+    background: bool = False,
+    directory: Optional[str] = None,
+) -> Dict[str, SharedRateBudget]:
+    """
+    Host-wide Alpaca budgets keyed like the Throttler buckets
+    ('alpaca_trading', 'alpaca_data'); empty unless MQD_SHARED_RATE_BUDGET=1.
+
+    Budgets are scoped by a hash of the API key, since Alpaca limits per key.
+    Background clients leave MQD_RATE_BUDGET_RESERVED (default 50) tokens
+    per window to the trading runtime.
+    """
+    if not shared_budget_enabled():
+        return {}
+    key = (api_key or os.getenv("ALPACA_API_KEY") or os.getenv("APCA_API_KEY_ID") or "").strip()
+    scope = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    reserved = int(os.getenv("MQD_RATE_BUDGET_RESERVED", "50") or "50")
+    budgets: Dict[str, SharedRateBudget] = {}
+    for name in ("alpaca_trading", "alpaca_data"):
+        try:
+            budgets[name] = SharedRateBudget(
+                f"{name}-{scope}", RateLimit(200, 60.0, reserved=reserved),
+                client=client, background=background, directory=directory,
+            )
+        except Exception as e:
+            # Fail open: the in-process limiter and 429 backoff still apply.
+            logger.warning("Shared rate budget %s unavailable: %s", name, e)
+    return budgets
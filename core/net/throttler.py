@@ -4,16 +4,26 @@ Rate limiting and throttling for API calls.
 Prevents account bans from rate limit violations.
 Implements exponential backoff and request queuing.
 
+PATCH 32: priority token buckets (core/net/token_bucket.py). Several limit
+ids can route onto one bucket so order submits, status polls and account
+calls share the trading budget; a burst of lower classes never delays an
+order. execute_sync() is thread-safe, execute() shares the same buckets
+without blocking the event loop, headroom()/get_stats() expose capacity.
+
 Pattern stolen from: Hummingbot async_utils.py
 """
 
 import asyncio
+import itertools
+import threading
 import time
-from collections import deque, defaultdict
+from collections import defaultdict
 from typing import Dict, Tuple, Callable, Any, Optional
 from dataclasses import dataclass
 import logging
 
+from .token_bucket import Priority, TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +32,8 @@ class RateLimit:
     """Rate limit configuration"""
     max_requests: int  # Maximum requests
     time_window: float  # Time window in seconds
-    
+    reserved: int = 0  # Tokens only Priority.ORDER may spend
+
     def __str__(self):
         return f"{self.max_requests} requests per {self.time_window}s"
 
@@ -38,28 +49,49 @@ class Throttler:
     
     Usage:
         throttler = Throttler({
-            'alpaca_orders': RateLimit(200, 60.0),  # 200/min
+            'alpaca_trading': RateLimit(200, 60.0, reserved=20),
             'polygon_data': RateLimit(5, 1.0),      # 5/sec
+        }, routes={
+            'alpaca_orders': ('alpaca_trading', Priority.ORDER),
+            'alpaca_status': ('alpaca_trading', Priority.STATUS),
         })
         
         # Wrap calls:
-        result = await throttler.execute(
+        result = throttler.execute_sync(
             'alpaca_orders',
             broker.submit_order,
             symbol='SPY', qty=10
         )
     """
     
-    def __init__(self, rate_limits: Dict[str, RateLimit]):
+    def __init__(
+        self,
+        rate_limits: Dict[str, RateLimit],
+        routes: Optional[Dict[str, Tuple[str, int]]] = None,
+        default_priority: int = Priority.DATA,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[Dict[str, Any]] = None,
+    ):
         """
         Args:
-            rate_limits: Dict mapping limit_id to RateLimit config
+            rate_limits: Dict mapping bucket id to RateLimit config
+            routes: Optional limit_id -> (bucket_id, priority). Limit ids
+                not routed use their own bucket at default_priority.
+            default_priority: Priority for unrouted limit ids
+            clock: Monotonic clock (injectable for tests)
+            shared: Optional bucket_id -> SharedRateBudget (host-wide)
         """
         self._rate_limits = rate_limits
-        self._request_times: Dict[str, deque] = defaultdict(deque)
-        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._routes: Dict[str, Tuple[str, int]] = dict(routes or {})
+        self._default_priority = int(default_priority)
+        self._buckets: Dict[str, TokenBucket] = {
+            bucket_id: TokenBucket(limit, clock, (shared or {}).get(bucket_id))
+            for bucket_id, limit in rate_limits.items()
+        }
+        self._seq = itertools.count()
+        self._stats_lock = threading.Lock()
         
-        # Statistics
+        # Statistics (per limit_id)
         self._total_requests: Dict[str, int] = defaultdict(int)
         self._total_waits: Dict[str, int] = defaultdict(int)
         self._total_wait_time: Dict[str, float] = defaultdict(float)
@@ -67,6 +99,53 @@ class Throttler:
         logger.info(f"Throttler initialized with {len(rate_limits)} limits")
         for limit_id, limit in rate_limits.items():
             logger.info(f"  {limit_id}: {limit}")
+
+    def _route(self, limit_id: str) -> Tuple[Optional[TokenBucket], int]:
+        bucket_id, priority = self._routes.get(limit_id, (limit_id, self._default_priority))
+        return self._buckets.get(bucket_id), int(priority)
+
+    def _record(self, limit_id: str, waited: float) -> None:
+        with self._stats_lock:
+            self._total_requests[limit_id] += 1
+            if waited > 0:
+                self._total_waits[limit_id] += 1
+                self._total_wait_time[limit_id] += waited
+
+    def acquire(self, limit_id: str, priority: Optional[int] = None) -> float:
+        """
+        Block (thread-safe) until a token for ``limit_id`` is available.
+
+        Args:
+            limit_id: Limit identifier (bucket id or routed alias)
+            priority: Override the route's priority class
+
+        Returns:
+            Seconds waited (0 if a token was free)
+        """
+        bucket, route_priority = self._route(limit_id)
+        if bucket is None:
+            # No limit defined, allow immediately
+            self._record(limit_id, 0.0)
+            return 0.0
+
+        waited = bucket.acquire(
+            int(route_priority if priority is None else priority), next(self._seq), limit_id
+        )
+        self._record(limit_id, waited)
+        return waited
+
+    async def acquire_async(self, limit_id: str, priority: Optional[int] = None) -> float:
+        """Event-loop friendly acquire() sharing the same buckets and queue."""
+        bucket, route_priority = self._route(limit_id)
+        if bucket is None:
+            self._record(limit_id, 0.0)
+            return 0.0
+
+        waited = await bucket.acquire_async(
+            int(route_priority if priority is None else priority), next(self._seq)
+        )
+        self._record(limit_id, waited)
+        return waited
     
     async def execute(
         self,
@@ -90,73 +169,53 @@ class Throttler:
         Raises:
             Exception from func if it fails
         """
-        async with self._locks[limit_id]:
-            # Wait if needed
-            wait_time = await self._wait_if_needed(limit_id)
-            
-            # Record this request
-            now = time.time()
-            self._request_times[limit_id].append(now)
-            self._total_requests[limit_id] += 1
-            
-            # Execute function
-            try:
-                if asyncio.iscoroutinefunction(func):
-                    return await func(*args, **kwargs)
-                else:
-                    return func(*args, **kwargs)
-            except Exception as e:
-                logger.error(
-                    f"Throttled call failed: {limit_id}",
-                    extra={'error': str(e), 'func': func.__name__}
-                )
-                raise
-    
-    async def _wait_if_needed(self, limit_id: str) -> float:
+        await self.acquire_async(limit_id)
+        try:
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            else:
+                return func(*args, **kwargs)
+        except Exception as e:
+            logger.error(
+                f"Throttled call failed: {limit_id}",
+                extra={'error': str(e), 'func': getattr(func, '__name__', repr(func))}
+            )
+            raise
+
+    def execute_sync(
+        self,
+        limit_id: str,
+        func: Callable,
+        *args,
+        **kwargs,
+    ) -> Any:
         """
-        Wait if at rate limit.
-        
-        Returns:
-            Time waited in seconds (0 if no wait)
+        Synchronous version of execute() for callers that are not async.
+
+        Thread-safe: concurrent callers queue on the bucket by priority and
+        block (Condition.wait) until a token is available.
         """
-        if limit_id not in self._rate_limits:
-            # No limit defined, allow immediately
-            return 0.0
-        
-        limit = self._rate_limits[limit_id]
-        request_times = self._request_times[limit_id]
-        
-        # Remove old requests outside time window
-        now = time.time()
-        cutoff_time = now - limit.time_window
-        
-        while request_times and request_times[0] < cutoff_time:
-            request_times.popleft()
-        
-        # Check if at limit
-        if len(request_times) >= limit.max_requests:
-            # Calculate wait time
-            oldest_request = request_times[0]
-            wait_time = (oldest_request + limit.time_window) - now
-            
-            if wait_time > 0:
-                logger.warning(
-                    f"Rate limit reached for {limit_id}, waiting {wait_time:.2f}s",
-                    extra={
-                        'limit_id': limit_id,
-                        'wait_time': wait_time,
-                        'limit': str(limit),
-                        'current_requests': len(request_times)
-                    }
-                )
-                
-                self._total_waits[limit_id] += 1
-                self._total_wait_time[limit_id] += wait_time
-                
-                await asyncio.sleep(wait_time)
-                return wait_time
-        
-        return 0.0
+        self.acquire(limit_id)
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            logger.error(
+                "Throttled call failed: %s", limit_id,
+                extra={"error": str(e)},
+            )
+            raise
+
+    def headroom(self, limit_id: Optional[str] = None) -> Any:
+        """
+        Tokens spendable right now by ``limit_id``'s priority class, or a
+        dict of every bucket at Priority.ORDER when limit_id is None.
+        """
+        if limit_id is None:
+            return {b_id: b.headroom(Priority.ORDER) for b_id, b in self._buckets.items()}
+        bucket, priority = self._route(limit_id)
+        if bucket is None:
+            return None
+        return bucket.headroom(priority)
     
     def get_stats(self, limit_id: Optional[str] = None) -> Dict:
         """
@@ -169,80 +228,47 @@ class Throttler:
             Statistics dict
         """
         if limit_id:
+            bucket, priority = self._route(limit_id)
+            bucket_id = self._routes.get(limit_id, (limit_id,))[0]
+            in_window = waiting = 0
+            headroom = None
+            if bucket is not None:
+                with bucket.cond:
+                    in_window = bucket.in_window()
+                    waiting = bucket.waiting()
+                    headroom = bucket.available(priority)
+            with self._stats_lock:
+                total_waits = self._total_waits[limit_id]
+                total_wait_time = self._total_wait_time[limit_id]
+                total_requests = self._total_requests[limit_id]
             return {
                 'limit_id': limit_id,
-                'limit': str(self._rate_limits.get(limit_id, 'No limit')),
-                'total_requests': self._total_requests[limit_id],
-                'total_waits': self._total_waits[limit_id],
-                'total_wait_time': self._total_wait_time[limit_id],
-                'avg_wait_time': (
-                    self._total_wait_time[limit_id] / self._total_waits[limit_id]
-                    if self._total_waits[limit_id] > 0
-                    else 0.0
-                ),
-                'current_window_requests': len(self._request_times[limit_id])
+                'bucket': bucket_id,
+                'priority': Priority(priority).name,
+                'limit': str(self._rate_limits.get(bucket_id, 'No limit')),
+                'total_requests': total_requests,
+                'total_waits': total_waits,
+                'total_wait_time': total_wait_time,
+                'avg_wait_time': total_wait_time / total_waits if total_waits > 0 else 0.0,
+                'current_window_requests': in_window,
+                'headroom': headroom,
+                'waiting': waiting,
             }
         else:
+            limit_ids = list(self._rate_limits.keys()) + [
+                r for r in self._routes if r not in self._rate_limits
+            ]
             return {
                 limit_id: self.get_stats(limit_id)
-                for limit_id in self._rate_limits.keys()
+                for limit_id in limit_ids
             }
     
     def reset_stats(self):
         """Reset all statistics"""
-        self._total_requests.clear()
-        self._total_waits.clear()
-        self._total_wait_time.clear()
-
-    def execute_sync(
-        self,
-        limit_id: str,
-        func: Callable,
-        *args,
-        **kwargs,
-    ) -> Any:
-        """
-        Synchronous version of execute() for callers that are not async.
-
-        Records the request against the rate-limit window and executes *func*
-        synchronously.  If the window is full the call blocks (via time.sleep)
-        until a slot opens — exactly like the async path but without asyncio.
-        """
-        # Wait if rate-limited
-        if limit_id in self._rate_limits:
-            limit = self._rate_limits[limit_id]
-            request_times = self._request_times[limit_id]
-
-            now = time.time()
-            cutoff = now - limit.time_window
-            while request_times and request_times[0] < cutoff:
-                request_times.popleft()
-
-            if len(request_times) >= limit.max_requests:
-                oldest = request_times[0]
-                wait = (oldest + limit.time_window) - now
-                if wait > 0:
-                    logger.warning(
-                        "Rate limit reached for %s, waiting %.2fs (sync)",
-                        limit_id, wait,
-                    )
-                    self._total_waits[limit_id] += 1
-                    self._total_wait_time[limit_id] += wait
-                    time.sleep(wait)
-
-        # Record request
-        self._request_times[limit_id].append(time.time())
-        self._total_requests[limit_id] += 1
-
-        # Execute
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            logger.error(
-                "Throttled call failed: %s", limit_id,
-                extra={"error": str(e)},
-            )
-            raise
+        with self._stats_lock:
+            self._total_requests.clear()
+            self._total_waits.clear()
+            self._total_wait_time.clear()
 
 
 class ExponentialBackoff:
@@ -304,20 +330,31 @@ class ExponentialBackoff:
 
 
 # Pre-configured throttlers for common services
+
+# Alpaca's trading API budget is per account across orders, status polls and
+# account calls; market data has its own budget shared with news.
+ALPACA_ROUTES: Dict[str, Tuple[str, int]] = {
+    'alpaca_orders': ('alpaca_trading', Priority.ORDER),
+    'alpaca_status': ('alpaca_trading', Priority.STATUS),
+    'alpaca_account': ('alpaca_trading', Priority.STATUS),
+    'alpaca_data': ('alpaca_data', Priority.DATA),
+    'alpaca_news': ('alpaca_data', Priority.NEWS),
+}
+
+
 def create_alpaca_throttler() -> Throttler:
     """
     Create throttler for Alpaca API.
     
     Alpaca limits:
-    - Orders: 200 requests/minute
+    - Trading (orders, status, account): 200 requests/minute, 20 reserved
+      for order submits/cancels
     - Data: 200 requests/minute
-    - Account: 200 requests/minute
     """
     return Throttler({
-        'alpaca_orders': RateLimit(200, 60.0),
+        'alpaca_trading': RateLimit(200, 60.0, reserved=20),
         'alpaca_data': RateLimit(200, 60.0),
-        'alpaca_account': RateLimit(200, 60.0),
-    })
+    }, routes=ALPACA_ROUTES)
 
 
 def create_polygon_throttler() -> Throttler:
@@ -334,15 +371,17 @@ def create_polygon_throttler() -> Throttler:
     })
 
 
-def create_combined_throttler() -> Throttler:
+def create_combined_throttler(shared: Optional[Dict[str, Any]] = None) -> Throttler:
     """
     Create throttler combining all services.
+
+    Args:
+        shared: Optional host-wide budgets (core.net.shared_budget)
     """
     return Throttler({
-        # Alpaca
-        'alpaca_orders': RateLimit(200, 60.0),
+        # Alpaca (see ALPACA_ROUTES)
+        'alpaca_trading': RateLimit(200, 60.0, reserved=20),
         'alpaca_data': RateLimit(200, 60.0),
-        'alpaca_account': RateLimit(200, 60.0),
         
         # Polygon
         'polygon_bars': RateLimit(5, 1.0),
@@ -357,4 +396,4 @@ def create_combined_throttler() -> Throttler:
         
         # Financial Modeling Prep
         'fmp': RateLimit(250, 86400.0),  # 250/day free tier
-    })
+    }, routes=ALPACA_ROUTES, shared=shared)
@@ -0,0 +1,186 @@
+"""
+Priority token bucket used by core.net.throttler.
+
+PATCH 32:
+    - A bucket holds max_requests tokens; a spent token comes back exactly
+      time_window after it was spent, so a bucket never admits more than the
+      broker's window allows (a continuously refilling bucket could admit up
+      to 2x in one window and trip 429s). Take/return is amortized O(1).
+    - Waiters queue in a heap by (priority, arrival): ORDER > STATUS > DATA
+      > NEWS, FIFO within a class. Only the head of the queue may take; a
+      waiter that is cancelled or raises removes its ticket on the way out.
+    - RateLimit.reserved tokens can only be spent by Priority.ORDER.
+"""
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request classes, served lowest value first."""
+    ORDER = 0    # submit / cancel / replace
+    STATUS = 1   # order status polls, account, positions
+    DATA = 2     # market data refreshes
+    NEWS = 3     # news / reference data
+
+
+class TokenBucket:
+    """
+    Token bucket for one rate limit. All state is guarded by ``cond``.
+
+    Spent tokens are kept as a monotonic deque of spend times (bounded by
+    max_requests); a token returns when its spend time leaves the window.
+    """
+
+    def __init__(self, limit: "RateLimit", clock: Callable[[], float], shared=None):
+        self.limit = limit
+        # PATCH 33: optional host-wide budget (SharedRateBudget) spent after
+        # the local token, so the in-process priority order still applies.
+        self.shared = shared
+        self.capacity = max(1, int(limit.max_requests))
+        self.reserved = min(max(0, int(limit.reserved)), self.capacity - 1)
+        self._clock = clock
+        self._spent: deque = deque()
+        self._waiters: list = []  # heap of (priority, seq)
+        self.cond = threading.Condition(threading.Lock())
+
+    # -- caller holds cond --------------------------------------------------
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.limit.time_window
+        spent = self._spent
+        while spent and spent[0] <= cutoff:
+            spent.popleft()
+
+    def available(self, priority: int) -> int:
+        self._expire(self._clock())
+        free = self.capacity - len(self._spent)
+        if priority > Priority.ORDER:
+            free -= self.reserved
+        return max(0, free)
+
+    def headroom(self, priority: int) -> int:
+        with self.cond:
+            return self.available(priority)
+
+    def in_window(self) -> int:
+        self._expire(self._clock())
+        return len(self._spent)
+
+    def try_take(self, ticket: Tuple[int, int]) -> Optional[float]:
+        """
+        Spend a token for ``ticket`` if it is first in line.
+
+        Returns None on success, otherwise seconds until the state can next
+        change (a token returning), or a short re-check if nothing is due.
+        """
+        now = self._clock()
+        self._expire(now)
+        if self._waiters[0] == ticket and self.available(ticket[0]) > 0:
+            heapq.heappop(self._waiters)
+            self._spent.append(now)
+            self.cond.notify_all()
+            return None
+        if self._spent:
+            return max(0.0, self._spent[0] + self.limit.time_window - now)
+        return 0.05
+
+    def enqueue(self, ticket: Tuple[int, int]) -> None:
+        heapq.heappush(self._waiters, ticket)
+
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def abandon(self, ticket: Tuple[int, int]) -> None:
+        """Drop a ticket that will never take (cancelled / raised) so it can't block the line."""
+        try:
+            self._waiters.remove(ticket)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+        self.cond.notify_all()
+
+    # -- blocking / async acquire -------------------------------------------
+
+    def acquire(self, priority: int, seq: int, label: str = "") -> float:
+        """Block until a token is taken; returns seconds waited."""
+        ticket = (priority, seq)
+        start = time.monotonic()
+        waited = False
+        with self.cond:
+            self.enqueue(ticket)
+            taken = False
+            try:
+                while True:
+                    delay = self.try_take(ticket)
+                    if delay is None:
+                        taken = True
+                        break
+                    if not waited and delay > 0:
+                        logger.warning(
+                            "Rate limit reached for %s, waiting (%d queued)",
+                            label, self.waiting(),
+                        )
+                    waited = True
+                    self.cond.wait(timeout=delay if delay > 0 else 0.05)
+            finally:
+                if not taken:
+                    self.abandon(ticket)
+        if self.shared is not None:
+            try:
+                self.shared.acquire(timeout=self._shared_timeout())
+            except TimeoutError as e:
+                self._shared_fail_open(e)
+            waited = waited or time.monotonic() - start > 0.001
+        return time.monotonic() - start if waited else 0.0
+
+    def _shared_timeout(self) -> float:
+        # A healthy host-wide budget frees a token within one window.
+        limit = getattr(self.shared, "limit", None)
+        return float(getattr(limit, "time_window", None) or self.limit.time_window)
+
+    def _shared_fail_open(self, error: BaseException) -> None:
+        # Fail open: the local token is already spent and 429 backoff still
+        # applies; a wedged shared file must never stall orders.
+        logger.warning("Shared rate budget wait exceeded, continuing on the local limit: %s", error)
+
+    async def acquire_async(self, priority: int, seq: int) -> float:
+        """Event-loop friendly acquire(); shares the same queue."""
+        ticket = (priority, seq)
+        start = time.monotonic()
+        waited = False
+        with self.cond:
+            self.enqueue(ticket)
+        taken = False
+        try:
+            while True:
+                with self.cond:
+                    delay = self.try_take(ticket)
+                if delay is None:
+                    taken = True
+                    break
+                waited = True
+                # Not woken by the Condition: re-check at the next token return,
+                # or shortly while others are ahead in line.
+                await asyncio.sleep(min(delay, 0.05) if delay > 0 else 0.005)
+        finally:
+            # A cancelled waiter must leave the queue, or everyone behind it
+            # waits forever for a ticket that will never take.
+            if not taken:
+                with self.cond:
+                    self.abandon(ticket)
+        if self.shared is not None:
+            try:
+                await self.shared.acquire_async(timeout=self._shared_timeout())
+            except TimeoutError as e:
+                self._shared_fail_open(e)
+            waited = waited or time.monotonic() - start > 0.001
+        return time.monotonic() - start if waited else 0.0
@@ -12,6 +12,7 @@ Pattern stolen from: Hummingbot user_stream_tracker.py
 
 import asyncio
 import json
+import os
 from typing import Optional, Dict, Callable, List
 from datetime import datetime, timezone
 from enum import Enum
@@ -66,20 +67,27 @@ class UserStreamTracker:
         self,
         api_key: str,
         api_secret: str,
-        is_paper: bool = True
+        is_paper: bool = True,
+        stream_url: Optional[str] = None
     ):
         """
         Args:
             api_key: Alpaca API key
             api_secret: Alpaca API secret
             is_paper: True for paper trading, False for live
+            stream_url: Override the stream endpoint (default
+                MQD_ALPACA_STREAM_URL, else Alpaca paper/live)
         """
         self._api_key = api_key
         self._api_secret = api_secret
         self._is_paper = is_paper
         
         # WebSocket URL
-        if is_paper:
+        # PATCH 35: overridable so the local Alpaca stand-in can be used
+        override = stream_url or os.getenv("MQD_ALPACA_STREAM_URL", "").strip()
+        if override:
+            self._ws_url = override
+        elif is_paper:
             self._ws_url = "wss://paper-api.alpaca.markets/stream"
         else:
             self._ws_url = "wss://api.alpaca.markets/stream"
@@ -241,12 +249,30 @@ class UserStreamTracker:
         response = await self._ws.recv()
         response_data = json.loads(response)
         
-        if response_data[0].get('T') == 'success' and response_data[0].get('msg') == 'authenticated':
+        if self._is_authorized(response_data):
             logger.info("Successfully authenticated")
         else:
             logger.error(f"Authentication failed: {response_data}")
             raise Exception("Authentication failed")
     
+    @staticmethod
+    def _is_authorized(response_data) -> bool:
+        """
+        PATCH 35: the trading stream answers auth with a single object
+        {"stream": "authorization", "data": {"status": "authorized"}}; the
+        market-data style [{"T": "success", "msg": "authenticated"}] is
+        still accepted.
+        """
+        items = response_data if isinstance(response_data, list) else [response_data]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if item.get('stream') == 'authorization':
+                return (item.get('data') or {}).get('status') == 'authorized'
+            if item.get('T') == 'success' and item.get('msg') == 'authenticated':
+                return True
+        return False
+
     async def _subscribe(self):
         """Subscribe to trade and account updates"""
         subscribe_msg = {
@@ -308,8 +334,11 @@ class UserStreamTracker:
         """
         Handle incoming WebSocket message.
         
-        Alpaca sends messages as array of objects.
+        The trading stream sends one object per frame (binary frames);
+        arrays of objects are also accepted.
         """
+        if isinstance(data, dict):
+            data = [data]
         for item in data:
             msg_type = item.get('stream')
             
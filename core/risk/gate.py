@@ -18,12 +18,19 @@ CHECKS PERFORMED:
 
 This is the LAST LINE OF DEFENSE before capital deployment.
 Based on LEAN's PreTradeFilter with enhanced safety.
+
+DECISION DELIVERY:
+Each queued job carries a Future; the caller blocks on it and wakes the
+moment the worker decides (no polling floor). submit_batch() evaluates a
+whole cycle's requests in one worker pass against a single exposure
+snapshot, with earlier approvals in the batch counted against later ones.
 """
 
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
 from decimal import Decimal
-from typing import Optional, Tuple, Dict, Set
+from typing import List, Optional, Tuple, Dict, Set
 from queue import Queue, Empty
-from threading import Thread, Lock, Event
+from threading import Thread, RLock, Event
 from datetime import datetime, timezone, date
 import logging
 
@@ -89,6 +96,26 @@ class GateDecision:
         self.timestamp = datetime.now(timezone.utc)
 
 
+class _GateJob:
+    """Requests evaluated together; the future resolves to their decisions."""
+
+    __slots__ = ("requests", "future")
+
+    def __init__(self, requests: List[OrderRequest]):
+        self.requests = requests
+        self.future: Future = Future()
+
+
+class _ExposureSnapshot:
+    """Exposure and loss-limit state shared by one evaluation pass."""
+
+    __slots__ = ("exposure", "daily_loss_breached")
+
+    def __init__(self, exposure: Decimal, daily_loss_breached: bool):
+        self.exposure = exposure
+        self.daily_loss_breached = daily_loss_breached
+
+
 # ============================================================================
 # PRE-TRADE RISK GATE
 # ============================================================================
@@ -115,6 +142,9 @@ class PreTradeRiskGate:
         # Submit order for validation
         request = OrderRequest(...)
         decision = gate.submit_order(request, timeout=5.0)
+
+        # Or a whole cycle's orders against one exposure snapshot
+        decisions = gate.submit_batch([req_a, req_b], timeout=5.0)
         
         if decision.approved:
             # Submit to broker
@@ -151,9 +181,10 @@ class PreTradeRiskGate:
         self.max_orders_per_day = max_orders_per_day
         self._protections = protections  # NEW
         
-        # Queue for order requests
-        self._request_queue: Queue[OrderRequest] = Queue()
-        self._decision_map: dict[str, GateDecision] = {}
+        # Queue of jobs; each job's Future delivers its decisions
+        self._request_queue: Queue[_GateJob] = Queue()
+        self._decisions_made = 0
+        self._batches_evaluated = 0
         
         # State tracking
         self._active_positions: dict[str, Decimal] = {}  # symbol → notional
@@ -169,7 +200,7 @@ class PreTradeRiskGate:
         self._last_reset_date: date = datetime.now(timezone.utc).date()
         
         # Threading
-        self._lock = Lock()
+        self._lock = RLock()  # evaluate_batch may auto-reset daily counters
         self._worker_thread: Optional[Thread] = None
         self._shutdown_event = Event()
         self._running = False
@@ -227,6 +258,19 @@ class PreTradeRiskGate:
         if self._worker_thread:
             self._worker_thread.join(timeout=5.0)
 
+        # Fail closed for anything still queued so callers don't sit out
+        # their timeout.
+        while True:
+            try:
+                job = self._request_queue.get_nowait()
+            except Empty:
+                break
+            if job.future.set_running_or_notify_cancel():
+                job.future.set_result([
+                    GateDecision(order_id=r.order_id, approved=False, rejection_reason="Risk gate stopped")
+                    for r in job.requests
+                ])
+
         logger.info("[RISK_GATE] Stopped")
 
     # ========================================================================
@@ -251,30 +295,57 @@ class PreTradeRiskGate:
                 rejection_reason="Async risk gate disabled/not running (Phase 1 containment)"
             )
 
-        # Submit to queue
-        self._request_queue.put(request)
+        return self._submit_job([request], timeout)[0]
 
-        # Wait for decision (polling with timeout)
-        start_time = datetime.now(timezone.utc)
-        while True:
-            with self._lock:
-                decision = self._decision_map.get(request.order_id)
-                if decision:
-                    del self._decision_map[request.order_id]
-                    return decision
-
-            elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
-            if elapsed > timeout:
-                logger.error(f"[RISK_GATE] Timeout waiting for decision on {request.order_id}")
-                return GateDecision(
-                    order_id=request.order_id,
+    def submit_batch(
+        self,
+        requests: List[OrderRequest],
+        timeout: float = 5.0
+    ) -> List[GateDecision]:
+        """
+        Evaluate several requests in one worker pass (one per cycle).
+
+        All requests see the same exposure snapshot; each approval is added
+        to it before the next request is checked. Decisions are returned in
+        request order. Fails closed like submit_order().
+        """
+        if not requests:
+            return []
+        if not self._running:
+            return [
+                GateDecision(
+                    order_id=r.order_id,
+                    approved=False,
+                    rejection_reason="Async risk gate disabled/not running (Phase 1 containment)"
+                )
+                for r in requests
+            ]
+        return self._submit_job(list(requests), timeout)
+
+    def _submit_job(self, requests: List[OrderRequest], timeout: float) -> List[GateDecision]:
+        job = _GateJob(requests)
+        self._request_queue.put(job)
+        try:
+            return job.future.result(timeout=timeout)
+        except (FutureTimeout, CancelledError):
+            # Not yet picked up -> cancel so it is never evaluated. Already
+            # being evaluated -> take the decision rather than discard an
+            # approval the gate has already counted.
+            if not job.future.cancel():
+                try:
+                    return job.future.result(timeout=1.0)
+                except Exception:
+                    pass
+            ids = ", ".join(r.order_id for r in requests)
+            logger.error(f"[RISK_GATE] Timeout waiting for decision on {ids}")
+            return [
+                GateDecision(
+                    order_id=r.order_id,
                     approved=False,
                     rejection_reason=f"Risk gate timeout after {timeout}s"
                 )
-
-            # Avoid allocating Event() repeatedly; keep it simple.
-            import time as _time
-            _time.sleep(0.1)
+                for r in requests
+            ]
 
     # ========================================================================
     # WORKER THREAD
@@ -286,33 +357,38 @@ class PreTradeRiskGate:
         
         while not self._shutdown_event.is_set():
             try:
-                # Get request with timeout (allows checking shutdown)
-                request = self._request_queue.get(timeout=0.5)
-                
-                # Process request
-                decision = self._evaluate_order(request)
-                
-                # Store decision
-                with self._lock:
-                    self._decision_map[request.order_id] = decision
-                
-                # Log decision
-                if decision.approved:
-                    logger.info(
-                        f"[RISK_GATE] ✓ APPROVED: {request.order_id} "
-                        f"{request.side} {request.quantity} {request.symbol} @ ${request.current_price}"
-                    )
-                else:
-                    logger.warning(
-                        f"[RISK_GATE] ✗ REJECTED: {request.order_id} - "
-                        f"{decision.rejection_reason}"
-                    )
-                
+                # Get job with timeout (allows checking shutdown)
+                job = self._request_queue.get(timeout=0.5)
             except Empty:
                 # No requests, continue loop
                 continue
+
+            # Caller already timed out and cancelled: never evaluate.
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                decisions = self.evaluate_batch(job.requests)
+                job.future.set_result(decisions)
+
+                for request, decision in zip(job.requests, decisions):
+                    if decision.approved:
+                        logger.info(
+                            f"[RISK_GATE] ✓ APPROVED: {request.order_id} "
+                            f"{request.side} {request.quantity} {request.symbol} @ ${request.current_price}"
+                        )
+                    else:
+                        logger.warning(
+                            f"[RISK_GATE] ✗ REJECTED: {request.order_id} - "
+                            f"{decision.rejection_reason}"
+                        )
             except Exception as e:
                 logger.error(f"[RISK_GATE] Error processing request: {e}", exc_info=True)
+                if not job.future.done():
+                    job.future.set_result([
+                        GateDecision(order_id=r.order_id, approved=False, rejection_reason=f"Risk gate error: {e}")
+                        for r in job.requests
+                    ])
         
         logger.info("[RISK_GATE] Worker thread stopped")
     
@@ -320,17 +396,49 @@ class PreTradeRiskGate:
     # RISK EVALUATION (ATOMIC)
     # ========================================================================
     
-    def _evaluate_order(self, request: OrderRequest) -> GateDecision:
+    def evaluate_batch(self, requests: List[OrderRequest]) -> List[GateDecision]:
+        """
+        Evaluate requests in order against one exposure snapshot.
+
+        Called on the worker thread; holds the gate lock for the pass so
+        position/account updates cannot interleave with the checks.
+        """
+        with self._lock:
+            self._check_and_reset_daily_counters()
+            snapshot = _ExposureSnapshot(
+                exposure=self._calculate_total_exposure(),
+                daily_loss_breached=self.limits_tracker.is_daily_loss_limit_breached(),
+            )
+            decisions = [self._evaluate_order(r, snapshot) for r in requests]
+            self._decisions_made += len(decisions)
+            self._batches_evaluated += 1
+            return decisions
+
+    def _evaluate_order(
+        self,
+        request: OrderRequest,
+        snapshot: Optional[_ExposureSnapshot] = None
+    ) -> GateDecision:
         """
         Evaluate order against ALL risk checks.
         
         This is the CRITICAL function - atomic evaluation of ALL checks.
         
+        Args:
+            request: Order request
+            snapshot: Shared exposure snapshot (batch pass); built fresh
+                when omitted. Approved notional is added to it.
+        
         Returns:
             GateDecision (approved=True only if ALL checks pass)
         """
-        # PATCH 2: Auto-reset daily counters if new trading day
-        self._check_and_reset_daily_counters()
+        if snapshot is None:
+            # PATCH 2: Auto-reset daily counters if new trading day
+            self._check_and_reset_daily_counters()
+            snapshot = _ExposureSnapshot(
+                exposure=self._calculate_total_exposure(),
+                daily_loss_breached=self.limits_tracker.is_daily_loss_limit_breached(),
+            )
         
         checks_passed = {}
         
@@ -361,7 +469,7 @@ class PreTradeRiskGate:
         # ====================================================================
         # CHECK 1: Daily Loss Limit
         # ====================================================================
-        if self.limits_tracker.is_daily_loss_limit_breached():
+        if snapshot.daily_loss_breached:
             return GateDecision(
                 order_id=request.order_id,
                 approved=False,
@@ -413,7 +521,7 @@ class PreTradeRiskGate:
         # ====================================================================
         # CHECK 5: Notional Exposure Limit
         # ====================================================================
-        current_exposure = self._calculate_total_exposure()
+        current_exposure = snapshot.exposure
         current_exposure_pct = calculate_exposure_pct(current_exposure, self.account_value)
         
         if not self.limits_tracker.is_notional_exposure_allowed(
@@ -483,6 +591,7 @@ class PreTradeRiskGate:
         self._pending_orders.add(request.order_id)
         self._order_count_today += 1
         self._submitted_orders_today.add(request.order_id)
+        snapshot.exposure += request.notional
         
         return GateDecision(
             order_id=request.order_id,
@@ -570,6 +679,8 @@ class PreTradeRiskGate:
                 'total_exposure': str(total_exposure),
                 'exposure_pct': str(exposure_pct),
                 'orders_today': self._order_count_today,
+                'decisions_made': self._decisions_made,
+                'batches_evaluated': self._batches_evaluated,
                 'account_value': str(self.account_value),
                 'daily_loss_limit_breached': self.limits_tracker.is_daily_loss_limit_breached()
             }
@@ -3,17 +3,26 @@ Persistent Risk Limits Tracker - SQLite-backed daily limits.
 
 CRITICAL RULES:
 1. Daily loss limit persists across restarts
-2. P&L tracked in SQLite (NOT in-memory)
+2. P&L persisted in SQLite (in-memory ledger is write-through only)
 3. Reset happens ONLY on new trading day
 4. Thread-safe (lock on all mutations)
 5. Fail-safe: If DB unavailable, BLOCK all trading
 
 Prevents circumventing loss limits via restart.
 Based on QuantConnect's daily loss limit pattern.
+
+PATCH 40: today's P&L / trade count live in an in-memory ledger loaded
+from SQLite at startup and on day rollover, so the pre-trade checks are
+attribute reads instead of a connect + query. Every update is committed
+(one persistent connection) BEFORE the ledger changes, so the ledger is
+never ahead of disk except after a failed write -- which counts as a
+breach until a later write succeeds (rule 5). One writer process per
+limits DB is assumed (the ledger does not watch for other writers).
 """
 
 import sqlite3
-from datetime import datetime, timezone, date
+import time
+from datetime import datetime, timezone, date, timedelta
 from decimal import Decimal
 from threading import Lock
 from pathlib import Path
@@ -77,12 +86,22 @@ class PersistentLimitsTracker:
         self.max_notional_exposure = max_notional_exposure
         
         self._lock = Lock()
+
+        # PATCH 40: persistent connection + in-memory ledger for today
+        self._conn: Optional[sqlite3.Connection] = None
+        self._day: str = ""
+        self._day_end_ts: float = 0.0      # epoch seconds of the next local midnight
+        self._pnl: Decimal = Decimal('0')
+        self._trade_count: int = 0
+        self._write_failed: bool = False   # ledger ahead of disk -> fail closed
         
         # Initialize database
         self._init_db()
         
         # Auto-reset if new day
         self._check_and_reset_if_new_day()
+        with self._lock:
+            self._load_day()
         
         logger.info(
             f"PersistentLimitsTracker initialized "
@@ -95,9 +114,27 @@ class PersistentLimitsTracker:
     # DATABASE INITIALIZATION
     # ========================================================================
     
+    def _db(self) -> sqlite3.Connection:
+        """The persistent connection (reopened after close()). Caller holds _lock or is __init__."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")  # every commit is durable
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the persistent connection (the next write reopens it)."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                finally:
+                    self._conn = None
+
     def _init_db(self) -> None:
         """Initialize SQLite schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._db() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS daily_pnl (
                     trading_date TEXT PRIMARY KEY,
@@ -123,8 +160,6 @@ class PersistentLimitsTracker:
                 VALUES (?, ?, ?)
             """, ('daily_loss_limit', str(self.daily_loss_limit), now))
             
-            conn.commit()
-            
         logger.info(f"Limits database initialized: {self.db_path}")
     
     # ========================================================================
@@ -138,17 +173,17 @@ class PersistentLimitsTracker:
         Returns:
             True if limit breached, trading should STOP
         """
-        with self._lock:
-            current_pnl = self.get_daily_realized_pnl()
-            is_breached = current_pnl <= -self.daily_loss_limit
-            
-            if is_breached:
-                logger.error(
-                    f"DAILY LOSS LIMIT BREACHED: "
-                    f"PnL=${current_pnl} <= limit=-${self.daily_loss_limit}"
-                )
-            
-            return is_breached
+        current_pnl = self.get_daily_realized_pnl()
+        is_breached = current_pnl <= -self.daily_loss_limit or self._write_failed
+        
+        if is_breached:
+            logger.error(
+                f"DAILY LOSS LIMIT BREACHED: "
+                f"PnL=${current_pnl} <= limit=-${self.daily_loss_limit}"
+                + (" (limits DB write failed)" if self._write_failed else "")
+            )
+        
+        return is_breached
     
     def get_daily_realized_pnl(self) -> Decimal:
         """
@@ -157,19 +192,17 @@ class PersistentLimitsTracker:
         Returns:
             Cumulative P&L for today (negative = loss)
         """
-        today = date.today().isoformat()
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT realized_pnl FROM daily_pnl
-                WHERE trading_date = ?
-            """, (today,))
-            
-            row = cursor.fetchone()
-            if row:
-                return Decimal(row[0])
-            else:
-                return Decimal('0')
+        if time.time() >= self._day_end_ts:
+            with self._lock:
+                self._load_day()
+        return self._pnl
+
+    def get_daily_trade_count(self) -> int:
+        """Number of realized P&L records today."""
+        if time.time() >= self._day_end_ts:
+            with self._lock:
+                self._load_day()
+        return self._trade_count
     
     def get_remaining_loss_buffer(self) -> Decimal:
         """
@@ -192,63 +225,68 @@ class PersistentLimitsTracker:
         
         Args:
             pnl: Realized profit/loss (negative = loss)
+
+        Raises:
+            sqlite3.Error: If the update could not be persisted (the ledger
+                still counts it and reports a breach until a write succeeds)
         """
         with self._lock:
-            today = date.today().isoformat()
-            now = datetime.now(timezone.utc).isoformat()
+            if time.time() >= self._day_end_ts:
+                self._load_day()
+            new_pnl = self._pnl + pnl
+            new_count = self._trade_count + 1
+            breached = new_pnl <= -self.daily_loss_limit
             
-            with sqlite3.connect(self.db_path) as conn:
-                # Get current P&L
-                cursor = conn.execute("""
-                    SELECT realized_pnl, trade_count FROM daily_pnl
-                    WHERE trading_date = ?
-                """, (today,))
-                
-                row = cursor.fetchone()
-                
-                if row:
-                    # Update existing record
-                    current_pnl = Decimal(row[0])
-                    trade_count = row[1]
-                    
-                    new_pnl = current_pnl + pnl
-                    new_count = trade_count + 1
-                    
-                    # Check if limit breached
-                    breached = 1 if new_pnl <= -self.daily_loss_limit else 0
-                    
-                    conn.execute("""
-                        UPDATE daily_pnl
-                        SET realized_pnl = ?,
-                            trade_count = ?,
-                            loss_limit_breached = ?,
-                            last_updated_utc = ?
-                        WHERE trading_date = ?
-                    """, (str(new_pnl), new_count, breached, now, today))
-                else:
-                    # Create new record
-                    breached = 1 if pnl <= -self.daily_loss_limit else 0
-                    
-                    conn.execute("""
-                        INSERT INTO daily_pnl (
-                            trading_date, realized_pnl, trade_count,
-                            loss_limit_breached, last_updated_utc
-                        ) VALUES (?, ?, ?, ?, ?)
-                    """, (today, str(pnl), 1, breached, now))
-                
-                conn.commit()
-            
-            logger.info(
-                f"[LIMIT_TRACKER] Recorded P&L: ${pnl} "
-                f"(daily_total=${self.get_daily_realized_pnl()})"
+            # Write-through: absolute totals, so a later success repairs a failed write
+            try:
+                self._write_day(new_pnl, new_count, breached)
+            finally:
+                self._pnl = new_pnl
+                self._trade_count = new_count
+        
+        # Log outside the lock (PATCH 40: the breach check used to re-take it -> deadlock)
+        logger.info(
+            f"[LIMIT_TRACKER] Recorded P&L: ${pnl} "
+            f"(daily_total=${new_pnl})"
+        )
+        
+        # Check and log if limit breached
+        if self.is_daily_loss_limit_breached():
+            logger.error(
+                f"[LIMIT_BREACH] Daily loss limit exceeded! "
+                f"Trading should be HALTED."
             )
-            
-            # Check and log if limit breached
-            if self.is_daily_loss_limit_breached():
-                logger.error(
-                    f"[LIMIT_BREACH] Daily loss limit exceeded! "
-                    f"Trading should be HALTED."
-                )
+
+    def _write_day(self, pnl: Decimal, trade_count: int, breached: bool) -> None:
+        """Persist today's totals in one committed statement. Caller holds _lock."""
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            with self._db() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO daily_pnl (
+                        trading_date, realized_pnl, trade_count,
+                        loss_limit_breached, last_updated_utc
+                    ) VALUES (?, ?, ?, ?, ?)
+                """, (self._day, str(pnl), trade_count, 1 if breached else 0, now))
+        except sqlite3.Error:
+            self._write_failed = True
+            logger.error("[LIMIT_TRACKER] Failed to persist daily P&L; blocking trading", exc_info=True)
+            raise
+        self._write_failed = False
+
+    def _load_day(self) -> None:
+        """(Re)load the ledger for the current local day. Caller holds _lock or is __init__."""
+        today = date.today()
+        if self._day == today.isoformat() and time.time() < self._day_end_ts:
+            return  # another thread already rolled over
+        row = self._db().execute("""
+            SELECT realized_pnl, trade_count FROM daily_pnl
+            WHERE trading_date = ?
+        """, (today.isoformat(),)).fetchone()
+        self._day = today.isoformat()
+        self._pnl = Decimal(row[0]) if row else Decimal('0')
+        self._trade_count = int(row[1]) if row else 0
+        self._day_end_ts = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
     
     # ========================================================================
     # DAILY RESET
@@ -264,7 +302,7 @@ class PersistentLimitsTracker:
         with self._lock:
             today = date.today().isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db() as conn:
                 # Check if today already has a record
                 cursor = conn.execute("""
                     SELECT trading_date FROM daily_pnl
@@ -285,8 +323,9 @@ class PersistentLimitsTracker:
                         loss_limit_breached, last_updated_utc
                     ) VALUES (?, ?, ?, ?, ?)
                 """, (today, '0', 0, 0, now))
-                
-                conn.commit()
+
+            self._day_end_ts = 0.0  # reload the (fresh) day on next read
+            self._load_day()
             
             logger.info(f"[LIMIT_RESET] Daily limits reset for {today}")
     
@@ -294,20 +333,20 @@ class PersistentLimitsTracker:
         """Auto-reset if starting on new calendar day."""
         today = date.today().isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        with self._lock:
+            cursor = self._db().execute("""
                 SELECT MAX(trading_date) FROM daily_pnl
             """)
             
             row = cursor.fetchone()
-            last_date = row[0] if row and row[0] else None
-            
-            if last_date and last_date != today:
-                logger.info(
-                    f"New trading day detected (last={last_date}, today={today}), "
-                    f"resetting limits"
-                )
-                self.reset_daily_limits()
+        last_date = row[0] if row and row[0] else None
+        
+        if last_date and last_date != today:
+            logger.info(
+                f"New trading day detected (last={last_date}, today={today}), "
+                f"resetting limits"
+            )
+            self.reset_daily_limits()
     
     # ========================================================================
     # POSITION SIZE CHECKS
@@ -373,6 +412,7 @@ class PersistentLimitsTracker:
         return {
             'daily_loss_limit': str(self.daily_loss_limit),
             'daily_realized_pnl': str(self.get_daily_realized_pnl()),
+            'daily_trade_count': self.get_daily_trade_count(),
             'remaining_buffer': str(self.get_remaining_loss_buffer()),
             'limit_breached': self.is_daily_loss_limit_breached(),
             'max_position_size': str(self.max_position_size) if self.max_position_size else None,
@@ -27,8 +27,12 @@ from typing import Any, Dict, List, Optional, Tuple  # FIX: added Any
 
 import pandas as pd
 
-from core.brokers import AlpacaBrokerConnector, BrokerOrderSide, BrokerConnectionError
+from core.brokers import AlpacaBrokerConnector, AsyncAlpacaBrokerConnector, BrokerOrderSide, BrokerConnectionError, BrokerStateCache
 from core.runtime.circuit_breaker import ConsecutiveFailureBreaker
+from core.runtime.load_shedding import CycleWatchdog
+from core.runtime.pipeline import BarPrefetcher
+from core.runtime.reconcile_worker import ReconciliationWorker
+from core.runtime.supervisor import UniverseSupervisor
 from core.recovery.coordinator import RecoveryCoordinator, RecoveryStatus
 from core.recovery.persistence import StatePersistence
 from core.runtime.state_snapshot import SnapshotHealthMonitor, build_state_snapshot
@@ -37,6 +41,7 @@ from core.data.validator import DataValidator, DataValidationError
 from core.data.pipeline import DataPipelineError
 from core.di.container import Container
 from core.execution.engine import OrderExecutionEngine
+from core.execution.status_refresher import BatchedOrderStatusRefresher
 from core.journal.trade_journal import TradeJournal
 from core.journal.writer import JournalWriter
 from core.logging import LogStream, get_logger
@@ -291,6 +296,39 @@ def _is_exit_signal(sig: dict) -> bool:
     return False
 
 
+def _symbols_under_management(
+    position_store: Any,
+    order_tracker: Any = None,
+    protective_stop_ids: Optional[Dict[str, str]] = None,
+) -> set:
+    """
+    Symbols we hold or have working orders in (local state only, no REST).
+
+    Used by the cycle watchdog to evaluate these symbols first and never
+    shed them, so position management cannot starve behind a big watchlist.
+    """
+    held: set = set()
+    try:
+        if hasattr(position_store, "get_all"):
+            for p in position_store.get_all() or []:
+                sym = getattr(p, "symbol", None)
+                if sym:
+                    held.add(str(sym).upper())
+    except Exception:
+        logger.debug("Watchdog: position lookup failed", exc_info=True)
+    try:
+        if order_tracker is not None and hasattr(order_tracker, "get_all_in_flight"):
+            for o in order_tracker.get_all_in_flight() or []:
+                sym = getattr(o, "symbol", None)
+                if sym:
+                    held.add(str(sym).upper())
+    except Exception:
+        logger.debug("Watchdog: in-flight order lookup failed", exc_info=True)
+    for sym in (protective_stop_ids or {}):
+        held.add(str(sym).upper())
+    return held
+
+
 def _try_recovery(
     broker,
     position_store,
@@ -335,6 +373,39 @@ def _try_recovery(
             return RecoveryStatus.FAILED
 
 
+def _open_orders_for_symbol(exec_engine: Any, container: Any, symbol: str) -> List[Any]:
+    """
+    Open orders the single-trade guard checks before a new entry.
+
+    PATCH 27 NOTE: OrderTracker.get_open_orders_for_symbol() exists since the
+    symbol index was added, so the tracker fallback is live: an entry is
+    blocked while ANY in-flight order for the symbol is tracked (a working
+    entry, a pending exit or a protective leg), not only a held position.
+    """
+    if hasattr(exec_engine, "get_open_orders"):
+        return exec_engine.get_open_orders(symbol=symbol) or []
+    if hasattr(container, "get_order_tracker"):
+        tracker = container.get_order_tracker()
+        if hasattr(tracker, "get_open_orders_for_symbol"):
+            return tracker.get_open_orders_for_symbol(symbol) or []
+    return []
+
+
+def _kill_switch_reason(path: Optional[Path]) -> Optional[str]:
+    """
+    Operator kill switch: the reason written in the trigger file, or None
+    when the file is absent. The file is left in place so a restart stays
+    halted until an operator removes it.
+    """
+    if path is None or not path.exists():
+        return None
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+    except OSError:
+        text = ""
+    return text or f"kill switch file {path}"
+
+
 def _load_protective_stops_from_broker(broker) -> Dict[str, str]:
     """
     P1 Patch 3: On restart, query the broker for open STOP SELL orders
@@ -439,6 +510,7 @@ class RunOptions:
     mode: str  # "paper" or "live"
     run_interval_s: int = 60
     run_once: bool = False
+    workers: int = 0  # >1: supervisor mode (universe sharded across processes)
 
 
 def _safe_decimal(v, default: Decimal = Decimal("0")) -> Decimal:
@@ -452,6 +524,192 @@ def _safe_decimal(v, default: Decimal = Decimal("0")) -> Decimal:
         return default
 
 
+def _acquire_bar(
+    symbol: str,
+    *,
+    opts: RunOptions,
+    journal: Any,
+    data_validator: Any,
+    fetch_bars: Any,
+    no_market_data_mode: bool,
+    timeframe: str = "1Min",
+) -> Optional[MarketDataContract]:
+    """
+    Data stage for one symbol: fetch, drop incomplete bars, validate.
+
+    Returns the bar strategies should evaluate, or None when the symbol must
+    be skipped this cycle (the reason is journaled). Shared by the runtime
+    loop and the supervisor's shard workers.
+    """
+    # ---- market data acquisition (or synthetic in harness mode) ----
+    bars: List[MarketDataContract] = []
+    bar: Optional[MarketDataContract] = None
+
+    if no_market_data_mode:
+        bar = _synthetic_bar(symbol)
+        bars = [bar]
+    else:
+        try:
+            df = fetch_bars(symbol)
+            bars = _df_to_contracts(symbol, df)
+            _diag = os.getenv("PIPELINE_DIAG", "0").strip().lower() in ("1", "true", "yes")
+            if _diag:
+                _df_n = len(df) if df is not None and not getattr(df, 'empty', True) else 0
+                print(f"[DIAG-app] df from pipeline: {_df_n} rows, contracts: {len(bars)}")
+
+            # In PAPER/LIVE, act only on fully closed bars (anti-lookahead).
+            # NOTE: The pipeline already drops incomplete bars via
+            # _drop_incomplete_last_bar, so use grace_period_seconds=0
+            # here to avoid rejecting bars the pipeline deemed complete.
+            if opts.mode in ("paper", "live") and bars and not no_market_data_mode:
+                _pre = len(bars)
+                while bars and not bars[-1].is_complete(timeframe, grace_period_seconds=0):
+                    bars.pop()
+                if _diag and _pre != len(bars):
+                    print(f"[DIAG-app] is_complete popped {_pre - len(bars)} bars, {len(bars)} remain")
+
+            if not bars:
+                # In harness mode we can synthesize; in PAPER/LIVE we skip this cycle.
+                if opts.mode in ("paper", "live") and not no_market_data_mode:
+                    journal.write_event(
+                        {
+                            "event": "market_data_incomplete_or_empty",
+                            "symbol": symbol,
+                            "reason": "no_closed_bars_available",
+                        }
+                    )
+                    if os.getenv("DATA_PRINT", "1").strip().lower() in ("1","true","yes"):
+                        print(f"[data] {symbol}: no_closed_bars_available (market likely closed)")
+                    return None
+
+                bar = _synthetic_bar(symbol)
+                bars = [bar]
+            else:
+                bar = bars[-1]
+
+        except DataPipelineError as e:
+            journal.write_event({"event": "market_data_block", "symbol": symbol, "reason": str(e)})
+            logger.warning(
+                "Market data blocked; skipping symbol",
+                extra={"symbol": symbol, "error": str(e)},
+            )
+            return None
+        except Exception as e:
+            journal.write_event({"event": "market_data_error", "symbol": symbol, "error": str(e)})
+            logger.exception("Market data error; skipping symbol", extra={"symbol": symbol})
+            return None
+    # ---- validation (skip/soften in harness mode) ----
+    try:
+        if isinstance(data_validator, DataValidator):
+            data_validator.validate_bars(bars=bars, timeframe=timeframe)
+    except DataValidationError as e:
+        # In PAPER/LIVE, bad/incomplete data should skip the symbol/cycle, not crash the loop.
+        if opts.mode in ("paper", "live") and not no_market_data_mode:
+            journal.write_event(
+                {"event": "market_data_invalid", "symbol": symbol, "error": str(e)}
+            )
+            logger.warning(
+                "Invalid market data; skipping symbol",
+                extra={"symbol": symbol, "error": str(e)},
+            )
+            return None
+        raise
+    except Exception:
+        # In harness mode, fake bars/strategies may not satisfy validator constraints.
+        if not no_market_data_mode:
+            raise
+
+    if bar is None:
+        return None
+
+    if opts.mode == "live" and not no_market_data_mode:
+        try:
+            if not bar.is_complete(timeframe):
+                return None
+        except Exception:
+            pass
+
+    return bar
+
+
+def _load_strategies(
+    cfg: Any,
+    registry: Any,
+    lifecycle: Any,
+    *,
+    universe_symbols: Optional[List[str]] = None,
+    symbol_filter: Optional[Any] = None,
+    start: bool = True,
+) -> List[str]:
+    """
+    Create + start every enabled strategy from config and return the ordered
+    symbol universe they cover.
+
+    symbol_filter restricts each strategy to a subset of symbols (used by
+    supervisor shard workers); strategies left with no symbols are skipped.
+    start=False only computes the universe from config (supervisor parent:
+    the shards own the strategies).
+    """
+    all_symbols: List[str] = []
+    strategies_obj = cfg.strategies
+
+    if isinstance(strategies_obj, list):
+        candidates = strategies_obj
+    else:
+        candidates = getattr(strategies_obj, "enabled", [])
+
+    enabled_strategies = []
+    for s in candidates:
+        if isinstance(s, dict):
+            is_enabled = s.get("enabled", True)
+        else:
+            is_enabled = getattr(s, "enabled", True)
+        if is_enabled:
+            enabled_strategies.append(s)
+
+    for strat_cfg in enabled_strategies:
+        if isinstance(strat_cfg, dict):
+            name = strat_cfg.get("name")
+            config = strat_cfg.get("config", {}) or {}
+            symbols = strat_cfg.get("symbols", []) or []
+            timeframe = strat_cfg.get("timeframe", "1Min") or "1Min"
+        else:
+            name = getattr(strat_cfg, "name", None)
+            config = getattr(strat_cfg, "config", {}) or {}
+            symbols = getattr(strat_cfg, "symbols", []) or []
+            timeframe = getattr(strat_cfg, "timeframe", "1Min") or "1Min"
+
+        if not name:
+            logger.warning("Skipping strategy with missing name", extra={"strat_cfg": str(strat_cfg)})
+            continue
+
+        strat_symbols = list(universe_symbols or symbols)
+        if symbol_filter is not None:
+            strat_symbols = [sym for sym in strat_symbols if sym in symbol_filter]
+            if not strat_symbols:
+                continue
+
+        if not start:
+            for sym in strat_symbols:
+                if sym not in all_symbols:
+                    all_symbols.append(sym)
+            continue
+
+        s = registry.create(
+            name=name,
+            config=config,
+            symbols=strat_symbols,
+            timeframe=timeframe,
+        )
+        lifecycle.add_strategy(s)
+        lifecycle.start_strategy(s.name)
+        for sym in s.symbols:
+            if sym not in all_symbols:
+                all_symbols.append(sym)
+
+    return all_symbols
+
+
 def _ensure_strategy_registry_bootstrapped(container: Container) -> None:
     """
     Register built-in strategies into StrategyRegistry.
@@ -688,7 +946,7 @@ def compute_adaptive_sleep(
     return max(1, closed_interval_s)
 
 
-def run(opts: RunOptions) -> int:
+def run(opts: RunOptions, *, intent_source: Any = None) -> int:
     container = Container()
     container.initialize(opts.config_path)
 
@@ -727,16 +985,32 @@ def run(opts: RunOptions) -> int:
             "(or ALPACA_API_KEY/ALPACA_API_SECRET, or APCA_API_KEY_ID/APCA_API_SECRET_KEY)."
         )
 
-    broker = AlpacaBrokerConnector(
+    # PATCH 30: pooled async connector (same method surface) behind a flag
+    _broker_cls = (
+        AsyncAlpacaBrokerConnector
+        if os.getenv("MQD_ASYNC_BROKER", "0").strip().lower() in ("1", "true", "yes")
+        else AlpacaBrokerConnector
+    )
+    broker = _broker_cls(
         api_key=api_key,
         api_secret=api_secret,
         paper=paper,
-        base_url=getattr(cfg.broker, "base_url", None),
+        # PATCH 35: MQD_ALPACA_BASE_URL points the runtime at a local stand-in
+        base_url=os.getenv("MQD_ALPACA_BASE_URL", "").strip() or getattr(cfg.broker, "base_url", None),
         data_feed=getattr(cfg.broker, "data_feed", None),
     )
 
     container.set_broker_connector(broker)
 
+    # Per-cycle broker state cache (account / positions / open orders).
+    # Shared with the container so user stream updates invalidate it.
+    try:
+        _broker_cache = container.get_broker_state_cache()
+    except Exception:
+        _broker_cache = None
+    if not isinstance(_broker_cache, BrokerStateCache) or _broker_cache.broker is not broker:
+        _broker_cache = BrokerStateCache(broker)
+
     # Register strategies
     _ensure_strategy_registry_bootstrapped(container)
 
@@ -747,6 +1021,8 @@ def run(opts: RunOptions) -> int:
     journal.write_event({"event": "boot", "mode": opts.mode, "paper": paper})
     trade_journal = TradeJournal(base_dir=journal_dir)
     trade_run_id = TradeJournal.new_run_id()
+    _prefetcher: Optional[BarPrefetcher] = None
+    _recon_worker: Optional[ReconciliationWorker] = None
 
     try:
         protections = container.get_protections()
@@ -867,50 +1143,27 @@ def run(opts: RunOptions) -> int:
             except Exception as e:
                 logger.warning(f"Universe mode '{universe_mode}' requested but unavailable: {e}")
 
-        all_symbols: List[str] = []
-        strategies_obj = cfg.strategies
-
-        if isinstance(strategies_obj, list):
-            candidates = strategies_obj
-        else:
-            candidates = getattr(strategies_obj, "enabled", [])
-
-        enabled_strategies = []
-        for s in candidates:
-            if isinstance(s, dict):
-                is_enabled = s.get("enabled", True)
-            else:
-                is_enabled = getattr(s, "enabled", True)
-            if is_enabled:
-                enabled_strategies.append(s)
-
-        for strat_cfg in enabled_strategies:
-            if isinstance(strat_cfg, dict):
-                name = strat_cfg.get("name")
-                config = strat_cfg.get("config", {}) or {}
-                symbols = strat_cfg.get("symbols", []) or []
-                timeframe = strat_cfg.get("timeframe", "1Min") or "1Min"
-            else:
-                name = getattr(strat_cfg, "name", None)
-                config = getattr(strat_cfg, "config", {}) or {}
-                symbols = getattr(strat_cfg, "symbols", []) or []
-                timeframe = getattr(strat_cfg, "timeframe", "1Min") or "1Min"
-
-            if not name:
-                logger.warning("Skipping strategy with missing name", extra={"strat_cfg": str(strat_cfg)})
-                continue
+        # Supervisor mode: the shard workers own the strategies; the parent
+        # only needs the universe to partition.
+        _sharded = intent_source is not None or int(opts.workers or 0) > 1
+        all_symbols: List[str] = _load_strategies(
+            cfg, registry, lifecycle, universe_symbols=universe_symbols, start=not _sharded
+        )
 
-            s = registry.create(
-                name=name,
-                config=config,
-                symbols=(universe_symbols or symbols),
-                timeframe=timeframe,
-            )
-            lifecycle.add_strategy(s)
-            lifecycle.start_strategy(s.name)
-            for sym in s.symbols:
-                if sym not in all_symbols:
-                    all_symbols.append(sym)
+        # Scanner-sourced symbols are the first to be shed under load.
+        _scanner_symbols: set = set()
+        if universe_symbols:
+            from core.universe.loader import CORE_SYMBOLS
+            _scanner_symbols = {s for s in universe_symbols if s not in CORE_SYMBOLS}
+
+        # Supervisor mode: shard workers own the data + strategy stages; this
+        # process stays the single risk/execution process. Fills are routed
+        # back to the owning shard through the supervisor.
+        if intent_source is None and int(opts.workers or 0) > 1:
+            intent_source = UniverseSupervisor(opts, n_workers=int(opts.workers))
+        if intent_source is not None:
+            intent_source.start(all_symbols, universe_symbols=universe_symbols)
+            lifecycle = intent_source
 
         # ===============================================================
         # SIGNAL HANDLING
@@ -933,7 +1186,6 @@ def run(opts: RunOptions) -> int:
         cycle_count = 0
         orphan_check_interval = 10
 
-        orphan_counter = 0
         # P1 Patch 3: reload protective stops from broker on restart
         protective_stop_ids: Dict[str, str] = _load_protective_stops_from_broker(broker)
         if protective_stop_ids:
@@ -951,6 +1203,42 @@ def run(opts: RunOptions) -> int:
         except Exception as e:
             logger.warning(f"Failed to initialize periodic reconciliation: {e}")
 
+        # Background reconciliation: orphan check, periodic reconcile, drift
+        # detection and paper auto-heal run off the trading hot path. The loop
+        # consumes published snapshots; urgent findings block new entries (LIVE).
+        _recon_order_tracker = None
+        try:
+            _recon_order_tracker = container.get_order_tracker()
+        except Exception:
+            _recon_order_tracker = None
+        _drift_detector = None
+        if hasattr(position_store, "get_all") or (
+            hasattr(position_store, "get_symbols") and hasattr(position_store, "get_position")
+        ):
+            try:
+                from core.monitoring.drift import DriftDetector
+                _drift_detector = DriftDetector(position_store=position_store, broker=broker)
+            except Exception as e:
+                logger.warning(f"Failed to initialize drift detector: {e}")
+        _recon_auto_heal = False
+        if paper:
+            _recon_heal_env = str(os.getenv("PAPER_AUTO_HEAL", "")).strip().lower()
+            if not _recon_heal_env:
+                _recon_heal_env = str(os.getenv("AUTO_HEAL", "0")).strip().lower()
+            _recon_auto_heal = _recon_heal_env in ("1", "true", "yes")
+        _recon_worker = ReconciliationWorker(
+            periodic_reconciler=periodic_reconciler,
+            drift_detector=_drift_detector,
+            broker=_broker_cache,
+            order_tracker=_recon_order_tracker,
+            orphan_interval_s=orphan_check_interval * max(float(opts.run_interval_s or 0), 1.0),
+            auto_heal=_recon_auto_heal,
+            block_on_urgent=(opts.mode == "live"),
+        )
+        _recon_last_seq = 0
+        if not opts.run_once:
+            _recon_worker.start()
+
         # PATCH 5: Snapshot health monitor — halt LIVE after N consecutive save failures
         _snapshot_interval_s = int(os.getenv("SNAPSHOT_INTERVAL_S", "30") or "30")
         _snapshot_max_failures = int(os.getenv("SNAPSHOT_MAX_FAILURES", "3") or "3")
@@ -963,6 +1251,90 @@ def run(opts: RunOptions) -> int:
             logger.warning("Could not initialize snapshot persistence: %s", _snap_err)
         _last_snapshot_time = 0.0
 
+        # Pipelined cycle: keep bar fetches for upcoming symbols in flight
+        # while strategies/risk/submission run for the current symbol.
+        _bar_timeframe = "1Min"
+        _bar_lookback = 120
+        if intent_source is None and not no_market_data_mode and os.getenv("MQD_PIPELINE_PREFETCH", "1").strip().lower() in ("1", "true", "yes"):
+            _prefetch_lookahead = max(1, int(os.getenv("MQD_PIPELINE_LOOKAHEAD", "2") or "2"))
+            _prefetcher = BarPrefetcher(
+                lambda _sym: _get_latest_bars_compat(data_pipeline, _sym, _bar_lookback, _bar_timeframe),
+                lookahead=_prefetch_lookahead,
+            )
+
+        def _fetch_bars(sym: str):
+            if _prefetcher is not None:
+                return _prefetcher.get(sym)
+            return _get_latest_bars_compat(data_pipeline, sym, _bar_lookback, _bar_timeframe)
+
+        def _cycle_inputs(cycle_symbols: List[str]):
+            """Yield (symbol, bar, signals) for this cycle in deterministic order."""
+            if intent_source is not None:
+                _rank = {s: i for i, s in enumerate(cycle_symbols)}
+                _intents = sorted(
+                    intent_source.collect_cycle(journal=journal),
+                    key=lambda it: _rank.get(it.symbol, len(_rank)),
+                )
+                for intent in _intents:
+                    if not _cycle_watchdog.admit(intent.symbol):
+                        continue
+                    yield intent.symbol, intent.bar, [dict(intent.signal)]
+                return
+            for symbol in cycle_symbols:
+                if not _cycle_watchdog.admit(symbol):
+                    continue
+                bar = _acquire_bar(
+                    symbol,
+                    opts=opts,
+                    journal=journal,
+                    data_validator=data_validator,
+                    fetch_bars=_fetch_bars,
+                    no_market_data_mode=no_market_data_mode,
+                    timeframe=_bar_timeframe,
+                )
+                if bar is None:
+                    continue
+                yield symbol, bar, lifecycle.on_bar(bar)
+
+        # Cycle-overrun watchdog: positions/pending orders first, scanner
+        # symbols and auxiliary work shed when the cycle is about to overrun.
+        # A run_once cycle has no next cycle to protect: no budget, no shedding.
+        _watchdog_budget_s: Optional[float] = None
+        if not opts.run_once and os.getenv("MQD_CYCLE_WATCHDOG", "1").strip().lower() in ("1", "true", "yes"):
+            _watchdog_budget_s = float(os.getenv("MQD_CYCLE_BUDGET_S", "") or opts.run_interval_s or 0) or None
+        _cycle_watchdog = CycleWatchdog(
+            _watchdog_budget_s,
+            shed_fraction=float(os.getenv("MQD_CYCLE_SHED_FRACTION", "0.8") or "0.8"),
+        )
+
+        # Batched status refresh: one get_orders() call per interval covers
+        # every working order (entries + protective legs).
+        _status_refresher: Optional[BatchedOrderStatusRefresher] = None
+        if (
+            os.getenv("MQD_BATCH_STATUS_REFRESH", "1").strip().lower() in ("1", "true", "yes")
+            and _order_machine is not None
+            and hasattr(broker, "get_orders")
+        ):
+            _status_refresher = BatchedOrderStatusRefresher(
+                broker=broker,
+                engine=exec_engine,
+                state_machine=_order_machine,
+                interval_s=float(os.getenv("MQD_STATUS_REFRESH_S", "5") or "5"),
+            )
+
+        # Daily-loss breach -> concurrent cancel-all + flatten-all (once per run).
+        # Opt-in: the flatten liquidates EVERY position on the account, not
+        # only the ones this runtime opened.
+        _flatten_on_daily_loss = os.getenv("MQD_FLATTEN_ON_DAILY_LOSS", "0").strip().lower() in ("1", "true", "yes")
+        _daily_loss_flattened = False
+        if _flatten_on_daily_loss:
+            logger.warning("MQD_FLATTEN_ON_DAILY_LOSS=1: a daily-loss breach liquidates ALL account positions")
+
+        # Kill switch: creating this file (content = reason) cancels every
+        # order, flattens every account position and halts the runtime.
+        _kill_switch_env = os.getenv("MQD_KILL_SWITCH_FILE", "data/state/KILL_SWITCH").strip()
+        _kill_switch_file = Path(_kill_switch_env) if _kill_switch_env else None
+
         cooldown_s = int(os.getenv("SIGNAL_COOLDOWN_SECONDS", "30") or "30")
         last_action_ts: Dict[Tuple[str, str, str], float] = {}
 
@@ -1017,6 +1389,18 @@ def run(opts: RunOptions) -> int:
 
         while state.running:
             try:
+                _kill_reason = _kill_switch_reason(_kill_switch_file)
+                if _kill_reason is not None:
+                    logger.critical("KILL SWITCH: %s", _kill_reason)
+                    _kill_report = container.activate_kill_switch(_kill_reason, trigger_source="kill_switch_file")
+                    journal.write_event({
+                        "event": "kill_switch_activated",
+                        "reason": _kill_reason,
+                        "report": _kill_report.to_dict() if _kill_report is not None else None,
+                    })
+                    return 1
+
+                _cycle_watchdog.begin_cycle()
                 logger.info(
                     "Cycle heartbeat",
                     extra={
@@ -1079,104 +1463,28 @@ def run(opts: RunOptions) -> int:
                         return 0
                     continue  # Skip all order processing this cycle
 
-                acct = broker.get_account_info()
+                _cycle_symbols = _cycle_watchdog.plan_cycle(
+                    all_symbols,
+                    priority=_symbols_under_management(
+                        position_store,
+                        container.get_order_tracker() if hasattr(container, "get_order_tracker") else None,
+                        protective_stop_ids,
+                    ),
+                    low=_scanner_symbols,
+                )
+                if _prefetcher is not None:
+                    _prefetcher.begin_cycle(_cycle_symbols)
+
+                _broker_cache.begin_cycle()
+                if _status_refresher is not None:
+                    _refresh = _status_refresher.maybe_refresh()
+                    if _refresh is not None and _refresh.transitions:
+                        _broker_cache.on_order_activity()
+                acct = _broker_cache.get_account_info()
                 account_value = _safe_decimal(acct.get("portfolio_value", "0"))
                 buying_power = _safe_decimal(acct.get("buying_power", "0"))
 
-                for symbol in all_symbols:
-                    timeframe = "1Min"
-                    lookback = 120
-
-                    # ---- market data acquisition (or synthetic in harness mode) ----
-                    bars: List[MarketDataContract] = []
-                    bar: Optional[MarketDataContract] = None
-
-                    if no_market_data_mode:
-                        bar = _synthetic_bar(symbol)
-                        bars = [bar]
-                    else:
-                        try:
-                            df = _get_latest_bars_compat(data_pipeline, symbol, lookback, timeframe)
-                            bars = _df_to_contracts(symbol, df)
-                            _diag = os.getenv("PIPELINE_DIAG", "0").strip().lower() in ("1", "true", "yes")
-                            if _diag:
-                                _df_n = len(df) if df is not None and not getattr(df, 'empty', True) else 0
-                                print(f"[DIAG-app] df from pipeline: {_df_n} rows, contracts: {len(bars)}")
-
-                            # In PAPER/LIVE, act only on fully closed bars (anti-lookahead).
-                            # NOTE: The pipeline already drops incomplete bars via
-                            # _drop_incomplete_last_bar, so use grace_period_seconds=0
-                            # here to avoid rejecting bars the pipeline deemed complete.
-                            if opts.mode in ("paper", "live") and bars and not no_market_data_mode:
-                                _pre = len(bars)
-                                while bars and not bars[-1].is_complete(timeframe, grace_period_seconds=0):
-                                    bars.pop()
-                                if _diag and _pre != len(bars):
-                                    print(f"[DIAG-app] is_complete popped {_pre - len(bars)} bars, {len(bars)} remain")
-
-                            if not bars:
-                                # In harness mode we can synthesize; in PAPER/LIVE we skip this cycle.
-                                if opts.mode in ("paper", "live") and not no_market_data_mode:
-                                    journal.write_event(
-                                        {
-                                            "event": "market_data_incomplete_or_empty",
-                                            "symbol": symbol,
-                                            "reason": "no_closed_bars_available",
-                                        }
-                                    )
-                                    if os.getenv("DATA_PRINT", "1").strip().lower() in ("1","true","yes"):
-                                        print(f"[data] {symbol}: no_closed_bars_available (market likely closed)")
-                                    continue
-
-                                bar = _synthetic_bar(symbol)
-                                bars = [bar]
-                            else:
-                                bar = bars[-1]
-
-                        except DataPipelineError as e:
-                            journal.write_event({"event": "market_data_block", "symbol": symbol, "reason": str(e)})
-                            logger.warning(
-                                "Market data blocked; skipping symbol",
-                                extra={"symbol": symbol, "error": str(e)},
-                            )
-                            continue
-                        except Exception as e:
-                            journal.write_event({"event": "market_data_error", "symbol": symbol, "error": str(e)})
-                            logger.exception("Market data error; skipping symbol", extra={"symbol": symbol})
-                            continue
-                    # ---- validation (skip/soften in harness mode) ----
-                    try:
-                        if isinstance(data_validator, DataValidator):
-                            data_validator.validate_bars(bars=bars, timeframe=timeframe)
-                    except DataValidationError as e:
-                        # In PAPER/LIVE, bad/incomplete data should skip the symbol/cycle, not crash the loop.
-                        if opts.mode in ("paper", "live") and not no_market_data_mode:
-                            journal.write_event(
-                                {"event": "market_data_invalid", "symbol": symbol, "error": str(e)}
-                            )
-                            logger.warning(
-                                "Invalid market data; skipping symbol",
-                                extra={"symbol": symbol, "error": str(e)},
-                            )
-                            continue
-                        raise
-                    except Exception:
-                        # In harness mode, fake bars/strategies may not satisfy validator constraints.
-                        if not no_market_data_mode:
-                            raise
-
-                    if bar is None:
-                        continue
-
-                    if opts.mode == "live" and not no_market_data_mode:
-                        try:
-                            if not bar.is_complete(timeframe):
-                                continue
-                        except Exception:
-                            pass
-
-                    signals = lifecycle.on_bar(bar)
-
+                for symbol, bar, signals in _cycle_inputs(_cycle_symbols):
                     for sig in signals:
                         trade_id = sig.get("trade_id") or (
                             f"{sig.get('strategy','UNKNOWN')}:{sig.get('symbol', symbol)}:"
@@ -1199,15 +1507,22 @@ def run(opts: RunOptions) -> int:
                         sig_limit = sig.get("limit_price")
                         sig_price = Decimal(str(sig_limit)) if sig_limit is not None else Decimal(str(sig.get("price", getattr(bar, "close", Decimal("0")))))
                         sig_strategy = sig.get("strategy", "UNKNOWN")
+                        if not _is_exit_signal(sig) and _recon_worker.trading_blocked:
+                            _blk = _recon_worker.latest()
+                            journal.write_event({
+                                "event": "reconciliation_block",
+                                "ts_utc": _utc_iso(),
+                                "trade_id": trade_id,
+                                "strategy": sig_strategy,
+                                "symbol": sig_symbol,
+                                "side": side_str,
+                                "qty": str(qty),
+                                "reasons": list(_blk.urgent_reasons) if _blk is not None else [],
+                            })
+                            continue
                         if not _is_exit_signal(sig):
                             try:
-                                open_orders = []
-                                if hasattr(exec_engine, "get_open_orders"):
-                                    open_orders = exec_engine.get_open_orders(symbol=sig_symbol) or []
-                                elif hasattr(container, "get_order_tracker"):
-                                    tracker = container.get_order_tracker()
-                                    if hasattr(tracker, "get_open_orders_for_symbol"):
-                                        open_orders = tracker.get_open_orders_for_symbol(sig_symbol) or []
+                                open_orders = _open_orders_for_symbol(exec_engine, container, sig_symbol)
 
                                 pos_qty = None
                                 if hasattr(position_store, "get_position"):
@@ -1353,7 +1668,7 @@ def run(opts: RunOptions) -> int:
 
                             if hasattr(broker, "get_position"):
                                 try:
-                                    pos = broker.get_position(sig_symbol)
+                                    pos = _broker_cache.get_position(sig_symbol)
                                 except Exception:
                                     pos = None
 
@@ -1415,6 +1730,7 @@ def run(opts: RunOptions) -> int:
                                 except Exception:
                                     logger.warning("Failed cancelling protective stop", exc_info=True)
                                 protective_stop_ids.pop(sig_symbol, None)
+                                _broker_cache.on_order_activity()
 
                         internal_id = f"{sig_strategy}-{uuid.uuid4().hex[:10]}"
 
@@ -1476,6 +1792,7 @@ def run(opts: RunOptions) -> int:
                                 timeout_seconds=ttl_seconds,
                                 poll_interval=2.0,
                             )
+                            _broker_cache.on_order_activity()
 
                             if final_status not in (OrderStatus.FILLED, OrderStatus.PARTIALLY_FILLED):
                                 try:
@@ -1543,6 +1860,7 @@ def run(opts: RunOptions) -> int:
                                 timeout_seconds=15,
                                 poll_interval=1.0,
                             )
+                            _broker_cache.on_order_activity()
 
                         filled_qty, fill_price = exec_engine.get_fill_details(internal_id)
                         if filled_qty is None or fill_price is None:
@@ -1556,7 +1874,15 @@ def run(opts: RunOptions) -> int:
 
                         stop_price = None
 
-                        if broker_side == BrokerOrderSide.BUY:
+                        # PATCH 29: a native bracket entry is protected by its own
+                        # broker-side legs; a second STOP SELL would oversell.
+                        _bracket = None
+                        if broker_side == BrokerOrderSide.BUY and hasattr(exec_engine, "native_bracket_legs"):
+                            _bracket = exec_engine.native_bracket_legs(internal_id)
+                        if isinstance(_bracket, tuple):  # BracketOrderIds
+                            if _bracket.stop_loss:
+                                protective_stop_ids[sig_symbol] = _bracket.stop_loss
+                        elif broker_side == BrokerOrderSide.BUY:
                             for k in ("stop_loss", "stop_loss_price", "stop_price"):
                                 if isinstance(sig, dict) and sig.get(k) is not None:
                                     stop_price = sig.get(k)
@@ -1577,6 +1903,7 @@ def run(opts: RunOptions) -> int:
                                         reason="protective_stop_after_entry",
                                     )
                                     protective_stop_ids[sig_symbol] = stop_id
+                                    _broker_cache.on_order_activity()
                                     journal.write_event(
                                         {
                                             "event": "protective_stop_submitted",
@@ -1645,6 +1972,15 @@ def run(opts: RunOptions) -> int:
                                                 "Recorded realized PnL: %.4f (fill=%.4f, entry=%.4f, qty=%.4f)",
                                                 realized_pnl, fill_price, existing_pos.entry_price, filled_qty,
                                             )
+                                            if (
+                                                _flatten_on_daily_loss
+                                                and not _daily_loss_flattened
+                                                and limits_tracker.is_daily_loss_limit_breached()
+                                            ):
+                                                _daily_loss_flattened = True
+                                                container.activate_kill_switch(
+                                                    "daily loss limit breached", trigger_source="daily_loss"
+                                                )
                                         except Exception:
                                             logger.warning("Failed to record realized PnL", exc_info=True)
                                     else:
@@ -1656,68 +1992,77 @@ def run(opts: RunOptions) -> int:
                             except Exception:
                                 logger.warning("PositionStore update failed", exc_info=True)
                 cycle_count += 1
-                orphan_counter += 1
-                if orphan_counter >= orphan_check_interval:
-                    orphan_counter = 0
-                    try:
-                        order_tracker = container.get_order_tracker()
-                        broker_orders_list = broker.get_orders()
-                        broker_orders = {order.id: order for order in broker_orders_list}
 
-                        orphans = order_tracker.get_orphaned_orders(broker_orders)
-                        shadows = order_tracker.get_shadow_orders(broker_orders)
+                # run_once has no time for a background pass: reconcile inline.
+                if opts.run_once:
+                    _recon_worker.tick()
+
+                _recon_snap = _recon_worker.latest()
+                if _recon_snap is not None and _recon_snap.seq != _recon_last_seq:
+                    _recon_last_seq = _recon_snap.seq
 
-                        if orphans:
+                    if _recon_snap.orphan_check_ran:
+                        if _recon_snap.orphans:
                             logger.error(
-                                f"ORPHAN ORDERS DETECTED: {len(orphans)} orders",
-                                extra={"orphan_broker_ids": orphans, "action": "Manual review required"},
+                                f"ORPHAN ORDERS DETECTED: {len(_recon_snap.orphans)} orders",
+                                extra={"orphan_broker_ids": list(_recon_snap.orphans), "action": "Manual review required"},
                             )
-                        if shadows:
+                        if _recon_snap.shadows:
                             logger.error(
-                                f"SHADOW ORDERS DETECTED: {len(shadows)} orders",
-                                extra={"shadow_client_ids": shadows, "action": "Manual review required"},
+                                f"SHADOW ORDERS DETECTED: {len(_recon_snap.shadows)} orders",
+                                extra={"shadow_client_ids": list(_recon_snap.shadows), "action": "Manual review required"},
                             )
-                        if not orphans and not shadows:
+                        if not _recon_snap.orphans and not _recon_snap.shadows:
                             logger.info("Orphan check: No drift detected")
-                    except Exception as e:
-                        logger.error(f"Orphan check failed: {e}", exc_info=True)
 
-                # PATCH 9 (2026-02-14): Periodic reconciliation check
-                if periodic_reconciler:
-                    try:
-                        reconcile_result = periodic_reconciler.check()
-                        if reconcile_result.ran:
-                            if reconcile_result.discrepancies:
-                                logger.error(
-                                    f"RECONCILIATION DISCREPANCIES: {len(reconcile_result.discrepancies)} found",
-                                    extra={
-                                        "discrepancies": [
-                                            {
-                                                "type": d.type,
-                                                "symbol": d.symbol,
-                                                "local": str(d.local_value),
-                                                "broker": str(d.broker_value),
-                                                "resolution": d.resolution,
-                                            }
-                                            for d in reconcile_result.discrepancies
-                                        ],
-                                        "run_count": periodic_reconciler.run_count,
-                                    },
-                                )
-                                journal.write_event({
-                                    "event": "reconciliation_discrepancies",
-                                    "count": len(reconcile_result.discrepancies),
-                                    "run_id": trade_run_id,
-                                    "ts_utc": _utc_iso(),
-                                })
-                            else:
-                                logger.info(
-                                    f"Periodic reconciliation: No discrepancies (run #{periodic_reconciler.run_count})"
-                                )
-                    except Exception as e:
-                        logger.error(f"Periodic reconciliation failed: {e}", exc_info=True)
+                    # PATCH 9 (2026-02-14): Periodic reconciliation results
+                    if _recon_snap.reconcile_ran:
+                        if _recon_snap.discrepancies:
+                            logger.error(
+                                f"RECONCILIATION DISCREPANCIES: {len(_recon_snap.discrepancies)} found",
+                                extra={
+                                    "discrepancies": [
+                                        {
+                                            "type": d.type,
+                                            "symbol": d.symbol,
+                                            "local": str(d.local_value),
+                                            "broker": str(d.broker_value),
+                                            "resolution": d.resolution,
+                                        }
+                                        for d in _recon_snap.discrepancies
+                                    ],
+                                    "run_count": _recon_snap.reconcile_run_count,
+                                },
+                            )
+                            journal.write_event({
+                                "event": "reconciliation_discrepancies",
+                                "count": len(_recon_snap.discrepancies),
+                                "run_id": trade_run_id,
+                                "ts_utc": _utc_iso(),
+                            })
+                        else:
+                            logger.info(
+                                f"Periodic reconciliation: No discrepancies (run #{_recon_snap.reconcile_run_count})"
+                            )
 
-                # PATCH 5: Periodic snapshot save with health monitoring
+                    if _recon_snap.urgent_reasons:
+                        journal.write_event({
+                            "event": "reconciliation_urgent",
+                            "reasons": list(_recon_snap.urgent_reasons),
+                            "block_trading": _recon_snap.block_trading,
+                            "run_id": trade_run_id,
+                            "ts_utc": _utc_iso(),
+                        })
+                    for _err in _recon_snap.errors:
+                        logger.error(f"Background reconciliation error: {_err}")
+
+                    # Auto-heal writes PositionStore/OrderTracker: run it here on
+                    # the runtime thread, never on the worker.
+                    if _recon_snap.heal_requested or _recon_snap.heal_drifts:
+                        _recon_worker.apply_heal(_recon_snap)
+
+                # PATCH 5: Periodic snapshot save with health monitoring.
+                # Crash-recovery state: never shed by the cycle watchdog.
                 _now_mono = time.monotonic()
                 if _snapshot_persistence and (_now_mono - _last_snapshot_time) >= _snapshot_interval_s:
                     try:
@@ -1744,6 +2089,38 @@ def run(opts: RunOptions) -> int:
                                     _snapshot_monitor.consecutive_failures,
                                 )
 
+                # Terminal orders past their grace period -> cold store
+                if hasattr(_order_machine, "archive_terminal_orders") and _cycle_watchdog.allow_auxiliary(
+                    "order_archive"
+                ):
+                    try:
+                        _order_machine.archive_terminal_orders()
+                    except Exception as _arch_exc:
+                        logger.warning("Order archival failed: %s", _arch_exc)
+
+                _cycle_report = _cycle_watchdog.end_cycle()
+                if _cycle_report.shed:
+                    journal.write_event({
+                        "event": "cycle_load_shed",
+                        "cycle": _cycle_report.cycle,
+                        "elapsed_s": _cycle_report.elapsed_s,
+                        "budget_s": _cycle_report.budget_s,
+                        "deferred_symbols": list(_cycle_report.deferred_symbols),
+                        "dropped_tasks": list(_cycle_report.dropped_tasks),
+                        "admitted": _cycle_report.admitted,
+                        "run_id": trade_run_id,
+                        "ts_utc": _utc_iso(),
+                    })
+                if _cycle_report.overrun:
+                    journal.write_event({
+                        "event": "cycle_overrun",
+                        "cycle": _cycle_report.cycle,
+                        "elapsed_s": _cycle_report.elapsed_s,
+                        "budget_s": _cycle_report.budget_s,
+                        "run_id": trade_run_id,
+                        "ts_utc": _utc_iso(),
+                    })
+
                 # ✅ success path only: reset breaker after a full successful cycle
                 _circuit_breaker.record_success()
 
@@ -1761,6 +2138,10 @@ def run(opts: RunOptions) -> int:
                         pre_open_interval_s=_preopen_sleep_s,
                         pre_open_window_m=_preopen_window_m,
                     )
+                    # Keep the cycle cadence: time already spent counts
+                    # against the interval instead of pushing the next cycle late.
+                    if _market_is_open and _cycle_watchdog.enabled:
+                        _sleep_s = max(0.0, _sleep_s - _cycle_report.elapsed_s)
                     try:
                         time.sleep(_sleep_s)
                     except KeyboardInterrupt:
@@ -1810,6 +2191,24 @@ def run(opts: RunOptions) -> int:
         return 0
 
     finally:
+        try:
+            if intent_source is not None:
+                intent_source.stop()
+        except Exception:
+            pass
+
+        try:
+            if _recon_worker is not None:
+                _recon_worker.stop()
+        except Exception:
+            pass
+
+        try:
+            if _prefetcher is not None:
+                _prefetcher.close()
+        except Exception:
+            pass
+
         # Close PositionStore first (SQLite "database is locked" prevention on Windows)
         try:
             _ps = container.get_position_store()
@@ -1828,6 +2227,12 @@ def run(opts: RunOptions) -> int:
         except Exception:
             pass
 
+        try:
+            if hasattr(broker, "close"):
+                broker.close()
+        except Exception:
+            pass
+
 
 def run_app(opts: RunOptions) -> int:
     """
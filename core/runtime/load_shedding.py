@@ -0,0 +1,274 @@
+"""
+Cycle-overrun watchdog with adaptive load shedding.
+
+PROBLEM:
+    When a cycle takes longer than the bar interval nothing reacts: the next
+    cycle simply starts late and the loop falls further and further behind.
+    With a large scanner watchlist, symbols we actually hold can end up at
+    the back of the queue behind dozens of candidates.
+
+DESIGN:
+    - CycleWatchdog tracks the cycle time budget (normally the run interval).
+    - plan_cycle() orders the symbols in three tiers:
+        1. PRIORITY  - open positions / pending orders (never shed)
+        2. NORMAL    - configured symbols
+        3. LOW       - scanner-sourced symbols (shed first)
+      Symbols deferred last cycle move to the front of their tier so a long
+      watchlist rotates instead of the same tail starving every cycle.
+    - admit(symbol) is asked before each symbol is evaluated. Once elapsed
+      time plus the expected per-symbol cost crosses the shed threshold
+      (shed_fraction * budget), LOW symbols are deferred first; past the
+      full budget NORMAL symbols are deferred too. PRIORITY symbols are
+      always admitted.
+    - allow_auxiliary(name) gates optional per-cycle work (housekeeping,
+      analytics, reporting). A task is dropped while the cycle is over the
+      shed threshold, but never more than max_aux_deferrals cycles in a row.
+      Recovery-critical work (NEVER_SHED_TASKS, e.g. the state snapshot) is
+      always allowed and should not be gated at all.
+    - end_cycle() returns a CycleReport; the runtime journals shed decisions
+      and overruns from it.
+
+Budget None/0 disables shedding (run_once, tests): every symbol is admitted.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.logging import LogStream, get_logger
+
+logger = get_logger(LogStream.SYSTEM)
+
+
+TIER_PRIORITY = "priority"
+TIER_NORMAL = "normal"
+TIER_LOW = "low"
+
+# Work the runtime relies on to recover from a crash; never dropped.
+NEVER_SHED_TASKS = frozenset({"state_snapshot"})
+
+
+@dataclass(frozen=True)
+class CycleReport:
+    """What the watchdog decided during one cycle."""
+    cycle: int
+    elapsed_s: float
+    budget_s: Optional[float]
+    overrun: bool
+    deferred_symbols: Tuple[str, ...] = ()
+    dropped_tasks: Tuple[str, ...] = ()
+    admitted: int = 0
+
+    @property
+    def shed(self) -> bool:
+        return bool(self.deferred_symbols or self.dropped_tasks)
+
+
+class CycleWatchdog:
+    """
+    Tracks the per-cycle time budget and decides what to shed.
+
+    Usage:
+        wd = CycleWatchdog(budget_s=60)
+
+        while running:
+            wd.begin_cycle()
+            for sym in wd.plan_cycle(symbols, priority=held, low=scanner):
+                if not wd.admit(sym):
+                    continue
+                ...evaluate sym...
+            if wd.allow_auxiliary("snapshot"):
+                ...optional work...
+            report = wd.end_cycle()
+    """
+
+    def __init__(
+        self,
+        budget_s: Optional[float],
+        *,
+        shed_fraction: float = 0.8,
+        max_aux_deferrals: int = 3,
+        ewma_alpha: float = 0.3,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            budget_s: Cycle time budget in seconds (None/0 disables shedding)
+            shed_fraction: Fraction of the budget after which LOW symbols
+                and auxiliary work are shed
+            max_aux_deferrals: Max consecutive cycles an auxiliary task may
+                be dropped before it is forced to run
+            ewma_alpha: Smoothing for the per-symbol cost estimate
+            monotonic: Injectable monotonic clock (tests)
+        """
+        if not 0.0 < shed_fraction <= 1.0:
+            raise ValueError(f"shed_fraction must be in (0, 1], got {shed_fraction}")
+        self._budget_s = float(budget_s) if budget_s else None
+        self._shed_fraction = shed_fraction
+        self._max_aux_deferrals = max(0, int(max_aux_deferrals))
+        self._alpha = ewma_alpha
+        self._monotonic = monotonic
+
+        self._cycle = 0
+        self._cycle_start: Optional[float] = None
+        self._last_admit_at: Optional[float] = None
+        self._symbol_cost_s = 0.0
+
+        self._tiers: Dict[str, str] = {}
+        self._deferred: List[str] = []
+        self._carry_over: Set[str] = set()
+        self._dropped: List[str] = []
+        self._aux_deferrals: Dict[str, int] = {}
+        self._admitted = 0
+
+        self._overruns = 0
+        self._cycles_shed = 0
+        self._symbols_deferred = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._budget_s is not None
+
+    @property
+    def budget_s(self) -> Optional[float]:
+        return self._budget_s
+
+    # ========================================================================
+    # CYCLE CONTROL
+    # ========================================================================
+
+    def begin_cycle(self) -> int:
+        self._cycle += 1
+        self._cycle_start = self._monotonic()
+        self._last_admit_at = None
+        self._deferred = []
+        self._dropped = []
+        self._admitted = 0
+        return self._cycle
+
+    def elapsed(self) -> float:
+        if self._cycle_start is None:
+            return 0.0
+        return self._monotonic() - self._cycle_start
+
+    def remaining(self) -> Optional[float]:
+        if self._budget_s is None:
+            return None
+        return self._budget_s - self.elapsed()
+
+    def plan_cycle(
+        self,
+        symbols: Iterable[str],
+        *,
+        priority: Iterable[str] = (),
+        low: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Return *symbols* ordered PRIORITY -> NORMAL -> LOW (stable within a
+        tier, last cycle's deferred symbols first).
+        """
+        prio = {str(s).upper() for s in priority}
+        lows = {str(s).upper() for s in low}
+        tiers: Dict[str, List[str]] = {TIER_PRIORITY: [], TIER_NORMAL: [], TIER_LOW: []}
+        self._tiers = {}
+        seen: Set[str] = set()
+        for sym in symbols:
+            if sym in seen:
+                continue
+            seen.add(sym)
+            key = str(sym).upper()
+            tier = TIER_PRIORITY if key in prio else (TIER_LOW if key in lows else TIER_NORMAL)
+            self._tiers[sym] = tier
+            tiers[tier].append(sym)
+
+        ordered: List[str] = []
+        for tier in (TIER_PRIORITY, TIER_NORMAL, TIER_LOW):
+            carried = [s for s in tiers[tier] if s in self._carry_over]
+            rest = [s for s in tiers[tier] if s not in self._carry_over]
+            ordered.extend(carried + rest)
+        return ordered
+
+    def tier_of(self, symbol: str) -> str:
+        return self._tiers.get(symbol, TIER_NORMAL)
+
+    # ========================================================================
+    # SHEDDING DECISIONS
+    # ========================================================================
+
+    def admit(self, symbol: str) -> bool:
+        """True if *symbol* should be evaluated this cycle."""
+        now = self._monotonic()
+        if self._last_admit_at is not None:
+            cost = now - self._last_admit_at
+            self._symbol_cost_s = (
+                cost if self._symbol_cost_s == 0.0
+                else self._alpha * cost + (1.0 - self._alpha) * self._symbol_cost_s
+            )
+
+        tier = self.tier_of(symbol)
+        if self._budget_s is not None and tier != TIER_PRIORITY:
+            projected = self.elapsed() + self._symbol_cost_s
+            limit = self._budget_s * self._shed_fraction if tier == TIER_LOW else self._budget_s
+            if projected >= limit:
+                self._deferred.append(symbol)
+                self._last_admit_at = None
+                return False
+
+        self._last_admit_at = now
+        self._admitted += 1
+        return True
+
+    def over_soft_budget(self) -> bool:
+        if self._budget_s is None:
+            return False
+        return self.elapsed() >= self._budget_s * self._shed_fraction
+
+    def allow_auxiliary(self, name: str) -> bool:
+        """True if optional work *name* may run this cycle."""
+        if name in NEVER_SHED_TASKS or not self.over_soft_budget():
+            self._aux_deferrals[name] = 0
+            return True
+        deferrals = self._aux_deferrals.get(name, 0)
+        if deferrals >= self._max_aux_deferrals:
+            # Bounded starvation: run it anyway.
+            self._aux_deferrals[name] = 0
+            return True
+        self._aux_deferrals[name] = deferrals + 1
+        self._dropped.append(name)
+        return False
+
+    def end_cycle(self) -> CycleReport:
+        elapsed = self.elapsed()
+        overrun = self._budget_s is not None and elapsed > self._budget_s
+        report = CycleReport(
+            cycle=self._cycle,
+            elapsed_s=round(elapsed, 6),
+            budget_s=self._budget_s,
+            overrun=overrun,
+            deferred_symbols=tuple(self._deferred),
+            dropped_tasks=tuple(self._dropped),
+            admitted=self._admitted,
+        )
+        self._carry_over = set(self._deferred)
+        if overrun:
+            self._overruns += 1
+        if report.shed:
+            self._cycles_shed += 1
+            self._symbols_deferred += len(self._deferred)
+            logger.warning(
+                "Cycle %d load shed: deferred=%d dropped=%s elapsed=%.2fs budget=%s",
+                self._cycle, len(self._deferred), list(self._dropped), elapsed, self._budget_s,
+            )
+        return report
+
+    def get_stats(self) -> dict:
+        return {
+            "cycle": self._cycle,
+            "budget_s": self._budget_s,
+            "symbol_cost_s": round(self._symbol_cost_s, 6),
+            "overruns": self._overruns,
+            "cycles_shed": self._cycles_shed,
+            "symbols_deferred": self._symbols_deferred,
+        }
@@ -0,0 +1,153 @@
+"""
+Pipelined market-data prefetch for the runtime cycle.
+
+PROBLEM:
+    The runtime loop handles symbols strictly one after another:
+    fetch -> validate -> strategies -> risk -> submit -> next symbol.
+    Cycle wall time is therefore sum(I/O) + sum(compute).
+
+DESIGN:
+    - BarPrefetcher keeps the data fetch for the next ``lookahead``
+      symbols in flight on a small thread pool while the loop runs
+      strategies/risk/submission for the current symbol.
+    - The consumer still walks symbols in the original order and calls
+      get(symbol) exactly where it used to call the pipeline, so journal
+      events, per-symbol ordering and order submission stay on the main
+      runtime thread and remain deterministic.
+    - Fetch exceptions are captured in the future and re-raised from
+      get(), so the loop's existing DataPipelineError / generic error
+      handling is unchanged.
+    - begin_cycle() drops every result from the previous cycle so a
+      stale prefetch can never be consumed by a later cycle.
+
+Cycle wall time approaches max(I/O, compute) instead of their sum.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.logging import LogStream, get_logger
+
+logger = get_logger(LogStream.SYSTEM)
+
+
+class BarPrefetcher:
+    """Overlaps per-symbol data fetches with per-symbol compute."""
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[str], Any],
+        *,
+        lookahead: int = 2,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            fetch_fn: Callable returning the raw data for one symbol
+                (e.g. a DataFrame from the market data pipeline).
+            lookahead: How many symbols ahead of the consumer to keep
+                in flight (>= 1).
+            max_workers: Thread pool size (defaults to ``lookahead``).
+        """
+        if lookahead < 1:
+            raise ValueError("lookahead must be >= 1")
+
+        self._fetch_fn = fetch_fn
+        self.lookahead = int(lookahead)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.lookahead,
+            thread_name_prefix="BarPrefetch",
+        )
+        self._lock = threading.Lock()
+        self._symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        self._next_to_schedule = 0
+        self._closed = False
+
+        self._prefetch_hits = 0
+        self._inline_fetches = 0
+        self._discarded = 0
+
+    # -- cycle control -------------------------------------------------------
+
+    def begin_cycle(self, symbols: Sequence[str]) -> None:
+        """Start a new cycle: drop old results and prime the first window."""
+        with self._lock:
+            self._discard_pending_locked()
+            self._symbols = list(symbols)
+            self._index = {}
+            for i, sym in enumerate(self._symbols):
+                self._index.setdefault(sym, i)
+            self._next_to_schedule = 0
+            self._schedule_until_locked(self.lookahead)
+
+    def get(self, symbol: str) -> Any:
+        """
+        Return the fetch result for *symbol*, blocking until it is ready.
+
+        Schedules the fetches that follow *symbol* before waiting so the
+        window keeps sliding. Re-raises whatever the fetch raised.
+        Symbols that were never scheduled (not part of the cycle) are
+        fetched inline on the caller's thread.
+        """
+        with self._lock:
+            fut = self._futures.pop(symbol, None)
+            pos = self._index.get(symbol)
+            if pos is not None:
+                self._schedule_until_locked(pos + 1 + self.lookahead)
+            if fut is None:
+                self._inline_fetches += 1
+            else:
+                self._prefetch_hits += 1
+
+        if fut is None:
+            return self._fetch_fn(symbol)
+        return fut.result()
+
+    def close(self) -> None:
+        """Cancel outstanding fetches and stop the pool."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._discard_pending_locked()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "lookahead": self.lookahead,
+                "in_flight": len(self._futures),
+                "prefetch_hits": self._prefetch_hits,
+                "inline_fetches": self._inline_fetches,
+                "discarded": self._discarded,
+            }
+
+    # -- internals -----------------------------------------------------------
+
+    def _schedule_until_locked(self, end: int) -> None:
+        if self._closed:
+            return
+        end = min(end, len(self._symbols))
+        while self._next_to_schedule < end:
+            sym = self._symbols[self._next_to_schedule]
+            self._next_to_schedule += 1
+            if sym in self._futures:
+                continue
+            self._futures[sym] = self._executor.submit(self._fetch_fn, sym)
+
+    def _discard_pending_locked(self) -> None:
+        for fut in self._futures.values():
+            fut.cancel()
+            self._discarded += 1
+        self._futures.clear()
+
+    def __enter__(self) -> "BarPrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
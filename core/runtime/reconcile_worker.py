@@ -0,0 +1,305 @@
+"""
+Background reconciliation worker.
+
+PROBLEM:
+    The runtime loop used to run the orphan/shadow order check and
+    PeriodicReconciler.check() inline, so every reconciliation pass
+    blocked signal evaluation on a full broker order/position pull.
+
+DESIGN:
+    - ReconciliationWorker runs periodic reconciliation, drift detection
+      (core.monitoring.drift.DriftDetector) and the orphan/shadow order
+      check on its own daemon thread.
+    - Auto-heal writes local state, so it never runs on the worker thread:
+      the snapshot carries a heal request (heal_requested / heal_drifts)
+      and the runtime loop executes it with apply_heal().
+    - Each pass produces an immutable ReconciliationSnapshot. Publishing is
+      a single reference assignment (atomic under the GIL); the main loop
+      reads ``latest()`` without taking any lock.
+    - Urgent findings (position discrepancies, CRITICAL drift) set
+      ``block_trading`` on the snapshot the moment the pass completes, so
+      the loop can refuse new entries on its very next signal.
+    - tick() runs one pass synchronously (used by run_once and tests).
+
+SAFETY:
+    - Exits are never blocked; only new entries.
+    - The block clears only after a later pass of the same check comes
+      back clean.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, Tuple
+
+from core.logging import LogStream, get_logger
+
+logger = get_logger(LogStream.SYSTEM)
+
+
+# Discrepancy types that mean local position state cannot be trusted.
+URGENT_DISCREPANCY_TYPES = frozenset({
+    "missing_position",
+    "extra_position",
+    "qty_mismatch",
+})
+
+
+@dataclass(frozen=True)
+class ReconciliationSnapshot:
+    """Immutable result of one background reconciliation pass."""
+    seq: int
+    timestamp: datetime
+    reconcile_ran: bool = False
+    reconcile_run_count: int = 0
+    discrepancies: Tuple[Any, ...] = ()
+    drifts: Tuple[Any, ...] = ()
+    orphan_check_ran: bool = False
+    orphans: Tuple[str, ...] = ()
+    shadows: Tuple[str, ...] = ()
+    heal_requested: bool = False          # reconciler discrepancies to heal
+    heal_drifts: Tuple[Any, ...] = ()     # MINOR drifts to auto-reconcile
+    urgent_reasons: Tuple[str, ...] = ()
+    block_trading: bool = False
+    errors: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def _drift_is_critical(drift: Any) -> bool:
+    sev = getattr(drift, "severity", None)
+    return str(getattr(sev, "value", sev)).upper() == "CRITICAL"
+
+
+def _drift_is_minor(drift: Any) -> bool:
+    sev = getattr(drift, "severity", None)
+    return str(getattr(sev, "value", sev)).upper() == "MINOR"
+
+
+class ReconciliationWorker:
+    """
+    Runs reconciliation off the trading hot path and hands results to the
+    runtime loop through a lock-free snapshot reference.
+
+    Usage::
+
+        worker = ReconciliationWorker(
+            periodic_reconciler=periodic,
+            broker=broker,
+            order_tracker=tracker,
+            orphan_interval_s=600,
+            block_on_urgent=(mode == "live"),
+        )
+        worker.start()
+        ...
+        snap = worker.latest()
+        if snap is not None and snap.block_trading:
+            # refuse new entries
+        if snap is not None and (snap.heal_requested or snap.heal_drifts):
+            worker.apply_heal(snap)   # on the runtime thread
+    """
+
+    def __init__(
+        self,
+        *,
+        periodic_reconciler: Any = None,
+        drift_detector: Any = None,
+        broker: Any = None,
+        order_tracker: Any = None,
+        orphan_interval_s: float = 600.0,
+        drift_interval_s: Optional[float] = None,
+        auto_heal: bool = False,
+        block_on_urgent: bool = True,
+        poll_interval_s: float = 1.0,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._periodic = periodic_reconciler
+        self._drift_detector = drift_detector
+        self._broker = broker
+        self._order_tracker = order_tracker
+        self._orphan_interval_s = float(orphan_interval_s)
+        if drift_interval_s is None:
+            drift_interval_s = float(getattr(drift_detector, "check_interval", 60) or 60)
+        self._drift_interval_s = float(drift_interval_s)
+        self._auto_heal = bool(auto_heal)
+        self._block_on_urgent = bool(block_on_urgent)
+        self._poll_interval_s = max(0.01, float(poll_interval_s))
+        self._monotonic = monotonic
+
+        self._last_orphan_check: Optional[float] = None
+        self._last_drift_check: Optional[float] = None
+        self._urgent_reconcile: Tuple[str, ...] = ()
+        self._urgent_drift: Tuple[str, ...] = ()
+        self._seq = 0
+
+        # Lock-free handoff: written only by the worker, read by the loop.
+        self._latest: Optional[ReconciliationSnapshot] = None
+
+        self._tick_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- public API ----------------------------------------------------------
+
+    def latest(self) -> Optional[ReconciliationSnapshot]:
+        """Most recent published snapshot (None until the first pass)."""
+        return self._latest
+
+    @property
+    def trading_blocked(self) -> bool:
+        snap = self._latest
+        return bool(snap is not None and snap.block_trading)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ReconciliationWorker", daemon=True
+        )
+        self._thread.start()
+        logger.info("ReconciliationWorker started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=timeout)
+        self._thread = None
+
+    def tick(self) -> Optional[ReconciliationSnapshot]:
+        """
+        Run one pass of every check that is due.
+
+        Returns the published snapshot, or None if nothing was due.
+        """
+        with self._tick_lock:
+            return self._tick_locked()
+
+    # -- internals -----------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:  # never let the worker die silently
+                logger.error(f"Reconciliation worker pass failed: {e}", exc_info=True)
+            self._stop_event.wait(self._poll_interval_s)
+
+    def _due(self, last: Optional[float], interval_s: float, now: float) -> bool:
+        return last is None or (now - last) >= interval_s
+
+    def _tick_locked(self) -> Optional[ReconciliationSnapshot]:
+        now = self._monotonic()
+        errors: List[str] = []
+        published = False
+
+        reconcile_ran = False
+        run_count = 0
+        discrepancies: Tuple[Any, ...] = ()
+        heal_requested = False
+
+        if self._periodic is not None:
+            try:
+                result = self._periodic.check()
+                if getattr(result, "ran", False):
+                    reconcile_ran = True
+                    published = True
+                    run_count = int(getattr(self._periodic, "run_count", 0) or 0)
+                    discrepancies = tuple(getattr(result, "discrepancies", []) or [])
+                    self._urgent_reconcile = tuple(
+                        f"{d.type}:{d.symbol}"
+                        for d in discrepancies
+                        if getattr(d, "type", None) in URGENT_DISCREPANCY_TYPES
+                    )
+                    heal_requested = bool(discrepancies) and self._auto_heal
+            except Exception as e:
+                errors.append(f"reconcile:{type(e).__name__}:{e}")
+
+        drifts: Tuple[Any, ...] = ()
+        heal_drifts: Tuple[Any, ...] = ()
+        if self._drift_detector is not None and self._due(self._last_drift_check, self._drift_interval_s, now):
+            self._last_drift_check = now
+            published = True
+            try:
+                drifts = tuple(self._drift_detector.check_drift() or [])
+                self._urgent_drift = tuple(
+                    f"drift:{getattr(d, 'symbol', '?')}" for d in drifts if _drift_is_critical(d)
+                )
+                if self._auto_heal:
+                    heal_drifts = tuple(d for d in drifts if _drift_is_minor(d))
+            except Exception as e:
+                errors.append(f"drift:{type(e).__name__}:{e}")
+
+        orphan_ran = False
+        orphans: Tuple[str, ...] = ()
+        shadows: Tuple[str, ...] = ()
+        if (
+            self._order_tracker is not None
+            and self._broker is not None
+            and self._due(self._last_orphan_check, self._orphan_interval_s, now)
+        ):
+            self._last_orphan_check = now
+            published = True
+            try:
+                broker_orders_list = self._broker.get_orders()
+                broker_orders = {order.id: order for order in broker_orders_list}
+                orphans = tuple(self._order_tracker.get_orphaned_orders(broker_orders) or [])
+                shadows = tuple(self._order_tracker.get_shadow_orders(broker_orders) or [])
+                orphan_ran = True
+            except Exception as e:
+                errors.append(f"orphan_check:{type(e).__name__}:{e}")
+
+        if not published:
+            return None
+
+        urgent = self._urgent_reconcile + self._urgent_drift
+        self._seq += 1
+        snap = ReconciliationSnapshot(
+            seq=self._seq,
+            timestamp=datetime.now(timezone.utc),
+            reconcile_ran=reconcile_ran,
+            reconcile_run_count=run_count,
+            discrepancies=discrepancies,
+            drifts=drifts,
+            orphan_check_ran=orphan_ran,
+            orphans=orphans,
+            shadows=shadows,
+            heal_requested=heal_requested,
+            heal_drifts=heal_drifts,
+            urgent_reasons=urgent,
+            block_trading=bool(urgent) and self._block_on_urgent,
+            errors=tuple(errors),
+        )
+        self._latest = snap
+        return snap
+
+    def apply_heal(self, snap: ReconciliationSnapshot) -> int:
+        """
+        Run the heal a snapshot requested, on the caller's (runtime) thread.
+
+        Returns the number of heal actions / reconciled drifts. Failures are
+        logged, never raised; the next pass reports what is still off.
+        """
+        healed = 0
+        if snap.heal_requested:
+            reconciler = getattr(self._periodic, "_reconciler", None)
+            if reconciler is not None and hasattr(reconciler, "heal_startup"):
+                try:
+                    actions = reconciler.heal_startup() or []
+                    healed += len(actions)
+                    logger.warning(f"Reconcile auto-heal applied {len(actions)} action(s)")
+                except Exception as e:
+                    logger.error(f"Reconcile auto-heal failed: {e}", exc_info=True)
+        for d in snap.heal_drifts:
+            try:
+                if self._drift_detector.auto_reconcile(d):
+                    healed += 1
+            except Exception as e:
+                logger.error(f"Drift auto-heal failed for {getattr(d, 'symbol', '?')}: {e}", exc_info=True)
+        return healed
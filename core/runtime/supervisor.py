@@ -0,0 +1,514 @@
+"""
+Universe sharding across worker processes (supervisor mode).
+
+PROBLEM:
+    One runtime process cannot evaluate a few hundred symbols at 1-minute
+    cadence: data parsing, strategy evaluation and Decimal math all hold
+    the GIL.
+
+DESIGN:
+    - The universe is partitioned across N shard worker processes
+      (partition_universe, round-robin in universe order).
+    - Each shard worker owns ONLY the data + strategy stages for its
+      symbols: it fetches/validates bars via the same _acquire_bar() the
+      runtime loop uses, runs its strategies, and sends OrderIntents to
+      the supervisor. Workers never touch the broker, PositionStore,
+      limits tracker or risk gate.
+    - The parent process runs the normal app.run() loop with
+      ``intent_source=UniverseSupervisor(...)``. It stays the single
+      risk/execution process: guards, protections, RiskManager,
+      PreTradeRiskGate, PositionStore and the broker connection all live
+      there, so global risk limits remain atomic.
+    - Worker journal events are forwarded over the intent queue and
+      written by the parent (single journal writer).
+    - Fills are routed back to the owning shard so strategies see
+      on_order_filled() exactly as in single-process mode.
+    - The parent does not load or start strategies itself; the shards own
+      them.
+
+ORDERING:
+    Workers run in lockstep with the parent: collect_cycle() numbers the
+    cycle and sends a CycleTick to every shard (on the same queue as fills,
+    so fills reach a shard before the bar they precede). Workers tag their
+    intents and cycle-done marker with that number. collect_cycle() waits
+    for the marker from every live shard (bounded by a timeout), drops
+    intents tagged with another cycle (late arrivals from a timed-out
+    cycle) or older than max_intent_age_s, and returns the rest sorted by
+    universe position, so per-symbol ordering and journal order are
+    deterministic regardless of shard timing.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.logging import LogStream, get_logger
+
+logger = get_logger(LogStream.SYSTEM)
+
+
+# ============================================================================
+# MESSAGES (must stay picklable)
+# ============================================================================
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Everything a shard worker needs to build its data + strategy stages."""
+    shard_id: int
+    symbols: Tuple[str, ...]
+    config_path: str
+    mode: str
+    run_interval_s: int
+    run_once: bool = False
+    universe_symbols: Optional[Tuple[str, ...]] = None
+
+
+@dataclass(frozen=True)
+class OrderIntent:
+    """A strategy signal produced by a shard, to be risk-checked and executed."""
+    shard_id: int
+    cycle: int
+    symbol: str
+    signal: dict
+    bar: Any
+    created_at: float
+
+
+@dataclass(frozen=True)
+class ShardJournalEvent:
+    shard_id: int
+    event: dict
+
+
+@dataclass(frozen=True)
+class ShardCycleDone:
+    shard_id: int
+    cycle: int
+
+
+@dataclass(frozen=True)
+class CycleTick:
+    """Parent -> shard: run cycle ``cycle`` now."""
+    cycle: int
+
+
+@dataclass(frozen=True)
+class FillNotice:
+    strategy_name: str
+    order_id: str
+    symbol: str
+    filled_qty: Any
+    fill_price: Any
+
+
+# ============================================================================
+# PARTITIONING
+# ============================================================================
+
+def partition_universe(symbols: Sequence[str], n_shards: int) -> List[List[str]]:
+    """
+    Deterministically split *symbols* into at most *n_shards* non-empty
+    shards (round-robin in universe order, duplicates removed).
+    """
+    if n_shards < 1:
+        raise ValueError("n_shards must be >= 1")
+    unique: List[str] = []
+    for s in symbols:
+        if s not in unique:
+            unique.append(s)
+    shards: List[List[str]] = [[] for _ in range(min(n_shards, max(1, len(unique))))]
+    for i, sym in enumerate(unique):
+        shards[i % len(shards)].append(sym)
+    return [s for s in shards if s]
+
+
+# ============================================================================
+# SHARD WORKER (child process)
+# ============================================================================
+
+class _QueueJournal:
+    """Journal shim for workers: forwards events to the parent's writer."""
+
+    def __init__(self, out_q: Any, shard_id: int) -> None:
+        self._q = out_q
+        self._shard_id = shard_id
+
+    def write_event(self, event: Dict[str, Any]) -> None:
+        self._q.put(ShardJournalEvent(shard_id=self._shard_id, event=dict(event)))
+
+
+def _build_shard_components(spec: ShardSpec):
+    """Config, data pipeline, validator and strategies for one shard."""
+    from core.config.loader import ConfigLoader
+    from core.config.schema import ConfigSchema
+    from core.data.pipeline import MarketDataPipeline
+    from core.data.validator import DataValidator
+    from core.net import alpaca_shared_budgets, create_combined_throttler
+    from core.runtime.app import _ensure_strategy_registry_bootstrapped, _load_strategies
+    from strategies.lifecycle import StrategyLifecycleManager
+    from strategies.registry import StrategyRegistry
+
+    raw = ConfigLoader(config_dir=Path(spec.config_path).parent).load()
+    cfg = ConfigSchema(**raw)
+
+    validator = DataValidator(
+        max_staleness_seconds=cfg.data.max_staleness_seconds,
+        require_complete_bars=True,
+    )
+
+    pipeline = None
+    try:
+        pipeline = MarketDataPipeline(
+            alpaca_api_key=cfg.broker.api_key,
+            alpaca_api_secret=cfg.broker.api_secret,
+            max_staleness_seconds=cfg.data.max_staleness_seconds,
+            throttler=create_combined_throttler(shared=alpaca_shared_budgets(
+                cfg.broker.api_key, client=f"shard-{spec.shard_id}")),
+            primary_provider=getattr(cfg.data, "primary_provider", "alpaca"),
+            fallback_providers=getattr(cfg.data, "fallback_providers", []),
+            twelvedata_api_key=getattr(cfg.data, "twelvedata_api_key", None),
+            allow_stale_in_paper=getattr(cfg.data, "allow_stale_in_paper", True),
+        )
+    except Exception as e:
+        logger.warning(f"Shard {spec.shard_id}: data pipeline unavailable ({e}); synthetic bars")
+
+    registry = StrategyRegistry()
+    _ensure_strategy_registry_bootstrapped(SimpleNamespace(get_strategy_registry=lambda: registry))
+    lifecycle = StrategyLifecycleManager()
+    _load_strategies(
+        cfg,
+        registry,
+        lifecycle,
+        universe_symbols=list(spec.universe_symbols) if spec.universe_symbols else None,
+        symbol_filter=set(spec.symbols),
+    )
+    return pipeline, validator, lifecycle
+
+
+def _apply_fill(notice: FillNotice, lifecycle: Any) -> None:
+    try:
+        lifecycle.on_order_filled(
+            strategy_name=notice.strategy_name,
+            order_id=notice.order_id,
+            symbol=notice.symbol,
+            filled_qty=notice.filled_qty,
+            fill_price=notice.fill_price,
+        )
+    except Exception:
+        logger.warning("Shard strategy fill callback failed", exc_info=True)
+
+
+def shard_worker_main(spec: ShardSpec, intent_q: Any, fill_q: Any, stop_event: Any) -> None:
+    """
+    Child-process entrypoint: data + strategy stages for one shard.
+
+    fill_q carries FillNotices and the parent's CycleTicks; a cycle runs
+    only when the parent ticks it.
+    """
+    from core.runtime.app import RunOptions, _acquire_bar, _get_latest_bars_compat
+
+    journal = _QueueJournal(intent_q, spec.shard_id)
+    try:
+        pipeline, validator, lifecycle = _build_shard_components(spec)
+    except Exception as e:
+        journal.write_event({"event": "shard_worker_failed", "shard_id": spec.shard_id, "error": str(e)})
+        intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=0))
+        return
+
+    no_market_data_mode = pipeline is None or getattr(pipeline, "get_latest_bars", None) is None
+    opts = RunOptions(
+        config_path=Path(spec.config_path),
+        mode=spec.mode,
+        run_interval_s=spec.run_interval_s,
+        run_once=spec.run_once,
+    )
+
+    def _fetch(sym: str):
+        return _get_latest_bars_compat(pipeline, sym, 120, "1Min")
+
+    while not stop_event.is_set():
+        try:
+            msg = fill_q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        except Exception:
+            return
+        if isinstance(msg, FillNotice):
+            _apply_fill(msg, lifecycle)
+            continue
+        if not isinstance(msg, CycleTick):
+            continue
+        cycle = msg.cycle
+        for symbol in spec.symbols:
+            try:
+                bar = _acquire_bar(
+                    symbol,
+                    opts=opts,
+                    journal=journal,
+                    data_validator=validator,
+                    fetch_bars=_fetch,
+                    no_market_data_mode=no_market_data_mode,
+                )
+                if bar is None:
+                    continue
+                for sig in lifecycle.on_bar(bar) or []:
+                    intent_q.put(OrderIntent(
+                        shard_id=spec.shard_id,
+                        cycle=cycle,
+                        symbol=symbol,
+                        signal=dict(sig),
+                        bar=bar,
+                        created_at=time.time(),
+                    ))
+            except Exception as e:
+                journal.write_event({
+                    "event": "shard_symbol_error",
+                    "shard_id": spec.shard_id,
+                    "symbol": symbol,
+                    "error": str(e),
+                })
+        intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=cycle))
+        if spec.run_once:
+            break
+
+
+# ============================================================================
+# SUPERVISOR (parent / risk-execution process)
+# ============================================================================
+
+class UniverseSupervisor:
+    """
+    Owns the shard worker processes and acts as the runtime loop's
+    intent source.
+
+    Used by app.run(opts, intent_source=supervisor):
+        supervisor.start(all_symbols, universe_symbols=...)
+        for intent in supervisor.collect_cycle(journal=journal): ...
+        supervisor.on_order_filled(...)   # routed to the owning shard
+        supervisor.stop()
+    """
+
+    def __init__(
+        self,
+        opts: Any,
+        n_workers: int,
+        *,
+        mp_context: str = "spawn",
+        collect_timeout_s: Optional[float] = None,
+        max_intent_age_s: Optional[float] = None,
+        worker_target: Any = None,
+    ) -> None:
+        if n_workers < 1:
+            raise ValueError("n_workers must be >= 1")
+        self._opts = opts
+        self.n_workers = int(n_workers)
+        self._ctx = multiprocessing.get_context(mp_context)
+        interval = max(float(getattr(opts, "run_interval_s", 0) or 0), 1.0)
+        self._collect_timeout_s = collect_timeout_s if collect_timeout_s is not None else interval * 2
+        self._max_intent_age_s = max_intent_age_s if max_intent_age_s is not None else interval * 2
+        self._worker_target = worker_target or shard_worker_main
+
+        self._universe: List[str] = []
+        self._rank: Dict[str, int] = {}
+        self._shard_of: Dict[str, int] = {}
+        self._specs: Dict[int, ShardSpec] = {}
+        self._procs: Dict[int, Any] = {}
+        self._fill_qs: Dict[int, Any] = {}
+        self._finished: set = set()
+        self._intent_q: Any = None
+        self._stop_event: Any = None
+        self._started = False
+        self._cycle = 0
+
+        self._intents_received = 0
+        self._intents_expired = 0
+        self._intents_stale = 0
+        self._restarts = 0
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self, symbols: Sequence[str], *, universe_symbols: Optional[Sequence[str]] = None) -> None:
+        if self._started:
+            return
+        self._universe = list(dict.fromkeys(symbols))
+        self._rank = {s: i for i, s in enumerate(self._universe)}
+        self._intent_q = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+
+        for shard_id, shard_symbols in enumerate(partition_universe(self._universe, self.n_workers)):
+            spec = ShardSpec(
+                shard_id=shard_id,
+                symbols=tuple(shard_symbols),
+                config_path=str(self._opts.config_path),
+                mode=self._opts.mode,
+                run_interval_s=int(self._opts.run_interval_s or 0),
+                run_once=bool(getattr(self._opts, "run_once", False)),
+                universe_symbols=tuple(universe_symbols) if universe_symbols else None,
+            )
+            self._specs[shard_id] = spec
+            for sym in shard_symbols:
+                self._shard_of[sym] = shard_id
+            self._fill_qs[shard_id] = self._ctx.Queue()
+            self._spawn(shard_id)
+
+        self._started = True
+        logger.info(
+            f"UniverseSupervisor started: {len(self._specs)} shard(s) for {len(self._universe)} symbol(s)"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self._started:
+            return
+        self._stop_event.set()
+        for proc in self._procs.values():
+            proc.join(timeout=timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout=1.0)
+        self._procs.clear()
+        self._started = False
+        logger.info("UniverseSupervisor stopped")
+
+    def _spawn(self, shard_id: int) -> None:
+        proc = self._ctx.Process(
+            target=self._worker_target,
+            args=(self._specs[shard_id], self._intent_q, self._fill_qs[shard_id], self._stop_event),
+            name=f"ShardWorker-{shard_id}",
+            daemon=True,
+        )
+        proc.start()
+        self._procs[shard_id] = proc
+
+    def _check_workers(self, journal: Any) -> None:
+        for shard_id, proc in list(self._procs.items()):
+            if proc.is_alive() or shard_id in self._finished:
+                continue
+            if self._specs[shard_id].run_once:
+                continue
+            self._restarts += 1
+            journal.write_event({
+                "event": "shard_worker_restarted",
+                "shard_id": shard_id,
+                "exitcode": proc.exitcode,
+                "symbols": list(self._specs[shard_id].symbols),
+            })
+            logger.error(f"Shard worker {shard_id} died (exitcode={proc.exitcode}); restarting")
+            self._spawn(shard_id)
+
+    # -- intent source API (used by app.run) ---------------------------------
+
+    def collect_cycle(self, *, journal: Any) -> List[OrderIntent]:
+        """
+        Gather one cycle's intents from every live shard.
+
+        Worker journal events are written to *journal* as they arrive.
+        Returns this cycle's non-expired intents ordered by universe position.
+        """
+        if not self._started:
+            return []
+        self._check_workers(journal)
+
+        self._cycle += 1
+        cycle = self._cycle
+        pending = {sid for sid, p in self._procs.items() if p.is_alive()}
+        for sid in pending:
+            self._fill_qs[sid].put(CycleTick(cycle))
+        intents: List[OrderIntent] = []
+        deadline = time.monotonic() + self._collect_timeout_s
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not pending:
+                # Pick up anything already queued without waiting.
+                remaining = 0.0
+            try:
+                msg = self._intent_q.get(timeout=remaining) if remaining > 0 else self._intent_q.get_nowait()
+            except queue.Empty:
+                break
+
+            if isinstance(msg, ShardCycleDone):
+                # cycle 0: the worker could not start and will not tick.
+                if msg.cycle not in (cycle, 0):
+                    continue
+                pending.discard(msg.shard_id)
+                if self._specs.get(msg.shard_id) is not None and self._specs[msg.shard_id].run_once:
+                    self._finished.add(msg.shard_id)
+            elif isinstance(msg, ShardJournalEvent):
+                journal.write_event(dict(msg.event, shard_id=msg.shard_id))
+            elif isinstance(msg, OrderIntent):
+                self._intents_received += 1
+                if msg.cycle != cycle:
+                    self._intents_stale += 1
+                    journal.write_event({
+                        "event": "shard_intent_stale",
+                        "shard_id": msg.shard_id,
+                        "symbol": msg.symbol,
+                        "intent_cycle": msg.cycle,
+                        "cycle": cycle,
+                        "signal": dict(msg.signal),
+                    })
+                    continue
+                age = time.time() - msg.created_at
+                if age > self._max_intent_age_s:
+                    self._intents_expired += 1
+                    journal.write_event({
+                        "event": "shard_intent_expired",
+                        "shard_id": msg.shard_id,
+                        "symbol": msg.symbol,
+                        "age_s": round(age, 3),
+                        "signal": dict(msg.signal),
+                    })
+                    continue
+                intents.append(msg)
+
+        if pending:
+            journal.write_event({
+                "event": "shard_cycle_timeout",
+                "pending_shards": sorted(pending),
+                "timeout_s": self._collect_timeout_s,
+            })
+
+        intents.sort(key=lambda it: (self._rank.get(it.symbol, len(self._rank)), it.created_at))
+        return intents
+
+    def on_order_filled(
+        self,
+        strategy_name: str,
+        order_id: str,
+        symbol: str,
+        filled_qty: Any,
+        fill_price: Any,
+    ) -> None:
+        """Route a fill back to the shard whose strategy produced the signal."""
+        shard_id = self._shard_of.get(symbol)
+        if shard_id is None or shard_id not in self._fill_qs:
+            logger.warning(f"Fill for {symbol} has no owning shard; strategy not notified")
+            return
+        self._fill_qs[shard_id].put(FillNotice(
+            strategy_name=strategy_name,
+            order_id=order_id,
+            symbol=symbol,
+            filled_qty=filled_qty,
+            fill_price=fill_price,
+        ))
+
+    def shard_for(self, symbol: str) -> Optional[int]:
+        return self._shard_of.get(symbol)
+
+    def get_stats(self) -> dict:
+        return {
+            "shards": len(self._specs),
+            "alive": sum(1 for p in self._procs.values() if p.is_alive()),
+            "intents_received": self._intents_received,
+            "intents_expired": self._intents_expired,
+            "intents_stale": self._intents_stale,
+            "restarts": self._restarts,
+        }
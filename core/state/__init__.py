@@ -5,6 +5,7 @@ Provides:
 - OrderStateMachine: Explicit state transitions with guards
 - TransactionLog: Append-only event log for crash recovery
 - PositionStore: SQLite-backed position persistence
+- OrderArchive: SQLite cold store for terminal orders
 """
 
 from .order_machine import (
@@ -24,6 +25,8 @@ from .transaction_log import (
     TransactionLogError,
 )
 
+from .order_archive import OrderArchive
+
 from .position_store import (
     PositionStore,
     Position,
@@ -46,6 +49,9 @@ __all__ = [
     "TransactionLog",
     "TransactionLogError",
     
+    # Order Archive
+    "OrderArchive",
+    
     # Position Store
     "PositionStore",
     "Position",
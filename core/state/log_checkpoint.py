@@ -0,0 +1,193 @@
+"""
+Incremental fold of transaction-log events into restart state.
+
+PATCH 37: restart replay (OrderStateMachine.restore_pending_orders and the
+engine's duplicate-order guard) used to fold the whole log history on
+every start. The fold now lives here so TransactionLog can apply it as it
+writes and persist the result in periodic CHECKPOINT records; replay then
+starts from the latest checkpoint instead of the first event.
+
+INVARIANT:
+    OrderLogReducer.from_snapshot(r.snapshot()) followed by the events after
+    the checkpoint yields the same open orders and submitted IDs as folding
+    every event from the start. Terminal orders are dropped from the
+    snapshot (they are never restored); submitted IDs are kept for the
+    duplicate-order guard, but only those submitted within the last
+    MQD_TXLOG_GUARD_ID_DAYS log days (default 7, 0 = keep all), so a
+    checkpoint does not grow with the age of the account.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+CHECKPOINT_EVENT_TYPE = "CHECKPOINT"
+
+TERMINAL_STATES = frozenset({"FILLED", "CANCELLED", "REJECTED", "EXPIRED"})
+
+_META_KEYS = ("symbol", "strategy", "broker_order_id", "side", "order_type")
+
+
+def event_state(ev: Dict[str, Any]) -> Optional[str]:
+    """Resulting order state of one event, if it implies one."""
+    # Shape (a): OrderStateChangedEvent has to_state directly
+    state_str: Optional[str] = ev.get("to_state")
+    if state_str:
+        return state_str
+
+    # Shape (b): engine / runtime events derive it from event_type
+    et = str(ev.get("event_type") or ev.get("event") or "").upper().strip()
+    if et == "ORDER_CREATED":
+        return ev.get("state") or "PENDING"
+    if et in ("ORDER_SUBMIT", "ORDERSTATECHANGED"):
+        return ev.get("state")
+    if et == "ORDER_FILLED":
+        return "FILLED"
+    if et in ("ORDER_CANCELLED", "CANCEL"):
+        return "CANCELLED"
+    if et == "ORDER_REJECTED":
+        return "REJECTED"
+    if et == "ORDER_EXPIRED":
+        return "EXPIRED"
+    return None
+
+
+class OrderLogReducer:
+    """
+    Latest known state per order plus the set of submitted internal IDs.
+
+    Events come in two shapes:
+      a) OrderStateChangedEvent (from OrderStateMachine.transition):
+         {"order_id": ..., "from_state": ..., "to_state": ..., "broker_order_id": ...}
+      b) Engine / runtime events:
+         {"event_type": "ORDER_SUBMIT", "internal_order_id": ..., ...}
+    """
+
+    def __init__(self, id_window_days: Optional[int] = None) -> None:
+        if id_window_days is None:
+            id_window_days = int(os.getenv("MQD_TXLOG_GUARD_ID_DAYS", "7") or "7")
+        self.id_window_days = id_window_days
+        self.order_states: Dict[str, Dict[str, Any]] = {}
+        self.submitted_ids: Set[str] = set()
+        # Submitted IDs bucketed by the UTC day (YYYY-MM-DD) of their
+        # _logged_at; "" holds IDs of unknown age (v1 checkpoints).
+        self._ids_by_day: Dict[str, Set[str]] = {}
+        self._last_day = ""
+
+    def apply(self, ev: Dict[str, Any]) -> None:
+        et = str(ev.get("event_type") or ev.get("event") or "").upper().strip()
+        if et == CHECKPOINT_EVENT_TYPE:
+            return
+        day = str(ev.get("_logged_at") or "")[:10]
+        if day > self._last_day:
+            self._last_day = day
+        if et == "ORDER_SUBMIT" and ev.get("internal_order_id"):
+            iid = ev["internal_order_id"]
+            if iid not in self.submitted_ids:
+                self.submitted_ids.add(iid)
+                self._ids_by_day.setdefault(day or self._last_day, set()).add(iid)
+
+        # Resolve the order identifier (different key names)
+        iid = ev.get("order_id") or ev.get("internal_order_id")
+        if not iid:
+            return
+
+        state_str = event_state(ev)
+        info = self.order_states.get(iid)
+        if info is None:
+            self.order_states[iid] = {
+                "order_id": iid,
+                "symbol": ev.get("symbol"),
+                "strategy": ev.get("strategy"),
+                "quantity": ev.get("qty") or ev.get("quantity"),
+                "side": ev.get("side"),
+                "order_type": ev.get("order_type"),
+                "broker_order_id": ev.get("broker_order_id"),
+                "state": state_str,
+            }
+            return
+
+        # Update with latest info
+        if state_str:
+            info["state"] = state_str
+        for key in _META_KEYS:
+            if ev.get(key):
+                info[key] = ev.get(key)
+        if ev.get("qty") or ev.get("quantity"):
+            info["quantity"] = ev.get("qty") or ev.get("quantity")
+
+    def apply_all(self, events: Iterable[Dict[str, Any]]) -> "OrderLogReducer":
+        for ev in events:
+            self.apply(ev)
+        return self
+
+    def open_orders(self) -> Dict[str, Dict[str, Any]]:
+        """Orders whose latest known state is set and non-terminal."""
+        return {
+            iid: info for iid, info in self.order_states.items()
+            if info.get("state") and info["state"] not in TERMINAL_STATES
+        }
+
+    def compact(self) -> None:
+        """
+        Forget terminal orders. A later event for one of them starts a fresh
+        entry, which is open only if that event carries a non-terminal state
+        -- the same outcome as folding from the start.
+        """
+        for iid in [i for i, info in self.order_states.items() if info.get("state") in TERMINAL_STATES]:
+            del self.order_states[iid]
+
+        # Submitted IDs age out of the window; undated ones start their window now.
+        undated = self._ids_by_day.pop("", None)
+        if undated:
+            if self._last_day:
+                self._ids_by_day.setdefault(self._last_day, set()).update(undated)
+            else:
+                self._ids_by_day[""] = undated
+        for day in self._expired_days():
+            self.submitted_ids -= self._ids_by_day.pop(day)
+
+    def _expired_days(self) -> List[str]:
+        if self.id_window_days <= 0 or not self._last_day:
+            return []
+        try:
+            cutoff = (date.fromisoformat(self._last_day) - timedelta(days=self.id_window_days - 1)).isoformat()
+        except ValueError:
+            return []
+        return [day for day in self._ids_by_day if day and day < cutoff]
+
+    # ------------------------
+    # Checkpoint payload
+    # ------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready state for a CHECKPOINT record."""
+        expired = set(self._expired_days())
+        return {
+            "version": 2,
+            "orders": {
+                iid: dict(info) for iid, info in self.order_states.items()
+                if info.get("state") not in TERMINAL_STATES
+            },
+            "submitted_ids": {
+                day: sorted(ids) for day, ids in sorted(self._ids_by_day.items()) if day not in expired
+            },
+            "last_day": self._last_day,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Optional[Dict[str, Any]]) -> "OrderLogReducer":
+        r = cls()
+        if not state:
+            return r
+        r.order_states = {iid: dict(info) for iid, info in (state.get("orders") or {}).items()}
+        ids = state.get("submitted_ids") or ()
+        if isinstance(ids, dict):
+            r._ids_by_day = {day: set(day_ids) for day, day_ids in ids.items()}
+        elif ids:
+            r._ids_by_day = {"": set(ids)}  # version 1: a flat, undated list
+        r.submitted_ids = set().union(*r._ids_by_day.values())
+        r._last_day = state.get("last_day") or ""
+        return r
@@ -0,0 +1,152 @@
+"""
+SQLite cold store for terminal orders.
+
+PROBLEM:
+    OrderStateMachine._orders kept every order for the life of the process,
+    so long paper sessions grew without bound.
+
+DESIGN:
+    - OrderStateMachine.archive_terminal_orders() moves terminal orders that
+      are past a grace period (beyond a small recent window) into this store.
+    - One row per order: indexed id columns + the full order as JSON
+      (Decimal/datetime/enum kept as strings, so a round trip is lossless).
+    - get()/get_by_broker_id() rebuild the Order on demand; the state
+      machine falls back to them when an id is not in memory.
+    - Single connection guarded by a lock (archival is batched and rare;
+      lookups of archived orders are rarer still).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import fields
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from core.logging import LogStream, get_logger
+
+if TYPE_CHECKING:
+    from core.state.order_machine import Order
+
+
+class OrderArchive:
+    """
+    Append-mostly SQLite store of terminal orders.
+
+    Usage:
+        archive = OrderArchive(Path("data/state/orders_archive.db"))
+        archive.put_many(orders)
+        order = archive.get("ORD_001")
+    """
+
+    CREATE_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS archived_orders (
+            order_id TEXT PRIMARY KEY,
+            broker_order_id TEXT,
+            symbol TEXT NOT NULL,
+            state TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+    """
+    CREATE_INDEX_SQL = (
+        "CREATE INDEX IF NOT EXISTS idx_archived_broker_id ON archived_orders (broker_order_id)"
+    )
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = get_logger(LogStream.ORDERS)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self.CREATE_TABLE_SQL)
+        self._conn.execute(self.CREATE_INDEX_SQL)
+        self._conn.commit()
+
+    def put_many(self, orders: Iterable["Order"]) -> int:
+        """Archive orders in one transaction (replaces existing rows)."""
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (o.order_id, o.broker_order_id, o.symbol, o.state.value, json.dumps(_order_to_dict(o)), now)
+            for o in orders
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO archived_orders "
+                    "(order_id, broker_order_id, symbol, state, payload, archived_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def get(self, order_id: str) -> Optional["Order"]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM archived_orders WHERE order_id = ?", (order_id,)
+            ).fetchone()
+        return _order_from_dict(json.loads(row[0])) if row else None
+
+    def get_by_broker_id(self, broker_order_id: str) -> Optional["Order"]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM archived_orders WHERE broker_order_id = ? LIMIT 1",
+                (str(broker_order_id),),
+            ).fetchone()
+        return _order_from_dict(json.loads(row[0])) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM archived_orders").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+def _order_to_dict(order: "Order") -> Dict:
+    out: Dict = {}
+    for f in fields(order):
+        value = getattr(order, f.name)
+        if isinstance(value, Decimal):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif f.name == "state":
+            value = value.value
+        out[f.name] = value
+    return out
+
+
+def _order_from_dict(data: Dict) -> "Order":
+    from core.state.order_machine import Order, OrderStatus
+
+    kwargs: Dict = {}
+    for f in fields(Order):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        if value is not None:
+            if f.name == "state":
+                value = OrderStatus(value)
+            elif f.name in ("quantity", "entry_price", "stop_loss", "take_profit",
+                            "filled_qty", "filled_price", "remaining_qty", "commission"):
+                value = Decimal(value)
+            elif f.name in ("created_at", "submitted_at", "filled_at", "cancelled_at"):
+                value = datetime.fromisoformat(value)
+        kwargs[f.name] = value
+    return Order(**kwargs)
@@ -27,8 +27,11 @@ from typing import Optional, Dict, Set, Tuple, List
 from datetime import datetime, timezone
 from decimal import Decimal
 import threading
+import time
 
 from core.logging import get_logger, LogStream, LogContext
+from core.state.log_checkpoint import OrderLogReducer
+from core.state.transaction_log import TransactionLog
 
 
 # ============================================================================
@@ -255,11 +258,35 @@ class OrderStateMachine:
         assert order.state == OrderStatus.SUBMITTED
     """
     
-    def __init__(self, event_bus, transaction_log):
-        """Initialize state machine with order storage."""
+    def __init__(
+        self,
+        event_bus,
+        transaction_log,
+        archive=None,
+        *,
+        archive_grace_s: float = 300.0,
+        archive_keep_recent: int = 200,
+    ):
+        """
+        Initialize state machine with order storage.
+
+        Args:
+            event_bus: Event bus for OrderStateChangedEvent
+            transaction_log: Transaction log
+            archive: Optional OrderArchive (cold store for terminal orders)
+            archive_grace_s: Seconds a terminal order stays in memory
+            archive_keep_recent: Most recent terminal orders always kept
+        """
         self.event_bus = event_bus
         self.transaction_log = transaction_log
         self.logger = get_logger(LogStream.ORDERS)
+
+        # Terminal-order archival (see archive_terminal_orders)
+        self._archive = archive
+        self.archive_grace_s = float(archive_grace_s)
+        self.archive_keep_recent = int(archive_keep_recent)
+        self._terminal_at: Dict[str, float] = {}  # order_id -> monotonic time it went terminal
+        self._archived_count = 0
         
         # Build transition lookup map
         self._transition_map: Dict[Tuple[OrderStatus, OrderStatus], OrderTransition] = {
@@ -276,6 +303,13 @@ class OrderStateMachine:
         
         # ORDER STORAGE
         self._orders: Dict[str, Order] = {}
+
+        # Secondary indexes (maintained with _orders; queries cost
+        # O(result) instead of O(every order this session)).
+        # Inner dicts are insertion-ordered sets keyed by order_id.
+        self._by_symbol: Dict[str, Dict[str, Order]] = {}
+        self._by_state: Dict[OrderStatus, Dict[str, Order]] = {}
+        self._by_broker_id: Dict[str, str] = {}
         
         # Thread safety
         self._lock = threading.Lock()
@@ -311,6 +345,17 @@ class OrderStateMachine:
                     pass
                 return existing
 
+            # An id archived by archive_terminal_orders() is still taken:
+            # recreating it as PENDING would resubmit a finished order.
+            if self._archive is not None:
+                archived = self._archive.get(order_id)
+                if archived is not None:
+                    self.logger.warning(
+                        "Idempotent create_order: order_id already archived; returning archived order",
+                        extra={"order_id": order_id, "symbol": symbol, "state": archived.state.value},
+                    )
+                    return archived
+
             order = Order(
                 order_id=order_id,
                 symbol=symbol,
@@ -325,6 +370,7 @@ class OrderStateMachine:
             )
             
             self._orders[order_id] = order
+            self._index_add(order)
 
             # Log creation to transaction log so restore can recover metadata
             self.transaction_log.append({
@@ -347,29 +393,128 @@ class OrderStateMachine:
             return order
     
     def get_order(self, order_id: str) -> Optional[Order]:
-        """Retrieve order by ID."""
+        """Retrieve order by ID (archived orders are loaded from the cold store)."""
         with self._lock:
-            return self._orders.get(order_id)
+            order = self._orders.get(order_id)
+        if order is None and self._archive is not None:
+            order = self._archive.get(order_id)
+        return order
     
     def get_all_orders(self) -> List[Order]:
-        """Get all orders."""
+        """Get all in-memory orders (archived terminal orders excluded)."""
         with self._lock:
             return list(self._orders.values())
     
     def get_pending_orders(self) -> List[Order]:
         """Get all non-terminal orders."""
         with self._lock:
-            return [o for o in self._orders.values() if o.state not in self._terminal_states]
+            return [
+                o
+                for state, bucket in self._by_state.items()
+                if state not in self._terminal_states
+                for o in bucket.values()
+            ]
     
     def get_orders_by_symbol(self, symbol: str) -> List[Order]:
         """Get orders for specific symbol."""
         with self._lock:
-            return [o for o in self._orders.values() if o.symbol == symbol]
+            return list(self._by_symbol.get(symbol, {}).values())
     
     def get_orders_by_state(self, state: OrderStatus) -> List[Order]:
         """Get orders in specific state."""
         with self._lock:
-            return [o for o in self._orders.values() if o.state == state]
+            return list(self._by_state.get(state, {}).values())
+    
+    def get_order_by_broker_id(self, broker_order_id: str) -> Optional[Order]:
+        """Retrieve order by broker order ID."""
+        with self._lock:
+            order_id = self._by_broker_id.get(str(broker_order_id))
+            order = self._orders.get(order_id) if order_id is not None else None
+        if order is None and self._archive is not None:
+            order = self._archive.get_by_broker_id(str(broker_order_id))
+        return order
+    
+    # ========================================================================
+    # TERMINAL-ORDER ARCHIVAL
+    # ========================================================================
+    
+    def archive_terminal_orders(self, now: Optional[float] = None) -> int:
+        """
+        Move terminal orders past the grace period to the cold store.
+
+        The archive_keep_recent most recently finished orders always stay in
+        memory. Rows are written before the orders leave memory, so a
+        concurrent get_order() never misses. Returns the number archived.
+        """
+        if self._archive is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            finished = sorted(self._terminal_at.items(), key=lambda kv: kv[1])
+            if self.archive_keep_recent > 0:
+                finished = finished[:-self.archive_keep_recent]
+            candidates = [
+                self._orders[oid]
+                for oid, ts in finished
+                if now - ts >= self.archive_grace_s and oid in self._orders
+            ]
+        if not candidates:
+            return 0
+
+        self._archive.put_many(candidates)
+
+        with self._lock:
+            for order in candidates:
+                if self._orders.get(order.order_id) is not order or order.state not in self._terminal_states:
+                    continue
+                del self._orders[order.order_id]
+                self._terminal_at.pop(order.order_id, None)
+                self._index_remove(order)
+                self._archived_count += 1
+
+        self.logger.info("Archived terminal orders", extra={
+            "archived": len(candidates), "in_memory": len(self._orders),
+        })
+        return len(candidates)
+    
+    def get_archive_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_memory": len(self._orders),
+                "terminal_in_memory": len(self._terminal_at),
+                "archived": self._archived_count,
+                "archive_enabled": self._archive is not None,
+            }
+    
+    # ========================================================================
+    # INDEX MAINTENANCE (caller holds _lock)
+    # ========================================================================
+    
+    def _index_add(self, order: Order) -> None:
+        self._by_symbol.setdefault(order.symbol, {})[order.order_id] = order
+        self._by_state.setdefault(order.state, {})[order.order_id] = order
+        if order.broker_order_id:
+            self._by_broker_id[str(order.broker_order_id)] = order.order_id
+    
+    def _index_remove(self, order: Order) -> None:
+        for index, key in ((self._by_symbol, order.symbol), (self._by_state, order.state)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(order.order_id, None)
+                if not bucket:
+                    del index[key]
+        if order.broker_order_id and self._by_broker_id.get(str(order.broker_order_id)) == order.order_id:
+            del self._by_broker_id[str(order.broker_order_id)]
+    
+    def _index_state_change(self, order: Order, old_state: OrderStatus) -> None:
+        if old_state == order.state:
+            return
+        bucket = self._by_state.get(old_state)
+        if bucket is not None:
+            bucket.pop(order.order_id, None)
+            if not bucket:
+                del self._by_state[old_state]
+        self._by_state.setdefault(order.state, {})[order.order_id] = order
     
     # ========================================================================
     # STATE TRANSITIONS
@@ -480,11 +625,16 @@ class OrderStateMachine:
             return
         
         # Update state
+        old_state = order.state
         order.state = to_state
+        self._index_state_change(order, old_state)
+        if to_state in self._terminal_states:
+            self._terminal_at.setdefault(order_id, time.monotonic())
         
         # Update broker ID
         if broker_order_id:
             order.broker_order_id = broker_order_id
+            self._by_broker_id[str(broker_order_id)] = order_id
         
         # Update timestamps
         now = datetime.now(timezone.utc)  # PATCH 4: UTC-aware
@@ -549,8 +699,10 @@ class OrderStateMachine:
         state before the process stopped.
 
         Algorithm:
-          1. Scan every event in the log.
-          2. Track the *latest* state for each internal_order_id.
+          1. Start from the latest CHECKPOINT record (PATCH 37; segmented
+             logs only) or the first event, and fold the events after it.
+          2. Track the *latest* state for each internal_order_id
+             (core.state.log_checkpoint.OrderLogReducer).
           3. For any order whose last known state is non-terminal,
              recreate it in ``_orders`` with that state.
 
@@ -559,61 +711,11 @@ class OrderStateMachine:
         This method is idempotent — calling it twice does not duplicate
         orders because ``_orders`` is keyed by order_id.
         """
-        # Track the latest state per order_id.
-        # Events come in two shapes:
-        #   a) OrderStateChangedEvent (from OrderStateMachine.transition):
-        #      {"order_id": ..., "from_state": ..., "to_state": ..., "broker_order_id": ...}
-        #   b) Engine / runtime events:
-        #      {"event_type": "ORDER_SUBMIT", "internal_order_id": ..., ...}
-        order_states: Dict[str, Dict] = {}
-
-        for ev in transaction_log.iter_events():
-            # Resolve the order identifier (different key names)
-            iid = ev.get("order_id") or ev.get("internal_order_id")
-            if not iid:
-                continue
-
-            # Determine the resulting state from this event.
-            # Shape (a): has to_state directly
-            state_str: Optional[str] = ev.get("to_state")
-
-            # Shape (b): derive state from event_type
-            if not state_str:
-                et = str(ev.get("event_type") or ev.get("event") or "").upper().strip()
-                if et == "ORDER_CREATED":
-                    state_str = ev.get("state") or "PENDING"
-                elif et in ("ORDER_SUBMIT", "ORDERSTATECHANGED"):
-                    state_str = ev.get("state")
-                elif et == "ORDER_FILLED":
-                    state_str = "FILLED"
-                elif et in ("ORDER_CANCELLED", "CANCEL"):
-                    state_str = "CANCELLED"
-                elif et == "ORDER_REJECTED":
-                    state_str = "REJECTED"
-                elif et == "ORDER_EXPIRED":
-                    state_str = "EXPIRED"
-
-            # Accumulate metadata
-            if iid not in order_states:
-                order_states[iid] = {
-                    "order_id": iid,
-                    "symbol": ev.get("symbol"),
-                    "strategy": ev.get("strategy"),
-                    "quantity": ev.get("qty") or ev.get("quantity"),
-                    "side": ev.get("side"),
-                    "order_type": ev.get("order_type"),
-                    "broker_order_id": ev.get("broker_order_id"),
-                    "state": state_str,
-                }
-            else:
-                # Update with latest info
-                if state_str:
-                    order_states[iid]["state"] = state_str
-                for key in ("symbol", "strategy", "broker_order_id", "side", "order_type"):
-                    if ev.get(key):
-                        order_states[iid][key] = ev.get(key)
-                if ev.get("qty") or ev.get("quantity"):
-                    order_states[iid]["quantity"] = ev.get("qty") or ev.get("quantity")
+        if isinstance(transaction_log, TransactionLog):
+            state, events = transaction_log.replay_from_checkpoint()
+        else:
+            state, events = None, transaction_log.iter_events()
+        order_states = OrderLogReducer.from_snapshot(state).apply_all(events).order_states
 
         # Restore non-terminal orders
         restored = 0
@@ -650,6 +752,7 @@ class OrderStateMachine:
                     broker_order_id=info.get("broker_order_id"),
                 )
                 self._orders[iid] = order
+                self._index_add(order)
                 restored += 1
                 self.logger.info(
                     "Restored pending order: %s state=%s",
@@ -188,6 +188,7 @@ class OrderTracker:
 
         # Tracking sets for quick lookups
         self._exchange_id_to_client_id: Dict[str, str] = {}
+        self._in_flight_by_symbol: Dict[str, Dict[str, InFlightOrder]] = {}
 
         # PATCH 7: Thread-safety lock for mutation methods
         self._lock = threading.Lock()
@@ -198,6 +199,7 @@ class OrderTracker:
         """Begin tracking an order (thread-safe)."""
         with self._lock:
             self._in_flight_orders[order.client_order_id] = order
+            self._in_flight_by_symbol.setdefault(order.symbol, {})[order.client_order_id] = order
 
             if order.exchange_order_id:
                 self._exchange_id_to_client_id[order.exchange_order_id] = order.client_order_id
@@ -231,6 +233,7 @@ class OrderTracker:
             # Move to completed
             self._completed_orders[client_order_id] = order
             del self._in_flight_orders[client_order_id]
+            self._unindex_symbol(order)
 
             # Remove exchange ID mapping
             if order.exchange_order_id in self._exchange_id_to_client_id:
@@ -269,6 +272,8 @@ class OrderTracker:
 
             # Update exchange ID if provided
             if 'exchange_order_id' in update and update['exchange_order_id']:
+                if order.exchange_order_id and order.exchange_order_id != update['exchange_order_id']:
+                    self._exchange_id_to_client_id.pop(order.exchange_order_id, None)
                 order.exchange_order_id = update['exchange_order_id']
                 self._exchange_id_to_client_id[update['exchange_order_id']] = client_order_id
 
@@ -343,6 +348,18 @@ class OrderTracker:
         """Get all in-flight orders"""
         return list(self._in_flight_orders.values())
     
+    def get_open_orders_for_symbol(self, symbol: str) -> List[InFlightOrder]:
+        """Get in-flight orders for a symbol (index lookup)."""
+        with self._lock:
+            return list(self._in_flight_by_symbol.get(symbol, {}).values())
+    
+    def _unindex_symbol(self, order: InFlightOrder) -> None:
+        bucket = self._in_flight_by_symbol.get(order.symbol)
+        if bucket is not None:
+            bucket.pop(order.client_order_id, None)
+            if not bucket:
+                del self._in_flight_by_symbol[order.symbol]
+    
     def get_completed_order(self, client_order_id: str) -> Optional[InFlightOrder]:
         """Get completed order"""
         return self._completed_orders.get(client_order_id)
@@ -357,10 +374,8 @@ class OrderTracker:
         Returns:
             List of exchange_order_ids that are orphans
         """
-        broker_ids = set(broker_orders.keys())
-        our_exchange_ids = set(self._exchange_id_to_client_id.keys())
-        
-        orphans = list(broker_ids - our_exchange_ids)
+        with self._lock:
+            orphans = [ex_id for ex_id in broker_orders if ex_id not in self._exchange_id_to_client_id]
         
         if orphans:
             logger.warning(
@@ -380,16 +395,12 @@ class OrderTracker:
         Returns:
             List of client_order_ids that are shadows
         """
-        broker_ids = set(broker_orders.keys())
-        our_exchange_ids = set(self._exchange_id_to_client_id.keys())
-        
-        shadow_exchange_ids = our_exchange_ids - broker_ids
-        
-        # Convert to client IDs
-        shadows = [
-            self._exchange_id_to_client_id[ex_id]
-            for ex_id in shadow_exchange_ids
-        ]
+        with self._lock:
+            shadows = [
+                client_id
+                for ex_id, client_id in self._exchange_id_to_client_id.items()
+                if ex_id not in broker_orders
+            ]
         
         if shadows:
             logger.error(
@@ -401,12 +412,12 @@ class OrderTracker:
     
     def get_stats(self) -> dict:
         """Get tracking statistics"""
-        return {
-            'in_flight_count': len(self._in_flight_orders),
-            'completed_count': len(self._completed_orders),
-            'total_tracked': len(self._in_flight_orders) + len(self._completed_orders),
-            'in_flight_symbols': {
-                order.symbol: sum(1 for o in self._in_flight_orders.values() if o.symbol == order.symbol)
-                for order in self._in_flight_orders.values()
+        with self._lock:
+            return {
+                'in_flight_count': len(self._in_flight_orders),
+                'completed_count': len(self._completed_orders),
+                'total_tracked': len(self._in_flight_orders) + len(self._completed_orders),
+                'in_flight_symbols': {
+                    symbol: len(bucket) for symbol, bucket in self._in_flight_by_symbol.items()
+                }
             }
-        }
@@ -9,13 +9,23 @@ CRITICAL PROPERTIES:
 5. Thread-safe via SQLite connection per thread
 6. Schema versioning support
 
+PATCH 39: optional write-behind mode (write_behind=True or
+MQD_POSITION_WRITE_BEHIND=1). The in-memory map becomes authoritative for
+reads, and upserts/deletes are coalesced per symbol and committed in one
+transaction every MQD_POSITION_FLUSH_MS or once MQD_POSITION_FLUSH_MAX
+symbols are pending. flush() is the synchronous durability barrier; the
+execution engine calls it before every broker submit. Off by default:
+property 4 above still holds unless the mode is enabled.
+
 Based on Freqtrade's persistence layer.
 """
 
+import copy
+import os
 import sqlite3
 import threading
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from decimal import Decimal
 from datetime import datetime
@@ -97,6 +107,12 @@ class PositionStore:
         
         # Delete position
         store.delete("SPY")
+
+    WRITE-BEHIND (PATCH 39):
+        store = PositionStore(path, write_behind=True)
+        store.upsert(position)      # memory now, SQLite within flush_interval_s
+        store.flush()               # barrier: everything above is committed
+        store.bulk_upsert(positions)  # one transaction, durable on return
     """
     
     # Schema version for migrations
@@ -126,8 +142,23 @@ class PositionStore:
             version INTEGER PRIMARY KEY
         )
     """
+
+    REPLACE_SQL = """
+        REPLACE INTO positions (
+            symbol, quantity, entry_price, entry_time, strategy, order_id,
+            stop_loss, take_profit, current_price, unrealized_pnl,
+            broker_position_id, metadata, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
     
-    def __init__(self, db_path: Path, clock: Optional[Clock] = None):
+    def __init__(
+        self,
+        db_path: Path,
+        clock: Optional[Clock] = None,
+        write_behind: Optional[bool] = None,
+        flush_interval_s: Optional[float] = None,
+        flush_max_pending: Optional[int] = None,
+    ):
         """
         Initialize position store.
 
@@ -135,6 +166,12 @@ class PositionStore:
             db_path: Path to SQLite database file
             clock: Optional clock for timestamps (supports backtesting).
                 Defaults to RealTimeClock() for live/paper + unit tests.
+            write_behind: Serve reads from memory and batch writes
+                (default: MQD_POSITION_WRITE_BEHIND, off)
+            flush_interval_s: Background flush period in write-behind mode
+                (default: MQD_POSITION_FLUSH_MS / 1000, 0.2s; 0 = size-triggered only)
+            flush_max_pending: Pending symbols that trigger an early flush
+                (default: MQD_POSITION_FLUSH_MAX, 64)
         """
         self.db_path = Path(db_path) if not isinstance(db_path, Path) else db_path
         self.clock = clock or RealTimeClock()
@@ -155,10 +192,38 @@ class PositionStore:
         self._conn_lock = threading.Lock()
         # Initialize database
         self._initialize_db()
+
+        # PATCH 39: write-behind state. _cache is authoritative for reads;
+        # _dirty holds the latest row per symbol (None = delete) until flushed.
+        if write_behind is None:
+            write_behind = os.getenv("MQD_POSITION_WRITE_BEHIND", "0").strip().lower() in ("1", "true", "yes")
+        if flush_interval_s is None:
+            flush_interval_s = float(os.getenv("MQD_POSITION_FLUSH_MS", "200") or "200") / 1000.0
+        if flush_max_pending is None:
+            flush_max_pending = int(os.getenv("MQD_POSITION_FLUSH_MAX", "64") or "64")
+        self.write_behind: bool = bool(write_behind)
+        self.flush_interval_s: float = max(0.0, float(flush_interval_s))
+        self.flush_max_pending: int = max(1, int(flush_max_pending))
+        self._cache: Dict[str, Position] = {}
+        self._dirty: Dict[str, Optional[Tuple[Any, ...]]] = {}
+        self._cache_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time; held across the commit
+        self._flush_wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closing = False
+        self._stats = {"flushes": 0, "rows_flushed": 0, "coalesced": 0}
+        if self.write_behind:
+            self._cache = {pos.symbol: pos for pos in self._load_all()}
+            if self.flush_interval_s > 0:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="position-store-flush", daemon=True
+                )
+                self._flusher.start()
         
         self.logger.info("PositionStore initialized", extra={
             "db_path": str(self.db_path),
-            "schema_version": self.SCHEMA_VERSION
+            "schema_version": self.SCHEMA_VERSION,
+            "write_behind": self.write_behind,
         })
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -214,6 +279,7 @@ class PositionStore:
         Insert or update position.
         
         Thread-safe. Uses REPLACE statement (atomic).
+        In write-behind mode the row is committed by the next flush.
         
         Args:
             position: Position to store
@@ -221,32 +287,23 @@ class PositionStore:
         Raises:
             PositionStoreError: If database operation fails
         """
+        if self.write_behind:
+            self._buffer([position])
+            self.logger.info(f"Position upserted: {position.symbol}", extra={
+                "symbol": position.symbol,
+                "quantity": str(position.quantity),
+                "entry_price": str(position.entry_price),
+                "strategy": position.strategy,
+                "write_behind": True,
+            })
+            return
+
         conn = self._get_connection()
         
         try:
             conn.execute("BEGIN TRANSACTION")
             
-            conn.execute("""
-                REPLACE INTO positions (
-                    symbol, quantity, entry_price, entry_time, strategy, order_id,
-                    stop_loss, take_profit, current_price, unrealized_pnl,
-                    broker_position_id, metadata, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                position.symbol,
-                str(position.quantity),
-                str(position.entry_price),
-                position.entry_time.isoformat(),
-                position.strategy,
-                position.order_id,
-                str(position.stop_loss) if position.stop_loss else None,
-                str(position.take_profit) if position.take_profit else None,
-                str(position.current_price) if position.current_price else None,
-                str(position.unrealized_pnl) if position.unrealized_pnl else None,
-                position.broker_position_id,
-                str(position.metadata) if position.metadata else None,
-                self.clock.now().isoformat()  # Use injected clock (backtest-safe)
-            ))
+            conn.execute(self.REPLACE_SQL, self._position_row(position))
             
             conn.commit()
             
@@ -266,6 +323,46 @@ class PositionStore:
             )
             raise PositionStoreError(f"Failed to upsert position: {e}") from e
 
+    def bulk_upsert(self, positions: Iterable[Position]) -> int:
+        """
+        Insert or update many positions in ONE transaction (reconciliation heal).
+
+        Durable on return in both modes (write-behind flushes everything
+        pending, including earlier deletes, in the same commit).
+
+        Returns:
+            Number of positions written
+
+        Raises:
+            PositionStoreError: If database operation fails
+        """
+        positions = list(positions)
+        if not positions:
+            return 0
+
+        if self.write_behind:
+            self._buffer(positions, trigger_flush=False)
+            self.flush()
+        else:
+            conn = self._get_connection()
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                conn.executemany(self.REPLACE_SQL, [self._position_row(p) for p in positions])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self.logger.error(
+                    "Failed to bulk upsert positions",
+                    extra={"count": len(positions), "error": str(e)},
+                    exc_info=True
+                )
+                raise PositionStoreError(f"Failed to bulk upsert positions: {e}") from e
+
+        self.logger.info(f"Positions bulk upserted: {len(positions)}", extra={
+            "symbols": [p.symbol for p in positions]
+        })
+        return len(positions)
+
     def restore_position(
         self,
         symbol: str,
@@ -298,6 +395,10 @@ class PositionStore:
         Returns:
             Position or None if not found
         """
+        if self.write_behind:
+            pos = self._cache.get(symbol)
+            return self._copy(pos) if pos is not None else None
+
         conn = self._get_connection()
         
         cursor = conn.execute(
@@ -318,6 +419,11 @@ class PositionStore:
         Returns:
             List of positions (empty if none)
         """
+        if self.write_behind:
+            return [self._copy(pos) for pos in sorted(self._cache.values(), key=lambda p: p.symbol)]
+        return self._load_all()
+
+    def _load_all(self) -> List[Position]:
         conn = self._get_connection()
         
         cursor = conn.execute("SELECT * FROM positions ORDER BY symbol")
@@ -335,6 +441,20 @@ class PositionStore:
         Returns:
             True if deleted, False if not found
         """
+        if self.write_behind:
+            with self._cache_lock:
+                deleted = self._cache.pop(symbol, None) is not None
+                if deleted:
+                    self._mark_dirty(symbol, None)
+                due = len(self._dirty) >= self.flush_max_pending
+            if deleted:
+                self.logger.info(f"Position deleted: {symbol}", extra={
+                    "symbol": symbol
+                })
+            if due:
+                self._flush_due()
+            return deleted
+
         conn = self._get_connection()
         
         try:
@@ -372,6 +492,24 @@ class PositionStore:
         Returns:
             Number of positions deleted
         """
+        if self.write_behind:
+            # Synchronous: nothing buffered may resurrect a cleared row.
+            with self._flush_lock:
+                with self._cache_lock:
+                    count = len(self._cache)
+                    self._cache.clear()
+                    self._dirty.clear()
+                self._clear_db()
+        else:
+            count = self._clear_db()
+
+        self.logger.warning(f"All positions cleared", extra={
+            "count": count
+        })
+
+        return count
+
+    def _clear_db(self) -> int:
         conn = self._get_connection()
         
         try:
@@ -382,15 +520,138 @@ class PositionStore:
             
             conn.commit()
             
-            self.logger.warning(f"All positions cleared", extra={
-                "count": count
-            })
-            
             return count
             
         except Exception as e:
             conn.rollback()
             raise PositionStoreError(f"Failed to clear positions: {e}") from e
+
+    # ========================================================================
+    # PATCH 39: WRITE-BEHIND
+    # ========================================================================
+
+    def _position_row(self, position: Position) -> Tuple[Any, ...]:
+        """REPLACE_SQL parameters for a position (stamped with the injected clock)."""
+        return (
+            position.symbol,
+            str(position.quantity),
+            str(position.entry_price),
+            position.entry_time.isoformat(),
+            position.strategy,
+            position.order_id,
+            str(position.stop_loss) if position.stop_loss else None,
+            str(position.take_profit) if position.take_profit else None,
+            str(position.current_price) if position.current_price else None,
+            str(position.unrealized_pnl) if position.unrealized_pnl else None,
+            position.broker_position_id,
+            str(position.metadata) if position.metadata else None,
+            self.clock.now().isoformat()  # Use injected clock (backtest-safe)
+        )
+
+    @staticmethod
+    def _copy(position: Position) -> Position:
+        """Callers may mutate what they get; never hand out the cached object."""
+        out = copy.copy(position)
+        out.metadata = dict(position.metadata or {})
+        return out
+
+    def _mark_dirty(self, symbol: str, row: Optional[Tuple[Any, ...]]) -> None:
+        """Caller holds _cache_lock."""
+        if symbol in self._dirty:
+            self._stats["coalesced"] += 1
+        self._dirty[symbol] = row
+
+    def _buffer(self, positions: List[Position], trigger_flush: bool = True) -> None:
+        rows = [self._position_row(p) for p in positions]
+        with self._cache_lock:
+            for pos, row in zip(positions, rows):
+                self._cache[pos.symbol] = self._copy(pos)
+                self._mark_dirty(pos.symbol, row)
+            due = len(self._dirty) >= self.flush_max_pending
+        if due and trigger_flush:
+            self._flush_due()
+
+    def _flush_due(self) -> None:
+        """Size trigger: wake the flusher, or flush inline when there is none."""
+        if self._flusher is not None:
+            self._flush_wakeup.set()
+        else:
+            self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._closing:
+            self._flush_wakeup.wait(self.flush_interval_s)
+            self._flush_wakeup.clear()
+            if self._closing:
+                return
+            try:
+                self.flush()
+            except PositionStoreError:
+                pass  # logged in flush(); rows stay pending for the next tick
+
+    def flush(self) -> int:
+        """
+        Durability barrier: commit every buffered write in one transaction.
+
+        Returns once all upserts/deletes made before the call are in SQLite
+        (also waits out a background flush already in progress). No-op when
+        write-behind is off.
+
+        Returns:
+            Number of rows written or deleted
+
+        Raises:
+            PositionStoreError: If the commit fails (rows stay pending)
+        """
+        if not self.write_behind:
+            return 0
+
+        with self._flush_lock:
+            with self._cache_lock:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+
+            conn = self._get_connection()
+            try:
+                conn.execute("BEGIN TRANSACTION")
+                deletes = [(sym,) for sym, row in batch.items() if row is None]
+                if deletes:
+                    conn.executemany("DELETE FROM positions WHERE symbol = ?", deletes)
+                rows = [row for row in batch.values() if row is not None]
+                if rows:
+                    conn.executemany(self.REPLACE_SQL, rows)
+                conn.commit()
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                with self._cache_lock:
+                    # Re-queue, but never over a newer write made meanwhile
+                    for sym, row in batch.items():
+                        self._dirty.setdefault(sym, row)
+                self.logger.error(
+                    "Failed to flush positions",
+                    extra={"pending": len(batch), "error": str(e)},
+                    exc_info=True
+                )
+                raise PositionStoreError(f"Failed to flush positions: {e}") from e
+
+            with self._cache_lock:
+                self._stats["flushes"] += 1
+                self._stats["rows_flushed"] += len(batch)
+            return len(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write-behind counters (coalesced = updates absorbed before a flush)."""
+        with self._cache_lock:
+            return {
+                **self._stats,
+                "write_behind": self.write_behind,
+                "cached": len(self._cache),
+                "pending": len(self._dirty),
+            }
     
     def _row_to_position(self, row: sqlite3.Row) -> Position:
         """
@@ -427,7 +688,20 @@ class PositionStore:
         other threads (e.g., an event bus worker thread) may have created their
         own connections. We therefore keep a registry of connections and close
         them all here.
+
+        PATCH 39: in write-behind mode, stops the flusher and flushes first.
         """
+        if self.write_behind:
+            self._closing = True
+            self._flush_wakeup.set()
+            if self._flusher is not None:
+                self._flusher.join(timeout=5.0)
+                self._flusher = None
+            try:
+                self.flush()
+            except PositionStoreError:
+                pass  # already logged; don't mask shutdown
+
         # Close all known connections (across threads)
         with self._conn_lock:
             conns = list(self._connections.items())
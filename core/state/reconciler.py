@@ -1,7 +1,7 @@
 # core/state/reconciler.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, Iterable, List, Optional, Tuple
@@ -18,6 +18,13 @@ def _to_decimal(v: Any) -> Decimal:
         return Decimal("0")
 
 
+def _position_matches(lp: Optional[Dict[str, Any]], bp: Dict[str, Any]) -> bool:
+    """Local row already agrees with the broker (qty, and avg entry when the broker reports one)."""
+    if lp is None or lp["qty"] != bp["qty"]:
+        return False
+    return bp.get("avg_entry") is None or lp.get("entry_price") == bp["avg_entry"]
+
+
 def _safe_get(obj: Any, key: str, default: Any = None) -> Any:
     if obj is None:
         return default
@@ -494,12 +501,18 @@ class StartupReconciler(StartupReconciler):  # type: ignore[misc]
                     )
                 )
 
-        # upsert broker positions into local
-        for sym in sorted(broker_syms):
-            bp = broker_positions[sym]
-            if bp["qty"] == 0:
-                continue
-            self._local_position_upsert_from_broker(sym, bp)
+        # upsert broker positions into local (PATCH 39: only symbols that
+        # differ, merged into the local row, one transaction when supported)
+        upserts = [
+            (sym, broker_positions[sym])
+            for sym in sorted(broker_syms)
+            if broker_positions[sym]["qty"] != 0
+            and not _position_matches(local_positions.get(sym), broker_positions[sym])
+        ]
+        if not self._local_positions_bulk_upsert(upserts, local_positions):
+            for sym, bp in upserts:
+                self._local_position_upsert_from_broker(sym, bp)
+        for sym, bp in upserts:
             actions.append(
                 HealAction(
                     kind="position_upsert",
@@ -552,6 +565,53 @@ class StartupReconciler(StartupReconciler):  # type: ignore[misc]
             except Exception:
                 pass
 
+    def _local_positions_bulk_upsert(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        local_positions: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bool:
+        """
+        PATCH 39: heal the given broker positions with one PositionStore.bulk_upsert.
+
+        Broker qty / avg entry are merged into the existing local row, so
+        strategy, order_id, entry_time, stops and metadata survive; only
+        symbols with no local row get a "reconciled" placeholder.
+
+        Returns False (caller falls back to per-symbol upserts) when the store
+        has no bulk_upsert or a broker position can't form a Position.
+        """
+        bulk = getattr(self.position_store, "bulk_upsert", None)
+        if not items or not callable(bulk):
+            return False
+        try:
+            from core.state.position_store import Position
+
+            now = _utc_now()
+            positions = []
+            for sym, bp in items:
+                qty = Decimal(str(bp["qty"]))
+                avg = bp.get("avg_entry")
+                existing = (local_positions or {}).get(sym, {}).get("raw")
+                if isinstance(existing, Position):
+                    positions.append(replace(
+                        existing,
+                        quantity=qty,
+                        entry_price=Decimal(str(avg)) if avg is not None else existing.entry_price,
+                    ))
+                else:
+                    positions.append(Position(
+                        symbol=sym,
+                        quantity=qty,
+                        entry_price=Decimal(str(avg)),
+                        entry_time=now,
+                        strategy="reconciled",
+                        order_id="reconciled",
+                    ))
+        except (ArithmeticError, TypeError, ValueError):
+            return False
+        bulk(positions)
+        return True
+
     def _local_position_upsert_from_broker(self, symbol: str, bp: Dict[str, Any]) -> None:
         qty = bp["qty"]
         avg = bp.get("avg_entry")
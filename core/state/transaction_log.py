@@ -11,6 +11,31 @@ PATCH 2 (2026-02-14):
 - CRC32 checksum per line for corruption detection
 - Explicit fsync after append for crash-safety
 - Validation on load: fail fast on corrupt lines
+
+PATCH 36:
+- Optional group commit: appends from all threads that arrive while a
+  batch is being prepared share ONE write+fsync. Every caller still
+  returns only after its own line is durable, so crash-safety is
+  unchanged; a burst of N transitions pays ~1 fsync instead of N.
+  Enable with group_commit_ms=... or MQD_TXLOG_GROUP_COMMIT_MS.
+
+PATCH 37:
+- Optional segmentation by size and/or UTC day (MQD_TXLOG_SEGMENT_MB,
+  MQD_TXLOG_SEGMENT_DAILY). The active segment stays at log_path; sealed
+  segments sit next to it (see core.state.txlog_index).
+- Segmented logs write CHECKPOINT records (open orders + submitted IDs,
+  see core.state.log_checkpoint) at the start of every segment and every
+  MQD_TXLOG_CHECKPOINT_EVERY events, plus a sparse timestamp->offset index
+  per segment. replay_from_checkpoint() and filter_since() seek instead of
+  re-reading the whole history, so restart time stops growing with account
+  age. Checkpoint records are hidden from iter_events().
+
+PATCH 38:
+- Optional compact binary record format (log_format="binary" or
+  MQD_TXLOG_FORMAT=binary; see core.state.txlog_codec). Each segment says
+  which format it is (binary files start with a magic header), so text and
+  binary segments can coexist and every reader handles both. An existing
+  non-empty active file keeps its format until it is sealed.
 """
 
 from __future__ import annotations
@@ -19,13 +44,36 @@ import json
 import logging
 import os
 import threading
+import time
 import zlib
-from dataclasses import asdict, is_dataclass
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, Optional, Protocol, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, Union
+
+from .log_checkpoint import CHECKPOINT_EVENT_TYPE, OrderLogReducer
+from .txlog_codec import (
+    MAGIC,
+    BinaryLogReader,
+    CodecError,
+    datetime_to_us,
+    encode_binary,
+    encode_text,
+    is_binary_file,
+)
+from .txlog_index import (
+    SegmentIndex,
+    all_segments,
+    append_index_rows,
+    format_ts,
+    fsync_dir,
+    index_path,
+    parse_ts,
+    sealed_name,
+    sealed_segments,
+)
 
 
 class Clock(Protocol):
@@ -50,6 +98,19 @@ class TransactionLogCorruptionError(TransactionLogError):
 
 EventLike = Union[dict, Any]
 
+# (encoded record bytes, normalized event dict, format the bytes are in)
+_Record = Tuple[bytes, Dict[str, Any], str]
+
+LOG_FORMATS = ("text", "binary")
+
+
+@dataclass
+class _PendingAppend:
+    """One encoded record waiting for its group commit."""
+    record: _Record
+    done: bool = False
+    error: Optional[BaseException] = None
+
 
 class TransactionLog:
     """
@@ -59,6 +120,23 @@ class TransactionLog:
       - TransactionLog(path: PathLike)                       # scripts/tests
       - TransactionLog(log_path=..., clock=...)              # container
       - TransactionLog(file_path=..., clock=...)
+
+    Group commit (PATCH 36):
+      - group_commit_ms > 0 turns it on (default: MQD_TXLOG_GROUP_COMMIT_MS, 0 = off).
+      - The first appender of a batch becomes its leader and waits up to
+        group_commit_ms for other in-flight appenders (or until
+        group_commit_max_events are queued), then writes + fsyncs the whole
+        batch. A lone appender does not wait.
+
+    Segments / checkpoints (PATCH 37):
+      - segment_max_bytes / segment_daily turn segmentation on (defaults:
+        MQD_TXLOG_SEGMENT_MB, MQD_TXLOG_SEGMENT_DAILY; off).
+      - checkpoint_every: events between CHECKPOINT records
+        (MQD_TXLOG_CHECKPOINT_EVERY, default 5000); index_every: events
+        between time-index rows.
+
+    Record format (PATCH 38):
+      - log_format: "text" (default) or "binary" (MQD_TXLOG_FORMAT).
     """
 
     def __init__(
@@ -69,6 +147,13 @@ class TransactionLog:
         file_path: Optional[Union[str, Path]] = None,
         clock: Optional[Clock] = None,
         logger: Optional[logging.Logger] = None,
+        group_commit_ms: Optional[float] = None,
+        group_commit_max_events: int = 256,
+        segment_max_bytes: Optional[int] = None,
+        segment_daily: Optional[bool] = None,
+        checkpoint_every: Optional[int] = None,
+        index_every: int = 256,
+        log_format: Optional[str] = None,
     ) -> None:
         # Resolve path precedence: explicit kwargs win, else positional
         chosen = log_path or file_path or path
@@ -82,19 +167,80 @@ class TransactionLog:
         self.clock: Clock = clock or SystemClock()
         self.logger: logging.Logger = logger or logging.getLogger("miniquantdesk.transaction_log")
 
+        # PATCH 38: the requested format applies to new (empty) segments;
+        # log_format is the format of the active file.
+        if log_format is None:
+            log_format = os.getenv("MQD_TXLOG_FORMAT", "text").strip().lower() or "text"
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown transaction log format {log_format!r} (expected one of {LOG_FORMATS})")
+        self._requested_format: str = log_format
+        self.log_format: str = log_format
+
         self._lock = threading.Lock()
         self._file = None  # type: Optional[Any]
         self._open_file()
 
+        # PATCH 36: group commit state (guarded by _commit_cond, never held
+        # across disk I/O; _lock serializes the file itself).
+        if group_commit_ms is None:
+            group_commit_ms = float(os.getenv("MQD_TXLOG_GROUP_COMMIT_MS", "0") or "0")
+        self.group_commit_s: float = max(0.0, float(group_commit_ms)) / 1000.0
+        self.group_commit_max_events: int = max(1, int(group_commit_max_events))
+        self._commit_cond = threading.Condition(threading.Lock())
+        self._pending: list[_PendingAppend] = []
+        self._leader_active = False
+        self._encoding = 0  # appenders that have not joined _pending yet
+        self._stats = {"appends": 0, "fsyncs": 0, "max_batch": 0, "checkpoints": 0, "rotations": 0}
+
+        # PATCH 37: segmentation, checkpoints and the sparse time index
+        # (write-side state is guarded by _lock).
+        if segment_max_bytes is None:
+            segment_max_bytes = int(float(os.getenv("MQD_TXLOG_SEGMENT_MB", "0") or "0") * 1024 * 1024)
+        if segment_daily is None:
+            segment_daily = os.getenv("MQD_TXLOG_SEGMENT_DAILY", "0").strip().lower() in ("1", "true", "yes")
+        if checkpoint_every is None:
+            checkpoint_every = int(os.getenv("MQD_TXLOG_CHECKPOINT_EVERY", "5000") or "5000")
+        self.segment_max_bytes: int = max(0, int(segment_max_bytes))
+        self.segment_daily: bool = bool(segment_daily)
+        self.segmented: bool = bool(self.segment_max_bytes or self.segment_daily)
+        self.checkpoint_every: int = max(1, int(checkpoint_every))
+        self.index_every: int = max(1, int(index_every))
+        self._offset = 0
+        self._max_dt: Optional[datetime] = None
+        self._segment_day = None
+        self._since_index = 0
+        self._since_checkpoint = 0
+        self._reducer: Optional[OrderLogReducer] = None
+        self._needs_recover = False
+        if self.segmented:
+            with self._lock:
+                self._recover_active_state()
+
     def _open_file(self) -> None:
-        """Open the underlying file handle (append + read)."""
+        """Open the underlying file handle (binary append; every write is flushed explicitly)."""
         try:
             self.log_path.parent.mkdir(parents=True, exist_ok=True)
-            # a+ so we can read/replay if needed; buffering=1 for line buffering
-            self._file = open(self.log_path, mode="a+", encoding="utf-8", buffering=1)
+            self._file = open(self.log_path, mode="ab")
+            if self._file.tell() == 0:
+                self.log_format = self._requested_format
+                if self.log_format == "binary":
+                    self._file.write(MAGIC)
+                    self._file.flush()
+            else:
+                existing = "binary" if is_binary_file(self.log_path) else "text"
+                if existing != self._requested_format:
+                    self.logger.info(
+                        "TransactionLog keeps existing %s format of %s (requested %s)",
+                        existing, self.log_path, self._requested_format,
+                    )
+                self.log_format = existing
         except Exception as e:
             raise TransactionLogError(f"Failed to open transaction log at {self.log_path}: {e}") from e
 
+    def _head_size(self) -> int:
+        """Offset of the first record in the active file."""
+        return len(MAGIC) if self.log_format == "binary" else 0
+
     # ------------------------
     # Write path
     # ------------------------
@@ -112,62 +258,307 @@ class TransactionLog:
           - If the event represents an order lifecycle event (ORDER_*, CANCEL, FILL, ERROR, BROKER_ORDER_ACK),
             we REQUIRE: event_type, trade_id, internal_order_id.
           - If a caller uses legacy key 'event' instead of 'event_type', we map it.
+
+        Returns once the line is fsynced (alone, or as part of a group commit).
         """
+        if self.group_commit_s > 0:
+            self._append_grouped(event)
+            return
+
         with self._lock:
             if self._file is None:
                 self._open_file()
 
             try:
-                event_dict = self._to_dict(event)
-
-                # Back-compat: allow legacy 'event' key (used by some writers)
-                if "event_type" not in event_dict and "event" in event_dict:
-                    event_dict["event_type"] = event_dict.get("event")
-
-                event_type = str(event_dict.get("event_type") or "").upper().strip()
-
-                # Enforce correlation IDs for order-relevant events only.
-                needs_corr = bool(
-                    event_type.startswith("ORDER_")
-                    or event_type in {"CANCEL", "FILL", "ERROR", "BROKER_ORDER_ACK", "BROKER_ACK", "ORDER_ACK"}
-                )
-                if needs_corr:
-                    # Derive trade_id deterministically when callers omit it (tests + legacy writers).
-                    if not event_dict.get('trade_id') and event_dict.get('internal_order_id'):
-                        event_dict['trade_id'] = f"T-{event_dict['internal_order_id']}"
-                    
-                    missing = [k for k in ('event_type', 'internal_order_id') if not event_dict.get(k)]
-                    if missing:
-                        raise ValueError(f"TransactionLog event missing required fields: {missing}")
-
-                # Inject a log timestamp (UTC, ISO8601 with Z)
-                logged_at = self.clock.now()
-                if logged_at.tzinfo is None:
-                    logged_at = logged_at.replace(tzinfo=timezone.utc)
-                event_dict["_logged_at"] = logged_at.isoformat().replace("+00:00", "Z")
-
-                # Normalize non-JSON-native values (e.g., Enum, Decimal, datetime)
-                event_dict = self._normalize_json(event_dict)
-
-                line = json.dumps(event_dict, separators=(",", ":"), ensure_ascii=False)
-
-                # PATCH 2: Add CRC32 checksum for corruption detection
-                checksum = zlib.crc32(line.encode("utf-8")) & 0xFFFFFFFF
-                line_with_checksum = f"{checksum:08x}:{line}"
-
-                self._file.write(line_with_checksum + "\n")
-                self._file.flush()
-
-                # PATCH 2: Explicit fsync for crash-safety (best-effort on Windows)
-                try:
-                    os.fsync(self._file.fileno())
-                except (OSError, AttributeError):
-                    # Windows may not support fsync on all file systems; log but continue
-                    pass
+                self._write_lines([self._encode(event)])
             except Exception as e:
                 self.logger.error("Failed to append to transaction log", extra={"error": str(e)}, exc_info=True)
                 raise TransactionLogError(f"Failed to append to transaction log: {e}") from e
 
+    def _encode(self, event: EventLike) -> _Record:
+        """Validate + stamp an event; return (encoded record, event dict)."""
+        event_dict = self._to_dict(event)
+
+        # Back-compat: allow legacy 'event' key (used by some writers)
+        if "event_type" not in event_dict and "event" in event_dict:
+            event_dict["event_type"] = event_dict.get("event")
+
+        event_type = str(event_dict.get("event_type") or "").upper().strip()
+
+        # Enforce correlation IDs for order-relevant events only.
+        needs_corr = bool(
+            event_type.startswith("ORDER_")
+            or event_type in {"CANCEL", "FILL", "ERROR", "BROKER_ORDER_ACK", "BROKER_ACK", "ORDER_ACK"}
+        )
+        if needs_corr:
+            # Derive trade_id deterministically when callers omit it (tests + legacy writers).
+            if not event_dict.get('trade_id') and event_dict.get('internal_order_id'):
+                event_dict['trade_id'] = f"T-{event_dict['internal_order_id']}"
+
+            missing = [k for k in ('event_type', 'internal_order_id') if not event_dict.get(k)]
+            if missing:
+                raise ValueError(f"TransactionLog event missing required fields: {missing}")
+
+        # Inject a log timestamp (UTC, ISO8601 with Z)
+        logged_at = self.clock.now()
+        if logged_at.tzinfo is None:
+            logged_at = logged_at.replace(tzinfo=timezone.utc)
+        event_dict["_logged_at"] = logged_at.isoformat().replace("+00:00", "Z")
+
+        # Normalize non-JSON-native values (e.g., Enum, Decimal, datetime)
+        event_dict = self._normalize_json(event_dict)
+
+        fmt = self.log_format
+        return self._serialize(event_dict, fmt), event_dict, fmt
+
+    @staticmethod
+    def _serialize(event_dict: Dict[str, Any], fmt: str) -> bytes:
+        # PATCH 2: CRC32 per record for corruption detection (both formats)
+        if fmt == "binary":
+            return encode_binary(event_dict)
+        return encode_text(event_dict)
+
+    def _in_active_format(self, records: list[_Record]) -> list[_Record]:
+        """Re-encode records whose format no longer matches the active file. Caller holds _lock.
+
+        Records are encoded before _lock is taken (group commit) and before
+        _write_segmented decides to rotate; a rotation onto a segment in a
+        different format would otherwise write them in the old one.
+        """
+        fmt = self.log_format
+        if all(f == fmt for _, _, f in records):
+            return records
+        return [(rec if f == fmt else self._serialize(ev, fmt), ev, fmt) for rec, ev, f in records]
+
+    def _write_lines(self, records: list[_Record]) -> None:
+        """Write records with one flush + fsync. Caller holds _lock."""
+        if self.segmented:
+            self._write_segmented(records)
+        else:
+            self._write_raw([rec for rec, _, _ in self._in_active_format(records)])
+
+        with self._commit_cond:
+            self._stats["appends"] += len(records)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(records))
+
+    def _write_raw(self, chunks: list[bytes]) -> None:
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+
+        # PATCH 2: Explicit fsync for crash-safety (best-effort on Windows)
+        try:
+            os.fsync(self._file.fileno())
+        except (OSError, AttributeError):
+            # Windows may not support fsync on all file systems; log but continue
+            pass
+
+        with self._commit_cond:
+            self._stats["fsyncs"] += 1
+
+    # ------------------------
+    # Segments / checkpoints (PATCH 37)
+    # ------------------------
+
+    def _write_segmented(self, records: list[_Record]) -> None:
+        """Rotate if due, write the batch (+ a checkpoint if due), then index it."""
+        if self._needs_recover:
+            self._recover_active_state()
+
+        first_dt = parse_ts(records[0][1].get("_logged_at"))
+        if self._offset > self._head_size() and (
+            (self.segment_max_bytes and self._offset >= self.segment_max_bytes)
+            or (self.segment_daily and first_dt and self._segment_day and first_dt.date() != self._segment_day)
+        ):
+            self._rotate()
+        if self._segment_day is None and first_dt is not None:
+            self._segment_day = first_dt.date()
+        records = self._in_active_format(records)
+
+        chunks: list[bytes] = []
+        rows: list[dict] = []
+        offset = self._offset
+        try:
+            for rec, ev, _ in records:
+                if self._since_index >= self.index_every and self._max_dt is not None:
+                    rows.append({"o": offset, "t": format_ts(self._max_dt)})
+                    self._since_index = 0
+                chunks.append(rec)
+                offset += len(rec)
+                self._note_ts(ev)
+                self._since_index += 1
+                if self._reducer is not None:
+                    self._reducer.apply(ev)
+                    self._since_checkpoint += 1
+            if self._reducer is not None and self._since_checkpoint >= self.checkpoint_every:
+                rows.append({"c": offset})
+                rec = self._checkpoint_record()
+                chunks.append(rec)
+                offset += len(rec)
+            self._write_raw(chunks)
+        except Exception:
+            # In-memory state may be ahead of the file; rebuild it from disk.
+            self._needs_recover = True
+            raise
+        self._offset = offset
+        self._write_index(rows)
+
+    def _note_ts(self, ev: Dict[str, Any]) -> None:
+        dt = parse_ts(ev.get("_logged_at"))
+        if dt is not None and (self._max_dt is None or dt > self._max_dt):
+            self._max_dt = dt
+
+    def _checkpoint_record(self) -> bytes:
+        snapshot = self._reducer.snapshot()
+        self._reducer.compact()
+        rec, ev, _ = self._encode({"event_type": CHECKPOINT_EVENT_TYPE, "state": snapshot})
+        self._note_ts(ev)
+        self._since_checkpoint = 0
+        with self._commit_cond:
+            self._stats["checkpoints"] += 1
+        return rec
+
+    def _write_index(self, rows: list[dict], segment: Optional[Path] = None) -> None:
+        try:
+            append_index_rows(segment or self.log_path, rows)
+        except OSError as e:
+            # The index is only a hint; readers fall back to scanning.
+            self.logger.warning("Failed to update transaction log index", extra={"error": str(e)})
+
+    def _rotate(self) -> None:
+        """Seal the active segment and start a new one with a checkpoint."""
+        end_row: Dict[str, Any] = {"end": self._offset}
+        if self._max_dt is not None:
+            end_row["t"] = format_ts(self._max_dt)
+        self._write_index([end_row])
+
+        self._file.close()
+        self._file = None
+        sealed = sealed_segments(self.log_path)
+        target = sealed_name(self.log_path, sealed[-1][0] + 1 if sealed else 1)
+        os.replace(self.log_path, target)
+        if index_path(self.log_path).exists():
+            os.replace(index_path(self.log_path), index_path(target))
+        fsync_dir(self.log_path.parent)
+        self._open_file()
+
+        self._offset = self._head_size()
+        self._max_dt = None
+        self._segment_day = None
+        self._since_index = 0
+        with self._commit_cond:
+            self._stats["rotations"] += 1
+        if self._reducer is not None:
+            # Every segment opens with a checkpoint, so replay never needs older segments.
+            head = self._offset
+            rec = self._checkpoint_record()
+            self._write_raw([rec])
+            self._offset += len(rec)
+            self._write_index([{"c": head}])
+        self.logger.info("TransactionLog segment sealed", extra={"segment": str(target)})
+
+    def _recover_active_state(self) -> None:
+        """Rebuild write-side segment state from disk (open / after a failed write)."""
+        self._needs_recover = False
+        path = self.log_path
+        self._offset = path.stat().st_size if path.exists() else 0
+        idx = SegmentIndex.load(path)
+        last = idx.last()
+        head = self._head_size()
+        self._max_dt, start = (last[0], last[1]) if last else (None, head)
+        first = self._read_record_at(path, head)
+        first_dt = parse_ts(first.get("_logged_at")) if first else None
+        self._segment_day = first_dt.date() if first_dt else None
+        try:
+            self._since_index = 0
+            for _, ev in self._iter_file(path, start, include_checkpoints=True):
+                self._note_ts(ev)
+                self._since_index += 1
+            state, events = self.replay_from_checkpoint()
+            reducer = OrderLogReducer.from_snapshot(state)
+            self._since_checkpoint = 0
+            for ev in events:
+                reducer.apply(ev)
+                self._since_checkpoint += 1
+            self._reducer = reducer
+        except TransactionLogError as e:
+            # No checkpoints until the log reads cleanly again (fail closed:
+            # a checkpoint must never hide events it did not see).
+            self._reducer = None
+            self.logger.error("TransactionLog checkpoints disabled: %s", e)
+
+    def _append_grouped(self, event: EventLike) -> None:
+        """PATCH 36: enqueue, then lead or follow a group commit until durable."""
+        with self._commit_cond:
+            self._encoding += 1
+        pending: Optional[_PendingAppend] = None
+        try:
+            pending = _PendingAppend(self._encode(event))
+        except Exception as e:
+            self.logger.error("Failed to append to transaction log", extra={"error": str(e)}, exc_info=True)
+            raise TransactionLogError(f"Failed to append to transaction log: {e}") from e
+        finally:
+            # Stop counting before waiting for completion: a leader only
+            # holds its window for appenders still encoding, never for one
+            # whose line is already queued or committed.
+            with self._commit_cond:
+                self._encoding -= 1
+                if pending is not None:
+                    self._pending.append(pending)
+                self._commit_cond.notify_all()
+
+        with self._commit_cond:
+            while not pending.done:
+                if not self._leader_active:
+                    self._lead_batch()
+                else:
+                    self._commit_cond.wait()
+
+        if pending.error is not None:
+            raise TransactionLogError(
+                f"Failed to append to transaction log: {pending.error}"
+            ) from pending.error
+
+    def _lead_batch(self) -> None:
+        """Collect one batch and commit it. Caller holds _commit_cond."""
+        self._leader_active = True
+        try:
+            # Give appenders that are still encoding a chance to join, but
+            # never hold a lone appender for the window.
+            deadline = time.monotonic() + self.group_commit_s
+            while len(self._pending) < self.group_commit_max_events and self._encoding > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._commit_cond.wait(remaining)
+
+            batch = self._pending[: self.group_commit_max_events]
+            del self._pending[: len(batch)]
+
+            self._commit_cond.release()
+            error: Optional[BaseException] = None
+            try:
+                with self._lock:
+                    if self._file is None:
+                        self._open_file()
+                    self._write_lines([p.record for p in batch])
+            except Exception as e:
+                error = e
+                self.logger.error("Failed to append to transaction log", extra={"error": str(e)}, exc_info=True)
+            finally:
+                self._commit_cond.acquire()
+
+            for p in batch:
+                p.error = error
+                p.done = True
+        finally:
+            self._leader_active = False
+            self._commit_cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Append / fsync counters (fsyncs < appends means group commit is batching)."""
+        with self._commit_cond:
+            return {**self._stats, "group_commit_ms": self.group_commit_s * 1000.0}
+
     def flush(self) -> None:
         with self._lock:
             if self._file is not None:
@@ -186,93 +577,178 @@ class TransactionLog:
         Iterate events without loading everything into memory.
 
         PATCH 2: Validates CRC32 checksums; raises TransactionLogCorruptionError on mismatch.
+        PATCH 37: Walks sealed segments oldest-first, then the active file;
+        CHECKPOINT records are skipped.
         """
         # We intentionally do NOT keep the lock during iteration to avoid deadlocks;
-        # instead we take a snapshot of the path and open a separate handle.
-        path = self.log_path
-        if not path.exists():
+        # instead we take a snapshot of the segment paths and open separate handles.
+        segments = all_segments(self.log_path)
+        if not segments:
             return iter(())
+        return self._iter_segments([(seg, 0) for seg in segments])
 
-        def _gen() -> Iterator[Dict[str, Any]]:
+    def replay_from_checkpoint(self) -> Tuple[Optional[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """
+        PATCH 37: Latest checkpoint state and the events written after it.
+
+        Returns (state, events): ``state`` is an OrderLogReducer snapshot
+        (None when the log has no checkpoint, in which case ``events`` is
+        the full history).
+        """
+        segments = all_segments(self.log_path)
+        for i in range(len(segments) - 1, -1, -1):
+            seg = segments[i]
+            offsets = list(reversed(SegmentIndex.load(seg).checkpoints))
+            head = len(MAGIC) if is_binary_file(seg) else 0
+            if head not in offsets:
+                offsets.append(head)  # rotation writes one at the head of each segment
+            for off in offsets:
+                ev = self._read_record_at(seg, off)
+                if ev is not None and ev.get("event_type") == CHECKPOINT_EVENT_TYPE:
+                    starts = [(seg, off)] + [(s, 0) for s in segments[i + 1:]]
+                    return ev.get("state") or {}, self._iter_segments(starts)
+        return None, self.iter_events()
+
+    def _iter_segments(self, starts: List[Tuple[Path, int]]) -> Iterator[Dict[str, Any]]:
+        for seg, off in starts:
+            for _, ev in self._iter_file(seg, off):
+                yield ev
+
+    @classmethod
+    def _iter_file(
+        cls, path: Path, start: int = 0, include_checkpoints: bool = False
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (byte offset, event) for one segment from ``start``."""
+        if is_binary_file(path):
+            yield from cls._iter_binary(path, start, include_checkpoints)
+            return
+        try:
+            f = open(path, mode="rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(start)
+            offset = start
+            line_num = 0
+            for raw in f:
+                line_offset = offset
+                offset += len(raw)
+                line_num += 1
+                ev = cls._parse_line(raw.decode("utf-8"), path, line_num if not start else f"+{line_offset}")
+                if ev is None:
+                    continue
+                if not include_checkpoints and ev.get("event_type") == CHECKPOINT_EVENT_TYPE:
+                    continue
+                yield line_offset, ev
+
+    @staticmethod
+    def _iter_binary(
+        path: Path, start: int = 0, include_checkpoints: bool = False, since_us: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """PATCH 38: one binary segment; ``since_us`` filters on record headers before decoding."""
+        try:
+            reader = BinaryLogReader(path)
+        except FileNotFoundError:
+            return
+        except CodecError as e:
+            raise TransactionLogCorruptionError(f"TransactionLog corruption detected: {e}") from e
+        with reader:
             try:
-                with open(path, mode="r", encoding="utf-8") as f:
-                    line_num = 0
-                    for line in f:
-                        line_num += 1
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        # PATCH 2: Parse and validate checksum
-                        if ":" not in line:
-                            # Legacy format without checksum (pre-PATCH 2); accept for backward compat
-                            try:
-                                yield json.loads(line)
-                                continue
-                            except json.JSONDecodeError:
-                                # Skip malformed line but continue
-                                continue
-
-                        # Format: "checksum:json_data"
-                        checksum_str, _, json_str = line.partition(":")
-                        if len(checksum_str) != 8:
-                            # Not a valid checksum format; try as legacy
-                            try:
-                                yield json.loads(line)
-                                continue
-                            except json.JSONDecodeError:
-                                continue
-
-                        try:
-                            expected_checksum = int(checksum_str, 16)
-                        except ValueError:
-                            # Not a hex checksum; try as legacy
-                            try:
-                                yield json.loads(line)
-                                continue
-                            except json.JSONDecodeError:
-                                continue
-
-                        # Compute actual checksum
-                        actual_checksum = zlib.crc32(json_str.encode("utf-8")) & 0xFFFFFFFF
-
-                        if actual_checksum != expected_checksum:
-                            error_msg = (
-                                f"TransactionLog corruption detected at {path}:{line_num}: "
-                                f"checksum mismatch (expected={expected_checksum:08x}, actual={actual_checksum:08x})"
-                            )
-                            raise TransactionLogCorruptionError(error_msg)
-
-                        try:
-                            yield json.loads(json_str)
-                        except json.JSONDecodeError as e:
-                            error_msg = (
-                                f"TransactionLog corruption detected at {path}:{line_num}: "
-                                f"invalid JSON after checksum validation: {e}"
-                            )
-                            raise TransactionLogCorruptionError(error_msg) from e
-
-            except FileNotFoundError:
-                return
-
-        return _gen()
+                for off, ev in reader.iter_events(start, since_us=since_us):
+                    if not include_checkpoints and ev.get("event_type") == CHECKPOINT_EVENT_TYPE:
+                        continue
+                    yield off, ev
+            except CodecError as e:
+                raise TransactionLogCorruptionError(f"TransactionLog corruption detected: {e}") from e
+
+    @classmethod
+    def _read_record_at(cls, path: Path, offset: int) -> Optional[Dict[str, Any]]:
+        """One record at a byte offset, or None if absent / unreadable."""
+        try:
+            if is_binary_file(path):
+                with BinaryLogReader(path) as reader:
+                    return reader.read_at(offset)
+            with open(path, mode="rb") as f:
+                f.seek(offset)
+                raw = f.readline()
+            return cls._parse_line(raw.decode("utf-8"), path, f"+{offset}")
+        except (OSError, UnicodeDecodeError, TransactionLogError, CodecError):
+            return None
+
+    @staticmethod
+    def _parse_line(line: str, path: Path, where: Any) -> Optional[Dict[str, Any]]:
+        """Decode one log line; None for blank / malformed legacy lines."""
+        line = line.strip()
+        if not line:
+            return None
+
+        # PATCH 2: Parse and validate checksum
+        if ":" not in line:
+            # Legacy format without checksum (pre-PATCH 2); accept for backward compat
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                # Skip malformed line but continue
+                return None
+
+        # Format: "checksum:json_data"
+        checksum_str, _, json_str = line.partition(":")
+        expected_checksum: Optional[int] = None
+        if len(checksum_str) == 8:
+            try:
+                expected_checksum = int(checksum_str, 16)
+            except ValueError:
+                expected_checksum = None
+        if expected_checksum is None:
+            # Not a valid checksum prefix; try as legacy
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                return None
+
+        # Compute actual checksum
+        actual_checksum = zlib.crc32(json_str.encode("utf-8")) & 0xFFFFFFFF
+
+        if actual_checksum != expected_checksum:
+            error_msg = (
+                f"TransactionLog corruption detected at {path}:{where}: "
+                f"checksum mismatch (expected={expected_checksum:08x}, actual={actual_checksum:08x})"
+            )
+            raise TransactionLogCorruptionError(error_msg)
+
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError as e:
+            error_msg = (
+                f"TransactionLog corruption detected at {path}:{where}: "
+                f"invalid JSON after checksum validation: {e}"
+            )
+            raise TransactionLogCorruptionError(error_msg) from e
 
     def filter_since(self, since: datetime) -> list[Dict[str, Any]]:
-        """Return events with _logged_at > since."""
+        """
+        Return events with _logged_at > since.
+
+        PATCH 37: sealed segments entirely at or before ``since`` are skipped
+        and each segment is entered at its indexed offset.
+        PATCH 38: binary segments skip older records on their headers alone.
+        """
         if since.tzinfo is None:
             since = since.replace(tzinfo=timezone.utc)
 
         out: list[Dict[str, Any]] = []
-        for ev in self.iter_events():
-            ts = ev.get("_logged_at")
-            if not ts:
-                continue
-            try:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            except Exception:
+        for seg in all_segments(self.log_path):
+            idx = SegmentIndex.load(seg)
+            if idx.end is not None and idx.end[1] is not None and idx.end[1] <= since:
                 continue
-            if dt > since:
-                out.append(ev)
+            if is_binary_file(seg):
+                records = self._iter_binary(seg, idx.seek_offset(since), since_us=datetime_to_us(since))
+            else:
+                records = self._iter_file(seg, idx.seek_offset(since))
+            for _, ev in records:
+                dt = parse_ts(ev.get("_logged_at"))
+                if dt is not None and dt > since:
+                    out.append(ev)
         return out
 
     def replay(self, handler) -> int:
@@ -291,6 +767,10 @@ class TransactionLog:
     # Lifecycle
     # ------------------------
     def close(self) -> None:
+        # PATCH 36: let an in-progress group commit land before closing.
+        with self._commit_cond:
+            while self._pending or self._leader_active:
+                self._commit_cond.wait(0.1)
         with self._lock:
             try:
                 if self._file is not None:
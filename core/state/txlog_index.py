@@ -0,0 +1,149 @@
+"""
+Segment layout and sparse sidecar index for the transaction log.
+
+PATCH 37: a segmented TransactionLog keeps its active segment at the
+configured path (so existing readers of that file keep working) and seals
+full / previous-day segments next to it:
+
+    transactions.log              active segment
+    transactions.log.idx          its sparse index
+    transactions.000001.log       sealed segments, oldest first
+    transactions.000001.log.idx
+
+Index rows are NDJSON:
+    {"o": offset, "t": iso}   every event before byte ``o`` has _logged_at <= t
+    {"c": offset}             a CHECKPOINT record starts at byte ``o``
+    {"end": size, "t": iso}   written once when the segment is sealed
+
+The index is a hint, never the source of truth: it is flushed but not
+fsynced, rows pointing past the end of the segment are ignored, and a
+missing index only costs a longer scan.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+INDEX_SUFFIX = ".idx"
+
+
+def parse_ts(ts: Optional[str]) -> Optional[datetime]:
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+
+
+def format_ts(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + INDEX_SUFFIX)
+
+
+def _sealed_pattern(log_path: Path) -> "re.Pattern[str]":
+    return re.compile(re.escape(log_path.stem) + r"\.(\d{6,})" + re.escape(log_path.suffix) + "$")
+
+
+def sealed_segments(log_path: Path) -> List[Tuple[int, Path]]:
+    """Sealed segments of ``log_path`` as (seq, path), oldest first."""
+    if not log_path.parent.exists():
+        return []
+    pat = _sealed_pattern(log_path)
+    out = []
+    for p in log_path.parent.iterdir():
+        m = pat.match(p.name)
+        if m:
+            out.append((int(m.group(1)), p))
+    return sorted(out)
+
+
+def sealed_name(log_path: Path, seq: int) -> Path:
+    return log_path.with_name(f"{log_path.stem}.{seq:06d}{log_path.suffix}")
+
+
+def all_segments(log_path: Path) -> List[Path]:
+    """Every segment in write order: sealed ones, then the active file."""
+    segs = [p for _, p in sealed_segments(log_path)]
+    if log_path.exists():
+        segs.append(log_path)
+    return segs
+
+
+@dataclass
+class SegmentIndex:
+    """Parsed sidecar index of one segment."""
+    times: List[Tuple[datetime, int]] = field(default_factory=list)
+    checkpoints: List[int] = field(default_factory=list)
+    end: Optional[Tuple[int, Optional[datetime]]] = None
+
+    @classmethod
+    def load(cls, segment: Path) -> "SegmentIndex":
+        idx = cls()
+        path = index_path(segment)
+        try:
+            size = segment.stat().st_size
+            with open(path, "r", encoding="utf-8") as f:
+                rows = f.readlines()
+        except OSError:
+            return idx
+        for raw in rows:
+            try:
+                row = json.loads(raw)
+            except ValueError:
+                continue  # torn last row
+            if "end" in row:
+                idx.end = (int(row["end"]), parse_ts(row.get("t")))
+            elif "c" in row and int(row["c"]) < size:
+                idx.checkpoints.append(int(row["c"]))
+            elif "o" in row and int(row["o"]) <= size:
+                dt = parse_ts(row.get("t"))
+                if dt is not None:
+                    idx.times.append((dt, int(row["o"])))
+        return idx
+
+    def seek_offset(self, since: datetime) -> int:
+        """Largest indexed offset before which nothing is newer than ``since``."""
+        best = 0
+        for dt, off in self.times:
+            if dt <= since:
+                best = max(best, off)
+            else:
+                break
+        return best
+
+    def last(self) -> Optional[Tuple[datetime, int]]:
+        return self.times[-1] if self.times else None
+
+
+def append_index_rows(segment: Path, rows: List[dict]) -> None:
+    """Best-effort append of index rows (flushed, not fsynced)."""
+    if not rows:
+        return
+    data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+    with open(index_path(segment), "a", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+
+
+def fsync_dir(path: Path) -> None:
+    """Make a rename in ``path`` durable (POSIX; no-op elsewhere)."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -53,6 +53,12 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="Bypass safety guards (NOT recommended).",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Shard the symbol universe across N worker processes (0/1 = single process).",
+    )
     return p.parse_args(argv)
 
 
@@ -101,13 +107,14 @@ def _looks_like_paper_key(api_key: str) -> bool:
     return k.upper().startswith("PK")
 
 
-def run_live(*, config_path: Path, run_interval_s: int = 60, run_once: bool = False) -> int:
+def run_live(*, config_path: Path, run_interval_s: int = 60, run_once: bool = False, workers: int = 0) -> int:
     return run(
         RunOptions(
             config_path=config_path,
             mode="live",
             run_interval_s=run_interval_s,
             run_once=run_once,
+            workers=workers,
         )
     )
 
@@ -178,7 +185,12 @@ def main(argv: list[str] | None = None) -> int:
         print("[entry_live] Smoke mode: order placement is DISABLED for this --once run.")
 
     try:
-        return run_live(config_path=cfg_path, run_interval_s=interval, run_once=bool(args.once))
+        return run_live(
+            config_path=cfg_path,
+            run_interval_s=interval,
+            run_once=bool(args.once),
+            workers=int(args.workers),
+        )
     except KeyboardInterrupt:
         return 0
     except BrokerConnectionError as e:
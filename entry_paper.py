@@ -42,6 +42,12 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="Print whether API env vars were loaded (no secrets) and exit.",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Shard the symbol universe across N worker processes (0/1 = single process).",
+    )
     return p.parse_args(argv)
 
 
@@ -82,13 +88,14 @@ def _apply_env_aliases() -> None:
 # Runner
 # ----------------------------
 
-def run_paper(*, config_path: Path, run_interval_s: int = 60, run_once: bool = False) -> int:
+def run_paper(*, config_path: Path, run_interval_s: int = 60, run_once: bool = False, workers: int = 0) -> int:
     return run(
         RunOptions(
             config_path=config_path,
             mode="paper",
             run_interval_s=run_interval_s,
             run_once=run_once,
+            workers=workers,
         )
     )
 
@@ -149,6 +156,7 @@ def main(argv: list[str] | None = None) -> int:
             config_path=cfg_path,
             run_interval_s=interval,
             run_once=bool(args.once),
+            workers=int(args.workers),
         )
     except KeyboardInterrupt:
         # Smoke rule: Ctrl-C always exits cleanly.
@@ -27,11 +27,11 @@ from zoneinfo import ZoneInfo
 from typing import Dict, List, Tuple, Optional, Callable
 import re
 
-import requests
+from core.net.http_client import get_http_client  # pooled keep-alive (PATCH 34)
 import tkinter as tk
 from tkinter import ttk
 
-from scanners.universe_builder import UniverseBuilder
+from scanners.universe_builder import UniverseBuilder, shared_alpaca_budgets, spend_budget
 import traceback
 import sys
 import webbrowser
@@ -498,6 +498,8 @@ class AlpacaDataREST:
         self.secret = os.getenv("ALPACA_API_SECRET", "").strip()
         if not self.key or not self.secret:
             raise RuntimeError("Missing ALPACA_API_KEY / ALPACA_API_SECRET in environment.")
+        # Host-wide Alpaca budget shared with the trading bot (MQD_SHARED_RATE_BUDGET=1)
+        self._budgets = shared_alpaca_budgets(self.key, client="scanner")
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -518,7 +520,8 @@ class AlpacaDataREST:
             "adjustment": "raw",
             "feed": "iex",
         }
-        r = requests.get(url, headers=self._headers(), params=params, timeout=20)
+        spend_budget(self._budgets, "alpaca_data")
+        r = get_http_client().get(url, headers=self._headers(), params=params, timeout=20)
         if r.status_code != 200:
             raise RuntimeError(f"Alpaca bars error {r.status_code}: {r.text[:300]}")
         data = r.json() or {}
@@ -540,7 +543,8 @@ class AlpacaDataREST:
 
         url = f"{base}/v2/stocks/snapshots"
         params = {"symbols": ",".join(symbols), "feed": "iex"}
-        r = requests.get(url, headers=self._headers(), params=params, timeout=25)
+        spend_budget(self._budgets, "alpaca_data")
+        r = get_http_client().get(url, headers=self._headers(), params=params, timeout=25)
         if r.status_code != 200:
             raise RuntimeError(f"Alpaca snapshots error {r.status_code}: {r.text[:300]}")
         data = r.json() or {}
@@ -587,6 +591,7 @@ class AlpacaNewsREST:
         self.headline_max = max(40, _env_int("NEWS_HEADLINE_MAX_CHARS", 90))
 
         self._disabled = False
+        self._budgets = shared_alpaca_budgets(self.key, client="scanner_news")
         # per-symbol cache: sym -> (fetched_ts, NewsHit|None)
         self._cache: Dict[str, Tuple[float, Optional[NewsHit]]] = {}
 
@@ -643,7 +648,8 @@ class AlpacaNewsREST:
         }
 
         try:
-            r = requests.get(url, headers=self._headers(), params=params, timeout=15)
+            spend_budget(self._budgets, "alpaca_data")
+            r = get_http_client().get(url, headers=self._headers(), params=params, timeout=15)
             if r.status_code in (401, 403):
                 # No entitlement; disable to prevent hammering
                 self._disabled = True
@@ -758,7 +764,7 @@ class FinnhubNewsREST:
 
     def _get(self, url: str, params: Dict[str, str]) -> Optional[dict]:
         try:
-            r = requests.get(url, params=params, timeout=10)
+            r = get_http_client().get(url, params=params, timeout=10)
             if r.status_code != 200:
                 return None
             return r.json()
@@ -849,7 +855,7 @@ class FMPNewsREST:
         params = {"tickers": symbol, "limit": str(self.limit), "apikey": self.key}
         hit: Optional[NewsHit] = None
         try:
-            r = requests.get(url, params=params, timeout=10)
+            r = get_http_client().get(url, params=params, timeout=10)
             if r.status_code == 200:
                 data = r.json()
                 if isinstance(data, list) and data:
@@ -947,7 +953,7 @@ class DiscordNotifier:
         if len(content) > 1800:
             content = content[:1800] + "…"
         try:
-            requests.post(self.webhook, json={"content": content}, timeout=10)
+            get_http_client().post(self.webhook, json={"content": content}, timeout=10)
         except Exception:
             pass
 
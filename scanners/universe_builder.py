@@ -29,6 +29,9 @@ ENV:
 
   NORMAL_MIN_PREV_DAY_VOL (default 1000000)   # proxy liquidity filter
   PENNY_MIN_PREV_DAY_VOL (default 5000000)    # pennies need crazy volume to be viable
+
+  MQD_SHARED_RATE_BUDGET (default 0)  # draw from the host-wide Alpaca budget
+                                      # shared with the trading bot (background)
 """
 
 from __future__ import annotations
@@ -42,7 +45,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import requests
+from core.net.http_client import get_http_client  # pooled keep-alive (PATCH 34)
 import math
 
 
@@ -74,6 +77,23 @@ def _utc_now_iso() -> str:
 def _today_utc_ymd() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
+def shared_alpaca_budgets(api_key: str, client: str) -> Dict[str, object]:
+    """
+    Host-wide Alpaca budgets as a background client ({} when disabled or
+    unavailable), so scanner traffic never eats the trading bot's headroom.
+    """
+    try:
+        from core.net.shared_budget import alpaca_shared_budgets
+        return alpaca_shared_budgets(api_key, client=client, background=True)
+    except Exception:
+        return {}
+
+def spend_budget(budgets: Dict[str, object], name: str) -> None:
+    """Block until the named shared budget (if any) grants a token."""
+    budget = budgets.get(name)
+    if budget is not None:
+        budget.acquire()
+
 
 @dataclass(frozen=True)
 class UniverseResult:
@@ -91,6 +111,8 @@ class UniverseBuilder:
         if not self.api_key or not self.api_secret:
             raise RuntimeError("Missing ALPACA_API_KEY / ALPACA_API_SECRET in environment.")
 
+        self._budgets = shared_alpaca_budgets(self.api_key, client="universe_builder")
+
         self.trading_base = os.getenv("ALPACA_TRADING_BASE_URL", "https://paper-api.alpaca.markets").rstrip("/")
         self.data_base = os.getenv("ALPACA_DATA_BASE_URL", "https://data.alpaca.markets").rstrip("/")
 
@@ -331,7 +353,8 @@ class UniverseBuilder:
         secret_ok = bool(self.api_secret)
         print(f"[UniverseBuilder] trading_base={self.trading_base} key_set={key_ok} secret_set={secret_ok}")
 
-        r = requests.get(url, headers=self._headers(), params=params, timeout=20)
+        spend_budget(self._budgets, "alpaca_trading")
+        r = get_http_client().get(url, headers=self._headers(), params=params, timeout=20)
 
         if r.status_code != 200:
             # more useful debug without leaking
@@ -392,7 +415,8 @@ class UniverseBuilder:
         for i in range(0, len(symbols), batch_size):
             batch = symbols[i:i + batch_size]
             params = {"symbols": ",".join(batch), "feed": "iex"}
-            r = requests.get(url, headers=headers, params=params, timeout=30)
+            spend_budget(self._budgets, "alpaca_data")
+            r = get_http_client().get(url, headers=headers, params=params, timeout=30)
 
             if r.status_code != 200:
                 req_id = r.headers.get("x-request-id") or r.headers.get("X-Request-Id") or ""
@@ -0,0 +1,180 @@
+"""
+P1 Patch 16 – Pipelined runtime cycle (market-data prefetch)
+
+INVARIANT:
+    Bar fetches for upcoming symbols overlap with compute for the current
+    symbol, but the consumer still sees results in symbol order, fetch
+    errors surface exactly where the inline fetch used to raise them, and
+    results never leak from one cycle into the next.
+
+DESIGN:
+    - core/runtime/pipeline.py: BarPrefetcher (thread pool + sliding
+      lookahead window).
+    - app.py calls begin_cycle() before the account fetch and get(symbol)
+      in place of the direct pipeline call. MQD_PIPELINE_PREFETCH=0
+      restores the strictly sequential fetch. The wiring is checked by
+      running app.run once against a recording prefetcher.
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.runtime.pipeline import BarPrefetcher
+
+
+class TestBarPrefetcher:
+
+    def test_results_returned_per_symbol(self):
+        with BarPrefetcher(lambda s: f"df:{s}", lookahead=2) as pf:
+            pf.begin_cycle(["SPY", "QQQ", "IWM"])
+            assert [pf.get(s) for s in ("SPY", "QQQ", "IWM")] == ["df:SPY", "df:QQQ", "df:IWM"]
+            stats = pf.get_stats()
+        assert stats["prefetch_hits"] == 3
+        assert stats["inline_fetches"] == 0
+
+    def test_next_symbol_in_flight_while_current_is_processed(self):
+        started = {}
+        lock = threading.Lock()
+
+        def fetch(sym):
+            with lock:
+                started[sym] = time.monotonic()
+            return sym
+
+        with BarPrefetcher(fetch, lookahead=1) as pf:
+            pf.begin_cycle(["A", "B", "C"])
+            assert pf.get("A") == "A"
+            # B was scheduled by get("A"); it runs while the caller "computes".
+            deadline = time.monotonic() + 2.0
+            while "B" not in started and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert "B" in started
+
+    def test_overlap_reduces_wall_time(self):
+        io_s = 0.05
+
+        def slow_fetch(sym):
+            time.sleep(io_s)
+            return sym
+
+        symbols = [f"S{i}" for i in range(6)]
+        with BarPrefetcher(slow_fetch, lookahead=2) as pf:
+            t0 = time.monotonic()
+            pf.begin_cycle(symbols)
+            for s in symbols:
+                pf.get(s)
+                time.sleep(io_s)  # simulated compute
+            elapsed = time.monotonic() - t0
+        sequential = 2 * io_s * len(symbols)
+        assert elapsed < sequential * 0.8
+
+    def test_fetch_error_reraised_from_get(self):
+        def fetch(sym):
+            if sym == "BAD":
+                raise RuntimeError("boom")
+            return sym
+
+        with BarPrefetcher(fetch, lookahead=2) as pf:
+            pf.begin_cycle(["BAD", "OK"])
+            with pytest.raises(RuntimeError, match="boom"):
+                pf.get("BAD")
+            assert pf.get("OK") == "OK"
+
+    def test_new_cycle_discards_previous_results(self):
+        calls = {"n": 0}
+
+        def fetch(sym):
+            calls["n"] += 1
+            return calls["n"]
+
+        with BarPrefetcher(fetch, lookahead=1, max_workers=1) as pf:
+            pf.begin_cycle(["SPY"])
+            first = pf.get("SPY")
+            pf.begin_cycle(["SPY"])
+            second = pf.get("SPY")
+        assert second != first
+
+    def test_unscheduled_symbol_fetched_inline(self):
+        with BarPrefetcher(lambda s: s.lower(), lookahead=1) as pf:
+            pf.begin_cycle(["SPY"])
+            assert pf.get("XYZ") == "xyz"
+            assert pf.get_stats()["inline_fetches"] == 1
+
+    def test_invalid_lookahead_rejected(self):
+        with pytest.raises(ValueError):
+            BarPrefetcher(lambda s: s, lookahead=0)
+
+
+class _RecordingPrefetcher:
+    """Stands in for BarPrefetcher inside app.run and records its use."""
+
+    instances = []
+
+    def __init__(self, fetch, lookahead=1):
+        self._fetch = fetch
+        self.calls = []
+        self.closed = False
+        _RecordingPrefetcher.instances.append(self)
+
+    def begin_cycle(self, symbols):
+        self.calls.append(("begin_cycle", list(symbols)))
+
+    def get(self, symbol):
+        self.calls.append(("get", symbol))
+        return self._fetch(symbol)
+
+    def close(self):
+        self.closed = True
+
+
+def _run_app_once(tmp_path, monkeypatch, env):
+    import pandas as pd
+
+    import tests.torture.helpers.run_harness as harness
+    from tests.torture.helpers.chaos_broker import ChaosBroker
+
+    fetched = []
+
+    class _Pipeline:
+        def get_latest_bars(self, symbol, *args, **kwargs):
+            fetched.append(symbol)
+            return pd.DataFrame()
+
+    class _PipelineContainer(harness.HarnessContainer):
+        def get_data_pipeline(self):
+            return _Pipeline()
+
+    _RecordingPrefetcher.instances = []
+    monkeypatch.setattr("core.runtime.app.BarPrefetcher", _RecordingPrefetcher)
+    monkeypatch.setattr(harness, "HarnessContainer", _PipelineContainer)
+    result = harness.run_harness(
+        broker=ChaosBroker(seed=1, closed_until_cycle=0),
+        tmp_path=tmp_path,
+        max_cycles=1,
+        symbols=["SPY", "QQQ"],
+        env_overrides=env,
+    )
+    assert result.error is None, result.error
+    return fetched
+
+
+def test_app_fetches_bars_through_the_prefetcher(tmp_path, monkeypatch):
+    fetched = _run_app_once(tmp_path, monkeypatch, {"MQD_PIPELINE_PREFETCH": "1"})
+
+    (pf,) = _RecordingPrefetcher.instances
+    begin = [c for c in pf.calls if c[0] == "begin_cycle"]
+    gets = [c[1] for c in pf.calls if c[0] == "get"]
+    assert len(begin) == 1
+    assert pf.calls[0] == begin[0]  # scheduled before the first get
+    assert gets == begin[0][1] and set(gets) == {"SPY", "QQQ"}
+    assert fetched == gets  # every pipeline read went through get()
+    assert pf.closed
+
+
+def test_prefetch_flag_off_fetches_inline(tmp_path, monkeypatch):
+    fetched = _run_app_once(tmp_path, monkeypatch, {"MQD_PIPELINE_PREFETCH": "0"})
+
+    assert _RecordingPrefetcher.instances == []
+    assert set(fetched) == {"SPY", "QQQ"}
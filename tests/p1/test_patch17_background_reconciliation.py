@@ -0,0 +1,224 @@
+"""
+P1 Patch 17 – Background reconciliation worker
+
+INVARIANT:
+    Periodic reconciliation, drift detection and the orphan/shadow order
+    check never run on the trading hot path, yet an urgent discrepancy
+    (position drift) can still block new entries as soon as it is found.
+
+DESIGN:
+    - core/runtime/reconcile_worker.py: ReconciliationWorker publishes an
+      immutable ReconciliationSnapshot by reference assignment; the loop
+      reads latest() without a lock.
+    - block_trading is set only when block_on_urgent is enabled (LIVE).
+    - Auto-heal is published as a request on the snapshot and applied by the
+      runtime loop (apply_heal), never on the worker thread.
+    - DriftDetector reads core.state.PositionStore (get_all / entry_price).
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from core.runtime.reconcile_worker import ReconciliationSnapshot, ReconciliationWorker
+from core.state.reconciler import Discrepancy, PeriodicReconciler, StartupReconciler
+
+
+def _disc(kind, symbol="SPY"):
+    return Discrepancy(
+        type=kind,
+        symbol=symbol,
+        local_value=Decimal("10"),
+        broker_value=Decimal("5"),
+        resolution="require_manual_review",
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+def _periodic(discrepancies):
+    base = MagicMock(spec=StartupReconciler)
+    base.reconcile_startup.return_value = discrepancies
+    return PeriodicReconciler(base, interval_s=0.0), base
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestReconciliationWorker:
+
+    def test_no_snapshot_until_first_pass(self):
+        w = ReconciliationWorker()
+        assert w.latest() is None
+        assert w.trading_blocked is False
+        assert w.tick() is None
+
+    def test_urgent_discrepancy_blocks_trading(self):
+        periodic, _ = _periodic([_disc("qty_mismatch")])
+        w = ReconciliationWorker(periodic_reconciler=periodic, block_on_urgent=True)
+        snap = w.tick()
+        assert isinstance(snap, ReconciliationSnapshot)
+        assert snap.reconcile_ran is True
+        assert snap.urgent_reasons == ("qty_mismatch:SPY",)
+        assert w.trading_blocked is True
+
+    def test_order_only_discrepancy_is_not_urgent(self):
+        periodic, _ = _periodic([_disc("missing_order")])
+        w = ReconciliationWorker(periodic_reconciler=periodic, block_on_urgent=True)
+        snap = w.tick()
+        assert len(snap.discrepancies) == 1
+        assert w.trading_blocked is False
+
+    def test_paper_mode_reports_but_does_not_block(self):
+        periodic, _ = _periodic([_disc("extra_position")])
+        w = ReconciliationWorker(periodic_reconciler=periodic, block_on_urgent=False)
+        snap = w.tick()
+        assert snap.urgent_reasons
+        assert snap.block_trading is False
+
+    def test_block_clears_after_clean_pass(self):
+        periodic, base = _periodic([_disc("missing_position")])
+        w = ReconciliationWorker(periodic_reconciler=periodic)
+        w.tick()
+        assert w.trading_blocked is True
+        base.reconcile_startup.return_value = []
+        w.tick()
+        assert w.trading_blocked is False
+
+    def test_orphan_check_uses_interval(self):
+        clock = _Clock()
+        broker = MagicMock()
+        broker.get_orders.return_value = [SimpleNamespace(id="b-1")]
+        tracker = MagicMock()
+        tracker.get_orphaned_orders.return_value = ["b-1"]
+        tracker.get_shadow_orders.return_value = []
+
+        w = ReconciliationWorker(broker=broker, order_tracker=tracker, orphan_interval_s=60, monotonic=clock)
+        snap = w.tick()
+        assert snap.orphan_check_ran is True
+        assert snap.orphans == ("b-1",)
+        assert tracker.get_orphaned_orders.call_args[0][0] == {"b-1": broker.get_orders.return_value[0]}
+
+        clock.t = 30
+        assert w.tick() is None
+        clock.t = 61
+        assert w.tick() is not None
+        assert broker.get_orders.call_count == 2
+
+    def test_critical_drift_blocks_and_minor_drift_heals(self):
+        critical = SimpleNamespace(symbol="AAPL", severity=SimpleNamespace(value="CRITICAL"))
+        minor = SimpleNamespace(symbol="MSFT", severity=SimpleNamespace(value="MINOR"))
+        detector = MagicMock()
+        detector.check_interval = 60
+        detector.check_drift.return_value = [critical, minor]
+        detector.auto_reconcile.return_value = True
+
+        w = ReconciliationWorker(drift_detector=detector, auto_heal=True)
+        snap = w.tick()
+        assert snap.block_trading is True
+        assert snap.urgent_reasons == ("drift:AAPL",)
+        assert snap.heal_drifts == (minor,)
+        detector.auto_reconcile.assert_not_called()  # published, not run by the worker
+        assert w.apply_heal(snap) == 1
+        detector.auto_reconcile.assert_called_once_with(minor)
+
+    def test_discrepancy_heal_runs_on_the_caller_thread(self):
+        periodic, base = _periodic([_disc("qty_mismatch")])
+        threads = []
+        base.heal_startup.side_effect = lambda: threads.append(threading.current_thread()) or ["a", "b"]
+        w = ReconciliationWorker(periodic_reconciler=periodic, auto_heal=True, poll_interval_s=0.01)
+        w.start()
+        try:
+            deadline = time.monotonic() + 2.0
+            while w.latest() is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            w.stop()
+        snap = w.latest()
+        assert snap.heal_requested is True and threads == []
+        assert w.apply_heal(snap) == 2
+        assert threads == [threading.current_thread()]
+
+        base.heal_startup.side_effect = RuntimeError("broker down")
+        assert w.apply_heal(snap) == 0  # logged, not raised
+
+    def test_errors_are_captured_not_raised(self):
+        broker = MagicMock()
+        broker.get_orders.side_effect = RuntimeError("api down")
+        w = ReconciliationWorker(broker=broker, order_tracker=MagicMock())
+        snap = w.tick()
+        assert snap.orphan_check_ran is False
+        assert snap.errors and "api down" in snap.errors[0]
+
+    def test_background_thread_publishes_without_caller(self):
+        periodic, base = _periodic([_disc("qty_mismatch")])
+        w = ReconciliationWorker(periodic_reconciler=periodic, poll_interval_s=0.01)
+        w.start()
+        try:
+            deadline = time.monotonic() + 2.0
+            while w.latest() is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert w.latest() is not None
+            assert w.trading_blocked is True
+        finally:
+            w.stop()
+        assert w.is_running is False
+
+    def test_slow_reconcile_does_not_block_reader(self):
+        gate = threading.Event()
+        base = MagicMock(spec=StartupReconciler)
+        base.reconcile_startup.side_effect = lambda: (gate.wait(2.0), [])[1]
+        w = ReconciliationWorker(periodic_reconciler=PeriodicReconciler(base, interval_s=0.0))
+        w.start()
+        try:
+            t0 = time.monotonic()
+            assert w.latest() is None
+            assert w.trading_blocked is False
+            assert time.monotonic() - t0 < 0.1
+        finally:
+            gate.set()
+            w.stop()
+
+
+def test_app_consumes_worker_snapshots():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app.run)
+    assert "ReconciliationWorker(" in src
+    assert "_recon_worker.latest()" in src
+    assert "reconciliation_block" in src
+    # The inline broker order pull is gone from the loop.
+    assert "broker_orders_list = broker.get_orders()" not in src
+
+
+def test_drift_detector_reads_position_store(tmp_path):
+    from core.monitoring.drift import DriftDetector, DriftSeverity, DriftType
+    from core.state.position_store import Position, PositionStore
+
+    store = PositionStore(db_path=str(tmp_path / "positions.db"))
+    store.upsert(Position(symbol="SPY", quantity=Decimal("10"), entry_price=Decimal("100"),
+                          entry_time=datetime.now(timezone.utc), strategy="s", order_id="O-1",
+                          stop_loss=Decimal("95")))
+    broker = MagicMock()
+    broker.get_positions.return_value = [  # connector returns core.state Positions
+        Position(symbol="SPY", quantity=Decimal("10.5"), entry_price=Decimal("100"),
+                 entry_time=datetime.now(timezone.utc), strategy="broker", order_id="x"),
+    ]
+    detector = DriftDetector(position_store=store, broker=broker)
+
+    drifts = detector.check_drift()
+    assert [(d.symbol, d.drift_type, d.severity) for d in drifts] == [
+        ("SPY", DriftType.QUANTITY_MISMATCH, DriftSeverity.MINOR)
+    ]
+    assert detector.auto_reconcile(drifts[0]) is True
+    healed = store.get("SPY")
+    assert healed.quantity == Decimal("10.5") and healed.stop_loss == Decimal("95")
+    assert detector.check_drift() == []
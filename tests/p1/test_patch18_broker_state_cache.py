@@ -0,0 +1,177 @@
+"""
+P1 Patch 18 – Per-cycle broker state cache
+
+INVARIANT:
+    Account, positions and open orders are fetched from the broker at most
+    once per runtime cycle, and any trade/account update (user stream) or
+    our own order activity invalidates exactly the affected sections.
+
+DESIGN:
+    - core/brokers/state_cache.py: BrokerStateCache (read-through, per-cycle,
+      generation-checked so a fetch racing an invalidation is not cached).
+    - Container owns the cache and feeds it from _handle_trade_update /
+      _handle_account_update; app.run reads the account and per-signal
+      positions through it and hands it to the reconciliation worker.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.brokers import BrokerStateCache
+from core.runtime.app import _single_trade_should_block_entry
+
+
+class _Broker:
+    def __init__(self):
+        self.calls = {"account": 0, "positions": 0, "orders": 0}
+        self.positions = [SimpleNamespace(symbol="SPY", qty="5")]
+        self.orders = [SimpleNamespace(id="o-1", symbol="QQQ")]
+
+    def get_account_info(self):
+        self.calls["account"] += 1
+        return {"portfolio_value": "1000", "buying_power": "500"}
+
+    def get_positions(self):
+        self.calls["positions"] += 1
+        return list(self.positions)
+
+    def get_orders(self, status="open", limit=None):
+        self.calls["orders"] += 1
+        return list(self.orders)
+
+
+class TestBrokerStateCache:
+
+    def test_one_fetch_per_section_per_cycle(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        for _ in range(3):
+            c.get_account_info()
+            c.get_positions()
+            c.get_open_orders()
+        assert b.calls == {"account": 1, "positions": 1, "orders": 1}
+
+        c.begin_cycle()
+        c.get_account_info()
+        assert b.calls["account"] == 2
+
+    def test_trade_update_invalidates_orders_only(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        c.get_account_info(); c.get_positions(); c.get_open_orders()
+
+        c.on_trade_update({"event": "new", "order": {"id": "o-2"}})
+        c.get_account_info(); c.get_positions(); c.get_open_orders()
+        assert b.calls == {"account": 1, "positions": 1, "orders": 2}
+
+    def test_fill_invalidates_positions_and_account(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        c.get_account_info(); c.get_positions(); c.get_open_orders()
+
+        c.on_trade_update({"event": "fill", "order": {"id": "o-1"}})
+        c.get_account_info(); c.get_positions(); c.get_open_orders()
+        assert b.calls == {"account": 2, "positions": 2, "orders": 2}
+
+    def test_account_update_invalidates_account_only(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        c.get_account_info(); c.get_positions()
+        c.on_account_update({"cash": "1"})
+        c.get_account_info(); c.get_positions()
+        assert b.calls["account"] == 2
+        assert b.calls["positions"] == 1
+
+    def test_get_position_filters_cached_list(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        assert c.get_position("spy").qty == "5"
+        assert c.get_position("IWM") is None
+        assert b.calls["positions"] == 1
+
+    def test_get_position_memoizes_connector_lookup(self):
+        b = MagicMock()
+        b.get_position.return_value = SimpleNamespace(qty="1")
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        c.get_position("SPY"); c.get_position("SPY")
+        assert b.get_position.call_count == 1
+        c.on_order_activity()
+        c.get_position("SPY")
+        assert b.get_position.call_count == 2
+
+    def test_fetch_error_not_cached(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        b.get_account_info = MagicMock(side_effect=[RuntimeError("down"), {"ok": 1}])
+        with pytest.raises(RuntimeError):
+            c.get_account_info()
+        assert c.get_account_info() == {"ok": 1}
+
+    def test_invalidation_during_fetch_is_not_published(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+
+        def racing_fetch():
+            c.on_account_update({})
+            return {"stale": True}
+
+        b.get_account_info = racing_fetch
+        assert c.get_account_info() == {"stale": True}
+        b.get_account_info = lambda: {"fresh": True}
+        assert c.get_account_info() == {"fresh": True}
+
+    def test_max_age_bounds_staleness(self):
+        now = [0.0]
+        b = _Broker()
+        c = BrokerStateCache(b, max_age_s=5, monotonic=lambda: now[0])
+        c.begin_cycle()
+        c.get_account_info()
+        now[0] = 10.0
+        c.get_account_info()
+        assert b.calls["account"] == 2
+
+    def test_get_orders_passthrough_for_non_open_views(self):
+        b = MagicMock()
+        b.get_orders.return_value = []
+        c = BrokerStateCache(b)
+        c.get_orders(status="all", limit=50)
+        b.get_orders.assert_called_once_with(status="all", limit=50)
+
+    def test_guard_uses_cached_state(self):
+        b = _Broker()
+        c = BrokerStateCache(b)
+        c.begin_cycle()
+        assert _single_trade_should_block_entry("SPY", broker=c) is True
+        assert _single_trade_should_block_entry("QQQ", broker=c) is True
+        assert _single_trade_should_block_entry("IWM", broker=c) is False
+        assert b.calls["positions"] == 1
+        assert b.calls["orders"] == 1
+
+
+def test_container_user_stream_handlers_invalidate_cache():
+    from core.di.container import Container
+
+    container = Container()
+    b = _Broker()
+    container._broker_state_cache = BrokerStateCache(b)
+    container._order_tracker = MagicMock()
+    cache = container.get_broker_state_cache()
+    cache.begin_cycle()
+    cache.get_account_info(); cache.get_open_orders()
+
+    asyncio.run(container._handle_account_update({"cash": "1"}))
+    asyncio.run(container._handle_trade_update({"event": "canceled", "order": {"client_order_id": "x"}}))
+    cache.get_account_info(); cache.get_open_orders()
+    assert b.calls["account"] == 2
+    assert b.calls["orders"] == 2
@@ -0,0 +1,259 @@
+"""
+P1 Patch 19 – Universe sharding across worker processes (supervisor mode)
+
+INVARIANT:
+    Shard workers only run data + strategy stages and emit OrderIntents;
+    the parent process stays the single risk/execution process. Intents are
+    handed to the runtime loop in universe order (deterministic journal),
+    stale intents and intents from another cycle are dropped, and fills are
+    routed back to the owning shard. The parent never runs strategies.
+
+DESIGN:
+    - core/runtime/supervisor.py: partition_universe, shard_worker_main,
+      UniverseSupervisor (intent source for app.run).
+    - app.run(opts, intent_source=...) / RunOptions.workers > 1; the parent
+      loads the universe with _load_strategies(start=False).
+    - Lockstep cycles: collect_cycle() sends CycleTick(n) to every shard and
+      keeps only intents tagged n.
+"""
+
+import queue
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from core.runtime import supervisor as sup_mod
+from core.runtime.app import RunOptions
+from core.runtime.supervisor import (
+    CycleTick,
+    FillNotice,
+    OrderIntent,
+    ShardCycleDone,
+    ShardJournalEvent,
+    ShardSpec,
+    UniverseSupervisor,
+    partition_universe,
+)
+
+
+# ---------------------------------------------------------------------------
+# Worker targets for real subprocesses (module level so spawn can import them)
+# ---------------------------------------------------------------------------
+
+def _reverse_order_worker(spec, intent_q, fill_q, stop_event):
+    intent_q.put(ShardJournalEvent(shard_id=spec.shard_id, event={"event": "shard_hello"}))
+    for sym in reversed(spec.symbols):
+        intent_q.put(OrderIntent(
+            shard_id=spec.shard_id, cycle=1, symbol=sym,
+            signal={"symbol": sym, "side": "BUY", "quantity": "1"},
+            bar=None, created_at=time.time(),
+        ))
+    intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=1))
+    stop_event.wait(10)
+
+
+def _lockstep_worker(spec, intent_q, fill_q, stop_event):
+    while not stop_event.is_set():
+        try:
+            tick = fill_q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if not isinstance(tick, CycleTick):
+            continue
+        for cycle in (tick.cycle - 1, tick.cycle):  # a late intent from the previous cycle, then this one
+            intent_q.put(OrderIntent(
+                shard_id=spec.shard_id, cycle=cycle, symbol=spec.symbols[0],
+                signal={"cycle": cycle}, bar=None, created_at=time.time(),
+            ))
+        intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=tick.cycle - 1))  # ignored
+        intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=tick.cycle))
+
+
+def _stale_worker(spec, intent_q, fill_q, stop_event):
+    for sym in spec.symbols:
+        intent_q.put(OrderIntent(
+            shard_id=spec.shard_id, cycle=1, symbol=sym,
+            signal={"symbol": sym}, bar=None, created_at=0.0,
+        ))
+    intent_q.put(ShardCycleDone(shard_id=spec.shard_id, cycle=1))
+    stop_event.wait(10)
+
+
+class _Journal:
+    def __init__(self):
+        self.events = []
+
+    def write_event(self, event):
+        self.events.append(event)
+
+
+def _opts(tmp_path, **kw):
+    return RunOptions(config_path=tmp_path / "config.yaml", mode="paper", run_interval_s=1, **kw)
+
+
+# ---------------------------------------------------------------------------
+# Partitioning
+# ---------------------------------------------------------------------------
+
+class TestPartitionUniverse:
+
+    def test_round_robin_is_deterministic_and_balanced(self):
+        syms = ["A", "B", "C", "D", "E"]
+        assert partition_universe(syms, 2) == [["A", "C", "E"], ["B", "D"]]
+        assert partition_universe(syms, 2) == partition_universe(list(syms), 2)
+
+    def test_duplicates_removed_and_no_empty_shards(self):
+        assert partition_universe(["A", "A", "B"], 5) == [["A"], ["B"]]
+
+    def test_invalid_shard_count(self):
+        with pytest.raises(ValueError):
+            partition_universe(["A"], 0)
+
+
+# ---------------------------------------------------------------------------
+# Shard worker (run in-process)
+# ---------------------------------------------------------------------------
+
+class _Lifecycle:
+    def __init__(self):
+        self.fills = []
+
+    def on_bar(self, bar):
+        if bar.symbol == "SPY":
+            return [{"symbol": "SPY", "side": "BUY", "quantity": "1", "strategy": "S"}]
+        return []
+
+    def on_order_filled(self, **kw):
+        self.fills.append(kw)
+
+
+def test_shard_worker_emits_intents_and_applies_fills(monkeypatch, tmp_path):
+    lifecycle = _Lifecycle()
+    monkeypatch.setattr(sup_mod, "_build_shard_components", lambda spec: (None, None, lifecycle))
+
+    intent_q, fill_q = queue.Queue(), queue.Queue()
+    fill_q.put(FillNotice("S", "o-1", "SPY", Decimal("1"), Decimal("10")))
+    fill_q.put(CycleTick(7))
+    spec = ShardSpec(
+        shard_id=3, symbols=("SPY", "QQQ"), config_path=str(tmp_path / "c.yaml"),
+        mode="paper", run_interval_s=0, run_once=True,
+    )
+    sup_mod.shard_worker_main(spec, intent_q, fill_q, threading.Event())
+
+    msgs = []
+    while not intent_q.empty():
+        msgs.append(intent_q.get_nowait())
+    intents = [m for m in msgs if isinstance(m, OrderIntent)]
+    assert [i.symbol for i in intents] == ["SPY"]
+    assert intents[0].shard_id == 3 and intents[0].cycle == 7
+    assert intents[0].signal["side"] == "BUY"
+    assert msgs[-1] == ShardCycleDone(shard_id=3, cycle=7)
+    assert lifecycle.fills and lifecycle.fills[0]["order_id"] == "o-1"
+
+
+def test_shard_worker_reports_build_failure(monkeypatch, tmp_path):
+    def boom(spec):
+        raise RuntimeError("no config")
+
+    monkeypatch.setattr(sup_mod, "_build_shard_components", boom)
+    intent_q = queue.Queue()
+    spec = ShardSpec(shard_id=0, symbols=("SPY",), config_path="x", mode="paper", run_interval_s=0, run_once=True)
+    sup_mod.shard_worker_main(spec, intent_q, queue.Queue(), threading.Event())
+    first = intent_q.get_nowait()
+    assert isinstance(first, ShardJournalEvent)
+    assert first.event["event"] == "shard_worker_failed"
+
+
+# ---------------------------------------------------------------------------
+# Supervisor with real worker processes
+# ---------------------------------------------------------------------------
+
+def test_supervisor_orders_intents_by_universe_and_forwards_journal(tmp_path):
+    sup = UniverseSupervisor(_opts(tmp_path), n_workers=2, worker_target=_reverse_order_worker,
+                             collect_timeout_s=20.0)
+    journal = _Journal()
+    sup.start(["A", "B", "C", "D"])
+    try:
+        intents = sup.collect_cycle(journal=journal)
+    finally:
+        sup.stop()
+    assert [i.symbol for i in intents] == ["A", "B", "C", "D"]
+    hellos = [e for e in journal.events if e.get("event") == "shard_hello"]
+    assert sorted(e["shard_id"] for e in hellos) == [0, 1]
+    assert not any(e.get("event") == "shard_cycle_timeout" for e in journal.events)
+
+
+def test_supervisor_drops_stale_intents(tmp_path):
+    sup = UniverseSupervisor(_opts(tmp_path), n_workers=1, worker_target=_stale_worker,
+                             collect_timeout_s=20.0, max_intent_age_s=5.0)
+    journal = _Journal()
+    sup.start(["SPY"])
+    try:
+        intents = sup.collect_cycle(journal=journal)
+    finally:
+        sup.stop()
+    assert intents == []
+    assert any(e.get("event") == "shard_intent_expired" for e in journal.events)
+    assert sup.get_stats()["intents_expired"] == 1
+
+
+def test_supervisor_keeps_only_the_current_cycles_intents(tmp_path):
+    sup = UniverseSupervisor(_opts(tmp_path), n_workers=1, worker_target=_lockstep_worker,
+                             collect_timeout_s=20.0)
+    journal = _Journal()
+    sup.start(["SPY"])
+    try:
+        first = sup.collect_cycle(journal=journal)
+        second = sup.collect_cycle(journal=journal)
+    finally:
+        sup.stop()
+    assert [i.signal["cycle"] for i in first] == [1]
+    assert [i.signal["cycle"] for i in second] == [2]
+    stale = [e for e in journal.events if e.get("event") == "shard_intent_stale"]
+    assert [(e["intent_cycle"], e["cycle"]) for e in stale] == [(0, 1), (1, 2)]
+    assert sup.get_stats()["intents_stale"] == 2
+    assert not any(e.get("event") == "shard_cycle_timeout" for e in journal.events)
+
+
+def test_parent_computes_universe_without_starting_strategies():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from core.runtime.app import _load_strategies
+
+    cfg = SimpleNamespace(strategies=[
+        {"name": "A", "symbols": ["SPY", "QQQ"]},
+        {"name": "B", "symbols": ["QQQ", "IWM"], "enabled": True},
+        {"name": "C", "symbols": ["TLT"], "enabled": False},
+    ])
+    registry, lifecycle = MagicMock(), MagicMock()
+    assert _load_strategies(cfg, registry, lifecycle, start=False) == ["SPY", "QQQ", "IWM"]
+    registry.create.assert_not_called()
+    lifecycle.add_strategy.assert_not_called()
+    lifecycle.start_strategy.assert_not_called()
+
+
+def test_fills_routed_to_owning_shard(tmp_path):
+    sup = UniverseSupervisor(_opts(tmp_path), n_workers=2, worker_target=_reverse_order_worker)
+    sup.start(["A", "B"])
+    try:
+        sup.on_order_filled(strategy_name="S", order_id="o-9", symbol="B",
+                            filled_qty=Decimal("2"), fill_price=Decimal("3"))
+        notice = sup._fill_qs[sup.shard_for("B")].get(timeout=5)
+    finally:
+        sup.stop()
+    assert notice.order_id == "o-9"
+    assert sup.shard_for("A") != sup.shard_for("B")
+
+
+def test_app_run_accepts_intent_source():
+    import inspect
+    from core.runtime import app
+
+    assert "intent_source" in inspect.signature(app.run).parameters
+    src = inspect.getsource(app.run)
+    assert "intent_source.collect_cycle(journal=journal)" in src
+    assert "start=not _sharded" in src
+    assert RunOptions(config_path="x", mode="paper").workers == 0
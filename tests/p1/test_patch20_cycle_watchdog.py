@@ -0,0 +1,191 @@
+"""
+P1 Patch 20 – Cycle-overrun watchdog with adaptive load shedding
+
+INVARIANT:
+    Symbols with open positions or working orders are evaluated first and
+    are never shed. When a cycle is about to overrun its budget, scanner-
+    sourced symbols are deferred first, then configured symbols, and
+    auxiliary work is dropped (bounded). The state snapshot is never shed.
+    Every shed decision is reported so the runtime can journal it.
+
+DESIGN:
+    - core/runtime/load_shedding.py: CycleWatchdog / CycleReport.
+    - app.run plans each cycle with _symbols_under_management() and
+      journals cycle_load_shed / cycle_overrun. run_once passes no budget,
+      so nothing is shed.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from core.runtime.app import _symbols_under_management
+from core.runtime.load_shedding import TIER_LOW, TIER_PRIORITY, CycleWatchdog
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _wd(budget=10.0, **kw):
+    clock = _Clock()
+    return CycleWatchdog(budget, monotonic=clock, **kw), clock
+
+
+class TestPlanCycle:
+
+    def test_orders_priority_normal_low(self):
+        wd, _ = _wd()
+        wd.begin_cycle()
+        order = wd.plan_cycle(["AAA", "SPY", "BBB", "QQQ"], priority=["qqq"], low=["AAA", "BBB"])
+        assert order == ["QQQ", "SPY", "AAA", "BBB"]
+        assert wd.tier_of("QQQ") == TIER_PRIORITY
+        assert wd.tier_of("AAA") == TIER_LOW
+
+    def test_deferred_symbols_rotate_to_front_of_tier(self):
+        wd, clock = _wd(budget=10.0, shed_fraction=0.5)
+        wd.begin_cycle()
+        order = wd.plan_cycle(["L1", "L2", "L3"], low=["L1", "L2", "L3"])
+        assert wd.admit(order[0])
+        clock.t = 6.0
+        assert not wd.admit(order[1])
+        assert not wd.admit(order[2])
+        wd.end_cycle()
+
+        wd.begin_cycle()
+        assert wd.plan_cycle(["L1", "L2", "L3"], low=["L1", "L2", "L3"]) == ["L2", "L3", "L1"]
+
+
+class TestAdmission:
+
+    def test_priority_never_shed(self):
+        wd, clock = _wd(budget=1.0)
+        wd.begin_cycle()
+        wd.plan_cycle(["HELD"], priority=["HELD"])
+        clock.t = 50.0
+        assert wd.admit("HELD")
+
+    def test_low_shed_before_normal(self):
+        wd, clock = _wd(budget=10.0, shed_fraction=0.8)
+        wd.begin_cycle()
+        wd.plan_cycle(["CORE", "SCAN"], low=["SCAN"])
+        clock.t = 8.5
+        assert wd.admit("CORE")
+        assert not wd.admit("SCAN")
+        report = wd.end_cycle()
+        assert report.deferred_symbols == ("SCAN",)
+        assert report.shed and not report.overrun
+
+    def test_expected_cost_triggers_shedding_before_budget(self):
+        wd, clock = _wd(budget=10.0, shed_fraction=1.0)
+        wd.begin_cycle()
+        wd.plan_cycle(["A", "B", "C"])
+        assert wd.admit("A")
+        clock.t = 4.0
+        assert wd.admit("B")     # A took 4s
+        clock.t = 8.0
+        assert not wd.admit("C")  # 8s + ~4s expected > 10s budget
+
+    def test_overrun_reported(self):
+        wd, clock = _wd(budget=5.0)
+        wd.begin_cycle()
+        clock.t = 7.0
+        report = wd.end_cycle()
+        assert report.overrun
+        assert wd.get_stats()["overruns"] == 1
+
+    def test_disabled_admits_everything(self):
+        wd, clock = _wd(budget=None)
+        wd.begin_cycle()
+        wd.plan_cycle(["SCAN"], low=["SCAN"])
+        clock.t = 1e6
+        assert wd.admit("SCAN")
+        assert wd.allow_auxiliary("snapshot")
+        assert not wd.end_cycle().overrun
+
+    def test_invalid_shed_fraction(self):
+        with pytest.raises(ValueError):
+            CycleWatchdog(10, shed_fraction=0)
+
+
+class TestAuxiliaryWork:
+
+    def test_dropped_when_over_soft_budget_with_bounded_starvation(self):
+        wd, clock = _wd(budget=10.0, shed_fraction=0.5, max_aux_deferrals=2)
+        results = []
+        for _ in range(3):
+            wd.begin_cycle()
+            clock.t += 6.0
+            results.append(wd.allow_auxiliary("order_archive"))
+            wd.end_cycle()
+        assert results == [False, False, True]
+
+    def test_state_snapshot_is_never_shed(self):
+        wd, clock = _wd(budget=10.0, shed_fraction=0.5, max_aux_deferrals=5)
+        wd.begin_cycle()
+        clock.t += 20.0
+        assert wd.allow_auxiliary("state_snapshot")
+        assert not wd.allow_auxiliary("order_archive")
+        assert wd.end_cycle().dropped_tasks == ("order_archive",)
+
+    def test_runs_when_within_budget(self):
+        wd, _ = _wd()
+        wd.begin_cycle()
+        assert wd.allow_auxiliary("order_archive")
+        assert wd.end_cycle().dropped_tasks == ()
+
+
+def test_symbols_under_management_uses_local_state():
+    store = SimpleNamespace(get_all=lambda: [SimpleNamespace(symbol="spy")])
+    tracker = SimpleNamespace(get_all_in_flight=lambda: [SimpleNamespace(symbol="QQQ")])
+    held = _symbols_under_management(store, tracker, {"IWM": "stop-1"})
+    assert held == {"SPY", "QQQ", "IWM"}
+
+
+def test_symbols_under_management_fails_soft():
+    def boom():
+        raise RuntimeError("db locked")
+
+    assert _symbols_under_management(SimpleNamespace(get_all=boom)) == set()
+
+
+def test_app_wires_watchdog():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app.run)
+    assert "CycleWatchdog(" in src
+    assert "_cycle_watchdog.admit(symbol)" in src
+    assert '"cycle_load_shed"' in src
+    assert '"cycle_overrun"' in src
+    assert 'allow_auxiliary("state_snapshot")' not in src  # recovery state is never shed
+    assert '"order_archive"' in src
+
+
+def test_run_once_disables_shedding(tmp_path, monkeypatch):
+    import tests.torture.helpers.run_harness as harness
+    from core.runtime import app
+    from tests.torture.helpers.chaos_broker import ChaosBroker
+
+    budgets = []
+
+    class _Recording(CycleWatchdog):
+        def __init__(self, budget_s, **kw):
+            budgets.append(budget_s)
+            super().__init__(budget_s, **kw)
+
+    monkeypatch.setattr(app, "CycleWatchdog", _Recording)
+    result = harness.run_harness(
+        broker=ChaosBroker(seed=1, closed_until_cycle=0),
+        tmp_path=tmp_path,
+        max_cycles=1,
+        env_overrides={"MQD_CYCLE_BUDGET_S": "0.001"},
+    )
+
+    assert result.error is None, result.error
+    assert budgets == [None]  # run_once: every symbol admitted however slow
+
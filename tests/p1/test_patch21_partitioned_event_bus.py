@@ -0,0 +1,152 @@
+"""
+P1 Patch 21 – Keyed-partition parallel dispatch for OrderEventBus
+
+INVARIANT:
+    Events with the same order_id (or symbol) are handled in emit order on
+    one worker; independent orders are handled in parallel, and slow
+    low-priority handlers never delay default-lane handlers.
+
+DESIGN:
+    - OrderEventBus(partitions=N): one queue + worker thread per partition,
+      crc32(order_id or symbol) % N picks the partition.
+    - subscribe(..., low_priority=True): handler runs on a separate FIFO lane.
+    - partitions=1 keeps the original single-consumer behaviour.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from core.events.bus import Event, OrderEventBus, default_partition_key
+
+
+@dataclass
+class _OrderEvent(Event):
+    order_id: str
+    seq: int
+
+    def to_dict(self):
+        return {"order_id": self.order_id, "seq": self.seq}
+
+
+@dataclass
+class _SymbolEvent(Event):
+    symbol: str
+
+    def to_dict(self):
+        return {"symbol": self.symbol}
+
+
+def _evt(order_id, seq=0):
+    return _OrderEvent(timestamp=datetime.now(timezone.utc), order_id=order_id, seq=seq)
+
+
+def _wait_for(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return pred()
+
+
+def test_partition_key_prefers_order_id_then_symbol():
+    assert default_partition_key(_evt("o-1")) == "o-1"
+    assert default_partition_key(_SymbolEvent(timestamp=datetime.now(timezone.utc), symbol="SPY")) == "SPY"
+
+
+def test_same_key_is_always_same_partition():
+    bus = OrderEventBus(partitions=4)
+    assert len({bus.partition_for(_evt("o-7", i)) for i in range(20)}) == 1
+    assert len({bus.partition_for(_evt(f"o-{i}")) for i in range(50)}) > 1
+
+
+def test_per_key_ordering_preserved():
+    bus = OrderEventBus(partitions=4, daemon=True)
+    seen = {}
+    lock = threading.Lock()
+
+    def handler(e):
+        with lock:
+            seen.setdefault(e.order_id, []).append(e.seq)
+
+    bus.subscribe(_OrderEvent, handler)
+    bus.start()
+    try:
+        for seq in range(50):
+            for oid in ("a", "b", "c", "d", "e"):
+                bus.emit(_evt(oid, seq))
+    finally:
+        bus.stop(timeout=5)
+    assert all(seen[oid] == list(range(50)) for oid in "abcde")
+    assert bus.get_stats()["events_processed"] == 250
+
+
+def test_slow_order_does_not_block_other_partitions():
+    bus = OrderEventBus(partitions=4, daemon=True)
+    release = threading.Event()
+    done = []
+
+    slow_id = "slow"
+    fast_id = next(f"f{i}" for i in range(100) if bus.partition_for(_evt(f"f{i}")) != bus.partition_for(_evt(slow_id)))
+
+    def handler(e):
+        if e.order_id == slow_id:
+            release.wait(5)
+        done.append(e.order_id)
+
+    bus.subscribe(_OrderEvent, handler)
+    bus.start()
+    try:
+        bus.emit(_evt(slow_id))
+        bus.emit(_evt(fast_id))
+        assert _wait_for(lambda: fast_id in done, timeout=2)
+        assert slow_id not in done
+        release.set()
+    finally:
+        bus.stop(timeout=5)
+    assert done[-1] == slow_id
+
+
+def test_low_priority_lane_isolated_from_default_lane():
+    bus = OrderEventBus(daemon=True)
+    release = threading.Event()
+    critical, notified = [], []
+
+    bus.subscribe(_OrderEvent, lambda e: critical.append(e.seq))
+
+    def slow_notify(e):
+        release.wait(5)
+        notified.append(e.seq)
+
+    bus.subscribe(_OrderEvent, slow_notify, low_priority=True)
+    bus.start()
+    try:
+        for i in range(3):
+            bus.emit(_evt("o-1", i))
+        assert _wait_for(lambda: critical == [0, 1, 2], timeout=2)
+        assert notified == []
+        release.set()
+    finally:
+        bus.stop(timeout=5)
+    assert notified == [0, 1, 2]
+    stats = bus.get_stats()
+    assert stats["low_priority_processed"] == 3
+    assert stats["events_processed"] == 3
+
+
+def test_single_partition_is_default():
+    bus = OrderEventBus()
+    stats = bus.get_stats()
+    assert stats["partitions"] == 1
+    assert bus._queue is bus._queues[0]
+
+
+def test_discord_subscribers_use_low_priority_lane():
+    # Source check: core.discord needs the optional discord.py dependency.
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parents[2] / "core" / "discord"
+    for name in ("bridge.py", "integration.py"):
+        assert "low_priority=True" in (root / name).read_text(encoding="utf-8")
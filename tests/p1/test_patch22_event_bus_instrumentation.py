@@ -0,0 +1,171 @@
+"""
+P1 Patch 22 – Event bus instrumentation
+
+INVARIANT:
+    For every event the bus records how long it waited in the queue (per
+    event type) and how long each handler ran; queue depth high-water marks
+    and drops are tracked per lane, and a handler stuck past the slow
+    threshold has its live stack captured. All of it is visible in
+    get_stats()["instrumentation"].
+
+DESIGN:
+    - core/events/instrumentation.py: LatencyHistogram, BusInstrumentation.
+    - OrderEventBus(instrument=True, slow_handler_ms=...) + EventBusMonitor
+      thread for stack capture and periodic performance-stream logging.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from core.events.bus import Event, OrderEventBus
+from core.events.instrumentation import BusInstrumentation, LatencyHistogram
+
+
+@dataclass
+class _Evt(Event):
+    order_id: str = "o-1"
+
+    def to_dict(self):
+        return {"order_id": self.order_id}
+
+
+def _evt(oid="o-1"):
+    return _Evt(timestamp=datetime.now(timezone.utc), order_id=oid)
+
+
+class TestLatencyHistogram:
+
+    def test_buckets_and_percentiles(self):
+        h = LatencyHistogram(bounds_ms=(1, 10, 100))
+        for v in (0.5, 0.7, 5, 50, 500):
+            h.record(v)
+        d = h.to_dict()
+        assert d["count"] == 5
+        assert d["p50_ms"] == 10
+        assert d["p99_ms"] == 500  # open bucket reports the max
+        assert d["buckets"] == {"le_1": 2, "le_10": 1, "le_100": 1, "gt_max": 1}
+
+    def test_empty(self):
+        assert LatencyHistogram().to_dict()["p50_ms"] is None
+
+
+class TestBusInstrumentation:
+
+    def test_queue_wait_and_handler_latency(self):
+        now = [0.0]
+        instr = BusInstrumentation(clock=lambda: now[0])
+        instr.on_enqueue("default", 3)
+        instr.on_enqueue("default", 1)
+        now[0] = 0.002
+        instr.on_dequeue("FillEvent", 0.0)
+        started = instr.handler_started("h", "FillEvent")
+        now[0] = 0.010
+        instr.handler_finished("h", "FillEvent", started)
+
+        snap = instr.snapshot()
+        assert snap["queue_high_water"] == {"default": 3}
+        assert snap["queue_wait_ms"]["FillEvent"]["max_ms"] == 2.0
+        assert snap["handler_latency_ms"]["h"]["max_ms"] == 8.0
+        assert snap["handlers_in_flight"] == 0
+
+    def test_slow_handler_stack_captured_once(self):
+        instr = BusInstrumentation(slow_handler_ms=20)
+        release = threading.Event()
+
+        def stuck_in_here():
+            started = instr.handler_started("slow_handler", "FillEvent")
+            release.wait(5)
+            instr.handler_finished("slow_handler", "FillEvent", started)
+
+        t = threading.Thread(target=stuck_in_here)
+        t.start()
+        time.sleep(0.05)
+        reports = instr.check_slow_handlers()
+        assert instr.check_slow_handlers() == []
+        release.set()
+        t.join()
+
+        assert len(reports) == 1
+        assert "stuck_in_here" in reports[0]["stack"]
+        snap = instr.snapshot()
+        assert snap["slow_handler_count"] == 1
+        assert len(snap["slow_handlers"]) == 1  # no duplicate stack-less report
+
+    def test_slow_handler_without_capture_still_reported(self):
+        now = [0.0]
+        instr = BusInstrumentation(slow_handler_ms=5, clock=lambda: now[0])
+        started = instr.handler_started("h", "E")
+        now[0] = 1.0
+        instr.handler_finished("h", "E", started)
+        assert instr.snapshot()["slow_handlers"][0]["stack"] is None
+
+    def test_maybe_log_respects_interval(self):
+        now = [0.0]
+        instr = BusInstrumentation(log_interval_s=60, clock=lambda: now[0])
+        assert not instr.maybe_log()
+        now[0] = 61.0
+        assert instr.maybe_log()
+        assert instr.maybe_log(force=True)
+
+
+class TestBusIntegration:
+
+    def test_stats_expose_telemetry(self):
+        bus = OrderEventBus(daemon=True)
+        seen = []
+
+        def record_fill(e):
+            seen.append(e)
+
+        bus.subscribe(_Evt, record_fill)
+        bus.start()
+        try:
+            for i in range(5):
+                bus.emit(_evt(f"o-{i}"))
+            deadline = time.monotonic() + 2
+            while len(seen) < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            bus.stop(timeout=2)
+
+        instr = bus.get_stats()["instrumentation"]
+        assert instr["queue_wait_ms"]["_Evt"]["count"] == 5
+        (name,) = instr["handler_latency_ms"].keys()
+        assert name.endswith("record_fill")
+        assert instr["queue_high_water"]["default"] >= 1
+
+    def test_monitor_captures_stuck_handler(self):
+        bus = OrderEventBus(daemon=True, slow_handler_ms=20)
+        release = threading.Event()
+
+        def blocking_notifier(e):
+            release.wait(5)
+
+        bus.subscribe(_Evt, blocking_notifier)
+        bus.start()
+        try:
+            bus.emit(_evt())
+            deadline = time.monotonic() + 2
+            while not bus.get_stats()["instrumentation"]["slow_handlers"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            release.set()
+        finally:
+            bus.stop(timeout=2)
+        report = bus.get_stats()["instrumentation"]["slow_handlers"][0]
+        assert "blocking_notifier" in report["stack"]
+
+    def test_drops_counted_by_type(self):
+        bus = OrderEventBus(max_queue_size=1)
+        bus._running = True
+        bus.emit(_evt())
+        bus.emit(_evt())
+        stats = bus.get_stats()
+        assert stats["events_dropped"] == 1
+        assert stats["instrumentation"]["dropped_by_type"] == {"_Evt": 1}
+        bus._running = False
+
+    def test_instrumentation_can_be_disabled(self):
+        bus = OrderEventBus(instrument=False)
+        assert bus.get_stats()["instrumentation"] is None
@@ -0,0 +1,288 @@
+"""
+P1 Patch 23 – Asyncio-native event bus
+
+INVARIANT:
+    AsyncOrderEventBus offers the OrderEventBus contract on an asyncio loop:
+    per-lane FIFO dispatch, handler isolation, graceful drain on stop, and
+    emit() from any thread. EventBusBridge moves events between the async
+    and threaded buses without echoing them back.
+
+DESIGN:
+    - core/events/async_bus.py: AsyncOrderEventBus, EventBusBridge.
+    - Container.get_async_event_bus() (opt-in: the runtime does not create
+      or subscribe it); websocket fills are published inline on the loop
+      from _handle_trade_update while it runs.
+    - emit() reports whether the event was queued (async bus: on_drop for
+      off-loop emits); EventBusBridge clears its echo mark in a finally
+      when the target bus drops the event.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.events import AsyncOrderEventBus, EventBusBridge, OrderEventBus
+from core.events.bus import Event
+from core.events.types import OrderFilledEvent
+
+
+@dataclass
+class _Evt(Event):
+    seq: int = 0
+
+    def to_dict(self):
+        return {"seq": self.seq}
+
+
+def _evt(seq=0):
+    return _Evt(timestamp=datetime.now(timezone.utc), seq=seq)
+
+
+def test_fifo_dispatch_sync_and_async_handlers():
+    seen = []
+
+    async def main():
+        bus = AsyncOrderEventBus()
+        bus.subscribe(_Evt, lambda e: seen.append(("sync", e.seq)))
+
+        async def ahandler(e):
+            await asyncio.sleep(0)
+            seen.append(("async", e.seq))
+
+        bus.subscribe(_Evt, ahandler)
+        await bus.start()
+        for i in range(3):
+            bus.emit(_evt(i))
+        await bus.stop()
+        return bus.get_stats()
+
+    stats = asyncio.run(main())
+    assert seen == [(k, i) for i in range(3) for k in ("sync", "async")]
+    assert stats["events_processed"] == 3
+    assert stats["instrumentation"]["queue_wait_ms"]["_Evt"]["count"] == 3
+
+
+def test_handler_failure_isolated():
+    seen = []
+
+    async def main():
+        bus = AsyncOrderEventBus()
+
+        def boom(e):
+            raise ValueError("bad handler")
+
+        bus.subscribe(_Evt, boom)
+        bus.subscribe(_Evt, lambda e: seen.append(e.seq))
+        await bus.start()
+        bus.emit(_evt(1))
+        await bus.stop()
+        return bus.get_stats()
+
+    stats = asyncio.run(main())
+    assert seen == [1]
+    assert stats["events_failed"] == 1
+
+
+def test_publish_dispatches_inline_and_queues_low_priority():
+    order = []
+
+    async def main():
+        bus = AsyncOrderEventBus()
+        bus.subscribe(_Evt, lambda e: order.append("critical"))
+        bus.subscribe(_Evt, lambda e: order.append("notify"), low_priority=True)
+        await bus.start()
+        await bus.publish(_evt())
+        order.append("after_publish")
+        await bus.stop()
+        return bus.get_stats()
+
+    stats = asyncio.run(main())
+    assert order == ["critical", "after_publish", "notify"]
+    assert stats["published_inline"] == 1
+    assert stats["low_priority_processed"] == 1
+
+
+def test_emit_from_other_thread():
+    seen = []
+
+    async def main():
+        bus = AsyncOrderEventBus()
+        bus.subscribe(_Evt, lambda e: seen.append(threading.get_ident()))
+        await bus.start()
+        t = threading.Thread(target=lambda: [bus.emit(_evt(i)) for i in range(5)])
+        t.start()
+        t.join()
+        for _ in range(100):
+            if len(seen) == 5:
+                break
+            await asyncio.sleep(0.01)
+        await bus.stop()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert seen == [loop_thread] * 5
+
+
+def test_stop_drains_queue_and_lifecycle_errors():
+    seen = []
+
+    async def main():
+        bus = AsyncOrderEventBus()
+
+        async def slow(e):
+            await asyncio.sleep(0.01)
+            seen.append(e.seq)
+
+        bus.subscribe(_Evt, slow)
+        with pytest.raises(RuntimeError):
+            bus.emit(_evt())
+        async with bus:
+            for i in range(5):
+                bus.emit(_evt(i))
+            with pytest.raises(RuntimeError):
+                bus.subscribe(_Evt, slow)
+        assert not bus.is_running
+
+    asyncio.run(main())
+    assert seen == [0, 1, 2, 3, 4]
+
+
+def test_queue_full_drops_are_counted():
+    async def main():
+        bus = AsyncOrderEventBus(max_queue_size=1)
+        bus.subscribe(_Evt, lambda e: None)
+        await bus.start()
+        bus.emit(_evt(0))
+        bus.emit(_evt(1))  # consumer has not run yet: queue full
+        await bus.stop()
+        return bus.get_stats()
+
+    stats = asyncio.run(main())
+    assert stats["events_dropped"] == 1
+    assert stats["instrumentation"]["dropped_by_type"] == {"_Evt": 1}
+
+
+def test_bridge_both_directions_without_echo():
+    threaded = OrderEventBus(daemon=True)
+    threaded_seen, async_seen = [], []
+    threaded.subscribe(_Evt, lambda e: threaded_seen.append(e.seq))
+
+    async def main():
+        abus = AsyncOrderEventBus()
+        abus.subscribe(_Evt, lambda e: async_seen.append(e.seq))
+        bridge = EventBusBridge(abus, threaded)
+        bridge.forward_to_threaded(_Evt)
+        bridge.forward_to_async(_Evt)
+        await abus.start()
+        threaded.start()
+        try:
+            abus.emit(_evt(1))      # loop -> threads
+            threaded.emit(_evt(2))  # threads -> loop
+            for _ in range(200):
+                if sorted(threaded_seen) == [1, 2] and sorted(async_seen) == [1, 2]:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+        finally:
+            threaded.stop(timeout=2)
+            await abus.stop()
+        return bridge.get_stats()
+
+    stats = asyncio.run(main())
+    assert sorted(threaded_seen) == [1, 2]
+    assert sorted(async_seen) == [1, 2]
+    assert stats == {"forwarded_to_threaded": 1, "forwarded_to_async": 1, "in_transit": 0}
+
+
+def test_bridge_forgets_events_the_threaded_bus_drops():
+    threaded = MagicMock()
+
+    async def main():
+        abus = AsyncOrderEventBus()
+        bridge = EventBusBridge(abus, threaded)
+        bridge.forward_to_threaded(_Evt)
+        bridge.forward_to_async(_Evt)
+        await abus.start()
+        try:
+            threaded.emit.return_value = False  # queue full
+            abus.emit(_evt(1))
+            await asyncio.sleep(0.05)
+            threaded.emit.side_effect = RuntimeError("Event bus is not running")
+            abus.emit(_evt(2))
+            await asyncio.sleep(0.05)
+        finally:
+            await abus.stop()
+        return bridge.get_stats()
+
+    stats = asyncio.run(main())
+    assert threaded.emit.call_count == 2
+    assert stats == {"forwarded_to_threaded": 0, "forwarded_to_async": 0, "in_transit": 0}
+
+
+def test_bridge_forgets_events_the_async_bus_drops():
+    threaded = MagicMock()
+    seen = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def gate(e):
+            seen.append(e.seq)
+            if e.seq == 1:
+                await release.wait()
+
+        abus = AsyncOrderEventBus(max_queue_size=1)
+        abus.subscribe(_Evt, gate)
+        bridge = EventBusBridge(abus, threaded)
+        bridge.forward_to_threaded(_Evt)
+        bridge.forward_to_async(_Evt)
+        to_async = threaded.subscribe.call_args.args[1]
+        await abus.start()
+        try:
+            for seq in (1, 2, 3):  # 1 blocks the consumer, 2 fills the queue, 3 drops
+                t = threading.Thread(target=to_async, args=(_evt(seq),))
+                t.start()
+                t.join(2)
+                await asyncio.sleep(0.05)
+            release.set()
+            await asyncio.sleep(0.05)
+        finally:
+            await abus.stop()
+        return bridge.get_stats(), abus.get_stats()
+
+    stats, bus_stats = asyncio.run(main())
+    assert seen == [1, 2]
+    assert bus_stats["events_dropped"] == 1
+    assert stats["in_transit"] == 0
+    threaded.emit.assert_not_called()  # no echo back to the threaded bus
+
+
+def test_container_publishes_websocket_fill_on_loop():
+    from core.di.container import Container
+
+    container = Container()
+    container._order_tracker = MagicMock()
+    container._clock = MagicMock()
+    container._clock.now.return_value = datetime.now(timezone.utc)
+    fills = []
+
+    async def main():
+        abus = container.get_async_event_bus()
+        abus.subscribe(OrderFilledEvent, fills.append)
+        await container.start_async()
+        await container._handle_trade_update({
+            "event": "fill",
+            "order": {"client_order_id": "c-1", "id": "b-1", "symbol": "SPY",
+                      "filled_qty": "2", "filled_avg_price": "450.5"},
+        })
+        await container.stop_async()
+
+    asyncio.run(main())
+    assert len(fills) == 1
+    assert fills[0].order_id == "c-1"
+    assert str(fills[0].fill_price) == "450.5"
+    container._order_tracker.process_fill.assert_called_once()
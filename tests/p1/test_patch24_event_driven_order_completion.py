@@ -0,0 +1,178 @@
+"""
+P1 Patch 24 – Event-driven order completion
+
+INVARIANT:
+    wait_for_order() returns as soon as the user stream or the event bus
+    reports the order's terminal status, applying it through the same
+    status-change path as polling (positions/journal/OCO unchanged).
+    Broker polling is the fallback; it backs off exponentially only while a
+    push source is attached. A further partial fill (PARTIALLY_FILLED ->
+    PARTIALLY_FILLED, more filled) is booked from a push or a poll.
+
+DESIGN:
+    - core/execution/completion.py: OrderCompletionTracker resolves waiters
+      by internal, broker or client order id.
+    - OrderExecutionEngine.completions; Container feeds it from
+      _handle_trade_update and OrderStateChangedEvent subscriptions.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.brokers.alpaca_connector import BrokerOrderSide, map_alpaca_status
+from core.execution.completion import OrderCompletionTracker
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, OrderStatus, PositionStore
+
+
+def _fill_update(broker_id="B-1", client_id="C-1", status="filled", qty="10", price="100.5"):
+    return {
+        "event": "fill",
+        "order": {"id": broker_id, "client_order_id": client_id, "status": status,
+                  "filled_qty": qty, "filled_avg_price": price},
+    }
+
+
+class TestOrderCompletionTracker:
+
+    def test_resolves_by_broker_and_client_id(self):
+        tracker = OrderCompletionTracker()
+        w1 = tracker.register("I-1", "B-1")
+        w2 = tracker.register("I-2", client_order_id="C-2")
+
+        assert tracker.on_trade_update(_fill_update(broker_id="B-1", client_id="x"))
+        assert tracker.on_trade_update(_fill_update(broker_id="y", client_id="C-2", status="canceled"))
+        assert not tracker.on_trade_update(_fill_update(broker_id="nope", client_id="nope"))
+
+        h1 = w1.wait(0)
+        assert h1.status == OrderStatus.FILLED
+        assert h1.fill_info["filled_avg_price"] == Decimal("100.5")
+        assert w2.wait(0).status == OrderStatus.CANCELLED
+        assert w1.wait(0) is None  # hint consumed
+
+        tracker.unregister("I-1")
+        tracker.unregister("I-2")
+        assert tracker.get_stats() == {"waiting": 0, "notifications": 3, "resolved": 2}
+
+    def test_waiter_wakes_on_push(self):
+        tracker = OrderCompletionTracker()
+        waiter = tracker.register("I-1", "B-1")
+        threading.Timer(0.02, tracker.on_trade_update, args=(_fill_update(),)).start()
+        start = time.monotonic()
+        hint = waiter.wait(5)
+        assert hint is not None and hint.source == "user_stream"
+        assert time.monotonic() - start < 1
+
+    def test_on_state_changed(self):
+        tracker = OrderCompletionTracker()
+        waiter = tracker.register("I-1")
+        event = MagicMock(order_id="I-1", to_state=OrderStatus.FILLED, broker_order_id="B-1",
+                          filled_qty=Decimal("5"), fill_price=Decimal("10"))
+        assert tracker.on_state_changed(event)
+        hint = waiter.wait(0)
+        assert hint.source == "state_machine"
+        assert hint.fill_info == {"filled_qty": Decimal("5"), "filled_avg_price": Decimal("10")}
+
+    def test_status_map_shared_with_connector(self):
+        assert map_alpaca_status("partially_filled") == OrderStatus.PARTIALLY_FILLED
+        assert map_alpaca_status("unknown_status") == OrderStatus.SUBMITTED
+
+
+@pytest.fixture
+def engine_parts(tmp_path):
+    broker = MagicMock()
+    broker.submit_market_order.return_value = "B-1"
+    broker.get_order_status.return_value = (OrderStatus.SUBMITTED, None)
+    state_machine = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    position_store = PositionStore(db_path=str(tmp_path / "positions.db"))
+    engine = OrderExecutionEngine(broker=broker, state_machine=state_machine, position_store=position_store)
+    engine.submit_market_order(
+        internal_order_id="I-1", symbol="SPY", quantity=Decimal("10"),
+        side=BrokerOrderSide.BUY, strategy="test",
+    )
+    return broker, position_store, engine
+
+
+class TestWaitForOrder:
+
+    def test_stream_fill_completes_without_polling(self, engine_parts):
+        broker, position_store, engine = engine_parts
+        threading.Timer(0.05, engine.completions.on_trade_update, args=(_fill_update(),)).start()
+
+        start = time.monotonic()
+        final = engine.wait_for_order("I-1", "B-1", timeout_seconds=10, poll_interval=1.0)
+
+        assert final == OrderStatus.FILLED
+        assert time.monotonic() - start < 0.9
+        assert broker.get_order_status.call_count == 1  # the upfront poll only
+        pos = position_store.get("SPY")
+        assert pos.quantity == Decimal("10")
+        assert pos.entry_price == Decimal("100.5")
+        assert engine.completions.get_stats()["waiting"] == 0
+
+    def test_fill_without_price_falls_back_to_poll(self, engine_parts):
+        broker, position_store, engine = engine_parts
+        update = _fill_update(price=None)
+
+        def fill_then_push():
+            broker.get_order_status.return_value = (
+                OrderStatus.FILLED, {"filled_qty": Decimal("10"), "filled_avg_price": Decimal("99")}
+            )
+            engine.completions.on_trade_update(update)
+
+        threading.Timer(0.05, fill_then_push).start()
+        final = engine.wait_for_order("I-1", "B-1", timeout_seconds=10, poll_interval=1.0)
+
+        assert final == OrderStatus.FILLED
+        assert broker.get_order_status.call_count == 2
+        assert position_store.get("SPY").entry_price == Decimal("99")
+
+    def test_fallback_polls_back_off_only_with_a_push_source(self, engine_parts):
+        broker, _, engine = engine_parts
+        engine.completions.attach_source("user_stream")
+        final = engine.wait_for_order(
+            "I-1", "B-1", timeout_seconds=0.5, poll_interval=0.02, max_poll_interval=0.16,
+        )
+        # polls at ~0, .02, .06, .14, .30, .46 instead of 25 fixed-interval polls
+        assert final == OrderStatus.SUBMITTED
+        assert 4 <= broker.get_order_status.call_count <= 8
+
+        # Nothing pushes fills (app.run): polling is the only signal, keep it fixed.
+        engine.completions.detach_source("user_stream")
+        broker.get_order_status.reset_mock()
+        engine.wait_for_order("I-1", "B-1", timeout_seconds=0.5, poll_interval=0.05, max_poll_interval=0.4)
+        assert broker.get_order_status.call_count >= 8
+
+    def test_partial_fill_progress_is_booked(self, engine_parts):
+        broker, position_store, engine = engine_parts
+        seen = []
+
+        def poll(_broker_id):
+            qty = ["4", "9", "9"][min(len(seen), 2)]
+            pos = position_store.get("SPY")
+            seen.append(pos.quantity if pos else Decimal("0"))
+            return OrderStatus.PARTIALLY_FILLED, {"filled_qty": Decimal(qty), "filled_avg_price": Decimal("100")}
+
+        broker.get_order_status.side_effect = poll
+        # poll 4 -> pushed 7 -> poll 9, all PARTIALLY_FILLED
+        threading.Timer(0.05, engine.completions.on_trade_update,
+                        args=(_fill_update(status="partially_filled", qty="7", price="100"),)).start()
+        final = engine.wait_for_order("I-1", "B-1", timeout_seconds=0.3, poll_interval=0.2)
+
+        assert final == OrderStatus.PARTIALLY_FILLED
+        assert seen[:2] == [Decimal("0"), Decimal("7")]
+        assert position_store.get("SPY").quantity == Decimal("9")
+
+
+
+def test_container_wires_completion_sources():
+    import inspect
+    from core.di import container as container_mod
+
+    src = inspect.getsource(container_mod.Container)
+    assert "completions.on_trade_update(update)" in src
+    assert "OrderStateChangedEvent, self._execution_engine.completions.on_state_changed" in src
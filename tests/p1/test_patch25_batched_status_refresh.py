@@ -0,0 +1,163 @@
+"""
+P1 Patch 25 – Batched order-status refresh
+
+INVARIANT:
+    Refreshing N working orders costs one broker.get_orders() call, not N
+    get_order_status() calls. Every changed order is applied in the same
+    pass through the engine's status-change path (or handed to the
+    wait_for_order() waiter that owns it), and orders absent from the
+    response are left untouched.
+
+DESIGN:
+    - core/execution/status_refresher.py: BatchedOrderStatusRefresher.
+    - get_orders(status="all", after=oldest working order - slack).
+    - Wired into the runtime loop (MQD_BATCH_STATUS_REFRESH, MQD_STATUS_REFRESH_S).
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.brokers.alpaca_connector import BrokerOrderSide
+from core.execution.engine import OrderExecutionEngine
+from core.execution.status_refresher import BatchedOrderStatusRefresher
+from core.state import OrderStateMachine, OrderStatus, PositionStore
+
+
+def _bo(bid, status, cid=None, qty=None, price=None):
+    return SimpleNamespace(
+        id=bid, client_order_id=cid, status=SimpleNamespace(value=status),
+        filled_qty=qty, filled_avg_price=price, filled_at=None,
+    )
+
+
+def _working(engine):
+    return {w.internal_order_id: w.state for w in engine.get_working_orders()}
+
+
+@pytest.fixture
+def parts(tmp_path):
+    broker = MagicMock()
+    ids = iter(f"B-{i}" for i in range(100))
+    broker.submit_market_order.side_effect = lambda **kw: next(ids)
+    broker.get_orders.return_value = []
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    store = PositionStore(db_path=str(tmp_path / "positions.db"))
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm, position_store=store)
+    for i, sym in enumerate(("SPY", "QQQ", "IWM")):
+        engine.submit_market_order(
+            internal_order_id=f"I-{i}", symbol=sym, quantity=Decimal("10"),
+            side=BrokerOrderSide.BUY, strategy="test",
+        )
+    return broker, sm, store, engine
+
+
+def test_one_call_applies_all_changes(parts):
+    broker, sm, store, engine = parts
+    broker.get_orders.return_value = [
+        _bo("B-0", "filled", qty="10", price="450"),
+        _bo("B-1", "canceled"),
+        _bo("B-2", "new"),
+        _bo("B-99", "filled", qty="1", price="1"),  # not ours
+    ]
+    refresher = BatchedOrderStatusRefresher(broker, engine)
+
+    report = refresher.refresh()
+
+    assert broker.get_orders.call_count == 1
+    broker.get_order_status.assert_not_called()
+    kwargs = broker.get_orders.call_args.kwargs
+    assert kwargs["status"] == "all"
+    assert kwargs["after"] < datetime.now(timezone.utc)
+    assert {t["internal_order_id"]: t["to_state"] for t in report.transitions} == {
+        "I-0": "FILLED", "I-1": "CANCELLED",
+    }
+    assert _working(engine) == {"I-2": OrderStatus.SUBMITTED}
+    assert store.get("SPY").entry_price == Decimal("450")
+
+
+def test_missing_orders_left_alone_and_no_call_without_working(parts):
+    broker, sm, _, engine = parts
+    broker.get_orders.return_value = [_bo("B-0", "canceled")]
+    refresher = BatchedOrderStatusRefresher(broker, engine)
+    report = refresher.refresh()
+    assert sorted(report.missing) == ["I-1", "I-2"]
+    assert _working(engine) == {"I-1": OrderStatus.SUBMITTED, "I-2": OrderStatus.SUBMITTED}
+
+    broker.get_orders.return_value = [_bo("B-1", "canceled"), _bo("B-2", "canceled")]
+    refresher.refresh()
+    broker.get_orders.reset_mock()
+    assert refresher.refresh().working == 0
+    broker.get_orders.assert_not_called()
+
+
+def test_matches_by_client_order_id(parts):
+    broker, sm, _, engine = parts
+    broker.get_orders.return_value = [_bo("other", "canceled", cid="I-2")]
+    BatchedOrderStatusRefresher(broker, engine).refresh()
+    assert "I-2" not in _working(engine)
+
+
+def test_state_machine_state_wins(parts):
+    broker, sm, _, engine = parts
+    sm.create_order("I-9", "TLT", Decimal("5"), "BUY", "MARKET", "test")
+    engine.submit_market_order(
+        internal_order_id="I-9", symbol="TLT", quantity=Decimal("5"),
+        side=BrokerOrderSide.BUY, strategy="test",
+    )
+    sm.transition("I-9", OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED, broker_order_id="B-3",
+                  filled_qty=Decimal("2"), fill_price=Decimal("90"))
+    broker.get_orders.return_value = [_bo("B-3", "filled", qty="5", price="90")]
+
+    report = BatchedOrderStatusRefresher(broker, engine).refresh()
+
+    (t,) = [t for t in report.transitions if t["internal_order_id"] == "I-9"]
+    assert t["from_state"] == "PARTIALLY_FILLED"
+    assert sm.get_order("I-9").state == OrderStatus.FILLED
+
+
+def test_waiting_order_is_handed_to_its_waiter(parts):
+    broker, sm, store, engine = parts
+    broker.get_order_status.return_value = (OrderStatus.SUBMITTED, None)
+    broker.get_orders.return_value = [_bo("B-0", "filled", qty="10", price="451")]
+    refresher = BatchedOrderStatusRefresher(broker, engine)
+
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault(
+        "status", engine.wait_for_order("I-0", "B-0", timeout_seconds=10, poll_interval=5.0)))
+    t.start()
+    while engine.completions.get_stats()["waiting"] == 0:
+        time.sleep(0.001)
+    report = refresher.refresh()
+    t.join(5)
+
+    assert report.transitions[0]["internal_order_id"] == "I-0"
+    assert result["status"] == OrderStatus.FILLED
+    assert store.get("SPY").quantity == Decimal("10")  # applied exactly once
+
+
+def test_maybe_refresh_interval_and_error_fail_open(parts):
+    broker, _, _, engine = parts
+    now = [0.0]
+    refresher = BatchedOrderStatusRefresher(broker, engine, interval_s=5, monotonic=lambda: now[0])
+    broker.get_orders.side_effect = RuntimeError("503")
+    assert refresher.maybe_refresh().error == "503"
+    assert refresher.maybe_refresh() is None
+    now[0] = 5.0
+    broker.get_orders.side_effect = None
+    assert refresher.maybe_refresh().error is None
+    assert refresher.get_stats() == {"refreshes": 2, "requests": 2, "transitions": 0, "errors": 1}
+
+
+def test_runtime_loop_wires_refresher():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app)
+    assert "BatchedOrderStatusRefresher(" in src
+    assert "_status_refresher.maybe_refresh()" in src
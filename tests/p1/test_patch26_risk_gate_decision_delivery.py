@@ -0,0 +1,97 @@
+"""
+P1 Patch 26 – Risk gate decision delivery
+
+INVARIANT:
+    A caller of PreTradeRiskGate.submit_order() wakes as soon as the worker
+    decides (no 100 ms polling floor). submit_batch() evaluates a cycle's
+    requests in one pass against one exposure snapshot, counting earlier
+    approvals against later requests. Timeouts and stop() still fail closed.
+
+DESIGN:
+    - Each queued _GateJob carries a concurrent.futures.Future.
+    - evaluate_batch() runs under the gate lock with a shared _ExposureSnapshot.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.risk.gate import OrderRequest, PreTradeRiskGate
+
+
+def _req(oid, symbol="SPY", qty=1, price="100"):
+    return OrderRequest(
+        order_id=oid, symbol=symbol, quantity=qty, side="LONG",
+        order_type="MARKET", strategy="t", current_price=Decimal(price),
+    )
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    monkeypatch.setenv("MQD_ENABLE_ASYNC_RISK_GATE", "1")
+    limits = MagicMock()
+    limits.is_daily_loss_limit_breached.return_value = False
+    limits.is_position_size_allowed.return_value = True
+    limits.is_notional_exposure_allowed.side_effect = lambda cur, new: cur + new <= Decimal("250")
+    sizer = MagicMock()
+    sizer.validate_position_size.return_value = (True, None)
+    g = PreTradeRiskGate(limits, sizer, Decimal("1000"), enable_pdt_protection=False)
+    g.start()
+    yield g
+    g.stop()
+
+
+def test_single_decision_has_no_polling_floor(gate):
+    gate.submit_order(_req("warmup", price="1"))
+    start = time.perf_counter()
+    for i in range(20):
+        assert gate.submit_order(_req(f"o-{i}", price="1")).approved
+    per_order = (time.perf_counter() - start) / 20
+    assert per_order < 0.02  # polling delivered every 100 ms
+
+
+def test_batch_uses_one_snapshot_and_counts_earlier_approvals(gate):
+    gate.update_position("QQQ", Decimal("50"))
+    decisions = gate.submit_batch([_req("a"), _req("b"), _req("c")])
+
+    assert [d.order_id for d in decisions] == ["a", "b", "c"]
+    assert [d.approved for d in decisions] == [True, True, False]  # 50+100+100, then 350 > 250
+    assert "Notional exposure" in decisions[2].rejection_reason
+    assert gate.limits_tracker.is_daily_loss_limit_breached.call_count == 1
+    stats = gate.get_stats()
+    assert stats["batches_evaluated"] == 1
+    assert stats["decisions_made"] == 3
+
+
+def test_duplicates_within_batch_rejected(gate):
+    decisions = gate.submit_batch([_req("dup", price="1"), _req("dup", price="1")])
+    assert [d.approved for d in decisions] == [True, False]
+
+
+def test_timeout_fails_closed_and_job_never_evaluated(gate):
+    release = threading.Event()
+    gate.position_sizer.validate_position_size.side_effect = lambda **kw: (release.wait(5), None)
+    blocker = threading.Thread(target=gate.submit_order, args=(_req("slow", price="1"),))
+    blocker.start()
+    time.sleep(0.05)
+
+    decision = gate.submit_order(_req("late", price="1"), timeout=0.05)
+    release.set()
+    blocker.join(5)
+    time.sleep(0.05)
+
+    assert not decision.approved
+    assert "timeout" in decision.rejection_reason
+    assert "late" not in gate._submitted_orders_today
+
+
+def test_not_running_fails_closed(monkeypatch):
+    monkeypatch.delenv("MQD_ENABLE_ASYNC_RISK_GATE", raising=False)
+    g = PreTradeRiskGate(MagicMock(), MagicMock(), Decimal("1000"))
+    g.start()
+    assert not g.submit_order(_req("x")).approved
+    assert [d.approved for d in g.submit_batch([_req("y"), _req("z")])] == [False, False]
+    assert g.submit_batch([]) == []
@@ -0,0 +1,127 @@
+"""
+P1 Patch 27 – Secondary order indexes
+
+INVARIANT:
+    OrderStateMachine symbol/state/pending/broker-id queries and OrderTracker
+    per-symbol, orphan and shadow queries return the same answers as a full
+    scan, but from indexes kept in step with every create, transition,
+    restore, start/stop tracking and exchange-id update.
+
+DESIGN:
+    - OrderStateMachine: _by_symbol, _by_state, _by_broker_id
+      (+ get_order_by_broker_id).
+    - OrderTracker: _in_flight_by_symbol (+ get_open_orders_for_symbol);
+      orphan/shadow detection probes the exchange-id map.
+    - get_open_orders_for_symbol() makes app's single-trade guard fallback
+      live (app._open_orders_for_symbol): an entry is blocked while any
+      tracked in-flight order for the symbol exists.
+"""
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from core.state import OrderStateMachine, OrderStatus
+from core.state.order_tracker import InFlightOrder, OrderSide, OrderTracker
+
+
+def _machine():
+    return OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+
+
+def _submit(m, oid, symbol, broker_id):
+    m.create_order(oid, symbol, Decimal("1"), "BUY", "MARKET", "t")
+    m.transition(oid, OrderStatus.PENDING, OrderStatus.SUBMITTED, broker_order_id=broker_id)
+
+
+def _scan(m, pred):
+    return sorted(o.order_id for o in m.get_all_orders() if pred(o))
+
+
+class TestOrderStateMachineIndexes:
+
+    def test_queries_match_full_scan_through_lifecycle(self):
+        m = _machine()
+        for i in range(6):
+            _submit(m, f"O-{i}", "SPY" if i % 2 else "QQQ", f"B-{i}")
+        m.create_order("O-new", "SPY", Decimal("1"), "BUY", "MARKET", "t")
+        m.transition("O-0", OrderStatus.SUBMITTED, OrderStatus.FILLED, broker_order_id="B-0",
+                     filled_qty=Decimal("1"), fill_price=Decimal("10"))
+        m.transition("O-1", OrderStatus.SUBMITTED, OrderStatus.CANCELLED, broker_order_id="B-1")
+        m.transition("O-2", OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED, broker_order_id="B-2",
+                     filled_qty=Decimal("1"), fill_price=Decimal("10"))
+
+        ids = lambda orders: sorted(o.order_id for o in orders)
+        assert ids(m.get_pending_orders()) == _scan(m, lambda o: o.is_active)
+        assert ids(m.get_orders_by_symbol("SPY")) == _scan(m, lambda o: o.symbol == "SPY")
+        for state in OrderStatus:
+            assert ids(m.get_orders_by_state(state)) == _scan(m, lambda o: o.state == state)
+        assert m.get_order_by_broker_id("B-2").order_id == "O-2"
+        assert m.get_order_by_broker_id("nope") is None
+        assert OrderStatus.SUBMITTED in m._by_state
+        assert m.get_orders_by_state(OrderStatus.EXPIRED) == []
+
+    def test_restored_orders_are_indexed(self):
+        log = MagicMock()
+        log.iter_events.return_value = [
+            {"order_id": "R-1", "symbol": "IWM", "to_state": "SUBMITTED", "broker_order_id": "BR-1"},
+        ]
+        m = _machine()
+        assert m.restore_pending_orders(log) == 1
+        assert [o.order_id for o in m.get_orders_by_symbol("IWM")] == ["R-1"]
+        assert [o.order_id for o in m.get_pending_orders()] == ["R-1"]
+        assert m.get_order_by_broker_id("BR-1").order_id == "R-1"
+
+
+def _flight(cid, symbol, ex_id=None):
+    return InFlightOrder(client_order_id=cid, symbol=symbol, quantity=Decimal("1"),
+                         side=OrderSide.BUY, exchange_order_id=ex_id)
+
+
+class TestOrderTrackerIndexes:
+
+    def test_symbol_index_follows_tracking(self):
+        t = OrderTracker()
+        t.start_tracking(_flight("c1", "SPY", "e1"))
+        t.start_tracking(_flight("c2", "SPY", "e2"))
+        t.start_tracking(_flight("c3", "QQQ", "e3"))
+        t.stop_tracking("c1", "cancelled")
+        t.process_order_update("c3", {"status": "FILLED"})
+
+        assert [o.client_order_id for o in t.get_open_orders_for_symbol("SPY")] == ["c2"]
+        assert t.get_open_orders_for_symbol("QQQ") == []
+        assert t.get_stats()["in_flight_symbols"] == {"SPY": 1}
+
+    def test_orphans_and_shadows(self):
+        t = OrderTracker()
+        t.start_tracking(_flight("c1", "SPY", "e1"))
+        t.start_tracking(_flight("c2", "SPY", "e2"))
+        t.process_order_update("c2", {"exchange_order_id": "e2b"})
+
+        broker = {"e1": {}, "x9": {}}
+        assert t.get_orphaned_orders(broker) == ["x9"]
+        assert t.get_shadow_orders(broker) == ["c2"]  # stale "e2" mapping dropped
+        assert t.get_in_flight_order_by_exchange_id("e2") is None
+
+
+def test_single_trade_guard_sees_tracked_orders():
+    from types import SimpleNamespace
+
+    from core.runtime.app import _open_orders_for_symbol
+
+    t = OrderTracker()
+    container = SimpleNamespace(get_order_tracker=lambda: t)
+    engine = SimpleNamespace()  # no get_open_orders: the guard falls back to the tracker index
+    assert _open_orders_for_symbol(engine, container, "SPY") == []
+
+    t.start_tracking(_flight("stop-1", "SPY", "e1"))  # e.g. a protective leg
+    assert [o.client_order_id for o in _open_orders_for_symbol(engine, container, "SPY")] == ["stop-1"]
+    assert _open_orders_for_symbol(engine, container, "QQQ") == []
+    t.stop_tracking("stop-1", "cancelled")
+    assert _open_orders_for_symbol(engine, container, "SPY") == []
+
+
+def test_app_single_trade_guard_uses_the_helper():
+    import inspect
+    from core.runtime import app
+
+    assert "_open_orders_for_symbol(exec_engine, container, sig_symbol)" in inspect.getsource(app.run)
@@ -0,0 +1,109 @@
+"""
+P1 Patch 28 – Terminal-order archival
+
+INVARIANT:
+    Terminal orders older than the grace period (beyond the most recent
+    keep window) leave OrderStateMachine memory and its indexes, yet
+    get_order()/get_order_by_broker_id() still return them, losslessly,
+    from the SQLite cold store. Live orders are never archived.
+
+DESIGN:
+    - core/state/order_archive.py: OrderArchive (one row per order, JSON payload).
+    - OrderStateMachine(archive=..., archive_grace_s=..., archive_keep_recent=...)
+      .archive_terminal_orders(); the runtime loop runs it as an auxiliary task.
+    - create_order() on an archived id returns the archived order (never a new
+      PENDING one); Container.stop() closes the archive.
+"""
+
+import sqlite3
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.state import OrderArchive, OrderStateMachine, OrderStatus
+
+
+def _machine(tmp_path, **kw):
+    archive = OrderArchive(tmp_path / "orders_archive.db")
+    m = OrderStateMachine(MagicMock(), MagicMock(), archive=archive, **kw)
+    return m, archive
+
+
+def _fill(m, oid, symbol="SPY"):
+    m.create_order(oid, symbol, Decimal("10"), "BUY", "LIMIT", "t", entry_price=Decimal("1.5"))
+    m.transition(oid, OrderStatus.PENDING, OrderStatus.SUBMITTED, broker_order_id=f"B-{oid}")
+    m.transition(oid, OrderStatus.SUBMITTED, OrderStatus.FILLED, broker_order_id=f"B-{oid}",
+                 filled_qty=Decimal("10"), fill_price=Decimal("1.25"))
+
+
+def test_archives_old_terminal_orders_and_keeps_live_ones(tmp_path):
+    m, archive = _machine(tmp_path, archive_grace_s=0, archive_keep_recent=2)
+    for i in range(5):
+        _fill(m, f"F-{i}")
+    m.create_order("LIVE", "SPY", Decimal("1"), "BUY", "MARKET", "t")
+    m.transition("LIVE", OrderStatus.PENDING, OrderStatus.SUBMITTED, broker_order_id="B-LIVE")
+
+    assert m.archive_terminal_orders() == 3
+    assert archive.count() == 3
+    in_memory = {o.order_id for o in m.get_all_orders()}
+    assert in_memory == {"F-3", "F-4", "LIVE"}
+    assert {o.order_id for o in m.get_orders_by_symbol("SPY")} == in_memory
+    assert [o.order_id for o in m.get_orders_by_state(OrderStatus.FILLED)] == ["F-3", "F-4"]
+    assert m.get_archive_stats()["archived"] == 3
+    assert m.archive_terminal_orders() == 0  # nothing new past the window
+
+
+def test_lazy_lookup_round_trips(tmp_path):
+    m, _ = _machine(tmp_path, archive_grace_s=0, archive_keep_recent=0)
+    _fill(m, "F-0")
+    before = m.get_order("F-0").to_dict()
+    submitted_at = m.get_order("F-0").submitted_at
+    m.archive_terminal_orders()
+
+    order = m.get_order("F-0")
+    assert order.to_dict() == before
+    assert order.state == OrderStatus.FILLED
+    assert order.filled_price == Decimal("1.25")
+    assert order.entry_price == Decimal("1.5")
+    assert order.submitted_at == submitted_at
+    assert m.get_order_by_broker_id("B-F-0").order_id == "F-0"
+    assert m.get_order("missing") is None
+
+
+def test_grace_period_respected(tmp_path):
+    m, _ = _machine(tmp_path, archive_grace_s=60, archive_keep_recent=0)
+    _fill(m, "F-0")
+    assert m.archive_terminal_orders() == 0
+    t_fill = m._terminal_at["F-0"]
+    assert m.archive_terminal_orders(now=t_fill + 61) == 1
+
+
+def test_no_archive_configured_is_noop():
+    m = OrderStateMachine(MagicMock(), MagicMock())
+    m.create_order("X", "SPY", Decimal("1"), "BUY", "MARKET", "t")
+    assert m.archive_terminal_orders() == 0
+    assert m.get_archive_stats()["archive_enabled"] is False
+
+
+def test_create_order_with_archived_id_is_idempotent(tmp_path):
+    m, archive = _machine(tmp_path, archive_grace_s=0, archive_keep_recent=0)
+    _fill(m, "F-0")
+    m.archive_terminal_orders()
+
+    again = m.create_order("F-0", "SPY", Decimal("10"), "BUY", "LIMIT", "t")
+    assert again.state == OrderStatus.FILLED  # not recreated as PENDING
+    assert m.get_all_orders() == [] and archive.count() == 1
+    m.transaction_log.append.reset_mock()
+    m.create_order("F-0", "SPY", Decimal("10"), "BUY", "LIMIT", "t")
+    m.transaction_log.append.assert_not_called()
+
+
+def test_container_stop_closes_archive(tmp_path):
+    from core.di.container import Container
+
+    c = Container()
+    c._order_archive = OrderArchive(tmp_path / "orders_archive.db")
+    c.stop()
+    with pytest.raises(sqlite3.ProgrammingError):
+        c._order_archive.count()
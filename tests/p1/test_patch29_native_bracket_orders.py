@@ -0,0 +1,229 @@
+"""
+P1 Patch 29 – Native bracket submission
+
+INVARIANT:
+    A BUY entry with both stop_loss and take_profit is submitted as ONE
+    broker request when the broker declares bracket support. The child legs
+    are tracked under the deterministic "{entry}::SL" / "{entry}::TP" ids
+    (state machine, journal, id map, working set) from the moment the entry
+    is accepted, so the entry fill never triggers separate protective
+    submits. Unsupported brokers, a disabled flag or a refused bracket fall
+    back to the synthetic path.
+
+DESIGN:
+    - AlpacaBrokerConnector.submit_bracket_order() -> BracketOrderIds
+      (legs resolved from order.legs by order type).
+    - OrderExecutionEngine._submit_native_bracket(); gated by
+      broker.supports_bracket_orders and MQD_NATIVE_BRACKETS. A submit error
+      is looked up by client_order_id (get_bracket_order_by_client_id) before
+      falling back; an unknown outcome raises instead of resubmitting.
+    - An entry that ends part-filled gets its full-size legs cancelled and
+      the filled quantity re-protected with synthetic "{entry}-R" legs.
+    - app.run skips its protective STOP SELL for native bracket entries
+      (engine.native_bracket_legs()).
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.brokers.alpaca_connector import (
+    AlpacaBrokerConnector,
+    BracketOrderIds,
+    BrokerOrderSide,
+)
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, OrderStatus, PositionStore
+
+
+def _engine(tmp_path, broker):
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    store = PositionStore(db_path=str(tmp_path / "positions.db"))
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm, position_store=store)
+    engine.trade_journal = MagicMock()
+    return engine, sm
+
+
+def _bracket_broker():
+    broker = MagicMock()
+    broker.supports_bracket_orders = True
+    broker.submit_bracket_order.return_value = BracketOrderIds("B-E", "B-SL", "B-TP")
+    return broker
+
+
+def _buy(engine):
+    return engine.submit_market_order(
+        internal_order_id="E-1", symbol="SPY", quantity=Decimal("10"),
+        side=BrokerOrderSide.BUY, strategy="s",
+        stop_loss=Decimal("95"), take_profit=Decimal("110"),
+    )
+
+
+def test_one_request_and_legs_mapped(tmp_path):
+    broker = _bracket_broker()
+    engine, sm = _engine(tmp_path, broker)
+
+    assert _buy(engine) == "B-E"
+
+    broker.submit_bracket_order.assert_called_once()
+    broker.submit_market_order.assert_not_called()
+    broker.submit_stop_order.assert_not_called()
+    assert engine._internal_to_broker_id == {"E-1": "B-E", "E-1::SL": "B-SL", "E-1::TP": "B-TP"}
+    assert {w.internal_order_id for w in engine.get_working_orders()} == {"E-1", "E-1::SL", "E-1::TP"}
+    assert sm.get_order_by_broker_id("B-SL").order_id == "E-1::SL"
+    assert sm.get_order("E-1::TP").state == OrderStatus.SUBMITTED
+    assert engine._order_metadata["E-1::SL"]["oco_sibling_internal_id"] == "E-1::TP"
+
+    submits = [c.args[0] for c in engine.trade_journal.emit.call_args_list
+               if c.args[0]["event_type"] == "ORDER_SUBMIT"]
+    assert [e["internal_order_id"] for e in submits] == ["E-1", "E-1::SL", "E-1::TP"]
+    assert len({e["trade_id"] for e in submits}) == 1
+
+
+def test_entry_fill_and_leg_fill_leave_protection_to_broker(tmp_path):
+    broker = _bracket_broker()
+    engine, _ = _engine(tmp_path, broker)
+    _buy(engine)
+
+    engine._handle_status_change("E-1", "B-E", OrderStatus.SUBMITTED, OrderStatus.FILLED,
+                                 {"filled_qty": Decimal("10"), "filled_avg_price": Decimal("100")})
+    engine._handle_status_change("E-1::TP", "B-TP", OrderStatus.SUBMITTED, OrderStatus.FILLED,
+                                 {"filled_qty": Decimal("10"), "filled_avg_price": Decimal("110")})
+
+    broker.submit_stop_order.assert_not_called()
+    broker.submit_limit_order.assert_not_called()
+    broker.cancel_order.assert_not_called()  # broker-side OCO cancels the SL
+    assert engine.position_store.get("SPY") is None
+
+
+@pytest.mark.parametrize("setup", ["unsupported", "flag_off", "refused", "one_leg"])
+def test_falls_back_to_synthetic(tmp_path, monkeypatch, setup):
+    broker = _bracket_broker()
+    broker.submit_market_order.return_value = "B-PLAIN"
+    if setup == "unsupported":
+        broker = MagicMock()  # no explicit supports_bracket_orders=True
+        broker.submit_market_order.return_value = "B-PLAIN"
+    elif setup == "flag_off":
+        monkeypatch.setenv("MQD_NATIVE_BRACKETS", "0")
+    elif setup == "refused":
+        broker.submit_bracket_order.side_effect = RuntimeError("422 bracket not allowed")
+        broker.get_bracket_order_by_client_id.return_value = None  # never accepted
+    engine, _ = _engine(tmp_path, broker)
+
+    if setup == "one_leg":
+        engine.submit_market_order(
+            internal_order_id="E-1", symbol="SPY", quantity=Decimal("10"),
+            side=BrokerOrderSide.BUY, strategy="s", stop_loss=Decimal("95"),
+        )
+    else:
+        _buy(engine)
+
+    broker.submit_market_order.assert_called_once()
+    assert engine._internal_to_broker_id == {"E-1": "B-PLAIN"}
+    assert not engine._order_metadata["E-1"].get("native_bracket")
+    assert engine.native_bracket_legs("E-1") is None
+
+
+def test_failed_response_is_looked_up_before_falling_back(tmp_path):
+    broker = _bracket_broker()
+    broker.submit_bracket_order.side_effect = TimeoutError("read timed out")
+    broker.get_bracket_order_by_client_id.return_value = BracketOrderIds("B-E", "B-SL", "B-TP")
+    engine, _ = _engine(tmp_path, broker)
+
+    assert _buy(engine) == "B-E"  # accepted despite the error: tracked, not resubmitted
+    broker.get_bracket_order_by_client_id.assert_called_once_with("E-1")
+    broker.submit_market_order.assert_not_called()
+    assert engine.native_bracket_legs("E-1") == BracketOrderIds("B-E", "B-SL", "B-TP")
+
+    broker = _bracket_broker()
+    broker.submit_bracket_order.side_effect = TimeoutError("read timed out")
+    broker.get_bracket_order_by_client_id.side_effect = ConnectionError("down")
+    engine, _ = _engine(tmp_path, broker)
+    with pytest.raises(Exception):
+        _buy(engine)
+    broker.submit_market_order.assert_not_called()  # outcome unknown: never reuse the id
+
+
+def test_partial_entry_reprotects_filled_quantity(tmp_path):
+    broker = _bracket_broker()
+    broker.cancel_order.return_value = True
+    broker.submit_stop_order.return_value = "B-SL2"
+    broker.submit_limit_order.return_value = "B-TP2"
+    engine, sm = _engine(tmp_path, broker)
+    sm.create_order("E-1", "SPY", Decimal("10"), "BUY", "MARKET", "s")
+    _buy(engine)
+
+    engine._handle_status_change("E-1", "B-E", OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED,
+                                 {"filled_qty": Decimal("4"), "filled_avg_price": Decimal("100")})
+    broker.cancel_order.assert_not_called()
+    engine._handle_status_change("E-1", "B-E", OrderStatus.PARTIALLY_FILLED, OrderStatus.CANCELLED, None)
+
+    assert sorted(c.args[0] for c in broker.cancel_order.call_args_list) == ["B-SL", "B-TP"]
+    assert broker.submit_stop_order.call_args.kwargs["quantity"] == Decimal("4")
+    assert broker.submit_limit_order.call_args.kwargs["quantity"] == Decimal("4")
+    assert engine._internal_to_broker_id["E-1-R::SL"] == "B-SL2"
+    assert engine.native_bracket_legs("E-1") is None
+
+
+def test_partial_entry_with_an_uncancellable_leg_is_not_reprotected(tmp_path):
+    broker = _bracket_broker()
+    broker.cancel_order.side_effect = lambda bid: bid != "B-SL"  # SL already triggered
+    engine, _ = _engine(tmp_path, broker)
+    _buy(engine)
+    engine._handle_status_change("E-1", "B-E", OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED,
+                                 {"filled_qty": Decimal("4"), "filled_avg_price": Decimal("100")})
+    engine._handle_status_change("E-1", "B-E", OrderStatus.PARTIALLY_FILLED, OrderStatus.CANCELLED, None)
+
+    broker.submit_stop_order.assert_not_called()
+    broker.submit_limit_order.assert_not_called()
+
+
+def test_app_skips_synthetic_stop_for_native_brackets():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app.run)
+    assert "exec_engine.native_bracket_legs(internal_id)" in src
+
+
+def test_connector_builds_bracket_and_resolves_legs(monkeypatch):
+    monkeypatch.delenv("MQD_SMOKE_NO_ORDERS", raising=False)
+    conn = AlpacaBrokerConnector.__new__(AlpacaBrokerConnector)
+    conn.logger = MagicMock()
+    conn._retry_api_call = lambda fn, **_: fn()
+    legs = [
+        SimpleNamespace(id="L-TP", order_type=SimpleNamespace(value="limit")),
+        SimpleNamespace(id="L-SL", order_type=SimpleNamespace(value="stop")),
+    ]
+    conn.client = MagicMock()
+    conn.client.submit_order.return_value = SimpleNamespace(id="P-1", status="accepted", legs=legs)
+
+    ids = conn.submit_bracket_order("SPY", Decimal("5"), BrokerOrderSide.BUY, "E-1",
+                                    stop_loss=Decimal("95"), take_profit=Decimal("110"),
+                                    limit_price=Decimal("100"))
+
+    assert ids == BracketOrderIds("P-1", "L-SL", "L-TP")
+    request = conn.client.submit_order.call_args.args[0]
+    assert request.order_class.value == "bracket"
+    assert request.client_order_id == "E-1"
+    assert request.stop_loss.stop_price == 95.0
+    assert request.take_profit.limit_price == 110.0
+    assert request.limit_price == 100.0
+
+
+def test_connector_looks_up_bracket_by_client_id():
+    from alpaca.common.exceptions import APIError
+
+    conn = AlpacaBrokerConnector.__new__(AlpacaBrokerConnector)
+    conn._retry_api_call = lambda fn, **_: fn()
+    legs = [SimpleNamespace(id="L-SL", order_type="stop"), SimpleNamespace(id="L-TP", order_type="limit")]
+    conn.client = MagicMock()
+    conn.client.get_order_by_client_id.return_value = SimpleNamespace(id="P-1", legs=legs)
+    assert conn.get_bracket_order_by_client_id("E-1") == BracketOrderIds("P-1", "L-SL", "L-TP")
+    conn.client.get_order_by_client_id.assert_called_once_with("E-1")
+
+    not_found = SimpleNamespace(response=SimpleNamespace(status_code=404))
+    conn.client.get_order_by_client_id.side_effect = APIError('{"message": "order not found"}', not_found)
+    assert conn.get_bracket_order_by_client_id("E-1") is None
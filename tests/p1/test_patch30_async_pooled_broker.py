@@ -0,0 +1,227 @@
+"""
+P1 Patch 30 – Async pooled broker connector
+
+INVARIANT:
+    AsyncAlpacaBrokerConnector exposes the same blocking methods as
+    AlpacaBrokerConnector (engine works with either), keeps requests in
+    flight concurrently over one pooled client, and retries 429/5xx without
+    blocking other requests. With a concurrent-capable broker the engine
+    submits and cancels synthetic SL/TP legs in parallel.
+
+DESIGN:
+    - core/brokers/alpaca_async_connector.py: httpx.AsyncClient on a private
+      loop thread; *_async coroutines + blocking wrappers; cancel_orders().
+    - OrderExecutionEngine._run_concurrently() gated by
+      broker.supports_concurrent_requests; its leg pool is shut down by
+      engine.close() (called from Container.stop()).
+    - Runtime selects it with MQD_ASYNC_BROKER=1. Its requests spend the
+      container's throttler per route (orders / status / account), like
+      the sync connector.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from core.brokers import AsyncAlpacaBrokerConnector, BrokerOrderSide
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, OrderStatus, PositionStore
+
+_TS = "2026-01-02T15:00:00Z"
+
+
+def _order(body, status="accepted"):
+    return {
+        "id": str(uuid.uuid4()), "client_order_id": body.get("client_order_id", "x"),
+        "created_at": _TS, "updated_at": _TS, "submitted_at": _TS,
+        "asset_id": str(uuid.uuid4()), "symbol": body.get("symbol", "SPY"),
+        "asset_class": "us_equity", "qty": str(body.get("qty", 1)), "filled_qty": "0",
+        "order_class": body.get("order_class", "simple"), "order_type": body.get("type", "market"),
+        "type": body.get("type", "market"), "side": body.get("side", "buy"),
+        "time_in_force": "day", "status": status, "extended_hours": False,
+    }
+
+
+class FakeAlpaca:
+    """Async MockTransport handler with per-request latency and scripted failures."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self.fail_next = []  # status codes returned before succeeding
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.path))
+        await asyncio.sleep(self.latency)
+        if self.fail_next and request.url.path != "/v2/account":
+            return httpx.Response(self.fail_next.pop(0), json={"message": "slow down"})
+        path = request.url.path
+        if path == "/v2/account":
+            return httpx.Response(200, json={"id": str(uuid.uuid4()), "account_number": "PA123",
+                                             "status": "ACTIVE", "buying_power": "1000",
+                                             "cash": "1000", "portfolio_value": "1000"})
+        if path == "/v2/orders" and request.method == "POST":
+            return httpx.Response(200, json=_order(json.loads(request.content)))
+        if path.startswith("/v2/orders/") and request.method == "DELETE":
+            return httpx.Response(422 if path.endswith("done") else 204,
+                                  json={"message": "order is not cancelable"} if path.endswith("done") else None)
+        if path.startswith("/v2/orders/"):
+            body = _order({}, status="filled")
+            body.update(filled_qty="3", filled_avg_price="101.5")
+            return httpx.Response(200, json=body)
+        return httpx.Response(404, json={"message": "nope"})
+
+
+@pytest.fixture
+def fake():
+    return FakeAlpaca()
+
+
+@pytest.fixture
+def broker(fake, monkeypatch):
+    monkeypatch.delenv("MQD_SMOKE_NO_ORDERS", raising=False)
+    b = AsyncAlpacaBrokerConnector("k", "s", paper=True, transport=httpx.MockTransport(fake))
+    b.RETRY_DELAY_SECONDS = 0.01
+    yield b
+    b.close()
+
+
+def test_same_surface_as_sync_connector(broker):
+    from core.brokers import AlpacaBrokerConnector
+
+    for name in ("submit_market_order", "submit_limit_order", "submit_stop_order",
+                 "submit_bracket_order", "get_order_status", "cancel_order", "get_orders",
+                 "get_positions", "get_account_info", "get_clock"):
+        assert callable(getattr(broker, name)), name
+        assert hasattr(AlpacaBrokerConnector, name), name
+
+    broker_id = broker.submit_limit_order("SPY", Decimal("3"), BrokerOrderSide.BUY, Decimal("100"), "L-1")
+    assert uuid.UUID(broker_id)
+    status, fill = broker.get_order_status(broker_id)
+    assert status == OrderStatus.FILLED
+    assert fill["filled_avg_price"] == Decimal("101.5")
+    assert broker.get_account_info()["cash"] == Decimal("1000")
+
+
+def test_requests_run_concurrently_over_pool(fake, broker):
+    fake.latency = 0.2
+    results = {}
+
+    def submit(i):
+        results[i] = broker.submit_market_order("SPY", Decimal("1"), BrokerOrderSide.BUY, f"M-{i}")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 8
+    assert elapsed < 0.8  # serial would be >= 1.6 s
+    assert broker.get_stats()["max_in_flight"] > 1
+
+    start = time.perf_counter()
+    out = broker.cancel_orders(["a", "b", "c", "done"])
+    assert time.perf_counter() - start < 0.6
+    assert out == {"a": True, "b": True, "c": True, "done": False}
+
+
+def test_retry_is_non_blocking(fake, broker):
+    fake.fail_next = [429, 503]
+    assert broker.cancel_order("x") is True
+    assert broker.get_stats()["retries"] == 2
+
+    fake.fail_next = [400]
+    with pytest.raises(Exception, match="400"):
+        broker.submit_market_order("SPY", Decimal("1"), BrokerOrderSide.BUY, "bad")
+
+
+def test_engine_submits_and_cancels_legs_concurrently(tmp_path):
+    barrier = threading.Barrier(2, timeout=2)
+    broker = MagicMock()
+    broker.supports_concurrent_requests = True
+    broker.submit_stop_order.side_effect = lambda **kw: (barrier.wait(), "B-SL")[1]
+    broker.submit_limit_order.side_effect = lambda **kw: (barrier.wait(), "B-TP")[1]
+    broker.cancel_order.side_effect = lambda broker_order_id: barrier.wait() is not None
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm,
+                                  position_store=PositionStore(db_path=str(tmp_path / "p.db")))
+
+    # Both legs must be in flight at once or the barrier times out.
+    engine._ensure_protective_orders_for_entry("E-1", "SPY", Decimal("5"), Decimal("100"), "s",
+                                               stop_loss=Decimal("95"), take_profit=Decimal("110"))
+    assert engine._internal_to_broker_id["E-1::SL"] == "B-SL"
+    assert engine._internal_to_broker_id["E-1::TP"] == "B-TP"
+    assert engine._order_metadata["E-1::SL"]["oco_sibling_internal_id"] == "E-1::TP"
+
+    barrier.reset()
+    engine._cancel_protective_orders_for_entry("E-1", reason="test")
+    assert broker.cancel_order.call_count == 2
+
+
+def test_engine_close_shuts_down_leg_pool(tmp_path):
+    broker = MagicMock()
+    broker.supports_concurrent_requests = True
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm,
+                                  position_store=PositionStore(db_path=str(tmp_path / "p.db")))
+    pool = engine._leg_pool
+    assert engine._run_concurrently([lambda: 1, lambda: 2]) == [1, 2]
+
+    engine.close()
+
+    assert pool._shutdown
+    assert not any(t.is_alive() for t in pool._threads)
+    caller = threading.current_thread().name
+    ran_on = engine._run_concurrently([lambda: threading.current_thread().name] * 2)
+    assert ran_on == [caller, caller]  # sequential once closed
+    engine.close()  # idempotent
+
+
+def test_container_stop_closes_engine():
+    from core.di.container import Container
+
+    container = Container()
+    container._execution_engine = MagicMock()
+    container.stop()
+    container._execution_engine.close.assert_called_once()
+
+
+def test_container_attaches_throttler_and_requests_spend_it(fake, broker):
+    from core.di.container import Container
+    from core.net import ALPACA_ROUTES, RateLimit, Throttler
+
+    assert broker.throttler is None  # unthrottled until attached
+    throttler = Throttler({"alpaca_trading": RateLimit(100, 60.0)}, routes=ALPACA_ROUTES)
+    container = Container()
+    container._throttler = throttler
+    container.set_broker_connector(broker)
+    assert broker.throttler is throttler
+
+    broker_id = broker.submit_market_order("SPY", Decimal("1"), BrokerOrderSide.BUY, "M-1")
+    broker.get_order_status(broker_id)
+    fake.fail_next = [429]
+    broker.cancel_order(broker_id)  # retried: each attempt spends a token
+    broker.get_account_info()
+
+    spent = {r: throttler.get_stats(r)["total_requests"]
+             for r in ("alpaca_orders", "alpaca_status", "alpaca_account")}
+    assert spent == {"alpaca_orders": 3, "alpaca_status": 1, "alpaca_account": 1}
+
+
+def test_runtime_flag_selects_async_connector():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app)
+    assert "MQD_ASYNC_BROKER" in src
+    assert "AsyncAlpacaBrokerConnector" in src
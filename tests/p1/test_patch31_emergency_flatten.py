@@ -0,0 +1,207 @@
+"""
+P1 Patch 31 – Emergency mass-cancel / flatten-all
+
+INVARIANT:
+    EmergencyFlattener.flatten_all() cancels every working order and
+    liquidates every position with one bulk broker request when available,
+    otherwise with concurrent per-order calls inside the throttler budget.
+    Completion is confirmed from stream notifications (polling only as a
+    fallback) and the report carries time-to-flat, which is also recorded
+    through the kill switch handler.
+
+DESIGN:
+    - core/execution/emergency.py: EmergencyFlattener, FlattenReport.
+    - Connectors: cancel_all_orders(), close_all_positions(cancel_orders=True).
+    - OrderExecutionEngine.register_external_order() adopts broker-created
+      liquidations.
+    - Container.activate_kill_switch() is the entry point; the runtime calls
+      it when MQD_KILL_SWITCH_FILE (default data/state/KILL_SWITCH) exists,
+      then halts. The daily-loss flatten liquidates the whole account, so it
+      is opt-in (MQD_FLATTEN_ON_DAILY_LOSS=1).
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.brokers.alpaca_connector import BrokerOrderSide
+from core.events.handlers import EventHandlerRegistry
+from core.events.types import KillSwitchActivatedEvent
+from core.execution.emergency import EmergencyFlattener
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, OrderStatus, Position, PositionStore
+
+
+def _pos(symbol, qty):
+    return Position(symbol=symbol, quantity=Decimal(qty), entry_price=Decimal("100"),
+                    entry_time=datetime.now(timezone.utc), strategy="s", order_id=f"E-{symbol}")
+
+
+@pytest.fixture
+def parts(tmp_path):
+    broker = MagicMock()
+    ids = iter(f"B-{i}" for i in range(100))
+    broker.submit_market_order.side_effect = lambda **kw: next(ids)
+    broker.get_order_status.return_value = (OrderStatus.SUBMITTED, None)
+    broker.cancel_order.return_value = True
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    store = PositionStore(db_path=str(tmp_path / "positions.db"))
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm, position_store=store)
+    for sym in ("SPY", "QQQ"):
+        store.upsert(_pos(sym, "10"))
+    # two working (unfilled) limit orders
+    broker.submit_limit_order.side_effect = lambda **kw: f"L-{kw['symbol']}"
+    for sym in ("IWM", "TLT"):
+        engine.submit_limit_order(internal_order_id=f"W-{sym}", symbol=sym, quantity=Decimal("1"),
+                                  side=BrokerOrderSide.BUY, limit_price=Decimal("50"), strategy="s")
+    return broker, engine, store
+
+
+def _stream(engine, broker_ids, status, price="99"):
+    """Simulate the user stream: deliver updates as soon as waiters register."""
+    def run():
+        pending = set(broker_ids)
+        deadline = time.time() + 5
+        while pending and time.time() < deadline:
+            for bid in list(pending):
+                if engine.completions.on_trade_update({"event": status, "order": {
+                        "id": bid, "status": status, "filled_qty": "10" if status == "filled" else "0",
+                        "filled_avg_price": price}}):
+                    pending.discard(bid)
+            time.sleep(0.005)
+    t = threading.Thread(target=run)
+    t.start()
+    return t
+
+
+def test_bulk_path_one_request_and_stream_confirmation(parts):
+    broker, engine, store = parts
+    broker.supports_bulk_close = True
+    broker.close_all_positions.return_value = [
+        {"symbol": "SPY", "broker_order_id": "X-SPY", "qty": Decimal("10"), "side": "SELL", "error": None},
+        {"symbol": "QQQ", "broker_order_id": "X-QQQ", "qty": Decimal("10"), "side": "SELL", "error": None},
+    ]
+    events = []
+    flattener = EmergencyFlattener(broker, engine, notify=events.append, poll_interval_s=5.0)
+
+    stream = _stream(engine, ["X-SPY", "X-QQQ"], "filled")
+    cancels = _stream(engine, ["L-IWM", "L-TLT"], "canceled")
+    report = flattener.flatten_all("kill switch", trigger_source="operator")
+    stream.join(5)
+    cancels.join(5)
+
+    broker.close_all_positions.assert_called_once_with(cancel_orders=True)
+    broker.cancel_order.assert_not_called()
+    broker.submit_market_order.assert_not_called()
+    assert report.used_bulk and report.flat
+    assert report.cancels_confirmed == 2 and report.liquidations_filled == 2
+    assert 0 <= report.time_to_flat_s < 2.0
+    assert store.get("SPY") is None and store.get("QQQ") is None
+    assert engine.get_working_orders() == []
+    (event,) = events
+    assert isinstance(event, KillSwitchActivatedEvent)
+    assert event.all_positions_closed and event.all_orders_cancelled
+    assert event.time_to_flat_s == report.time_to_flat_s
+
+
+def test_fallback_is_concurrent_and_throttled(parts):
+    broker, engine, store = parts
+    broker.supports_concurrent_requests = True
+    broker.get_positions.return_value = [_pos("SPY", "10"), _pos("QQQ", "10")]
+    submitted = []
+
+    def slow_submit(**kw):
+        time.sleep(0.2)
+        submitted.append(kw["symbol"])
+        return f"F-{kw['symbol']}"
+
+    def slow_cancel(broker_order_id):
+        time.sleep(0.2)
+        return True
+
+    broker.submit_market_order.side_effect = slow_submit
+    broker.cancel_order.side_effect = slow_cancel
+    broker.get_order_status.return_value = (OrderStatus.FILLED, {
+        "filled_qty": Decimal("10"), "filled_avg_price": Decimal("99")})
+    throttler = MagicMock()
+    throttler.execute_sync.side_effect = lambda limit_id, fn: fn()
+
+    start = time.perf_counter()
+    report = EmergencyFlattener(broker, engine, throttler=throttler).flatten_all("daily loss")
+    elapsed = time.perf_counter() - start
+
+    assert not report.used_bulk and report.flat
+    assert sorted(submitted) == ["QQQ", "SPY"]
+    assert report.cancels_confirmed == 2
+    assert elapsed < 0.7  # serial would be >= 0.8 s
+    # 2 cancels + 1 get_positions + 2 submits, all inside the budget
+    assert throttler.execute_sync.call_count == 5
+    assert {c.args[0] for c in throttler.execute_sync.call_args_list} == {"alpaca_orders"}
+    assert store.get_all() == []
+
+
+def test_failed_liquidation_reported_not_flat(parts):
+    broker, engine, _ = parts
+    broker.get_positions.return_value = [_pos("SPY", "10")]
+    broker.submit_market_order.side_effect = RuntimeError("403 forbidden")
+    report = EmergencyFlattener(broker, engine, timeout_s=1).flatten_all("kill")
+    assert not report.flat
+    assert report.time_to_flat_s is None
+    assert any("SPY" in e for e in report.errors)
+
+
+def test_concurrent_trigger_is_ignored(parts):
+    broker, engine, _ = parts
+    flattener = EmergencyFlattener(broker, engine)
+    flattener._lock.acquire()
+    try:
+        assert flattener.flatten_all("again") is None
+    finally:
+        flattener._lock.release()
+
+
+def test_kill_switch_handler_records_time_to_flat():
+    log = MagicMock()
+    registry = EventHandlerRegistry(MagicMock(), MagicMock(), log)
+    registry.register_default_handlers()
+    registry.handle_event(KillSwitchActivatedEvent(
+        reason="r", trigger_source="t", all_positions_closed=True,
+        all_orders_cancelled=True, time_to_flat_s=0.42))
+    assert log.append.call_args.args[0]["time_to_flat_s"] == 0.42
+
+
+def test_container_kill_switch_entry_point():
+    from core.di.container import Container
+
+    c = Container()
+    assert c.activate_kill_switch("operator", trigger_source="manual") is None  # no broker wired
+    c._emergency_flattener = MagicMock()
+    assert c.activate_kill_switch("operator") is c._emergency_flattener.flatten_all.return_value
+    c._emergency_flattener.flatten_all.assert_called_once_with("operator", trigger_source="manual")
+
+
+def test_kill_switch_file_reason(tmp_path):
+    from core.runtime.app import _kill_switch_reason
+
+    path = tmp_path / "KILL_SWITCH"
+    assert _kill_switch_reason(path) is None
+    assert _kill_switch_reason(None) is None
+    path.write_text("")
+    assert _kill_switch_reason(path) == f"kill switch file {path}"
+    path.write_text("broker showing phantom fills\n")
+    assert _kill_switch_reason(path) == "broker showing phantom fills"
+    assert path.exists()  # stays until an operator clears it
+
+
+def test_app_daily_loss_flatten_is_opt_in_and_kill_switch_wired():
+    import inspect
+    from core.runtime import app
+
+    src = inspect.getsource(app.run)
+    assert 'os.getenv("MQD_FLATTEN_ON_DAILY_LOSS", "0")' in src
+    assert "_kill_switch_reason(_kill_switch_file)" in src
+    assert 'container.activate_kill_switch(_kill_reason, trigger_source="kill_switch_file")' in src
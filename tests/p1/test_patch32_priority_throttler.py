@@ -0,0 +1,142 @@
+"""
+P1 Patch 32 – Priority-aware token-bucket Throttler
+
+INVARIANT:
+    Throttler buckets never admit more than max_requests per time_window.
+    execute_sync() is safe to call from many threads. When a bucket is
+    saturated, waiters are served ORDER > STATUS > DATA > NEWS (FIFO within
+    a class), and RateLimit.reserved tokens are only spent by ORDER traffic,
+    so a data burst never delays a protective stop submission. Live headroom
+    is exposed via headroom() / get_stats().
+
+DESIGN:
+    - core/net/throttler.py: Priority, _Bucket (Condition + priority heap),
+      Throttler(rate_limits, routes=...), acquire()/acquire_async(),
+      headroom().
+    - ALPACA_ROUTES: alpaca_orders/status/account share 'alpaca_trading';
+      alpaca_data/news share 'alpaca_data'.
+"""
+
+import asyncio
+import threading
+import time
+
+from core.net import ALPACA_ROUTES, Priority, RateLimit, Throttler, create_combined_throttler
+
+
+def test_threads_never_exceed_window():
+    t = Throttler({"b": RateLimit(5, 0.3)})
+    stamps = []
+    lock = threading.Lock()
+
+    def call():
+        t.execute_sync("b", lambda: None)
+        with lock:
+            stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(12)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(5)
+
+    assert len(stamps) == 12
+    assert t.get_stats("b")["total_requests"] == 12
+    stamps.sort()
+    for i in range(len(stamps) - 5):
+        assert stamps[i + 5] - stamps[i] >= 0.3 - 0.02
+
+
+def test_order_jumps_queue_ahead_of_data():
+    t = Throttler({"trading": RateLimit(1, 0.2)}, routes={
+        "orders": ("trading", Priority.ORDER),
+        "data": ("trading", Priority.DATA),
+        "news": ("trading", Priority.NEWS),
+    })
+    t.execute_sync("data", lambda: None)  # saturate
+    served = []
+
+    def call(limit_id, tag):
+        t.execute_sync(limit_id, served.append, tag)
+
+    threads = [threading.Thread(target=call, args=("news", "news"))]
+    threads += [threading.Thread(target=call, args=("data", f"data{i}")) for i in range(2)]
+    for th in threads:
+        th.start()
+        time.sleep(0.01)
+    stop = threading.Thread(target=call, args=("orders", "stop"))
+    stop.start()
+    for th in threads + [stop]:
+        th.join(5)
+
+    assert served[0] == "stop"
+    assert served[-1] == "news"
+    assert served[1:3] == ["data0", "data1"]
+
+
+def test_reserved_headroom_only_for_orders():
+    t = Throttler({"trading": RateLimit(3, 5.0, reserved=1)}, routes={
+        "orders": ("trading", Priority.ORDER),
+        "data": ("trading", Priority.DATA),
+    })
+    assert t.headroom("data") == 2 and t.headroom("orders") == 3
+    t.execute_sync("data", lambda: None)
+    t.execute_sync("data", lambda: None)
+    assert t.headroom("data") == 0
+
+    start = time.perf_counter()
+    assert t.execute_sync("orders", lambda: "stop") == "stop"
+    assert time.perf_counter() - start < 0.05
+
+    stats = t.get_stats("orders")
+    assert stats["bucket"] == "trading" and stats["priority"] == "ORDER"
+    assert stats["current_window_requests"] == 3 and stats["headroom"] == 0
+    assert t.headroom() == {"trading": 0}
+
+
+def test_async_execute_shares_bucket_and_does_not_serialize():
+    t = Throttler({"b": RateLimit(10, 1.0)})
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return 1
+
+    async def main():
+        start = time.perf_counter()
+        out = await asyncio.gather(*(t.execute("b", slow) for _ in range(5)))
+        return out, time.perf_counter() - start
+
+    out, elapsed = asyncio.run(main())
+    assert out == [1] * 5
+    assert elapsed < 0.3  # old asyncio.Lock serialized: >= 0.5 s
+    t.execute_sync("b", lambda: None)
+    assert t.get_stats("b")["current_window_requests"] == 6
+
+
+def test_combined_throttler_routes_alpaca_onto_shared_budget():
+    t = create_combined_throttler()
+    assert set(ALPACA_ROUTES) <= set(t.get_stats())
+    t.execute_sync("alpaca_status", lambda: None)
+    t.execute_sync("alpaca_orders", lambda: None)
+    assert t.get_stats("alpaca_account")["current_window_requests"] == 2
+    assert t.get_stats("alpaca_data")["current_window_requests"] == 0
+    assert t.headroom("alpaca_orders") == 198
+    assert t.headroom("alpaca_status") == 178
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    t = Throttler({"trading": RateLimit(1, 0.2)}, routes={
+        "orders": ("trading", Priority.ORDER),
+        "data": ("trading", Priority.DATA),
+    })
+    t.execute_sync("data", lambda: None)  # saturate
+
+    async def main():
+        stop = asyncio.ensure_future(t.acquire_async("orders"))
+        await asyncio.sleep(0.02)
+        stop.cancel()  # e.g. its caller timed out while first in line
+        await asyncio.gather(stop, return_exceptions=True)
+        return await asyncio.wait_for(t.acquire_async("data"), timeout=2)
+
+    assert asyncio.run(main()) >= 0
+    assert t._buckets["trading"].waiting() == 0
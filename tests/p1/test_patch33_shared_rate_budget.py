@@ -0,0 +1,200 @@
+"""
+P1 Patch 33 – Cross-process shared rate-limit budget
+
+INVARIANT:
+    Every process on the host that uses the same Alpaca key draws from one
+    memory-mapped budget per API. Across processes the total never exceeds
+    max_requests per window. Background clients (scanner, universe builder)
+    leave ``reserved`` tokens for the trading runtime and split the rest
+    fair-share among themselves.
+
+DESIGN:
+    - core/net/shared_budget.py: SharedRateBudget (mmap ring + file lock),
+      alpaca_shared_budgets() gated by MQD_SHARED_RATE_BUDGET.
+    - Throttler(shared=...): a bucket spends the host-wide token after its
+      local priority token; container / shard supervisor pass it in. That
+      wait is bounded by the shared window and fails open to the local
+      limit.
+    - The header keeps the boot epoch; a reboot (monotonic restart) resets
+      the ring, and a slot stamped after "now" counts as expired.
+    - scanners: AlpacaDataREST, AlpacaNewsREST and UniverseBuilder spend
+      from the budget as background clients.
+    - AlpacaBrokerConnector REST calls go through the container's throttler
+      (alpaca_orders / alpaca_status / alpaca_account routes).
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from core.net import RateLimit, SharedRateBudget, alpaca_shared_budgets, create_combined_throttler
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _budget(tmp_path, limit, client, background=False):
+    return SharedRateBudget("b", limit, client=client, background=background, directory=str(tmp_path))
+
+
+def test_background_leaves_reserved_headroom(tmp_path):
+    limit = RateLimit(4, 30.0, reserved=2)
+    bot = _budget(tmp_path, limit, "bot")
+    scanner = _budget(tmp_path, limit, "scanner", background=True)
+
+    assert scanner.try_acquire() is None
+    assert scanner.try_acquire() is None
+    assert scanner.try_acquire() > 0  # would eat into the bot's reserve
+
+    assert bot.try_acquire() is None
+    assert bot.try_acquire() is None
+    assert bot.try_acquire() > 0  # budget exhausted for everyone
+    usage = bot.usage()
+    assert usage["in_window"] == 4
+    assert usage["foreground_in_window"] == 2 and usage["background_in_window"] == 2
+
+
+def test_background_clients_fair_share(tmp_path):
+    limit = RateLimit(6, 30.0, reserved=2)
+    a = _budget(tmp_path, limit, "scanner", background=True)
+    b = _budget(tmp_path, limit, "universe", background=True)
+
+    assert a.try_acquire() is None
+    assert b.try_acquire() is None
+    assert a.try_acquire() is None
+    assert a.try_acquire() > 0  # a already holds its half of the 4 shareable
+    assert b.try_acquire() is None
+    assert b.usage()["mine_in_window"] == 2
+
+
+def test_processes_share_one_window(tmp_path):
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {str(_ROOT)!r})
+        from core.net import RateLimit, SharedRateBudget
+        b = SharedRateBudget("b", RateLimit(5, 0.5), client=sys.argv[1], directory={str(tmp_path)!r})
+        for _ in range(6):
+            b.acquire(timeout=5)
+            print(time.monotonic(), flush=True)
+    """)
+    procs = [subprocess.Popen([sys.executable, "-c", script, name], stdout=subprocess.PIPE, text=True)
+             for name in ("bot", "shard")]
+    stamps = []
+    for p in procs:
+        out, _ = p.communicate(timeout=30)
+        assert p.returncode == 0
+        stamps += [float(line) for line in out.split()]
+
+    stamps.sort()
+    assert len(stamps) == 12
+    for i in range(len(stamps) - 5):
+        assert stamps[i + 5] - stamps[i] >= 0.5 - 0.02
+
+
+def test_clock_going_backwards_does_not_block(tmp_path):
+    limit = RateLimit(5, 60.0)
+    old = SharedRateBudget("b", limit, directory=str(tmp_path), clock=lambda: 100000.0)
+    for _ in range(5):
+        assert old.try_acquire() is None
+    assert 0 < old.try_acquire() <= 60.0
+    old.close()
+
+    # Reboot: monotonic time restarts near zero, the budget file survives.
+    rebooted = SharedRateBudget("b", limit, directory=str(tmp_path), clock=lambda: 30.0)
+    assert rebooted.usage()["in_window"] == 0
+    assert rebooted.try_acquire() is None
+
+    # Same boot, but slots stamped after "now" are still never waited on.
+    now = [200.0]
+    a = SharedRateBudget("c", limit, directory=str(tmp_path), clock=lambda: now[0])
+    for _ in range(5):
+        a.try_acquire()
+    now[0] = 50.0
+    assert a.try_acquire() is None
+
+
+def test_throttler_fails_open_when_shared_budget_is_stuck(tmp_path):
+    import time
+
+    from core.net import Throttler
+
+    class _Stuck:
+        limit = RateLimit(1, 0.2)
+
+        def acquire(self, timeout=None):
+            assert timeout == 0.2  # bounded by the shared window
+            raise TimeoutError("Shared rate budget stuck exhausted")
+
+    t = Throttler({"alpaca_trading": RateLimit(5, 1.0)}, shared={"alpaca_trading": _Stuck()})
+    start = time.monotonic()
+    assert t.execute_sync("alpaca_trading", lambda: "ok") == "ok"
+    assert time.monotonic() - start < 0.5
+    assert t.get_stats("alpaca_trading")["total_requests"] == 1
+
+
+def test_throttler_spends_shared_budget(tmp_path, monkeypatch):
+    assert alpaca_shared_budgets("k", directory=str(tmp_path)) == {}  # disabled by default
+
+    monkeypatch.setenv("MQD_SHARED_RATE_BUDGET", "1")
+    shared = alpaca_shared_budgets("k", client="trading", directory=str(tmp_path))
+    assert set(shared) == {"alpaca_trading", "alpaca_data"}
+    scanner = alpaca_shared_budgets("k", client="scanner", background=True,
+                                    directory=str(tmp_path))["alpaca_data"]
+
+    t = create_combined_throttler(shared=shared)
+    t.execute_sync("alpaca_orders", lambda: None)
+    t.execute_sync("alpaca_data", lambda: None)
+    scanner.acquire()
+
+    assert shared["alpaca_trading"].usage()["foreground_in_window"] == 1
+    data = shared["alpaca_data"].usage()
+    assert data["foreground_in_window"] == 1 and data["background_in_window"] == 1
+    # A different key is a different budget.
+    other = alpaca_shared_budgets("other", directory=str(tmp_path))["alpaca_data"]
+    assert other.usage()["in_window"] == 0
+
+
+def test_connector_rest_calls_spend_trading_budget_by_priority(monkeypatch):
+    import threading
+    import time
+    from decimal import Decimal
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from core.brokers.alpaca_connector import AlpacaBrokerConnector, BrokerOrderSide
+    from core.execution.emergency import EmergencyFlattener
+    from core.net import ALPACA_ROUTES, Priority, Throttler
+
+    monkeypatch.delenv("MQD_SMOKE_NO_ORDERS", raising=False)
+    throttler = Throttler({"alpaca_trading": RateLimit(1, 0.2)}, routes=ALPACA_ROUTES)
+    conn = AlpacaBrokerConnector.__new__(AlpacaBrokerConnector)
+    assert conn.throttler is None  # class default: unthrottled until attached
+    conn.logger = MagicMock()
+    conn.throttler = throttler
+    served = []
+    conn.client = MagicMock()
+    conn.client.submit_order.side_effect = lambda req: served.append("submit") or SimpleNamespace(
+        id="B-1", status="accepted")
+    conn.client.get_order_by_id.side_effect = lambda oid: served.append("status") or SimpleNamespace(
+        status="new", filled_qty=None, filled_avg_price=None)
+
+    conn.get_positions()  # saturate the shared bucket (STATUS)
+    poll = threading.Thread(target=conn.get_order_status, args=("B-1",))
+    poll.start()
+    time.sleep(0.02)
+    submit = threading.Thread(target=conn.submit_market_order,
+                              args=("SPY", Decimal("1"), BrokerOrderSide.BUY, "E-1"))
+    submit.start()
+    poll.join(5)
+    submit.join(5)
+
+    assert served == ["submit", "status"]  # ORDER jumped the queued status poll
+    spent = lambda: {r: throttler.get_stats(r)["total_requests"]  # noqa: E731
+                     for r in ("alpaca_orders", "alpaca_status", "alpaca_account")}
+    assert spent() == {"alpaca_orders": 1, "alpaca_status": 1, "alpaca_account": 1}
+    assert ALPACA_ROUTES["alpaca_orders"] == ("alpaca_trading", Priority.ORDER)
+
+    # The flattener doesn't spend a second token for a call the connector throttles.
+    flattener = EmergencyFlattener(conn, MagicMock(), throttler=throttler)
+    flattener._call(lambda: None)
+    assert spent()["alpaca_orders"] == 1
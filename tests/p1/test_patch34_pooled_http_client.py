@@ -0,0 +1,157 @@
+"""
+P1 Patch 34 – Shared pooled HTTP client
+
+INVARIANT:
+    REST integrations (scanner, UniverseBuilder, TwelveData fetch, Discord
+    notifier) go through one pooled client: connections are reused across
+    requests, gzip is accepted, idempotent requests retry 429/5xx and
+    transport errors under one policy (non-idempotent ones only when the
+    connection never opened), and per-host latency / error metrics are
+    exposed.
+
+DESIGN:
+    - core/net/http_client.py: HttpClient, HttpPolicy, HttpClientError,
+      get_http_client() process-wide singleton.
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from core.net import ExponentialBackoff, HttpClient, HttpClientError, HttpPolicy
+
+_FAST = HttpPolicy(max_retries=2, backoff=ExponentialBackoff(base=0.0, jitter=False))
+
+
+@pytest.fixture
+def server():
+    peers = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            peers.append(self.client_address)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", peers
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_connections_are_reused(server):
+    url, peers = server
+    client = HttpClient(policy=_FAST, http2=False)
+    for _ in range(10):
+        assert client.get(f"{url}/v2/x", params={"a": "1"}).json() == {"ok": True}
+    client.close()
+
+    assert len(peers) == 10
+    assert len(set(peers)) == 1  # one TCP connection for all ten requests
+    host = url.split("//")[1]
+    stats = client.get_stats(host)
+    assert stats["requests"] == 10 and stats["errors"] == 0
+    assert stats["latency_ms_p50"] is not None and stats["last_status"] == 200
+
+
+def test_retry_policy_and_gzip():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        assert "gzip" in request.headers["accept-encoding"]
+        if len(calls) == 1:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, headers={"Content-Encoding": "gzip"},
+                              content=gzip.compress(json.dumps({"bars": [1]}).encode()))
+
+    client = HttpClient(policy=_FAST, transport=httpx.MockTransport(handler))
+    r = client.get("https://data.example/v2/bars")
+    assert r.status_code == 200 and r.json() == {"bars": [1]}
+    assert client.get_stats("data.example")["retries"] == 1
+
+    calls.clear()
+    assert client.post("https://data.example/hook", json={}).status_code == 503  # not retried
+    assert calls == ["POST"]
+
+
+def test_transport_failure_raises_after_retries():
+    attempts = []
+
+    def handler(request):
+        attempts.append(1)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = HttpClient(policy=_FAST, transport=httpx.MockTransport(handler))
+    with pytest.raises(HttpClientError, match="connection"):
+        client.get("https://down.example/")
+    assert len(attempts) == 3
+    assert client.get_stats("down.example")["errors"] == 3
+
+
+def test_callers_use_shared_client(monkeypatch):
+    import scanners.standalone_scanner as scanner
+    import scanners.universe_builder as ub
+    from core.data import pipeline
+
+    seen = []
+
+    class Fake:
+        def get(self, url, **kw):
+            seen.append(url)
+            return httpx.Response(200, json={"values": [], "bars": {}}, request=httpx.Request("GET", url))
+
+        def post(self, url, **kw):
+            seen.append(url)
+
+    for mod in (scanner, ub, pipeline):
+        monkeypatch.setattr(mod, "get_http_client", lambda: Fake())
+    monkeypatch.setenv("ALPACA_API_KEY", "k")
+    monkeypatch.setenv("ALPACA_API_SECRET", "s")
+
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc)
+    scanner.AlpacaDataREST().get_bars_1m(["SPY"], now, now)
+    ub.UniverseBuilder()._fetch_snapshots_batched(["SPY"])
+    p = pipeline.MarketDataPipeline(alpaca_api_key="x", alpaca_api_secret="y",
+                                    twelvedata_api_key="t", primary_provider="twelvedata")
+    p._fetch_from_twelvedata("SPY", 5, "1Min")
+
+    assert any("/v2/stocks/bars" in u for u in seen)
+    assert any("/v2/stocks/snapshots" in u for u in seen)
+    assert any("twelvedata" in u for u in seen)
+
+
+def test_discord_notifier_uses_shared_client(monkeypatch):
+    pytest.importorskip("discord")  # core.discord also loads the bot
+    from core.discord import notifier
+
+    calls = []
+
+    class Fake:
+        def post(self, url, **kw):
+            calls.append((url, kw))
+            return httpx.Response(204, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(notifier, "get_http_client", lambda: Fake())
+    notifier.DiscordNotifier(webhooks={})._send_webhook("https://discord.example/hook", {"content": "x"})
+
+    assert len(calls) == 1  # 204 on the first attempt
+    url, kw = calls[0]
+    assert url == "https://discord.example/hook"
+    assert kw["json"] == {"content": "x"}
+    assert kw["retries"] == 0  # the notifier's own loop owns retries
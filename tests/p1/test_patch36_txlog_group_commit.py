@@ -0,0 +1,168 @@
+"""
+P1 Patch 36 – TransactionLog group commit
+
+INVARIANT:
+    With group commit on, concurrent appends share one write+fsync, yet
+    append() still returns only after the caller's own line is durable and
+    every line keeps its CRC. A lone appender is never held for the window,
+    and a failed batch write raises in every caller of that batch.
+
+DESIGN:
+    - TransactionLog(group_commit_ms=..., group_commit_max_events=...);
+      default from MQD_TXLOG_GROUP_COMMIT_MS (0 = off, per-append fsync).
+    - Leader/follower batching under a Condition; the file lock is only
+      taken by the leader for the write. A leader's window only waits for
+      appenders still encoding; an appender stops counting as soon as its
+      line is queued.
+    - get_stats(): appends / fsyncs / max_batch.
+"""
+
+import threading
+import time
+
+import pytest
+
+import core.state.transaction_log as txmod
+from core.state.transaction_log import TransactionLog, TransactionLogError
+
+
+def _slow_fsync(monkeypatch, delay=0.003):
+    real = txmod.os.fsync
+    calls = []
+
+    def fsync(fd):
+        calls.append(fd)
+        time.sleep(delay)
+        real(fd)
+
+    monkeypatch.setattr(txmod.os, "fsync", fsync)
+    return calls
+
+
+def _hammer(log, threads=16, per_thread=40):
+    def work(t):
+        for i in range(per_thread):
+            log.append({"event_type": "ORDER_SUBMIT", "internal_order_id": f"O-{t}-{i}"})
+
+    ts = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for th in ts:
+        th.start()
+    for th in ts:
+        th.join(30)
+
+
+def test_concurrent_appends_share_fsyncs(tmp_path, monkeypatch):
+    calls = _slow_fsync(monkeypatch)
+    log = TransactionLog(tmp_path / "tx.log", group_commit_ms=2)
+    _hammer(log)
+    log.close()
+
+    events = list(TransactionLog(tmp_path / "tx.log").iter_events())  # CRC-checked
+    assert len(events) == 16 * 40
+    assert len({e["internal_order_id"] for e in events}) == 16 * 40
+    stats = log.get_stats()
+    assert stats["appends"] == 640 and stats["fsyncs"] == len(calls)
+    assert stats["fsyncs"] < 640 // 4
+    assert stats["max_batch"] > 1
+
+
+def test_per_thread_order_preserved(tmp_path):
+    log = TransactionLog(tmp_path / "tx.log", group_commit_ms=1)
+    _hammer(log, threads=4, per_thread=25)
+    seen = {}
+    for ev in log.iter_events():
+        t, i = map(int, ev["internal_order_id"].split("-")[1:])
+        assert i == seen.get(t, -1) + 1
+        seen[t] = i
+    log.close()
+
+
+def test_lone_appender_not_held_for_window(tmp_path):
+    log = TransactionLog(tmp_path / "tx.log", group_commit_ms=500)
+    start = time.perf_counter()
+    for i in range(5):
+        log.append({"event_type": "X", "n": i})
+    assert time.perf_counter() - start < 0.5
+    assert log.get_stats()["fsyncs"] == 5
+    log.close()
+
+
+def test_leader_does_not_wait_for_a_committed_follower(tmp_path, monkeypatch):
+    log = TransactionLog(tmp_path / "tx.log", group_commit_ms=500)
+    real_encode = log._encode
+    stalled = []
+
+    def encode(event):
+        if threading.current_thread().name == "B" and not stalled:
+            time.sleep(0.05)  # still encoding when A starts leading
+        return real_encode(event)
+
+    class _SlowWake(type(log._commit_cond)):
+        def wait(self, timeout=None):
+            woke = super().wait(timeout)
+            if threading.current_thread().name == "B" and not stalled:
+                stalled.append(True)  # B's line is committed; it is slow to resume
+                self.release()
+                time.sleep(0.2)
+                self.acquire()
+            return woke
+
+    monkeypatch.setattr(log, "_encode", encode)
+    log._commit_cond = _SlowWake(threading.Lock())
+    elapsed = []
+
+    def a():
+        log.append({"event_type": "X", "n": "a1"})  # one batch with B's line
+        start = time.perf_counter()
+        log.append({"event_type": "X", "n": "a2"})
+        elapsed.append(time.perf_counter() - start)
+
+    tb = threading.Thread(target=log.append, args=({"event_type": "X", "n": "b1"},), name="B")
+    ta = threading.Thread(target=a, name="A")
+    tb.start()
+    time.sleep(0.01)
+    ta.start()
+    ta.join(5)
+    tb.join(5)
+    log.close()
+
+    assert stalled and log.get_stats()["max_batch"] == 2
+    assert elapsed[0] < 0.15  # not held for B (0.2 s) or the 0.5 s window
+
+
+def test_failed_batch_raises_for_every_caller(tmp_path, monkeypatch):
+    log = TransactionLog(tmp_path / "tx.log", group_commit_ms=5)
+
+    def boom(lines):
+        time.sleep(0.01)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(log, "_write_lines", boom)
+    errors = []
+
+    def work(i):
+        try:
+            log.append({"event_type": "X", "n": i})
+        except TransactionLogError as e:
+            errors.append(e)
+
+    ts = [threading.Thread(target=work, args=(i,)) for i in range(6)]
+    for th in ts:
+        th.start()
+    for th in ts:
+        th.join(5)
+    assert len(errors) == 6
+
+    with pytest.raises(TransactionLogError):
+        log.append({"event_type": "ORDER_SUBMIT"})  # validation still raises up front
+
+
+def test_off_by_default_and_env_enables(tmp_path, monkeypatch):
+    monkeypatch.delenv("MQD_TXLOG_GROUP_COMMIT_MS", raising=False)
+    assert TransactionLog(tmp_path / "a.log").group_commit_s == 0
+    monkeypatch.setenv("MQD_TXLOG_GROUP_COMMIT_MS", "2")
+    log = TransactionLog(tmp_path / "b.log")
+    assert log.get_stats()["group_commit_ms"] == pytest.approx(2.0)
+    log.append({"event_type": "X"})
+    log.close()
+    assert len(TransactionLog(tmp_path / "b.log").read_all()) == 1
@@ -0,0 +1,176 @@
+"""
+P1 Patch 37 – Segmented TransactionLog with checkpoints and a time index
+
+INVARIANT:
+    A segmented log returns exactly the same events (in order) as a single
+    file. Restart state rebuilt from the latest CHECKPOINT plus the tail
+    equals folding the full history, and reads only the tail. filter_since()
+    returns the same events as a full scan while skipping sealed segments
+    that end before ``since``.
+
+DESIGN:
+    - core/state/txlog_index.py: segment naming, sparse sidecar index.
+    - core/state/log_checkpoint.py: OrderLogReducer (shared by checkpoints,
+      OrderStateMachine.restore_pending_orders and engine ID seeding).
+    - TransactionLog(segment_max_bytes=..., segment_daily=...,
+      checkpoint_every=..., index_every=...), replay_from_checkpoint().
+    - Checkpoints keep submitted IDs (bucketed by log day) for the last
+      MQD_TXLOG_GUARD_ID_DAYS days only, so they do not grow with account age.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, TransactionLog
+from core.state.log_checkpoint import OrderLogReducer
+from core.state.txlog_index import SegmentIndex, sealed_segments
+
+T0 = datetime(2026, 3, 2, 14, 30, tzinfo=timezone.utc)
+
+
+class StepClock:
+    def __init__(self, start=T0, step=timedelta(seconds=1)):
+        self.t = start
+        self.step = step
+
+    def now(self):
+        self.t += self.step
+        return self.t
+
+
+def _lifecycle(log, n):
+    """n orders; every third stays open, the rest fill or cancel."""
+    for i in range(n):
+        iid = f"O-{i}"
+        log.append({"event_type": "ORDER_SUBMIT", "internal_order_id": iid, "symbol": "SPY",
+                    "qty": "1", "side": "BUY", "state": "SUBMITTED", "strategy": "s"})
+        if i % 3 == 1:
+            log.append({"event_type": "ORDER_FILLED", "internal_order_id": iid})
+        elif i % 3 == 2:
+            log.append({"event_type": "ORDER_CANCELLED", "internal_order_id": iid})
+
+
+def _seg_log(path, clock=None, **kw):
+    kw.setdefault("segment_max_bytes", 4000)
+    kw.setdefault("checkpoint_every", 25)
+    kw.setdefault("index_every", 8)
+    return TransactionLog(path, clock=clock or StepClock(), **kw)
+
+
+def test_segments_preserve_order_and_hide_checkpoints(tmp_path):
+    log = _seg_log(tmp_path / "tx.log")
+    _lifecycle(log, 60)
+    log.close()
+
+    assert len(sealed_segments(tmp_path / "tx.log")) >= 2
+    events = TransactionLog(tmp_path / "tx.log").read_all()
+    assert len(events) == 60 + 40
+    assert all(e["event_type"] != "CHECKPOINT" for e in events)
+    submits = [e["internal_order_id"] for e in events if e["event_type"] == "ORDER_SUBMIT"]
+    assert submits == [f"O-{i}" for i in range(60)]
+    assert log.get_stats()["rotations"] >= 2 and log.get_stats()["checkpoints"] >= 4
+
+
+def test_restart_replays_only_the_tail(tmp_path):
+    path = tmp_path / "tx.log"
+    log = _seg_log(path)
+    _lifecycle(log, 90)
+    log.close()
+
+    reopened = _seg_log(path)
+    state, tail = reopened.replay_from_checkpoint()
+    tail = list(tail)
+    assert state is not None and len(tail) < 25
+
+    full = OrderLogReducer().apply_all(reopened.iter_events())
+    resumed = OrderLogReducer.from_snapshot(state).apply_all(tail)
+    assert set(resumed.open_orders()) == set(full.open_orders()) == {f"O-{i}" for i in range(0, 90, 3)}
+    assert resumed.submitted_ids == full.submitted_ids
+
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    assert sm.restore_pending_orders(reopened) == 30
+    engine = OrderExecutionEngine(broker=MagicMock(), state_machine=sm, position_store=MagicMock(),
+                                  transaction_log=reopened)
+    assert engine._submitted_order_ids == {f"O-{i}" for i in range(90)}
+
+    # Appends after reopen continue the same checkpoint chain.
+    reopened.append({"event_type": "ORDER_FILLED", "internal_order_id": "O-0"})
+    reopened.close()
+    sm2 = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    assert sm2.restore_pending_orders(_seg_log(path)) == 29
+
+
+def test_checkpoint_keeps_only_recent_submitted_ids(tmp_path, monkeypatch):
+    monkeypatch.setenv("MQD_TXLOG_GUARD_ID_DAYS", "2")
+    path = tmp_path / "tx.log"
+    # 3h per record: the 40 orders span more than a week
+    log = _seg_log(path, clock=StepClock(step=timedelta(hours=3)), checkpoint_every=10)
+    _lifecycle(log, 40)
+    log.close()
+
+    state, tail = TransactionLog(path).replay_from_checkpoint()
+    days = sorted(state["submitted_ids"])
+    assert len(days) == 2 and days[-1] == state["last_day"]
+    seeded = OrderLogReducer.from_snapshot(state).apply_all(tail).submitted_ids
+    assert {f"O-{i}" for i in range(32, 40)} <= seeded
+    assert "O-0" not in seeded and len(seeded) < 20
+
+    # A version-1 checkpoint (flat list) keeps its IDs for a full window.
+    old = OrderLogReducer.from_snapshot({"version": 1, "orders": {}, "submitted_ids": ["X-1"]})
+    old.apply({"event_type": "ORDER_SUBMIT", "internal_order_id": "X-2", "_logged_at": "2026-03-10T00:00:00Z"})
+    old.compact()
+    assert old.submitted_ids == {"X-1", "X-2"}
+    old.apply({"event_type": "ORDER_SUBMIT", "internal_order_id": "X-3", "_logged_at": "2026-03-12T00:00:00Z"})
+    old.compact()
+    assert old.submitted_ids == {"X-3"}
+
+
+def test_daily_segments(tmp_path):
+    clock = StepClock(step=timedelta(hours=5))
+    log = TransactionLog(tmp_path / "tx.log", clock=clock, segment_daily=True)
+    for i in range(12):  # 60 h -> spans 3-4 UTC days
+        log.append({"event_type": "HEARTBEAT", "n": i})
+    log.close()
+    days = set()
+    for _, seg in sealed_segments(tmp_path / "tx.log"):
+        ts = {e["_logged_at"][:10] for _, e in TransactionLog._iter_file(seg)}
+        assert len(ts) == 1
+        days |= ts
+    assert len(days) >= 2
+    assert [e["n"] for e in TransactionLog(tmp_path / "tx.log").iter_events()] == list(range(12))
+
+
+def test_filter_since_seeks(tmp_path, monkeypatch):
+    path = tmp_path / "tx.log"
+    log = _seg_log(path)
+    _lifecycle(log, 60)
+    log.close()
+
+    # Seek target: an indexed point inside the second sealed segment.
+    since = SegmentIndex.load(sealed_segments(path)[1][1]).last()[0]
+    expected = [e for e in TransactionLog(path).iter_events()
+                if datetime.fromisoformat(e["_logged_at"].replace("Z", "+00:00")) > since]
+
+    scanned = []
+    real = TransactionLog._iter_file.__func__
+
+    def spy(cls, p, start=0, include_checkpoints=False):
+        scanned.append((p.name, start))
+        return real(cls, p, start, include_checkpoints)
+
+    monkeypatch.setattr(TransactionLog, "_iter_file", classmethod(spy))
+    got = TransactionLog(path).filter_since(since)
+    assert got == expected and len(got) > 0
+    sealed = [p.name for _, p in sealed_segments(path)]
+    assert sealed[0] not in {name for name, _ in scanned}
+    assert any(start > 0 for _, start in scanned)
+
+
+def test_unsegmented_log_unchanged(tmp_path):
+    log = TransactionLog(tmp_path / "tx.log")
+    _lifecycle(log, 5)
+    log.close()
+    assert list(tmp_path.iterdir()) == [tmp_path / "tx.log"]
+    state, events = TransactionLog(tmp_path / "tx.log").replay_from_checkpoint()
+    assert state is None and len(list(events)) == 5 + 3
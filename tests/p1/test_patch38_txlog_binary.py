@@ -0,0 +1,191 @@
+"""
+P1 Patch 38 – Binary transaction-log records
+
+INVARIANT:
+    A binary log returns exactly the events a text log would (same keys,
+    values and _logged_at), including checkpoints, segments and
+    filter_since(). Converting text -> binary -> text is lossless. A
+    flipped byte in a binary record raises TransactionLogCorruptionError,
+    like a bad CRC line in text.
+
+DESIGN:
+    - core/state/txlog_codec.py: MAGIC-prefixed files, fixed record header
+      (length, crc32, kind, field mask, ts_us) + compact payload; typed
+      schemas for hot event types, JSON escape hatch for the rest.
+    - BinaryLogReader: mmap, header-only scan(kinds=, since_us=);
+      iter_events() parses payloads in batches (one json.loads per batch),
+      still yielding the valid prefix before a corrupt or torn record.
+    - TransactionLog(log_format="binary") / MQD_TXLOG_FORMAT; the format of
+      each segment is detected from its first bytes.
+    - python -m core.state.txlog_codec SRC DST --to text|binary
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.state import TransactionLog
+from core.state.transaction_log import TransactionLogCorruptionError
+from core.state.txlog_codec import (
+    KIND_BY_EVENT_TYPE,
+    MAGIC,
+    BinaryLogReader,
+    CodecError,
+    convert_log,
+    datetime_to_us,
+    main,
+)
+from core.state.txlog_index import sealed_segments
+
+T0 = datetime(2026, 3, 2, 14, 30, tzinfo=timezone.utc)
+
+
+class StepClock:
+    def __init__(self, start=T0, step=timedelta(seconds=1)):
+        self.t = start
+        self.step = step
+
+    def now(self):
+        self.t += self.step
+        return self.t
+
+
+def _write(log, n):
+    for i in range(n):
+        iid = f"O-{i}"
+        log.append({"event_type": "ORDER_SUBMIT", "internal_order_id": iid, "symbol": "SPY", "qty": "10",
+                    "side": "BUY", "order_type": "LIMIT", "price": "512.34", "strategy": "vwap_mr",
+                    "state": "SUBMITTED", "broker_order_id": None})
+        log.append({"event_type": "OrderStateChanged", "order_id": iid, "from_state": "PENDING",
+                    "to_state": "SUBMITTED", "metadata": {"legs": [1, 2]}, "fill_price": None})
+        if i % 2:
+            log.append({"event_type": "ORDER_FILLED", "internal_order_id": iid})  # JSON escape hatch
+
+
+def test_binary_round_trip_matches_text(tmp_path):
+    for fmt in ("text", "binary"):
+        log = TransactionLog(tmp_path / f"{fmt}.log", clock=StepClock(), log_format=fmt)
+        _write(log, 40)
+        log.close()
+
+    text = TransactionLog(tmp_path / "text.log").read_all()
+    binary = TransactionLog(tmp_path / "binary.log").read_all()
+    assert binary == text and len(binary) == 100
+    assert binary[0]["broker_order_id"] is None and binary[1]["metadata"] == {"legs": [1, 2]}
+    assert (tmp_path / "binary.log").read_bytes().startswith(MAGIC)
+    assert (tmp_path / "binary.log").stat().st_size * 1.5 < (tmp_path / "text.log").stat().st_size
+
+
+def test_segmented_binary_checkpoints_and_filter_since(tmp_path):
+    path = tmp_path / "tx.log"
+    log = TransactionLog(path, clock=StepClock(), log_format="binary",
+                         segment_max_bytes=6000, checkpoint_every=20, index_every=8)
+    _write(log, 60)
+    log.close()
+    assert len(sealed_segments(path)) >= 2
+    assert all(p.read_bytes().startswith(MAGIC) for _, p in sealed_segments(path))
+
+    reopened = TransactionLog(path, segment_max_bytes=6000, checkpoint_every=20)
+    assert reopened.log_format == "binary"  # existing file keeps its format
+    state, tail = reopened.replay_from_checkpoint()
+    assert state is not None and len(list(tail)) < 40
+
+    since = T0 + timedelta(seconds=100)
+    expected = [e for e in reopened.iter_events()
+                if datetime.fromisoformat(e["_logged_at"].replace("Z", "+00:00")) > since]
+    assert reopened.filter_since(since) == expected and len(expected) > 0
+    reopened.close()
+
+
+def test_conversion_is_lossless_both_ways(tmp_path):
+    src = tmp_path / "src" / "tx.log"
+    log = TransactionLog(src, clock=StepClock(), segment_max_bytes=6000, checkpoint_every=20, index_every=8)
+    _write(log, 60)
+    log.close()
+
+    convert_log(src, tmp_path / "bin" / "tx.log", "binary")
+    main([str(tmp_path / "bin" / "tx.log"), str(tmp_path / "back" / "tx.log"), "--to", "text"])
+
+    original = TransactionLog(src)
+    for d in ("bin", "back"):
+        converted = TransactionLog(tmp_path / d / "tx.log")
+        assert converted.read_all() == original.read_all()
+        assert converted.replay_from_checkpoint()[0] == original.replay_from_checkpoint()[0]
+    assert len(sealed_segments(tmp_path / "bin" / "tx.log")) == len(sealed_segments(src))
+    assert all(p.read_bytes().startswith(MAGIC) for _, p in sealed_segments(tmp_path / "bin" / "tx.log"))
+    assert not (tmp_path / "back" / "tx.log").read_bytes().startswith(MAGIC)
+
+
+def test_header_scan_filters_without_decoding(tmp_path):
+    log = TransactionLog(tmp_path / "tx.log", clock=StepClock(), log_format="binary")
+    _write(log, 30)
+    log.close()
+
+    with BinaryLogReader(tmp_path / "tx.log") as reader:
+        submits = list(reader.scan(kinds={KIND_BY_EVENT_TYPE["ORDER_SUBMIT"]}))
+        late = list(reader.iter_events(since_us=datetime_to_us(T0 + timedelta(seconds=70))))
+    assert len(submits) == 30
+    assert [ev["_logged_at"] for _, ev in late][0] == "2026-03-02T14:31:11Z"
+    assert len(late) == 75 - 70
+
+
+def test_corrupt_binary_record_detected(tmp_path):
+    path = tmp_path / "tx.log"
+    log = TransactionLog(path, log_format="binary")
+    _write(log, 3)
+    log.close()
+
+    data = bytearray(path.read_bytes())
+    data[-5] ^= 0x01
+    path.write_bytes(bytes(data))
+    with pytest.raises(TransactionLogCorruptionError, match="checksum mismatch"):
+        TransactionLog(path).read_all()
+
+    path.write_bytes(bytes(data[:-5]))  # torn tail
+    with pytest.raises(TransactionLogCorruptionError, match="truncated"):
+        TransactionLog(path).read_all()
+
+
+def test_batched_decode_matches_single_record_reads(tmp_path, monkeypatch):
+    from core.state import txlog_codec
+
+    monkeypatch.setattr(txlog_codec, "DECODE_BATCH", 4)
+    path = tmp_path / "tx.log"
+    log = TransactionLog(path, clock=StepClock(), log_format="binary")
+    _write(log, 10)
+    log.close()
+
+    with BinaryLogReader(path) as reader:
+        events = list(reader.iter_events())
+        assert len(events) == 25
+        assert events == [(off, reader.read_at(off)) for off, _, _ in reader.scan()]
+
+    path.write_bytes(path.read_bytes()[:-5])  # torn tail inside the last batch
+    seen = []
+    with BinaryLogReader(path) as reader:
+        with pytest.raises(CodecError, match="truncated"):
+            for item in reader.iter_events():
+                seen.append(item)
+    assert seen == events[:-1]
+
+
+@pytest.mark.parametrize("group_commit_ms", [0, 5])
+def test_format_changing_rotation_reencodes_pending_records(tmp_path, group_commit_ms):
+    path = tmp_path / "t.log"
+    log = TransactionLog(path, clock=StepClock(), segment_max_bytes=300)
+    _write(log, 1)
+    log.close()
+
+    # The active file is text, so records are encoded as text until the
+    # size-triggered rotation opens a binary segment.
+    log = TransactionLog(path, clock=StepClock(start=T0 + timedelta(hours=1)), segment_max_bytes=300,
+                         log_format="binary", group_commit_ms=group_commit_ms)
+    assert log.log_format == "text"
+    for i in range(5):
+        log.append({"event_type": "ORDER_SUBMIT", "internal_order_id": f"N-{i}", "symbol": "QQQ"})
+    assert log.log_format == "binary"
+
+    events = [e for e in log.iter_events() if e["event_type"] == "ORDER_SUBMIT"]
+    assert [e["internal_order_id"] for e in events] == ["O-0"] + [f"N-{i}" for i in range(5)]
+    assert all(p.read_bytes().startswith(MAGIC) for _, p in sealed_segments(path)[1:])
+    log.close()
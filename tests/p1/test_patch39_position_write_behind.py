@@ -0,0 +1,166 @@
+"""
+P1 Patch 39 – Write-behind PositionStore
+
+INVARIANT:
+    With write_behind on, reads come from memory and always reflect the
+    latest upsert/delete; SQLite converges to the same state within one
+    flush. flush() returns only after every earlier write is committed, and
+    the engine calls it before each broker submit. bulk_upsert() is one
+    durable transaction. With write_behind off nothing changes.
+
+DESIGN:
+    - PositionStore(write_behind=..., flush_interval_s=..., flush_max_pending=...);
+      env MQD_POSITION_WRITE_BEHIND / MQD_POSITION_FLUSH_MS / MQD_POSITION_FLUSH_MAX.
+    - Per-symbol coalescing (_dirty), background flusher thread, size trigger.
+    - StartupReconciler.heal_startup() heals only differing positions, merged
+      into the local row, via bulk_upsert().
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from core.brokers.alpaca_connector import BrokerOrderSide
+from core.execution.engine import OrderExecutionEngine
+from core.state import OrderStateMachine, PositionStore
+from core.state.position_store import Position
+from core.state.reconciler import StartupReconciler
+
+
+def _pos(symbol, qty="10", price="100"):
+    return Position(symbol=symbol, quantity=Decimal(qty), entry_price=Decimal(price),
+                    entry_time=datetime(2026, 3, 2, 14, 30, tzinfo=timezone.utc),
+                    strategy="s", order_id=f"O-{symbol}")
+
+
+def _on_disk(db):
+    conn = sqlite3.connect(str(db))
+    try:
+        return {sym: qty for sym, qty in conn.execute("SELECT symbol, quantity FROM positions")}
+    finally:
+        conn.close()
+
+
+def test_reads_from_memory_writes_coalesced_until_flush(tmp_path):
+    db = tmp_path / "positions.db"
+    store = PositionStore(db, write_behind=True, flush_interval_s=0, flush_max_pending=100)
+    for i in range(1, 51):
+        store.upsert(_pos("SPY", qty=str(i)))
+    store.upsert(_pos("QQQ"))
+    store.upsert(_pos("IWM"))
+    assert store.delete("IWM") is True and store.delete("IWM") is False
+
+    assert store.get("SPY").quantity == Decimal("50")
+    assert [p.symbol for p in store.get_all()] == ["QQQ", "SPY"]
+    assert _on_disk(db) == {}
+
+    assert store.flush() == 3  # SPY, QQQ, IWM(delete) -- 50 SPY updates became one row
+    assert _on_disk(db) == {"SPY": "50", "QQQ": "10"}
+    assert store.get_stats()["coalesced"] == 50 and store.get_stats()["pending"] == 0
+
+    # Returned objects are copies; mutating them doesn't touch the store.
+    store.get("SPY").quantity = Decimal("1")
+    assert store.get("SPY").quantity == Decimal("50")
+    store.close()
+
+    reopened = PositionStore(db, write_behind=True, flush_interval_s=0)
+    assert {p.symbol: p.quantity for p in reopened.get_all()} == {"SPY": Decimal("50"), "QQQ": Decimal("10")}
+    reopened.close()
+
+
+def test_size_and_timer_triggers(tmp_path):
+    store = PositionStore(tmp_path / "a.db", write_behind=True, flush_interval_s=0, flush_max_pending=3)
+    store.upsert(_pos("A"))
+    store.upsert(_pos("B"))
+    assert _on_disk(tmp_path / "a.db") == {}
+    store.upsert(_pos("C"))
+    assert set(_on_disk(tmp_path / "a.db")) == {"A", "B", "C"}
+    store.close()
+
+    store = PositionStore(tmp_path / "b.db", write_behind=True, flush_interval_s=0.01)
+    store.upsert(_pos("A"))
+    deadline = time.monotonic() + 5
+    while not _on_disk(tmp_path / "b.db") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _on_disk(tmp_path / "b.db") == {"A": "10"}
+    store.upsert(_pos("B"))
+    store.close()  # close flushes what the timer hasn't
+    assert _on_disk(tmp_path / "b.db") == {"A": "10", "B": "10"}
+
+
+def test_engine_flushes_before_broker_submit(tmp_path):
+    store = PositionStore(tmp_path / "positions.db", write_behind=True, flush_interval_s=0)
+    store.upsert(_pos("SPY"))
+    seen = {}
+
+    def submit(**kwargs):
+        seen["on_disk"] = _on_disk(tmp_path / "positions.db")
+        return "B-1"
+
+    broker = MagicMock()
+    broker.supports_bracket_orders = False
+    broker.submit_market_order.side_effect = submit
+    sm = OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock())
+    engine = OrderExecutionEngine(broker=broker, state_machine=sm, position_store=store)
+    engine.trade_journal = MagicMock()
+
+    engine.submit_market_order(internal_order_id="E-1", symbol="SPY", quantity=Decimal("1"),
+                               side=BrokerOrderSide.SELL, strategy="s")
+    assert seen["on_disk"] == {"SPY": "10"}
+    store.close()
+
+
+def test_bulk_upsert_and_reconciler_heal(tmp_path):
+    store = PositionStore(tmp_path / "sync.db")
+    assert store.bulk_upsert([_pos("A"), _pos("B", qty="-5")]) == 2
+    assert _on_disk(tmp_path / "sync.db") == {"A": "10", "B": "-5"}
+    store.close()
+
+    db = tmp_path / "wb.db"
+    store = PositionStore(db, write_behind=True, flush_interval_s=0)
+    store.upsert(_pos("STALE"))
+    spy = _pos("SPY", qty="5", price="500")
+    spy.stop_loss = Decimal("490")
+    store.upsert(spy)
+    store.upsert(_pos("IWM", qty="2", price="210"))  # already matches the broker
+    store.flush()
+    broker = SimpleNamespace(
+        get_positions=lambda: [{"symbol": "SPY", "qty": "7", "avg_entry_price": "501.5"},
+                               {"symbol": "QQQ", "qty": "3", "avg_entry_price": "420"},
+                               {"symbol": "IWM", "qty": "2", "avg_entry_price": "210"}],
+        get_orders=lambda: [],
+    )
+    written = []
+    bulk = store.bulk_upsert
+    store.bulk_upsert = lambda positions: written.extend(p.symbol for p in positions) or bulk(positions)
+    actions = StartupReconciler(broker=broker, position_store=store, order_tracker=MagicMock()).heal_startup()
+
+    assert {a.symbol for a in actions if a.kind == "position_upsert"} == {"SPY", "QQQ"}
+    assert written == ["QQQ", "SPY"]  # IWM untouched
+    # Heal is durable on return: the delete and both upserts in one commit.
+    assert _on_disk(db) == {"SPY": "7", "QQQ": "3", "IWM": "2"}
+    healed = store.get("SPY")
+    assert healed.quantity == Decimal("7") and healed.entry_price == Decimal("501.5")
+    # Broker qty / avg entry merged into the local row; the rest survives.
+    assert (healed.strategy, healed.order_id, healed.stop_loss) == ("s", "O-SPY", Decimal("490"))
+    assert healed.entry_time == spy.entry_time
+    assert store.get("QQQ").strategy == "reconciled"
+    store.close()
+
+
+def test_write_through_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv("MQD_POSITION_WRITE_BEHIND", raising=False)
+    store = PositionStore(tmp_path / "positions.db")
+    assert store.write_behind is False
+    store.upsert(_pos("SPY"))
+    assert _on_disk(tmp_path / "positions.db") == {"SPY": "10"}
+    assert store.flush() == 0
+    store.close()
+
+    monkeypatch.setenv("MQD_POSITION_WRITE_BEHIND", "1")
+    store = PositionStore(tmp_path / "positions.db", flush_interval_s=0)
+    assert store.write_behind is True and store.get("SPY").quantity == Decimal("10")
+    store.close()
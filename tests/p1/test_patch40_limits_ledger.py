@@ -0,0 +1,109 @@
+"""
+P1 Patch 40 – In-memory daily P&L ledger for PersistentLimitsTracker
+
+INVARIANT:
+    Pre-trade checks (is_daily_loss_limit_breached, get_remaining_loss_buffer,
+    get_daily_realized_pnl) never open the database. Every recorded P&L is
+    committed before it is reported, so a fresh tracker on the same file
+    sees the same totals. A failed write counts as a breach until a later
+    write succeeds. record_realized_pnl() no longer re-takes its own lock.
+
+DESIGN:
+    - One persistent sqlite3 connection (WAL, synchronous=FULL).
+    - Ledger (_day, _pnl, _trade_count) loaded at startup and when the
+      cached next-midnight timestamp passes.
+"""
+
+import sqlite3
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import core.risk.limits as limits_mod
+from core.risk.limits import PersistentLimitsTracker
+
+
+def _tracker(tmp_path, limit="100"):
+    return PersistentLimitsTracker(db_path=str(tmp_path / "limits.db"), daily_loss_limit=Decimal(limit))
+
+
+def test_record_persists_and_does_not_deadlock(tmp_path):
+    tracker = _tracker(tmp_path)
+    t = threading.Thread(target=lambda: [tracker.record_realized_pnl(Decimal("-30")) for _ in range(3)])
+    t.start()
+    t.join(5)
+    assert not t.is_alive()
+
+    assert tracker.get_daily_realized_pnl() == Decimal("-90")
+    assert tracker.get_daily_trade_count() == 3
+    assert tracker.get_remaining_loss_buffer() == Decimal("10")
+    assert tracker.is_daily_loss_limit_breached() is False
+    tracker.record_realized_pnl(Decimal("-10"))
+    assert tracker.is_daily_loss_limit_breached() is True
+    tracker.close()
+
+    restarted = _tracker(tmp_path)
+    assert restarted.get_daily_realized_pnl() == Decimal("-100")
+    assert restarted.get_stats()["daily_trade_count"] == 4
+    assert restarted.is_daily_loss_limit_breached() is True
+    restarted.close()
+
+
+def test_checks_never_touch_the_database(tmp_path, monkeypatch):
+    tracker = _tracker(tmp_path)
+    tracker.record_realized_pnl(Decimal("-25"))
+
+    def no_connect(*args, **kwargs):
+        raise AssertionError("pre-trade check opened the database")
+
+    monkeypatch.setattr(limits_mod.sqlite3, "connect", no_connect)
+    tracker._conn.close()  # and the persistent connection is not used either
+    for _ in range(100):
+        assert tracker.is_daily_loss_limit_breached() is False
+        assert tracker.get_remaining_loss_buffer() == Decimal("75")
+
+
+def test_day_rollover_starts_a_fresh_ledger(tmp_path, monkeypatch):
+    tracker = _tracker(tmp_path)
+    tracker.record_realized_pnl(Decimal("-80"))
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+
+    monkeypatch.setattr(limits_mod, "date", Tomorrow)
+    tracker._day_end_ts = 0.0  # midnight passed
+    assert tracker.get_daily_realized_pnl() == Decimal("0")
+    tracker.record_realized_pnl(Decimal("-5"))
+
+    conn = sqlite3.connect(str(tmp_path / "limits.db"))
+    rows = dict(conn.execute("SELECT trading_date, realized_pnl FROM daily_pnl"))
+    conn.close()
+    assert rows == {date.today().isoformat(): "-80", Tomorrow.today().isoformat(): "-5"}
+    tracker.close()
+
+
+class _BrokenConn:
+    def __enter__(self):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_failed_write_blocks_until_a_write_succeeds(tmp_path, monkeypatch):
+    tracker = _tracker(tmp_path)
+    monkeypatch.setattr(tracker, "_db", lambda: _BrokenConn())
+    with pytest.raises(sqlite3.OperationalError):
+        tracker.record_realized_pnl(Decimal("-1"))
+    assert tracker.get_daily_realized_pnl() == Decimal("-1")
+    assert tracker.is_daily_loss_limit_breached() is True  # fail closed
+
+    monkeypatch.undo()
+    tracker.record_realized_pnl(Decimal("-2"))
+    assert tracker.is_daily_loss_limit_breached() is False
+    tracker.close()
+    assert _tracker(tmp_path).get_daily_realized_pnl() == Decimal("-3")  # totals repaired
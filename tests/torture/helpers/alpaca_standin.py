@@ -0,0 +1,783 @@
+"""
+Local Alpaca-compatible stand-in server for end-to-end load testing.
+
+The torture harness monkeypatches objects, so the real HTTP, websocket and
+serialization paths are never exercised under load. This server implements
+the subset of Alpaca we use, on localhost, so the real connectors, user
+stream tracker, engine and journal can be driven at hundreds of orders per
+minute with no network:
+
+  Trading REST   /v2/account, /v2/clock, /v2/orders (market/limit/stop,
+                 bracket legs, by_client_order_id, cancel one/all),
+                 /v2/positions (list, get, close one/all)
+  Market data    /v2/stocks/bars, /v2/stocks/{symbol}/bars,
+                 /v2/stocks/snapshots, /v1beta1/news
+  Websocket      /stream (auth -> listen -> trade_updates), binary frames
+                 like the real trading stream
+
+Behaviour knobs (StandinConfig): latency distribution, fill mode
+(immediate / delayed / partial / never), reject rate, per-key rate limit
+(429 + X-RateLimit-* headers), injected 500s and hangs, and websocket drops.
+All randomness is seeded.
+
+Usage (tests):
+    with StandinServer(StandinConfig(fill_mode="delayed")) as srv:
+        broker = AsyncAlpacaBrokerConnector("k", "s", base_url=srv.base_url)
+        ...
+
+Usage (CLI, point the runtime at it):
+    python -m tests.torture.helpers.alpaca_standin --port 8788 --latency-ms 20
+    MQD_ALPACA_BASE_URL=http://127.0.0.1:8788 \\
+    MQD_ALPACA_DATA_URL=http://127.0.0.1:8788 \\
+    MQD_ALPACA_STREAM_URL=ws://127.0.0.1:8788/stream  python entry_paper.py
+
+    python -m tests.torture.helpers.alpaca_standin --bench 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(ts: Optional[datetime]) -> Optional[str]:
+    return ts.isoformat().replace("+00:00", "Z") if ts else None
+
+
+def _num(v: Any) -> Optional[str]:
+    return None if v is None else str(v)
+
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+
+@dataclass
+class LatencyModel:
+    """Per-request latency: fixed, uniform [ms, ms_hi] or lognormal(ms, sigma)."""
+    kind: str = "fixed"
+    ms: float = 0.0
+    ms_hi: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.ms, max(self.ms, self.ms_hi)) / 1000.0
+        if self.kind == "lognormal" and self.ms > 0:
+            import math
+            return rng.lognormvariate(math.log(self.ms), self.sigma) / 1000.0
+        return self.ms / 1000.0
+
+
+@dataclass
+class StandinConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    fill_mode: str = "immediate"       # immediate | delayed | partial | never
+    fill_delay_ms: float = 50.0
+    reject_rate: float = 0.0           # fraction of orders rejected after "new"
+    rate_limit_per_min: Optional[int] = None
+    error_rate: float = 0.0            # fraction of REST calls answered 500
+    hang_rate: float = 0.0             # fraction of REST calls delayed by hang_ms
+    hang_ms: float = 5000.0
+    ws_drop_after: Optional[int] = None  # close stream after N trade events
+    default_price: Decimal = Decimal("100")
+    cash: Decimal = Decimal("100000")
+    market_open: bool = True
+    seed: int = 7
+
+
+# ============================================================================
+# BROKER STATE
+# ============================================================================
+
+class _Book:
+    """Orders, positions and cash. Only touched on the server loop."""
+
+    def __init__(self, cfg: StandinConfig, emit):
+        self.cfg = cfg
+        self.emit = emit
+        self.rng = random.Random(cfg.seed)
+        self.cash = Decimal(cfg.cash)
+        self.prices: Dict[str, Decimal] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.by_client_id: Dict[str, str] = {}
+        self.positions: Dict[str, Dict[str, Decimal]] = {}
+        self.asset_ids: Dict[str, str] = {}
+
+    def price(self, symbol: str) -> Decimal:
+        return self.prices.setdefault(symbol, Decimal(self.cfg.default_price))
+
+    # -- orders -------------------------------------------------------------
+
+    def new_order(self, body: Dict[str, Any], parent: Optional[Dict] = None) -> Dict[str, Any]:
+        now = _now()
+        symbol = str(body["symbol"]).upper()
+        client_id = body.get("client_order_id") or str(uuid.uuid4())
+        order = {
+            "id": str(uuid.uuid4()), "client_order_id": client_id,
+            "created_at": _iso(now), "updated_at": _iso(now), "submitted_at": _iso(now),
+            "filled_at": None, "expired_at": None, "canceled_at": None, "failed_at": None,
+            "replaced_at": None, "replaced_by": None, "replaces": None,
+            "asset_id": self.asset_ids.setdefault(symbol, str(uuid.uuid4())),
+            "symbol": symbol, "asset_class": "us_equity", "notional": None,
+            "qty": _num(body.get("qty")), "filled_qty": "0", "filled_avg_price": None,
+            "order_class": body.get("order_class") or "simple",
+            "order_type": body.get("type", "market"), "type": body.get("type", "market"),
+            "side": body.get("side", "buy"), "time_in_force": body.get("time_in_force", "day"),
+            "limit_price": _num(body.get("limit_price")), "stop_price": _num(body.get("stop_price")),
+            "status": "held" if parent else "accepted", "extended_hours": False,
+            "legs": None, "trail_percent": None, "trail_price": None, "hwm": None,
+        }
+        self.orders[order["id"]] = order
+        self.by_client_id[client_id] = order["id"]
+        return order
+
+    def submit(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if body.get("client_order_id") in self.by_client_id:
+            raise web.HTTPUnprocessableEntity(
+                text=json.dumps({"code": 40010001, "message": "client_order_id must be unique"}),
+                content_type="application/json")
+        order = self.new_order(body)
+        if order["order_class"] == "bracket":
+            exit_side = "sell" if order["side"] == "buy" else "buy"
+            tp = self.new_order({"symbol": order["symbol"], "qty": order["qty"], "side": exit_side,
+                                 "type": "limit", "limit_price": body["take_profit"]["limit_price"],
+                                 "time_in_force": order["time_in_force"],
+                                 "order_class": "bracket"}, parent=order)
+            sl = self.new_order({"symbol": order["symbol"], "qty": order["qty"], "side": exit_side,
+                                 "type": "stop", "stop_price": body["stop_loss"]["stop_price"],
+                                 "time_in_force": order["time_in_force"],
+                                 "order_class": "bracket"}, parent=order)
+            order["legs"] = [tp["id"], sl["id"]]
+        order["status"] = "new"
+        self.emit("new", order)
+        if self.cfg.reject_rate and self.rng.random() < self.cfg.reject_rate:
+            self._finish(order, "rejected", "failed_at")
+            self.emit("rejected", order)
+        return order
+
+    def render(self, order: Dict[str, Any], nested: bool = True) -> Dict[str, Any]:
+        out = dict(order)
+        legs = order.get("legs")
+        out["legs"] = [self.render(self.orders[i], nested=False) for i in legs] if legs and nested else None
+        return out
+
+    def is_open(self, order: Dict[str, Any]) -> bool:
+        return order["status"] in ("new", "accepted", "partially_filled", "held", "pending_new")
+
+    def cancel(self, order_id: str) -> bool:
+        order = self.orders.get(order_id)
+        if order is None or not self.is_open(order):
+            return False
+        self._finish(order, "canceled", "canceled_at")
+        self.emit("canceled", order)
+        for leg in order.get("legs") or []:
+            self.cancel(leg)
+        return True
+
+    def _finish(self, order: Dict[str, Any], status: str, stamp: str) -> None:
+        now = _iso(_now())
+        order["status"] = status
+        order[stamp] = now
+        order["updated_at"] = now
+
+    # -- fills --------------------------------------------------------------
+
+    def marketable(self, order: Dict[str, Any]) -> bool:
+        px = self.price(order["symbol"])
+        if order["type"] == "market":
+            return True
+        if order["type"] == "limit":
+            limit = Decimal(order["limit_price"])
+            return px <= limit if order["side"] == "buy" else px >= limit
+        if order["type"] == "stop":
+            stop = Decimal(order["stop_price"])
+            return px >= stop if order["side"] == "buy" else px <= stop
+        return False
+
+    def fill(self, order: Dict[str, Any], qty: Optional[Decimal] = None) -> None:
+        if not self.is_open(order) or order["status"] == "held":
+            return
+        total = Decimal(order["qty"])
+        done = Decimal(order["filled_qty"])
+        qty = min(total - done, qty if qty is not None else total - done)
+        if qty <= 0:
+            return
+        px = self.price(order["symbol"])
+        prev_avg = Decimal(order["filled_avg_price"] or "0")
+        order["filled_qty"] = str(done + qty)
+        order["filled_avg_price"] = str(((prev_avg * done) + px * qty) / (done + qty))
+        order["updated_at"] = _iso(_now())
+        signed = qty if order["side"] == "buy" else -qty
+        self._apply_position(order["symbol"], signed, px)
+        self.cash -= signed * px
+
+        if done + qty >= total:
+            self._finish(order, "filled", "filled_at")
+            self.emit("fill", order, price=px, qty=qty)
+            self._on_filled(order)
+        else:
+            order["status"] = "partially_filled"
+            self.emit("partial_fill", order, price=px, qty=qty)
+
+    def _on_filled(self, order: Dict[str, Any]) -> None:
+        # Bracket: entry fill releases the legs; a leg fill cancels its sibling.
+        for leg_id in order.get("legs") or []:
+            leg = self.orders[leg_id]
+            leg["status"] = "new"
+            self.emit("new", leg)
+        for parent in self.orders.values():
+            legs = parent.get("legs") or []
+            if order["id"] in legs:
+                for sib in legs:
+                    if sib != order["id"]:
+                        self.cancel(sib)
+
+    def _apply_position(self, symbol: str, signed_qty: Decimal, px: Decimal) -> None:
+        pos = self.positions.get(symbol, {"qty": Decimal("0"), "avg": Decimal("0")})
+        qty = pos["qty"] + signed_qty
+        if qty == 0:
+            self.positions.pop(symbol, None)
+            return
+        if pos["qty"] == 0 or (pos["qty"] > 0) == (signed_qty > 0):
+            pos["avg"] = (pos["avg"] * abs(pos["qty"]) + px * abs(signed_qty)) / abs(qty)
+        pos["qty"] = qty
+        self.positions[symbol] = pos
+
+    def position_json(self, symbol: str) -> Dict[str, Any]:
+        pos = self.positions[symbol]
+        px = self.price(symbol)
+        qty = pos["qty"]
+        cost = pos["avg"] * qty
+        upl = (px - pos["avg"]) * qty
+        return {
+            "asset_id": self.asset_ids.setdefault(symbol, str(uuid.uuid4())), "symbol": symbol,
+            "exchange": "NASDAQ", "asset_class": "us_equity", "avg_entry_price": str(pos["avg"]),
+            "qty": str(qty), "qty_available": str(qty), "side": "long" if qty > 0 else "short",
+            "market_value": str(px * qty), "cost_basis": str(cost), "unrealized_pl": str(upl),
+            "unrealized_plpc": str(upl / cost if cost else 0), "unrealized_intraday_pl": str(upl),
+            "unrealized_intraday_plpc": str(upl / cost if cost else 0), "current_price": str(px),
+            "lastday_price": str(px), "change_today": "0",
+        }
+
+    def equity(self) -> Decimal:
+        return self.cash + sum(p["qty"] * self.price(s) for s, p in self.positions.items())
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class StandinServer:
+    """Runs the stand-in on a private event loop thread."""
+
+    def __init__(self, config: Optional[StandinConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StandinConfig()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(self.config.seed)
+        self.book = _Book(self.config, self._emit)
+        self.stats: Dict[str, int] = defaultdict(int)
+        self._req_times: Dict[str, deque] = defaultdict(deque)
+        self._streams: List[web.WebSocketResponse] = []
+        self._events_sent = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- lifecycle ----------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stream_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    def start(self) -> "StandinServer":
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        async def _boot():
+            self._runner = web.AppRunner(self._app(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            ready.set()
+
+        def _run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(_boot())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="alpaca-standin", daemon=True)
+        self._thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("stand-in server failed to start")
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def _shutdown():
+            for ws in list(self._streams):
+                await ws.close()
+            await self._runner.cleanup()
+
+        asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def call(self, fn, *args) -> Any:
+        """Run fn(*args) on the server loop (book is loop-confined)."""
+        async def _do():
+            return fn(*args)
+        return asyncio.run_coroutine_threadsafe(_do(), self._loop).result(10)
+
+    def set_price(self, symbol: str, price: Any) -> None:
+        """Move a price; working limit/stop orders that become marketable fill."""
+        def _set():
+            self.book.prices[symbol.upper()] = Decimal(str(price))
+            for order in list(self.book.orders.values()):
+                if order["symbol"] == symbol.upper() and order["status"] in ("new", "accepted", "partially_filled") \
+                        and order["type"] != "market" and self.book.marketable(order):
+                    self.book.fill(order)
+        self.call(_set)
+
+    # -- app ----------------------------------------------------------------
+
+    def _app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        r = app.router
+        r.add_get("/v2/account", self._account)
+        r.add_get("/v2/clock", self._clock)
+        r.add_post("/v2/orders", self._submit)
+        r.add_get("/v2/orders", self._list_orders)
+        r.add_delete("/v2/orders", self._cancel_all)
+        r.add_get("/v2/orders:by_client_order_id", self._by_client_id)
+        r.add_get("/v2/orders/{id}", self._get_order)
+        r.add_delete("/v2/orders/{id}", self._cancel)
+        r.add_get("/v2/positions", self._positions)
+        r.add_delete("/v2/positions", self._close_all)
+        r.add_get("/v2/positions/{symbol}", self._position)
+        r.add_delete("/v2/positions/{symbol}", self._close_position)
+        r.add_get("/v2/stocks/bars", self._bars)
+        r.add_get("/v2/stocks/snapshots", self._snapshots)
+        r.add_get("/v2/stocks/{symbol}/bars", self._symbol_bars)
+        r.add_get("/v1beta1/news", self._news)
+        r.add_get("/stream", self._stream)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if request.path == "/stream":
+            return await handler(request)
+        cfg = self.config
+        self.stats["requests"] += 1
+        self.stats[f"{request.method} {request.match_info.route.resource.canonical if request.match_info.route.resource else request.path}"] += 1
+
+        delay = cfg.latency.sample(self.rng)
+        if cfg.hang_rate and self.rng.random() < cfg.hang_rate:
+            self.stats["injected_hangs"] += 1
+            delay += cfg.hang_ms / 1000.0
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if not request.headers.get("APCA-API-KEY-ID"):
+            return web.json_response({"code": 40110000, "message": "access key verification failed"}, status=401)
+
+        headers = {}
+        if cfg.rate_limit_per_min:
+            key = request.headers["APCA-API-KEY-ID"]
+            window = self._req_times[key]
+            now = time.monotonic()
+            while window and window[0] <= now - 60.0:
+                window.popleft()
+            reset = int(time.time() + (60.0 - (now - window[0]) if window else 60.0))
+            if len(window) >= cfg.rate_limit_per_min:
+                self.stats["rate_limited"] += 1
+                return web.json_response({"code": 42910000, "message": "rate limit exceeded"}, status=429,
+                                         headers={"X-RateLimit-Limit": str(cfg.rate_limit_per_min),
+                                                  "X-RateLimit-Remaining": "0",
+                                                  "X-RateLimit-Reset": str(reset)})
+            window.append(now)
+            headers = {"X-RateLimit-Limit": str(cfg.rate_limit_per_min),
+                       "X-RateLimit-Remaining": str(cfg.rate_limit_per_min - len(window)),
+                       "X-RateLimit-Reset": str(reset)}
+
+        if cfg.error_rate and self.rng.random() < cfg.error_rate:
+            self.stats["injected_errors"] += 1
+            return web.json_response({"message": "internal server error"}, status=500)
+
+        resp = await handler(request)
+        resp.headers.update(headers)
+        return resp
+
+    # -- trading ------------------------------------------------------------
+
+    async def _account(self, request):
+        b = self.book
+        equity = b.equity()
+        return web.json_response({
+            "id": "00000000-0000-0000-0000-000000000001", "account_number": "PA0STANDIN",
+            "status": "ACTIVE", "crypto_status": "INACTIVE", "currency": "USD",
+            "buying_power": str(b.cash * 2), "regt_buying_power": str(b.cash * 2),
+            "daytrading_buying_power": str(b.cash * 4), "non_marginable_buying_power": str(b.cash),
+            "cash": str(b.cash), "portfolio_value": str(equity), "equity": str(equity),
+            "last_equity": str(equity), "long_market_value": str(equity - b.cash),
+            "short_market_value": "0", "initial_margin": "0", "maintenance_margin": "0",
+            "last_maintenance_margin": "0", "sma": "0", "daytrade_count": 0,
+            "pattern_day_trader": False, "trading_blocked": False, "transfers_blocked": False,
+            "account_blocked": False, "created_at": "2024-01-02T00:00:00Z",
+            "trade_suspended_by_user": False, "multiplier": "2", "shorting_enabled": True,
+        })
+
+    async def _clock(self, request):
+        now = _now()
+        return web.json_response({
+            "timestamp": _iso(now), "is_open": self.config.market_open,
+            "next_open": _iso(now + timedelta(hours=16)), "next_close": _iso(now + timedelta(hours=6)),
+        })
+
+    async def _submit(self, request):
+        body = await request.json()
+        order = self.book.submit(body)
+        self.stats["orders_submitted"] += 1
+        if order["status"] == "new":
+            self._schedule_fill(order)
+        return web.json_response(self.book.render(order))
+
+    def _schedule_fill(self, order: Dict[str, Any]) -> None:
+        mode = self.config.fill_mode
+        if mode == "never" or not self.book.marketable(order):
+            return
+        if mode == "immediate":
+            self.book.fill(order)
+            return
+        delay = self.config.fill_delay_ms / 1000.0
+        if mode == "partial":
+            half = (Decimal(order["qty"]) / 2).quantize(Decimal("1")) or Decimal(order["qty"])
+            self._loop.call_later(delay, self.book.fill, order, half)
+            self._loop.call_later(delay * 2, self.book.fill, order)
+        else:
+            self._loop.call_later(delay, self.book.fill, order)
+
+    async def _list_orders(self, request):
+        status = request.query.get("status", "open")
+        symbols = {s.upper() for s in request.query.get("symbols", "").split(",") if s}
+        nested = request.query.get("nested", "false").lower() == "true"
+        limit = int(request.query.get("limit", "50"))
+        out = []
+        for order in sorted(self.book.orders.values(), key=lambda o: o["created_at"], reverse=True):
+            is_open = self.book.is_open(order)
+            if (status == "open" and not is_open) or (status == "closed" and is_open):
+                continue
+            if symbols and order["symbol"] not in symbols:
+                continue
+            out.append(self.book.render(order, nested=nested))
+        return web.json_response(out[:limit])
+
+    def _order_or_404(self, order_id: Optional[str]) -> Dict[str, Any]:
+        order = self.book.orders.get(order_id or "")
+        if order is None:
+            raise web.HTTPNotFound(text=json.dumps({"code": 40410000, "message": "order not found"}),
+                                   content_type="application/json")
+        return order
+
+    async def _get_order(self, request):
+        order = self._order_or_404(request.match_info["id"])
+        return web.json_response(self.book.render(order, nested=request.query.get("nested") == "true"))
+
+    async def _by_client_id(self, request):
+        order_id = self.book.by_client_id.get(request.query.get("client_order_id", ""))
+        return web.json_response(self.book.render(self._order_or_404(order_id)))
+
+    async def _cancel(self, request):
+        order = self._order_or_404(request.match_info["id"])
+        if not self.book.cancel(order["id"]):
+            return web.json_response({"code": 42210000, "message": "order is not cancelable"}, status=422)
+        return web.Response(status=204)
+
+    async def _cancel_all(self, request):
+        out = []
+        for order in list(self.book.orders.values()):
+            if self.book.is_open(order) and self.book.cancel(order["id"]):
+                out.append({"id": order["id"], "status": 200, "body": self.book.render(order)})
+        return web.json_response(out, status=207)
+
+    async def _positions(self, request):
+        return web.json_response([self.book.position_json(s) for s in sorted(self.book.positions)])
+
+    async def _position(self, request):
+        symbol = request.match_info["symbol"].upper()
+        if symbol not in self.book.positions:
+            return web.json_response({"code": 40410000, "message": "position does not exist"}, status=404)
+        return web.json_response(self.book.position_json(symbol))
+
+    def _liquidate(self, symbol: str) -> Dict[str, Any]:
+        qty = self.book.positions[symbol]["qty"]
+        order = self.book.submit({"symbol": symbol, "qty": str(abs(qty)), "type": "market",
+                                  "side": "sell" if qty > 0 else "buy", "time_in_force": "day"})
+        self._schedule_fill(order)
+        return order
+
+    async def _close_position(self, request):
+        symbol = request.match_info["symbol"].upper()
+        if symbol not in self.book.positions:
+            return web.json_response({"code": 40410000, "message": "position does not exist"}, status=404)
+        return web.json_response(self.book.render(self._liquidate(symbol)))
+
+    async def _close_all(self, request):
+        if request.query.get("cancel_orders", "false").lower() == "true":
+            for order in list(self.book.orders.values()):
+                if self.book.is_open(order):
+                    self.book.cancel(order["id"])
+        out = []
+        for symbol in sorted(self.book.positions):
+            order = self._liquidate(symbol)
+            out.append({"symbol": symbol, "status": 200, "body": self.book.render(order)})
+        return web.json_response(out, status=207)
+
+    # -- market data --------------------------------------------------------
+
+    def _make_bars(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
+        px = float(self.book.price(symbol))
+        end = _now().replace(second=0, microsecond=0) - timedelta(minutes=1)
+        rng = random.Random(f"{self.config.seed}:{symbol}:{end.isoformat()}")
+        bars, close = [], px
+        for i in range(limit):
+            ts = end - timedelta(minutes=i)
+            open_ = close * (1 + rng.uniform(-0.002, 0.002))
+            hi, lo = max(open_, close) * 1.001, min(open_, close) * 0.999
+            bars.append({"t": _iso(ts), "o": round(open_, 4), "h": round(hi, 4), "l": round(lo, 4),
+                         "c": round(close, 4), "v": rng.randint(1_000, 50_000), "n": rng.randint(10, 500),
+                         "vw": round((hi + lo + close) / 3, 4)})
+            close = open_
+        return list(reversed(bars))
+
+    async def _bars(self, request):
+        limit = min(int(request.query.get("limit", "100")), 1000)
+        symbols = [s.upper() for s in request.query.get("symbols", "").split(",") if s]
+        return web.json_response({"bars": {s: self._make_bars(s, limit) for s in symbols},
+                                  "next_page_token": None})
+
+    async def _symbol_bars(self, request):
+        symbol = request.match_info["symbol"].upper()
+        limit = min(int(request.query.get("limit", "100")), 1000)
+        return web.json_response({"bars": self._make_bars(symbol, limit), "symbol": symbol,
+                                  "next_page_token": None})
+
+    async def _snapshots(self, request):
+        out = {}
+        for s in (x.upper() for x in request.query.get("symbols", "").split(",") if x):
+            px = float(self.book.price(s))
+            bar = self._make_bars(s, 1)[0]
+            out[s] = {
+                "latestTrade": {"t": _iso(_now()), "p": px, "s": 100, "x": "V", "i": 1, "c": ["@"], "z": "C"},
+                "latestQuote": {"t": _iso(_now()), "ap": px + 0.01, "as": 1, "bp": px - 0.01, "bs": 1,
+                                "ax": "V", "bx": "V", "c": ["R"], "z": "C"},
+                "minuteBar": bar, "dailyBar": dict(bar, v=2_000_000), "prevDailyBar": dict(bar, v=2_000_000),
+            }
+        return web.json_response(out)
+
+    async def _news(self, request):
+        return web.json_response({"news": [], "next_page_token": None})
+
+    # -- trade_updates stream -----------------------------------------------
+
+    async def _stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats["ws_connections"] += 1
+        authed = False
+        async for msg in ws:
+            if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                continue
+            try:
+                data = json.loads(msg.data)
+            except ValueError:
+                continue
+            action = data.get("action")
+            if action in ("auth", "authenticate"):
+                authed = bool(data.get("key"))
+                await ws.send_bytes(json.dumps({"stream": "authorization", "data": {
+                    "action": "authenticate", "status": "authorized" if authed else "unauthorized"}}).encode())
+            elif action == "listen" and authed:
+                streams = [s for s in (data.get("data") or {}).get("streams", []) if s == "trade_updates"]
+                if streams and ws not in self._streams:
+                    self._streams.append(ws)
+                await ws.send_bytes(json.dumps({"stream": "listening", "data": {"streams": streams}}).encode())
+        if ws in self._streams:
+            self._streams.remove(ws)
+        return ws
+
+    def _emit(self, event: str, order: Dict[str, Any], price=None, qty=None) -> None:
+        self.stats[f"event_{event}"] += 1
+        payload = {"event": event, "order": self.book.render(order, nested=False), "timestamp": _iso(_now())}
+        if event in ("fill", "partial_fill"):
+            pos = self.book.positions.get(order["symbol"])
+            payload.update(price=str(price), qty=str(qty), position_qty=str(pos["qty"] if pos else 0))
+        frame = json.dumps({"stream": "trade_updates", "data": payload}).encode()
+        for ws in list(self._streams):
+            asyncio.ensure_future(ws.send_bytes(frame))
+        self._events_sent += 1
+        drop = self.config.ws_drop_after
+        if drop and self._events_sent % drop == 0:
+            self.stats["ws_drops"] += 1
+            for ws in list(self._streams):
+                self._streams.remove(ws)
+                asyncio.ensure_future(ws.close())
+
+
+# ============================================================================
+# BENCHMARK: connector -> engine -> journal against the stand-in
+# ============================================================================
+
+def run_benchmark(
+    orders: int = 300,
+    concurrency: int = 16,
+    config: Optional[StandinConfig] = None,
+    journal_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Submit ``orders`` market orders through AsyncAlpacaBrokerConnector and
+    OrderExecutionEngine (with a TradeJournal), resolving completions from
+    the stand-in's trade_updates stream via UserStreamTracker.
+    """
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    from unittest.mock import MagicMock
+
+    from core.brokers import AsyncAlpacaBrokerConnector, BrokerOrderSide
+    from core.execution.engine import OrderExecutionEngine
+    from core.journal.trade_journal import TradeJournal
+    from core.realtime.user_stream_tracker import UserStreamTracker
+    from core.state import OrderStateMachine, OrderStatus, PositionStore
+
+    tmp = Path(journal_dir or tempfile.mkdtemp(prefix="standin_bench_"))
+    with StandinServer(config or StandinConfig(fill_mode="delayed", fill_delay_ms=20,
+                                               latency=LatencyModel("uniform", 2, 15))) as srv:
+        smoke = os.environ.pop("MQD_SMOKE_NO_ORDERS", None)
+        broker = AsyncAlpacaBrokerConnector("standin", "standin", paper=True, base_url=srv.base_url,
+                                            max_connections=concurrency)
+        journal = TradeJournal(base_dir=tmp / "journal")
+        engine = OrderExecutionEngine(
+            broker=broker,
+            state_machine=OrderStateMachine(event_bus=MagicMock(), transaction_log=MagicMock()),
+            position_store=PositionStore(db_path=str(tmp / "positions.db")),
+        )
+        engine.trade_journal = journal
+
+        stream = UserStreamTracker("standin", "standin", stream_url=srv.stream_url)
+        stream.on_trade_update(engine.completions.on_trade_update)
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(stream.start(), loop).result(10)
+
+        latencies: List[float] = []
+        lock = threading.Lock()
+
+        def one(i: int) -> bool:
+            t0 = time.perf_counter()
+            iid = f"BENCH-{i}"
+            bid = engine.submit_market_order(internal_order_id=iid, symbol=("SPY", "QQQ", "IWM")[i % 3],
+                                             quantity=Decimal("1"), side=BrokerOrderSide.BUY,
+                                             strategy="bench")
+            status = engine.wait_for_order(iid, bid, timeout_seconds=10, poll_interval=0.5)
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+            return status == OrderStatus.FILLED
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                filled = sum(pool.map(one, range(orders)))
+            elapsed = time.perf_counter() - start
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.stop(), loop).result(10)
+            loop.call_soon_threadsafe(loop.stop)
+            broker.close()
+            journal.close()
+            if smoke is not None:
+                os.environ["MQD_SMOKE_NO_ORDERS"] = smoke
+
+        latencies.sort()
+        return {
+            "orders": orders,
+            "filled": filled,
+            "elapsed_s": round(elapsed, 3),
+            "orders_per_min": round(orders / elapsed * 60.0, 1) if elapsed else None,
+            "latency_ms_p50": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "latency_ms_p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else None,
+            "server": dict(srv.stats),
+            "broker": broker.get_stats(),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Local Alpaca-compatible stand-in server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8788)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--latency-hi-ms", type=float, default=None, help="uniform latency upper bound")
+    ap.add_argument("--fill-mode", default="immediate", choices=["immediate", "delayed", "partial", "never"])
+    ap.add_argument("--fill-delay-ms", type=float, default=50.0)
+    ap.add_argument("--reject-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=int, default=None, help="requests per minute per key")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--ws-drop-after", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--bench", type=int, default=0, help="run the end-to-end benchmark with N orders")
+    args = ap.parse_args(argv)
+
+    latency = (LatencyModel("uniform", args.latency_ms, args.latency_hi_ms)
+               if args.latency_hi_ms is not None else LatencyModel("fixed", args.latency_ms))
+    cfg = StandinConfig(latency=latency, fill_mode=args.fill_mode, fill_delay_ms=args.fill_delay_ms,
+                        reject_rate=args.reject_rate, rate_limit_per_min=args.rate_limit,
+                        error_rate=args.error_rate, ws_drop_after=args.ws_drop_after, seed=args.seed)
+    if args.bench:
+        print(json.dumps(run_benchmark(args.bench, config=cfg), indent=2, default=str))
+        return
+
+    srv = StandinServer(cfg, host=args.host, port=args.port).start()
+    print(f"Alpaca stand-in listening on {srv.base_url} (stream {srv.stream_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()